@@ -5,16 +5,33 @@ from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 from flask_cors import CORS
 
+from app.events import Events
+from app.jobs import Jobs
+from app.metrics import Metrics
+from app.profiling import RequestProfiler
+from app.ratelimit import RateLimiter
+from app.revocation import TokenRevocation
+from app.search import Search
+from app.storage import Storage
+
 load_dotenv()
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
+revocation = TokenRevocation()
+profiler = RequestProfiler()
+metrics = Metrics()
+limiter = RateLimiter()
+search = Search()
+storage = Storage()
+events = Events()
+jobs = Jobs()
 
 
-def create_app():
+def create_app(config_object="config.Config"):
     app = Flask(__name__)
-    app.config.from_object("config.Config")
+    app.config.from_object(config_object)
 
     CORS(app, supports_credentials=True)
 
@@ -22,12 +39,34 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    revocation.init_app(app)
+    profiler.init_app(app)
+    metrics.init_app(app)
+    limiter.init_app(app)
+    search.init_app(app)
+    storage.init_app(app)
+    events.init_app(app)
+    jobs.init_app(app)
+
+    from app.lifecycle import install_soft_delete_filter
+
+    install_soft_delete_filter()
 
     from app.routes.auth import auth_bp
     from app.routes.course import courses_bp
     from app.routes.lessons import lessons_bp
     from app.routes.enrollments import enrollments_bp
     from app.routes.progress import progress_bp
+    from app.routes.health import health_bp
+    from app.routes.search import search_bp
+    from app.routes.reviews import reviews_bp
+    from app.routes.roster import roster_bp
+    from app.routes.media import media_bp
+    from app.routes.bundles import bundles_bp
+    from app.routes.batch import batch_bp
+    from app.routes.events import events_bp
+    from app.routes.certificates import certificates_bp
+    from app.routes.exports import exports_bp
 
     
     app.register_blueprint(auth_bp)
@@ -35,6 +74,32 @@ def create_app():
     app.register_blueprint(lessons_bp)
     app.register_blueprint(enrollments_bp)
     app.register_blueprint(progress_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(reviews_bp)
+    app.register_blueprint(roster_bp)
+    app.register_blueprint(media_bp)
+    app.register_blueprint(bundles_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(certificates_bp)
+    app.register_blueprint(exports_bp)
+
+    from app.recommendations import recommendations_cli
+    from app.progress_bitmap import progress_cli
+    from app.rendering import lessons_cli
+    from app.media import media_cli
+    from app.lifecycle import courses_cli
+    from app.popularity import popularity_cli
+    from app.worker import jobs_cli
+
+    app.cli.add_command(recommendations_cli)
+    app.cli.add_command(progress_cli)
+    app.cli.add_command(lessons_cli)
+    app.cli.add_command(media_cli)
+    app.cli.add_command(courses_cli)
+    app.cli.add_command(popularity_cli)
+    app.cli.add_command(jobs_cli)
 
     @app.route("/")
     def home():
@@ -0,0 +1,265 @@
+import asyncio
+import contextvars
+import io
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from flask import request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+
+logger = logging.getLogger("languagelift.asgi")
+
+# ASGI serving mode (backend/asgi.py, GUNICORN_WORKER_CLASS=uvicorn). GET routes
+# with an @async_view run on the event loop against an async engine (aiomysql /
+# aiosqlite), so a request waiting on the database holds no thread. Every other
+# request goes to the unchanged Flask app on a small thread pool.
+#
+# An async view runs inside a normal Flask request context: URL matching,
+# before/after_request hooks (metrics, rate limits, CORS, profiling), JWT checks,
+# error handlers and jsonify are all Flask's, so the response is the one the sync
+# view would give. Async views only read; raise Fallback to let the sync view
+# answer (e.g. it has to write). It runs on the thread pool in the same request
+# context, so the hooks (a rate-limit token, metrics) still run once per request.
+
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+_views = {}  # endpoint -> async view
+
+
+class Fallback(Exception):
+    pass
+
+
+def async_view(endpoint: str):
+    # Serve GET <endpoint> with this coroutine under ASGI: view(session, **view_args)
+    def decorator(fn):
+        _views[endpoint] = fn
+        return fn
+
+    return decorator
+
+
+def async_database_url(url: str):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def _environ(scope, body) -> dict:
+    # PEP 3333 environ for an ASGI HTTP scope
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1"), value.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _headers(headers) -> list:
+    return [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+
+class AsyncApp:
+    def __init__(self, app):
+        app.config.setdefault("ASYNC_DATABASE_URL", "")
+        app.config.setdefault("ASYNC_POOL_SIZE", 10)
+        app.config.setdefault("ASYNC_MAX_OVERFLOW", 10)
+        app.config.setdefault("ASGI_WSGI_THREADS", 8)
+        self.app = app
+        self.engine = None
+        self.sessions = None
+        self.executor = None
+
+    # -----------------------
+    # Lifecycle (per worker process)
+    # -----------------------
+    def _start(self):
+        # Created in the worker, never in a preloading master
+        config = self.app.config
+        url = make_url(config["ASYNC_DATABASE_URL"] or async_database_url(config["SQLALCHEMY_DATABASE_URI"]))
+        options = {"pool_pre_ping": True}
+        if url.get_backend_name() != "sqlite":
+            options.update(
+                pool_size=config["ASYNC_POOL_SIZE"],
+                max_overflow=config["ASYNC_MAX_OVERFLOW"],
+                pool_recycle=3600,
+            )
+        self.engine = create_async_engine(url, **options)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.executor = ThreadPoolExecutor(config["ASGI_WSGI_THREADS"], thread_name_prefix="wsgi")
+
+    async def _stop(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.executor.shutdown(wait=False)
+            self.engine = None
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.engine is None:
+                    self._start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self._stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # -----------------------
+    # Requests
+    # -----------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope: {scope['type']}")
+        if self.engine is None:
+            self._start()
+
+        view = None
+        if scope["method"] == "GET":
+            environ = _environ(scope, io.BytesIO())
+            try:
+                endpoint, _ = self.app.url_map.bind_to_environ(environ).match(method="GET")
+                view = _views.get(endpoint)
+            except HTTPException:
+                pass
+        if view is not None:
+            return await self._call_async(view, environ, receive, send)
+        await self._call_wsgi(scope, receive, send)
+
+    async def _call_async(self, view, environ, receive, send):
+        # Flask's full_dispatch_request with an awaited view
+        app = self.app
+        ctx = app.request_context(environ)
+        ctx.push()
+        try:
+            async with self.sessions() as session:
+                try:
+                    try:
+                        rv = app.preprocess_request()
+                        if rv is None:
+                            try:
+                                rv = await view(session, **request.view_args)
+                            except Fallback:
+                                rv = await self._run_sync(app.dispatch_request)
+                    except Exception as e:
+                        rv = app.handle_user_exception(e)
+                    response = app.finalize_request(rv)
+                except Exception as e:
+                    response = app.handle_exception(e)
+            status, headers = response.status_code, response.get_wsgi_headers(environ)
+        finally:
+            # Teardown (and the session) before the body, as under WSGI
+            ctx.pop()
+
+        await send({"type": "http.response.start", "status": status, "headers": _headers(headers.items())})
+        if hasattr(response.response, "__aiter__"):
+            await self._send_stream(response.response, receive, send)
+        else:
+            await send({"type": "http.response.body", "body": b"".join(response.get_app_iter(environ))})
+
+    async def _run_sync(self, fn):
+        # fn on the thread pool, with the current request context
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, context.run, fn)
+
+    async def _send_stream(self, chunks, receive, send):
+        # An async generator body (GET /events); stops when the client goes away
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        watcher = asyncio.ensure_future(disconnected())
+        try:
+            async for chunk in chunks:
+                if watcher.done():
+                    break
+                await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            await chunks.aclose()
+
+    async def _call_wsgi(self, scope, receive, send):
+        # The Flask app on the thread pool; the body is streamed chunk by chunk
+        body = SpooledTemporaryFile(max_size=1024 * 1024)
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return
+            body.write(message.get("body", b""))
+            more = message.get("more_body", False)
+        body.seek(0)
+        environ = _environ(scope, body)
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = headers
+
+        def first():
+            iterable = self.app(environ, start_response)
+            iterator = iter(iterable)
+            return iterable, iterator, next(iterator, None)
+
+        # Each step may run on a different pool thread. Flask keeps the request
+        # context in context variables, and a streamed body (stream_with_context)
+        # needs it on every chunk, so all steps of a request run in one context.
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+
+        def step(fn, *args):
+            return loop.run_in_executor(self.executor, context.run, fn, *args)
+
+        iterable, iterator, chunk = await step(first)
+        try:
+            await send({"type": "http.response.start", "status": started["status"],
+                        "headers": _headers(started["headers"])})
+            while chunk is not None:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await step(next, iterator, None)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(iterable, "close"):
+                await step(iterable.close)
+            body.close()
@@ -0,0 +1,271 @@
+import glob
+import hashlib
+import json
+import os
+import secrets
+import tarfile
+import zipfile
+
+from sqlalchemy import select
+
+from app import db, storage
+from app.models.lesson import Lesson
+from app.models.media import LessonMedia, MediaBlob
+from app.rendering import ensure_rendered
+
+# Offline course bundles: manifest.json + lessons/<id>.json + media/<sha256>.
+#
+# The course version is a hash of everything that ends up in the bundle, computed
+# from narrow columns (content_hash stands in for the lesson text), so checking for
+# changes never loads lesson bodies. Full bundles are streamed to the first client
+# while being written to MEDIA_ROOT/cache; later downloads of the same version are
+# plain file responses (Range, resumable). The manifest lists a sha256 per file so
+# clients can fetch only lessons that changed (?lessons=1,2,3).
+
+BUNDLE_FORMAT = 1
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)  # fixed timestamps: same version, same bytes
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# -----------------------
+# Version + manifest
+# -----------------------
+def _media_rows(course_id: int):
+    return db.session.execute(
+        select(
+            LessonMedia.id, LessonMedia.lesson_id, LessonMedia.sha256, LessonMedia.filename,
+            LessonMedia.content_type, MediaBlob.size,
+        )
+        .join(Lesson, Lesson.id == LessonMedia.lesson_id)
+        .join(MediaBlob, MediaBlob.sha256 == LessonMedia.sha256)
+        .where(Lesson.course_id == course_id)
+        .order_by(LessonMedia.id)
+    ).all()
+
+
+def course_version(course) -> str:
+    lessons = db.session.execute(
+        select(Lesson.id, Lesson.title, Lesson.order_index, Lesson.content_hash,
+               Lesson.content_html.is_(None).label("unrendered"))
+        .where(Lesson.course_id == course.id)
+        .order_by(Lesson.order_index, Lesson.id)
+    ).all()
+    if any(l.content_hash is None or l.unrendered for l in lessons):
+        # Legacy rows: render once so their hash is part of the version
+        for lesson in Lesson.query.filter_by(course_id=course.id).filter(
+            (Lesson.content_hash.is_(None)) | (Lesson.content_html.is_(None))
+        ):
+            ensure_rendered(lesson)
+        db.session.commit()
+        return course_version(course)
+
+    digest = hashlib.sha256(_dumps([
+        BUNDLE_FORMAT,
+        [course.id, course.title, course.description, course.level],
+        [[l.id, l.title, l.order_index, l.content_hash] for l in lessons],
+        [list(m) for m in _media_rows(course.id)],
+    ]))
+    return digest.hexdigest()[:20]
+
+
+def _media_path(sha256: str, filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()[:10]
+    return f"media/{sha256}{ext}"
+
+
+def build_manifest(course, version: str, lesson_ids=None):
+    # (manifest, [(path, bytes or (sha256, size), compress)]) in bundle order;
+    # lesson_ids limits the files (not the manifest) to those lessons
+    media_by_lesson = {}
+    for m in _media_rows(course.id):
+        media_by_lesson.setdefault(m.lesson_id, []).append({
+            "id": m.id,
+            "filename": m.filename,
+            "content_type": m.content_type,
+            "size": m.size,
+            "sha256": m.sha256,
+            "path": _media_path(m.sha256, m.filename),
+        })
+
+    query = Lesson.query.filter_by(course_id=course.id).order_by(Lesson.order_index, Lesson.id)
+    lessons, entries, media_files = [], [], {}
+    for lesson in query:
+        media = media_by_lesson.get(lesson.id, [])
+        body = _dumps({
+            "id": lesson.id,
+            "course_id": lesson.course_id,
+            "title": lesson.title,
+            "content": lesson.content,
+            "content_html": lesson.content_html,
+            "order_index": lesson.order_index,
+            "media": media,
+        })
+        path = f"lessons/{lesson.id}.json"
+        lessons.append({
+            "id": lesson.id,
+            "title": lesson.title,
+            "order_index": lesson.order_index,
+            "path": path,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+            "media": [m["path"] for m in media],
+        })
+        if lesson_ids is None or lesson.id in lesson_ids:
+            entries.append((path, body, True))
+            for m in media:
+                # Media is already compressed (audio/video/images): stored, not deflated
+                media_files.setdefault(m["path"], (m["path"], (m["sha256"], m["size"]), False))
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "course": {"id": course.id, "title": course.title, "description": course.description, "level": course.level},
+        "lessons": lessons,
+        "media": {
+            m["path"]: {"sha256": m["sha256"], "size": m["size"], "content_type": m["content_type"]}
+            for media in media_by_lesson.values() for m in media
+        },
+    }
+    entries = [("manifest.json", _dumps(manifest), True)] + entries + list(media_files.values())
+    return manifest, entries
+
+
+# -----------------------
+# Streaming writers (no temp files, no seeking)
+# -----------------------
+class _Sink:
+    # Write-only file object; the generator hands out what was written so far.
+    # No tell()/seek(), so zipfile writes data descriptors instead of seeking back.
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _entry_chunks(content, backend):
+    # bytes, (sha256, size) in storage, or an iterator of bytes chunks
+    if isinstance(content, bytes):
+        yield content
+    elif isinstance(content, tuple):
+        sha256, size = content
+        yield from backend.open_range(sha256, 0, size)
+    else:
+        yield from content
+
+
+def _entry_size(content) -> int | None:
+    if isinstance(content, bytes):
+        return len(content)
+    return content[1] if isinstance(content, tuple) else None
+
+
+def zip_stream(entries, backend):
+    # entries may be a generator; each entry is written before the next is pulled
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as zf:
+        for path, content, compress in entries:
+            info = zipfile.ZipInfo(path, date_time=ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            size = _entry_size(content)
+            info.file_size = size or 0  # lets zipfile decide on zip64 up front
+            with zf.open(info, "w", force_zip64=size is None) as f:
+                for chunk in _entry_chunks(content, backend):
+                    f.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def tar_zst_stream(entries, backend, level: int = 10):
+    import zstandard
+
+    sink = _Sink()
+    writer = zstandard.ZstdCompressor(level=level).stream_writer(sink, closefd=False)
+    for path, content, _ in entries:
+        size = _entry_size(content)
+        info = tarfile.TarInfo(path)
+        info.size = size
+        info.mode = 0o644
+        writer.write(info.tobuf(format=tarfile.PAX_FORMAT))
+        for chunk in _entry_chunks(content, backend):
+            writer.write(chunk)
+            data = sink.drain()
+            if data:
+                yield data
+        writer.write(b"\0" * (-size % tarfile.BLOCKSIZE))
+    writer.write(b"\0" * (tarfile.BLOCKSIZE * 2))
+    writer.flush(zstandard.FLUSH_FRAME)
+    yield sink.drain()
+
+
+STREAMS = {"zip": zip_stream, "tar.zst": tar_zst_stream}
+
+
+# -----------------------
+# Cache
+# -----------------------
+def cache_path(course_id: int, version: str, fmt: str) -> str:
+    return storage.cache_path("bundles", f"course-{course_id}-{version}.{fmt}")
+
+
+def cached_manifest(course, version: str) -> dict:
+    path = cache_path(course.id, version, "manifest.json")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return json.load(f)
+    manifest, _ = build_manifest(course, version, lesson_ids=set())
+    evict_old_versions(course.id, version)
+    _write_atomic(path, _dumps(manifest))
+    return manifest
+
+
+def _write_atomic(path: str, data: bytes):
+    part = f"{path}.{secrets.token_hex(4)}.part"
+    with open(part, "wb") as f:
+        f.write(data)
+    os.replace(part, path)
+
+
+def stream_and_cache(chunks, path: str):
+    # Tee the stream into the cache; a client that disconnects early leaves nothing
+    part = f"{path}.{secrets.token_hex(4)}.part"
+    complete = False
+    try:
+        with open(part, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(part, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(part):
+            os.remove(part)
+
+
+def evict_old_versions(course_id: int, version: str):
+    for path in glob.glob(storage.cache_path("bundles", f"course-{course_id}-*")):
+        if f"-{version}." not in os.path.basename(path) and not path.endswith(".part"):
+            os.remove(path)
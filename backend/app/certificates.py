@@ -0,0 +1,248 @@
+import hashlib
+import secrets
+import uuid
+import zlib
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db, events, jobs, storage
+from app.events import user_channel
+from app.jobs import task
+from app.media import file_in_use
+from app.models.certificate import Certificate
+from app.models.course import Course
+
+# Course completion certificates. Completing the last lesson of a course inserts a
+# Certificate (verification code, name and title as of that day) in the same
+# transaction and enqueues certificates.render; a job worker draws the PDF and
+# stores it content-addressed in the media storage backend. The PDF is a function
+# of the certificate row and the template fingerprint only (no timestamps in the
+# file), so rendering twice gives the same bytes and the same key.
+#
+# Changing the layout (TEMPLATE_VERSION) or CERTIFICATE_ISSUER /
+# CERTIFICATE_VERIFY_URL changes the fingerprint; certificates.regenerate then
+# re-renders a course (or everything) in batches spread over the workers.
+#
+# The PDF uses the standard Helvetica fonts in WinAnsiEncoding, so it needs no font
+# files; characters outside Windows-1252 are printed as "?".
+
+TEMPLATE_VERSION = 1
+REGENERATE_BATCH = 200
+
+CODE_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32
+CODE_LENGTH = 12
+
+
+# -----------------------
+# Verification codes
+# -----------------------
+def new_code() -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def format_code(code: str) -> str:
+    return "-".join(code[i:i + 4] for i in range(0, len(code), 4))
+
+
+def normalize_code(text: str) -> str | None:
+    # As typed: any case, dashes or spaces, O for 0 and I/L for 1
+    code = text.upper().replace("-", "").replace(" ", "")
+    code = code.replace("O", "0").replace("I", "1").replace("L", "1")
+    if len(code) != CODE_LENGTH or any(ch not in CODE_ALPHABET for ch in code):
+        return None
+    return code
+
+
+# -----------------------
+# PDF
+# -----------------------
+# Advance widths (1/1000 em) of ASCII 32..126; other characters count as 556
+_HELVETICA = (
+    "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 "
+    "556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 "
+    "1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+    "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 "
+    "333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 "
+    "556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+)
+_HELVETICA_BOLD = (
+    "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 "
+    "556 556 556 556 556 556 556 556 556 556 333 333 584 584 584 611 "
+    "975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 "
+    "667 778 722 667 611 722 667 944 667 667 611 333 278 333 584 556 "
+    "333 556 611 556 611 556 333 611 611 278 278 556 278 889 611 611 "
+    "611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+)
+_WIDTHS = {
+    "F1": [int(w) for w in _HELVETICA.split()],
+    "F2": [int(w) for w in _HELVETICA_BOLD.split()],
+}
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595  # A4 landscape, points
+INK = "0.12 0.23 0.45"
+
+
+def _text_width(text: str, font: str, size: float) -> float:
+    widths = _WIDTHS[font]
+    return sum(widths[ord(ch) - 32] if 32 <= ord(ch) <= 126 else 556 for ch in text) * size / 1000
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _centered(text: str, font: str, size: float, y: float, max_width: float = 700) -> bytes:
+    # Shrinks long names and titles to fit the page
+    width = _text_width(text, font, size)
+    if width > max_width:
+        size, width = size * max_width / width, max_width
+    x = (PAGE_WIDTH - width) / 2
+    return b"BT /%s %.2f Tf 1 0 0 1 %.2f %.2f Tm %s Tj ET\n" % (font.encode(), size, x, y, _pdf_string(text))
+
+
+def _pdf(content: bytes, title: str) -> bytes:
+    body = zlib.compress(content, 9)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(body) + body + b"\nendstream",
+        b"<< /Title " + _pdf_string(title) + b" /Producer (LanguageLift) >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 7 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_pdf(cert: Certificate, issuer: str, verify_url: str) -> bytes:
+    issued = f"{cert.issued_at:%B} {cert.issued_at.day}, {cert.issued_at:%Y}"
+    code = format_code(cert.code)
+    content = b"".join([
+        b"%s RG %s rg\n" % (INK.encode(), INK.encode()),
+        b"3 w 30 30 782 535 re S\n0.75 w 42 42 758 511 re S\n",
+        b"0.5 w 221 322 m 621 322 l S\n",
+        _centered(issuer, "F2", 16, 492),
+        _centered("Certificate of Completion", "F2", 34, 432),
+        _centered("This certifies that", "F1", 14, 384),
+        _centered(cert.student_name, "F2", 30, 332),
+        _centered("has successfully completed the course", "F1", 14, 288),
+        _centered(cert.course_title, "F2", 22, 248),
+        _centered(f"Issued on {issued}", "F1", 13, 200),
+        _centered(f"Verification code: {code}", "F2", 11, 92),
+        _centered(f"Verify at {verify_url.format(code=code)}", "F1", 10, 74),
+    ])
+    return _pdf(content, f"{issuer} certificate {code}")
+
+
+def template_fingerprint() -> str:
+    cfg = current_app.config
+    key = f"{TEMPLATE_VERSION}\0{cfg['CERTIFICATE_ISSUER']}\0{cfg['CERTIFICATE_VERIFY_URL']}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+# -----------------------
+# Issuing (request time)
+# -----------------------
+def issue(user, course_id: int) -> Certificate | None:
+    # In the completing request's transaction, once every lesson is done; None if
+    # the user already has this course's certificate
+    if db.session.execute(
+        select(Certificate.id).where(Certificate.user_id == user.id, Certificate.course_id == course_id)
+    ).first():
+        return None
+    title = db.session.execute(select(Course.title).where(Course.id == course_id)).scalar()
+    for _ in range(3):
+        cert = Certificate(user_id=user.id, course_id=course_id, code=new_code(),
+                           student_name=user.name, course_title=title, issued_at=datetime.utcnow())
+        try:
+            with db.session.begin_nested():
+                db.session.add(cert)
+        except IntegrityError:
+            # Completed concurrently (same user and course), or a code collision
+            if db.session.execute(
+                select(Certificate.id).where(Certificate.user_id == user.id, Certificate.course_id == course_id)
+            ).first():
+                return None
+            continue
+        jobs.enqueue("certificates.render", {"ids": [cert.id]})
+        return cert
+    return None
+
+
+# -----------------------
+# Rendering (job workers)
+# -----------------------
+def _store(cert: Certificate, fingerprint: str) -> str | None:
+    # Render and store the PDF; returns the digest it replaced, if any
+    cfg = current_app.config
+    pdf = render_pdf(cert, cfg["CERTIFICATE_ISSUER"], cfg["CERTIFICATE_VERIFY_URL"])
+    digest = hashlib.sha256(pdf).hexdigest()
+    backend = storage.backend
+    if not backend.exists(digest):
+        staged = storage.staging_path(f"certificate-{uuid.uuid4().hex}")
+        with open(staged, "wb") as f:
+            f.write(pdf)
+        backend.put(digest, staged)
+    replaced = cert.sha256 if cert.sha256 != digest else None
+    cert.sha256, cert.size, cert.template, cert.rendered_at = digest, len(pdf), fingerprint, datetime.utcnow()
+    return replaced
+
+
+def _release(digests):
+    # After commit: delete files no certificate (or lesson media) points to any more
+    for digest in digests:
+        if not file_in_use(digest):
+            storage.backend.delete(digest)
+
+
+@task("certificates.render", backoff=10.0)
+def render_certificates(ids: list, force: bool = False) -> dict:
+    fingerprint = template_fingerprint()
+    certs = Certificate.query.filter(Certificate.id.in_(ids)).order_by(Certificate.id).all()
+    todo = [c for c in certs if force or not c.sha256 or c.template != fingerprint]
+    replaced = [d for d in (_store(c, fingerprint) for c in todo) if d]
+    db.session.commit()
+    _release(replaced)
+
+    from app.serializers import certificate_json
+
+    for cert in todo:
+        events.publish(user_channel(cert.user_id), "certificate", certificate_json(cert))
+    return {"rendered": len(todo), "skipped": len(certs) - len(todo)}
+
+
+@task("certificates.regenerate", concurrency=1)
+def regenerate(course_id: int | None = None, batch_size: int = REGENERATE_BATCH) -> dict:
+    # Enqueue certificates.render for every certificate drawn with another
+    # template, batch_size per job, so all workers share the work
+    fingerprint = template_fingerprint()
+    stale = or_(Certificate.template.is_(None), Certificate.template != fingerprint)
+    last_id, batches, total = 0, 0, 0
+    while True:
+        stmt = select(Certificate.id).where(stale, Certificate.id > last_id).order_by(Certificate.id).limit(batch_size)
+        if course_id is not None:
+            stmt = stmt.where(Certificate.course_id == course_id)
+        ids = db.session.execute(stmt).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        jobs.enqueue("certificates.render", {"ids": ids})
+        db.session.commit()
+        batches += 1
+        total += len(ids)
+    return {"certificates": total, "jobs": batches}
+
@@ -0,0 +1,138 @@
+from flask import g
+from sqlalchemy import select
+
+from app import db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson, LessonPrerequisite
+from app.models.progress import CourseProgress
+from app.models.recommendation import CourseNeighbor
+
+# DataLoader-style batching for POST /batch. A resolver asks a loader for keys
+# (load) and returns a thunk; when the first thunk reads a value (get), every key
+# queued so far on that loader is fetched in one WHERE ... IN (...) query. Values
+# are memoized for the rest of the request, so 20 sub-requests naming the same
+# course cost one lookup.
+
+
+class DataLoader:
+    def __init__(self, batch_fn):
+        # batch_fn(keys) -> {key: value}; missing keys resolve to None
+        self._batch_fn = batch_fn
+        self._cache = {}
+        self._queue = {}
+        self.batches = 0
+
+    def load(self, key):
+        if key not in self._cache:
+            self._queue[key] = None
+        return lambda: self.get(key)
+
+    def load_many(self, keys):
+        thunks = [self.load(k) for k in keys]
+        return lambda: [t() for t in thunks]
+
+    def prime(self, key, value):
+        # A value fetched some other way (e.g. courses joined into enrollments)
+        self._cache.setdefault(key, value)
+
+    def get(self, key):
+        if key not in self._cache:
+            self._queue[key] = None
+            self.dispatch()
+        return self._cache[key]
+
+    def dispatch(self):
+        keys = [k for k in self._queue if k not in self._cache]
+        self._queue = {}
+        if not keys:
+            return
+        found = self._batch_fn(keys)
+        self.batches += 1
+        for key in keys:
+            self._cache[key] = found.get(key)
+
+
+# -----------------------
+# Batch functions (one query each)
+# -----------------------
+def _courses(ids):
+    return {c.id: c for c in Course.query.filter(Course.id.in_(ids))}
+
+
+def _lessons(ids):
+    return {l.id: l for l in Lesson.query.filter(Lesson.id.in_(ids))}
+
+
+def _course_lessons(course_ids):
+    # {course_id: [Lesson, ...]} in display order; courses without lessons get []
+    result = {cid: [] for cid in course_ids}
+    for lesson in Lesson.query.filter(Lesson.course_id.in_(course_ids)).order_by(
+        Lesson.course_id, Lesson.order_index.asc(), Lesson.id.asc()
+    ):
+        result[lesson.course_id].append(lesson)
+    return result
+
+
+def _gated(course_ids):
+    # {course_id: {lesson ids that have prerequisites}}
+    result = {cid: set() for cid in course_ids}
+    for course_id, lesson_id in db.session.execute(
+        select(LessonPrerequisite.course_id, LessonPrerequisite.lesson_id)
+        .where(LessonPrerequisite.course_id.in_(course_ids))
+        .distinct()
+    ):
+        result[course_id].add(lesson_id)
+    return result
+
+
+def _pairs(model, keys):
+    # keys: (user_id, course_id); usually one user, so IN on both columns and an
+    # exact match in Python
+    users = {u for u, _ in keys}
+    courses = {c for _, c in keys}
+    rows = model.query.filter(model.user_id.in_(users), model.course_id.in_(courses))
+    wanted = set(keys)
+    return {(r.user_id, r.course_id): r for r in rows if (r.user_id, r.course_id) in wanted}
+
+
+def _enrollments(keys):
+    return _pairs(Enrollment, keys)
+
+
+def _course_progress(keys):
+    return _pairs(CourseProgress, keys)
+
+
+def _related(keys):
+    # keys: (course_id, limit) -> [(CourseNeighbor, Course)] by rank; archived
+    # neighbors are skipped as in GET /courses/<id>/related (top-K rows per course)
+    rows = (
+        db.session.query(CourseNeighbor, Course)
+        .join(Course, Course.id == CourseNeighbor.neighbor_id)
+        .filter(CourseNeighbor.course_id.in_({c for c, _ in keys}), Course.archived_at.is_(None))
+        .order_by(CourseNeighbor.course_id, CourseNeighbor.rank)
+    )
+    by_course = {}
+    for n, c in rows:
+        by_course.setdefault(n.course_id, []).append((n, c))
+    return {(cid, l): by_course.get(cid, [])[:l] for cid, l in keys}
+
+
+BATCH_FUNCTIONS = {
+    "course": _courses,
+    "lesson": _lessons,
+    "course_lessons": _course_lessons,
+    "gated": _gated,
+    "enrollment": _enrollments,
+    "course_progress": _course_progress,
+    "related": _related,
+}
+
+
+def loader(name: str) -> DataLoader:
+    # One loader per name per request (memoization never outlives the request)
+    loaders = g.setdefault("dataloaders", {})
+    if name not in loaders:
+        loaders[name] = DataLoader(BATCH_FUNCTIONS[name])
+    return loaders[name]
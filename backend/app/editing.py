@@ -0,0 +1,114 @@
+import hashlib
+
+from flask import request
+from sqlalchemy import case, select, update
+
+from app import db
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.rendering import content_hash, render_markdown
+
+# Optimistic concurrency for edits. Course and Lesson carry a `version` that every
+# edit bumps in the same UPDATE that checks it (WHERE version = <the one the client
+# saw>), so two editors can never silently overwrite each other. Clients send the
+# ETag of what they edited as If-Match:
+#   course-<id>-v<version>      GET/PATCH /courses/<id>
+#   lesson-<id>-v<version>      GET/PATCH /lessons/<id>
+#   lessons-<course id>-<hash>  GET /courses/<id>/lessons, PUT .../lessons/order
+
+
+class PreconditionRequired(Exception):
+    pass
+
+
+class VersionConflict(Exception):
+    pass
+
+
+def course_etag(course: Course) -> str:
+    return f"course-{course.id}-v{course.version}"
+
+
+def lesson_etag(lesson: Lesson) -> str:
+    return f"lesson-{lesson.id}-v{lesson.version}"
+
+
+def lessons_etag(course_id: int, lessons) -> str:
+    # Changes when a lesson is added, removed, edited or moved
+    pairs = sorted((l.id, l.version) for l in lessons)
+    digest = hashlib.sha256(",".join(f"{i}:{v}" for i, v in pairs).encode("ascii"))
+    return f"lessons-{course_id}-{digest.hexdigest()[:16]}"
+
+
+def check_if_match(etag: str):
+    if not request.if_match:
+        raise PreconditionRequired()
+    if not request.if_match.contains(etag):
+        raise VersionConflict()
+
+
+# -----------------------
+# Edits
+# -----------------------
+def _update_versioned(model, row, values: dict):
+    # One conditional UPDATE; 0 rows means someone else saved since the row was read
+    result = db.session.execute(
+        update(model)
+        .where(model.id == row.id, model.version == row.version)
+        .values(**values, version=model.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        raise VersionConflict()
+    db.session.commit()
+    db.session.refresh(row)
+
+
+def edit_course(course: Course, changes: dict):
+    _update_versioned(Course, course, changes)
+
+
+def edit_lesson(lesson: Lesson, changes: dict):
+    if "content" in changes:
+        # Rendered at write time, as on create
+        changes["content_html"] = render_markdown(changes["content"])
+        changes["content_hash"] = content_hash(changes["content"])
+    _update_versioned(Lesson, lesson, changes)
+
+
+def reorder_lessons(course_id: int, current, lesson_ids) -> int:
+    # current: the course's lessons as read (id, order_index, version). Rewrites
+    # order_index to 1..n in lesson_ids order with one UPDATE of the lessons that
+    # moved; each must still be at the version read. Returns how many moved.
+    position = {lesson_id: i for i, lesson_id in enumerate(lesson_ids, start=1)}
+    moved = {l.id: l.version for l in current if l.order_index != position[l.id]}
+    if not moved:
+        return 0
+
+    result = db.session.execute(
+        update(Lesson)
+        .where(
+            Lesson.course_id == course_id,
+            Lesson.id.in_(moved),
+            Lesson.version == case(moved, value=Lesson.id),
+        )
+        .values(
+            order_index=case({i: position[i] for i in moved}, value=Lesson.id),
+            version=Lesson.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(moved):
+        db.session.rollback()
+        raise VersionConflict()
+    db.session.commit()
+    return len(moved)
+
+
+def course_lessons(course_id: int):
+    return db.session.execute(
+        select(Lesson.id, Lesson.order_index, Lesson.version)
+        .where(Lesson.course_id == course_id, Lesson.deleted_at.is_(None))
+        .order_by(Lesson.order_index, Lesson.id)
+    ).all()
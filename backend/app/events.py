@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from flask import current_app
+
+logger = logging.getLogger("languagelift.events")
+
+# Live events for GET /events (server-sent events). Channels:
+#   course:<id>   enrollments, lesson completions and lesson edits in a course
+#   user:<id>     the user's own enrollments and progress
+#
+# Every worker fans events out to its open streams from memory. Brokers
+# (EVENTS_URL):
+#   memory://  events only reach streams in the publishing process (dev, tests)
+#   redis://   PUBLISH to one Redis channel; one listener thread per worker
+#              receives every event and fans it out locally
+#
+# A stream waits on an event, not a thread of its own: under the gevent worker an
+# idle connection costs a greenlet and a small queue, under ASGI a coroutine.
+# The last EVENTS_REPLAY events per channel are kept, so a client that reconnects
+# with Last-Event-ID receives what it missed. If they are gone, or its queue
+# overflowed, it gets a "reset" event and reloads.
+
+
+def course_channel(course_id: int) -> str:
+    return f"course:{course_id}"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class Subscription:
+    def __init__(self, channels, maxsize: int):
+        self.channels = tuple(channels)
+        self._events = deque(maxlen=maxsize)
+        self._wakeup = threading.Event()
+        self._waiter = None  # (loop, asyncio.Event) once an ASGI stream waits on it
+        self.overflowed = False
+
+    def put(self, event: dict):
+        # Called from any thread (request threads, the Redis listener)
+        if len(self._events) == self._events.maxlen:
+            self.overflowed = True
+        self._events.append(event)
+        self._wakeup.set()
+        if self._waiter:
+            loop, flag = self._waiter
+            try:
+                loop.call_soon_threadsafe(flag.set)
+            except RuntimeError:
+                pass  # loop closed: the worker is shutting down
+
+    def get(self, timeout: float) -> list:
+        # Everything queued, or [] after timeout (time for a heartbeat)
+        if not self._events:
+            self._wakeup.wait(timeout)
+        self._wakeup.clear()
+        return self._drain()
+
+    async def get_async(self, timeout: float) -> list:
+        # The same on the event loop (app.asgi)
+        if self._waiter is None:
+            self._waiter = (asyncio.get_running_loop(), asyncio.Event())
+        flag = self._waiter[1]
+        if not self._events:
+            try:
+                await asyncio.wait_for(flag.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        flag.clear()
+        self._wakeup.clear()
+        return self._drain()
+
+    def _drain(self) -> list:
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+# -----------------------
+# Brokers
+# -----------------------
+class MemoryBroker:
+    def __init__(self, queue_size: int = 256, replay: int = 100, replay_channels: int = 10_000):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # channel -> {Subscription}
+        self._open = 0
+        self._recent = OrderedDict()  # channel -> deque of recent events, LRU
+        self._queue_size = queue_size
+        self._replay = replay
+        self._replay_channels = replay_channels
+
+    def subscribe(self, channels, last_event_id: str | None = None):
+        # (subscription, missed events, True if some could not be replayed)
+        sub = Subscription(channels, self._queue_size)
+        missed, gap = [], False
+        with self._lock:
+            self._open += 1
+            for channel in sub.channels:
+                self._subscriptions.setdefault(channel, set()).add(sub)
+                if last_event_id:
+                    # Ids sort by time, and the last id may come from another channel
+                    recent = self._recent.get(channel, ())
+                    missed.extend(e for e in recent if e["id"] > last_event_id)
+                    if len(recent) == self._replay and recent[0]["id"] > last_event_id:
+                        gap = True
+        missed.sort(key=lambda e: e["id"])
+        return sub, missed, gap
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._open -= 1
+            for channel in sub.channels:
+                subs = self._subscriptions.get(channel)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscriptions[channel]
+
+    def connections(self) -> int:
+        return self._open
+
+    def deliver(self, event: dict):
+        channel = event["channel"]
+        with self._lock:
+            recent = self._recent.get(channel)
+            if recent is None:
+                recent = self._recent[channel] = deque(maxlen=self._replay)
+                if len(self._recent) > self._replay_channels:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(channel)
+            recent.append(event)
+            subs = list(self._subscriptions.get(channel, ()))
+        for sub in subs:
+            sub.put(event)
+
+    def publish(self, event: dict):
+        self.deliver(event)
+
+
+class RedisBroker(MemoryBroker):
+    def __init__(self, url: str, prefix: str, **kwargs):
+        import redis
+
+        super().__init__(**kwargs)
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._listen_client = redis.Redis.from_url(url, socket_connect_timeout=0.5, health_check_interval=30)
+        self._channel = prefix + "events"
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, event: dict):
+        try:
+            self._client.publish(self._channel, json.dumps(event, separators=(",", ":")))
+        except Exception as e:
+            # Redis down: at least this worker's streams see it
+            logger.warning("event publish failed, delivering locally: %s", e)
+            self.deliver(event)
+
+    def subscribe(self, channels, last_event_id: str | None = None):
+        # Started in the worker on first use (never in a preloading master)
+        if self._listener is None:
+            with self._listener_lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+                    self._listener.start()
+        return super().subscribe(channels, last_event_id)
+
+    def _listen(self):
+        backoff = 0.5
+        while True:
+            try:
+                pubsub = self._listen_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                backoff = 0.5
+                for message in pubsub.listen():
+                    self.deliver(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning("event listener disconnected, retrying in %.1fs: %s", backoff, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+
+# -----------------------
+# Extension
+# -----------------------
+class Events:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("EVENTS_URL", "memory://")
+        app.config.setdefault("EVENTS_PREFIX", "languagelift:")
+        app.config.setdefault("EVENTS_QUEUE_SIZE", 256)
+        app.config.setdefault("EVENTS_REPLAY", 100)
+        app.config.setdefault("EVENTS_HEARTBEAT_SECONDS", 15.0)
+        app.config.setdefault("EVENTS_MAX_STREAM_SECONDS", 300.0)
+        app.config.setdefault("EVENTS_MAX_CONNECTIONS", 1000)
+
+        url = app.config["EVENTS_URL"]
+        options = {"queue_size": app.config["EVENTS_QUEUE_SIZE"], "replay": app.config["EVENTS_REPLAY"]}
+        if url.startswith("memory://"):
+            broker = MemoryBroker(**options)
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            broker = RedisBroker(url, app.config["EVENTS_PREFIX"], **options)
+        else:
+            raise ValueError(f"Unsupported EVENTS_URL: {url}")
+        app.extensions["events"] = broker
+
+    @property
+    def broker(self):
+        return current_app.extensions["events"]
+
+    def publish(self, channel: str, type_: str, data: dict):
+        # Call after the change is committed; ids sort by time across workers
+        event = {
+            "id": f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}",
+            "channel": channel,
+            "type": type_,
+            "data": data,
+        }
+        self.broker.publish(event)
+        from app import metrics
+
+        metrics.inc("languagelift_events_published_total", type=type_)
+        return event
@@ -0,0 +1,272 @@
+import json
+import threading
+import time
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import select
+
+from app import db, metrics
+from app.models.archive import EnrollmentArchive, ProgressArchive
+from app.models.certificate import Certificate
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+from app.models.review import ReviewState, VocabularyItem
+from app.serializers import certificate_json
+
+# Personal data export: one zip of NDJSON files per user, streamed while it is read.
+#
+# Every dataset is read in the order of an index that starts with user_id (the
+# unique (user_id, lesson_id) on progress, the primary key of review_states, ...),
+# through a server-side cursor fetching STREAM_CHUNK rows at a time. Memory stays at
+# one chunk and the database never sorts, however long the user's history is.
+#
+# An export is cut into parts of at most EXPORT_PART_ROWS rows. Each part ends with
+# export.json, holding a signed token for the next part (null on the last one). The
+# token is the dataset and the last key written, so a part can be fetched again,
+# or the export resumed after a dropped connection, without starting over. Rows
+# added meanwhile with a higher key still show up in a later part.
+#
+# Throttling, so exports never starve interactive traffic: reads are paced to
+# EXPORT_ROWS_PER_SECOND per export, and a worker streams at most
+# EXPORT_MAX_CONCURRENT exports (each holds a pool connection while it runs).
+
+EXPORT_FORMAT = 1
+STREAM_CHUNK = 1000  # rows per server-side cursor fetch
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# -----------------------
+# Datasets: (file, key column, query for one user, row -> dict), in export order
+# -----------------------
+def _enrollments(user_id: int):
+    return (
+        select(Enrollment.course_id, Enrollment.enrolled_at, Course.title, Course.deleted_at)
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.user_id == user_id)
+    )
+
+
+def _enrollment_json(r) -> dict:
+    return {
+        "course_id": r.course_id,
+        "course_title": r.title,
+        "course_deleted": r.deleted_at is not None,
+        "enrolled_at": _iso(r.enrolled_at),
+    }
+
+
+def _progress(user_id: int):
+    return (
+        select(Progress.lesson_id, Progress.completed, Progress.completed_at, Lesson.title, Lesson.course_id)
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Progress.user_id == user_id)
+    )
+
+
+def _progress_json(r) -> dict:
+    return {
+        "lesson_id": r.lesson_id,
+        "lesson_title": r.title,
+        "course_id": r.course_id,
+        "completed": r.completed,
+        "completed_at": _iso(r.completed_at),
+    }
+
+
+def _reviews(user_id: int):
+    return (
+        select(ReviewState, VocabularyItem.term, VocabularyItem.translation, VocabularyItem.lesson_id)
+        .join(VocabularyItem, VocabularyItem.id == ReviewState.item_id)
+        .where(ReviewState.user_id == user_id)
+    )
+
+
+def _review_json(r) -> dict:
+    state = r.ReviewState
+    return {
+        "item_id": state.item_id,
+        "term": r.term,
+        "translation": r.translation,
+        "lesson_id": r.lesson_id,
+        "ease": state.ease,
+        "interval_days": state.interval_days,
+        "repetitions": state.repetitions,
+        "lapses": state.lapses,
+        "due_at": _iso(state.due_at),
+        "last_reviewed_at": _iso(state.last_reviewed_at),
+    }
+
+
+def _certificates(user_id: int):
+    return select(Certificate).where(Certificate.user_id == user_id)
+
+
+def _enrollments_archive(user_id: int):
+    return select(EnrollmentArchive).where(EnrollmentArchive.user_id == user_id)
+
+
+def _enrollment_archive_json(r) -> dict:
+    e = r.EnrollmentArchive
+    return {
+        "course_id": e.course_id,
+        "course_title": e.course_title,
+        "enrolled_at": _iso(e.enrolled_at),
+        "archived_at": _iso(e.archived_at),
+    }
+
+
+def _progress_archive(user_id: int):
+    return select(ProgressArchive).where(ProgressArchive.user_id == user_id)
+
+
+def _progress_archive_json(r) -> dict:
+    p = r.ProgressArchive
+    return {
+        "lesson_id": p.lesson_id,
+        "lesson_title": p.lesson_title,
+        "course_id": p.course_id,
+        "completed": p.completed,
+        "completed_at": _iso(p.completed_at),
+        "archived_at": _iso(p.archived_at),
+    }
+
+
+DATASETS = (
+    ("enrollments.ndjson", Enrollment.course_id, _enrollments, _enrollment_json),
+    ("progress.ndjson", Progress.lesson_id, _progress, _progress_json),
+    ("reviews.ndjson", ReviewState.item_id, _reviews, _review_json),
+    ("certificates.ndjson", Certificate.course_id, _certificates, lambda r: certificate_json(r.Certificate)),
+    # Purged courses and lessons (app.lifecycle)
+    ("archive/enrollments.ndjson", EnrollmentArchive.id, _enrollments_archive, _enrollment_archive_json),
+    ("archive/progress.ndjson", ProgressArchive.id, _progress_archive, _progress_archive_json),
+)
+
+
+# -----------------------
+# Part tokens
+# -----------------------
+def _serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt="languagelift-export")
+
+
+def dump_token(user_id: int, part: int, dataset: int, after) -> str:
+    return _serializer().dumps({"u": user_id, "p": part, "d": dataset, "k": after})
+
+
+def load_token(token: str, user_id: int):
+    # (part, dataset index, last key written), or None if the token is not valid
+    # for this user
+    try:
+        data = _serializer().loads(token)
+    except BadSignature:
+        return None
+    if data.get("u") != user_id or not 0 <= data.get("d", -1) < len(DATASETS):
+        return None
+    return data["p"], data["d"], data["k"]
+
+
+# -----------------------
+# Throttling
+# -----------------------
+class _Slots:
+    # Exports currently streaming in this process
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self, limit: int) -> bool:
+        with self._lock:
+            if self.active >= limit:
+                return False
+            self.active += 1
+        metrics.inc("languagelift_exports_running")
+        return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        metrics.inc("languagelift_exports_running", -1)
+
+
+slots = _Slots()
+
+
+class _Pacer:
+    # Sleeps between chunks so the export reads at most `rate` rows per second
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def __call__(self, rows: int):
+        self.rows += rows
+        if self.rate > 0:
+            ahead = self.rows / self.rate - (time.monotonic() - self.started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+
+# -----------------------
+# Streaming
+# -----------------------
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _profile_json(user) -> dict:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "created_at": _iso(user.created_at),
+    }
+
+
+def part_entries(user, part: int = 1, dataset: int = 0, after=None):
+    # zip_stream entries for one part. Lazy: each file is written before the next
+    # entry is pulled, so the budget left is known when deciding what comes next.
+    cfg = current_app.config
+    budget = cfg["EXPORT_PART_ROWS"]
+    pace = _Pacer(cfg["EXPORT_ROWS_PER_SECOND"])
+    state = {"rows": {}, "next": None}
+
+    def rows(index, name, key, query, to_json, limit):
+        stmt = query(user.id).add_columns(key.label("export_key"))
+        if after is not None and index == dataset:
+            stmt = stmt.where(key > after)
+        stmt = stmt.order_by(key).limit(limit).execution_options(yield_per=STREAM_CHUNK, include_deleted=True)
+        count, last = 0, None
+        for chunk in db.session.execute(stmt).partitions():
+            yield b"".join(_dumps(to_json(r)) + b"\n" for r in chunk)
+            count += len(chunk)
+            last = chunk[-1].export_key
+            pace(len(chunk))
+        metrics.inc("languagelift_export_rows_total", count, dataset=name.split(".")[0])
+        state["rows"][name] = count
+        if count == limit:
+            # Budget spent: the next part resumes after the last key
+            state["next"] = dump_token(user.id, part + 1, index, last)
+
+    if part == 1 and dataset == 0 and after is None:
+        yield "profile.json", _dumps(_profile_json(user)), True
+    for index in range(dataset, len(DATASETS)):
+        name, key, query, to_json = DATASETS[index]
+        yield name, rows(index, name, key, query, to_json, budget), True
+        budget -= state["rows"][name]
+        if state["next"]:
+            break
+
+    yield "export.json", _dumps({
+        "format": EXPORT_FORMAT,
+        "user_id": user.id,
+        "part": part,
+        "rows": state["rows"],
+        "next": state["next"],
+    }), True
@@ -0,0 +1,596 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("languagelift.jobs")
+
+# Deferred and periodic work outside requests. A task is a function registered
+# with @task("name"); jobs.enqueue("name", {...}) records a job and returns at
+# once, and `flask jobs worker` processes (app/worker.py) run it. Queues (JOBS_URL):
+#   sql://     the jobs table in the app database (default). The job is inserted in
+#              the caller's transaction, so it exists iff the request commits.
+#   redis://   sorted sets in Redis; the job is pushed when the caller's session
+#              commits and dropped if it rolls back.
+#
+# Delivery is at least once: a worker claims a job with a lease of the task's
+# timeout, and a job whose worker died (or that outran its timeout) is retried
+# when the lease expires, so tasks must be safe to run twice. Failed runs are
+# retried after backoff * 2^(attempt - 1) seconds (capped at
+# JOBS_MAX_BACKOFF_SECONDS) until max_attempts, then stay "failed" for
+# `flask jobs retry`. Periodic jobs come from JOBS_SCHEDULES (cron syntax, UTC);
+# every worker runs the scheduler and a unique key per task and minute keeps it
+# to one job per slot.
+
+
+class Task:
+    def __init__(self, fn, name: str, max_attempts: int, backoff: float, timeout: float, concurrency: int | None):
+        self.fn = fn
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.concurrency = concurrency  # at most this many running at once, across workers
+
+    def retry_delay(self, attempts: int, cap: float) -> float:
+        return min(self.backoff * 2 ** (attempts - 1), cap)
+
+
+tasks = {}  # name -> Task
+
+
+def task(name: str, max_attempts: int = 5, backoff: float = 30.0, timeout: float = 3600.0, concurrency: int | None = None):
+    # fn(**args) runs in an app context; its return value (JSON) is kept on the job
+    def decorator(fn):
+        tasks[name] = Task(fn, name, max_attempts, backoff, timeout, concurrency)
+        return fn
+
+    return decorator
+
+
+# -----------------------
+# Cron schedules
+# -----------------------
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _cron_field(spec: str, lo: int, hi: int) -> frozenset:
+    # "*", "5", "1-5", "*/15", "0-30/10", "5/15" and lists of those
+    values = set()
+    for part in spec.split(","):
+        span, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if span == "*":
+            start, end = lo, hi
+        elif "-" in span:
+            start, end = (int(v) for v in span.split("-", 1))
+        else:
+            start = end = int(span)
+            if step > 1:
+                end = hi
+        if step < 1 or not lo <= start <= end <= hi:
+            raise ValueError(f"Bad cron field {spec!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class Cron:
+    # minute hour day-of-month month day-of-week (0 or 7 = Sunday)
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _cron_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_FIELDS)
+        )
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        # As in cron: with both day fields restricted, either one matches
+        self._either_day = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom, dow = dt.day in self.days, dt.isoweekday() % 7 in self.weekdays
+        return (dom or dow) if self._either_day else (dom and dow)
+
+    def matches(self, dt: datetime) -> bool:
+        return (
+            dt.minute in self.minutes
+            and dt.hour in self.hours
+            and dt.month in self.months
+            and self._day_matches(dt)
+        )
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months or not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+            elif t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        return None
+
+
+def parse_schedules(value) -> dict:
+    # "popularity.reconcile=7 * * * *; courses.purge=30 3 * * *" -> {task: Cron}
+    if isinstance(value, dict):
+        return {name: Cron(expr) for name, expr in value.items()}
+    schedules = {}
+    for part in filter(None, (p.strip() for p in value.split(";"))):
+        name, _, expr = part.partition("=")
+        schedules[name.strip()] = Cron(expr.strip())
+    return schedules
+
+
+# -----------------------
+# Queues
+# -----------------------
+# A claimed job is a dict: id, name, args, attempts (including this run), max_attempts.
+# Every state change after the claim is conditional on the worker still holding it.
+def _job_dict(job_id, name, args, attempts, max_attempts) -> dict:
+    return {"id": job_id, "name": name, "args": json.loads(args or "{}"),
+            "attempts": int(attempts), "max_attempts": int(max_attempts)}
+
+
+def _epoch(dt: datetime) -> float:
+    # Naive datetimes here are UTC (datetime.utcnow)
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class SqlQueue:
+    name = "sql"
+
+    def enqueue(self, name, args, run_at, max_attempts, unique_key=None):
+        from sqlalchemy.exc import IntegrityError
+
+        from app import db
+        from app.models.job import Job
+
+        job = Job(name=name, args=_dumps(args), run_at=run_at, max_attempts=max_attempts, unique_key=unique_key)
+        if unique_key is None:
+            db.session.add(job)
+            db.session.flush()
+            return job.id
+        try:
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            return None  # a job with this key exists
+        return job.id
+
+    def claim(self, worker_id: str, names) -> dict | None:
+        from sqlalchemy import select, update
+
+        from app import db
+        from app.models.job import Job
+
+        now = datetime.utcnow()
+        candidate = (
+            select(Job.id, Job.name)
+            .where(Job.status == "queued", Job.run_at <= now, Job.name.in_(names))
+            .order_by(Job.run_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        # SKIP LOCKED keeps workers off each other's rows (MySQL 8, PostgreSQL);
+        # elsewhere the conditional UPDATE decides and the loser tries again
+        for _ in range(3):
+            row = db.session.execute(candidate).first()
+            if row is None:
+                db.session.commit()
+                return None
+            lease = now + timedelta(seconds=tasks[row.name].timeout)
+            claimed = db.session.execute(
+                update(Job.__table__)
+                .where(Job.__table__.c.id == row.id, Job.__table__.c.status == "queued")
+                .values(status="running", attempts=Job.__table__.c.attempts + 1, locked_by=worker_id,
+                        locked_until=lease, started_at=now)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                job = db.session.execute(
+                    select(Job.id, Job.name, Job.args, Job.attempts, Job.max_attempts).where(Job.id == row.id)
+                ).one()
+                db.session.commit()
+                return _job_dict(*job)
+        return None
+
+    def _finish(self, worker_id: str, job: dict, **values) -> bool:
+        from sqlalchemy import update
+
+        from app import db
+        from app.models.job import Job
+
+        table = Job.__table__
+        changed = db.session.execute(
+            update(table)
+            .where(table.c.id == job["id"], table.c.status == "running", table.c.locked_by == worker_id)
+            .values(locked_by=None, locked_until=None, **values)
+        ).rowcount
+        db.session.commit()
+        return bool(changed)
+
+    def complete(self, worker_id, job, result) -> bool:
+        return self._finish(worker_id, job, status="done", result=_dumps(result), last_error=None,
+                            finished_at=datetime.utcnow())
+
+    def retry(self, worker_id, job, error: str, run_at: datetime) -> bool:
+        return self._finish(worker_id, job, status="queued", run_at=run_at, last_error=error)
+
+    def fail(self, worker_id, job, error: str) -> bool:
+        return self._finish(worker_id, job, status="failed", last_error=error, finished_at=datetime.utcnow())
+
+    def release(self, worker_id, job, run_at: datetime) -> bool:
+        # Put back unrun (concurrency limit reached); the attempt does not count
+        from app.models.job import Job
+
+        return self._finish(worker_id, job, status="queued", run_at=run_at, attempts=Job.__table__.c.attempts - 1)
+
+    def running_counts(self) -> dict:
+        from sqlalchemy import func, select
+
+        from app import db
+        from app.models.job import Job
+
+        counts = dict(db.session.execute(
+            select(Job.name, func.count()).where(Job.status == "running").group_by(Job.name)
+        ).all())
+        db.session.commit()
+        return counts
+
+    def recover(self) -> int:
+        # Jobs whose lease ran out go back to the queue, or fail if out of attempts
+        from sqlalchemy import update
+
+        from app import db
+        from app.models.job import Job
+
+        table = Job.__table__
+        now = datetime.utcnow()
+        expired = (table.c.status == "running", table.c.locked_until < now)
+        failed = db.session.execute(
+            update(table)
+            .where(*expired, table.c.attempts >= table.c.max_attempts)
+            .values(status="failed", locked_by=None, locked_until=None, last_error="Lease expired", finished_at=now)
+        ).rowcount
+        requeued = db.session.execute(
+            update(table)
+            .where(*expired)
+            .values(status="queued", locked_by=None, locked_until=None, last_error="Lease expired", run_at=now)
+        ).rowcount
+        db.session.commit()
+        return failed + requeued
+
+    def requeue(self, job_id: int) -> bool:
+        # A failed job, with a fresh set of attempts
+        from sqlalchemy import update
+
+        from app import db
+        from app.models.job import Job
+
+        table = Job.__table__
+        changed = db.session.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.status == "failed")
+            .values(status="queued", attempts=0, run_at=datetime.utcnow(), finished_at=None)
+        ).rowcount
+        db.session.commit()
+        return bool(changed)
+
+    def prune(self, before: datetime, batch_size: int = 1000) -> int:
+        from sqlalchemy import delete, select
+
+        from app import db
+        from app.models.job import Job
+
+        removed = 0
+        while True:
+            ids = db.session.execute(
+                select(Job.id).where(Job.status.in_(("done", "failed")), Job.finished_at < before).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return removed
+            db.session.execute(delete(Job.__table__).where(Job.__table__.c.id.in_(ids)))
+            db.session.commit()
+            removed += len(ids)
+
+    def counts(self) -> dict:
+        from sqlalchemy import func, select
+
+        from app import db
+        from app.models.job import Job
+
+        return dict(db.session.execute(select(Job.status, func.count()).group_by(Job.status)).all())
+
+    def recent(self, status: str | None = None, limit: int = 20) -> list:
+        from sqlalchemy import select
+
+        from app import db
+        from app.models.job import Job
+
+        stmt = select(Job).order_by(Job.id.desc()).limit(limit)
+        if status:
+            stmt = stmt.where(Job.status == status)
+        return [
+            {"id": j.id, "name": j.name, "status": j.status, "attempts": j.attempts,
+             "max_attempts": j.max_attempts, "run_at": j.run_at, "last_error": j.last_error}
+            for j in db.session.execute(stmt).scalars()
+        ]
+
+
+# Redis: one hash per job, a sorted set of due times per task (queued:<name>) and
+# sorted sets for running (by lease deadline), done and failed (by finish time).
+# Claims and state changes are Lua scripts, so they are atomic.
+_CLAIM = """
+local best, best_score, best_key, best_lease
+for i = 2, #KEYS do
+  local r = redis.call('ZRANGEBYSCORE', KEYS[i], '-inf', ARGV[1], 'LIMIT', 0, 1, 'WITHSCORES')
+  if r[1] and (not best_score or tonumber(r[2]) < best_score) then
+    best, best_score, best_key, best_lease = r[1], tonumber(r[2]), KEYS[i], ARGV[i + 2]
+  end
+end
+if not best then return false end
+redis.call('ZREM', best_key, best)
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(best_lease), best)
+local job = ARGV[3] .. 'job:' .. best
+redis.call('HINCRBY', job, 'attempts', 1)
+redis.call('HSET', job, 'status', 'running', 'locked_by', ARGV[2], 'started_at', ARGV[1])
+return best
+"""
+
+_FINISH = """
+if redis.call('HGET', KEYS[1], 'locked_by') ~= ARGV[1] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[2])
+redis.call('HINCRBY', KEYS[1], 'attempts', ARGV[5])
+redis.call('HSET', KEYS[1], 'status', ARGV[4], 'locked_by', '', unpack(ARGV, 6))
+return 1
+"""
+
+_RECOVER = """
+local lease = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not lease or tonumber(lease) >= tonumber(ARGV[2]) then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+if tonumber(redis.call('HGET', KEYS[2], 'attempts')) >= tonumber(redis.call('HGET', KEYS[2], 'max_attempts')) then
+  redis.call('ZADD', KEYS[4], ARGV[2], ARGV[1])
+  redis.call('HSET', KEYS[2], 'status', 'failed', 'locked_by', '', 'last_error', 'Lease expired', 'finished_at', ARGV[2])
+else
+  redis.call('ZADD', KEYS[3], ARGV[2], ARGV[1])
+  redis.call('HSET', KEYS[2], 'status', 'queued', 'locked_by', '', 'last_error', 'Lease expired')
+end
+return 1
+"""
+
+
+class RedisQueue:
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+        self._claim = self._client.register_script(_CLAIM)
+        self._finish_script = self._client.register_script(_FINISH)
+        self._recover = self._client.register_script(_RECOVER)
+
+    def _key(self, *parts) -> str:
+        return self._prefix + ":".join(str(p) for p in parts)
+
+    def enqueue(self, name, args, run_at, max_attempts, unique_key=None):
+        # The id now; the job itself once the caller's session commits
+        job_id = self._client.incr(self._key("ids"))
+        _pending().append((self, job_id, name, args, run_at, max_attempts, unique_key))
+        return job_id
+
+    def push(self, job_id, name, args, run_at, max_attempts, unique_key=None):
+        if unique_key and not self._client.set(self._key("unique", unique_key), job_id, nx=True):
+            return
+        now = time.time()
+        pipe = self._client.pipeline()
+        pipe.hset(self._key("job", job_id), mapping={
+            "name": name, "args": _dumps(args), "status": "queued", "attempts": 0,
+            "max_attempts": max_attempts, "unique_key": unique_key or "", "created_at": now,
+        })
+        pipe.sadd(self._key("names"), name)
+        pipe.zadd(self._key("queued", name), {job_id: _epoch(run_at)})
+        pipe.execute()
+
+    def claim(self, worker_id, names) -> dict | None:
+        names = list(names)
+        leases = [tasks[n].timeout for n in names]
+        job_id = self._claim(
+            keys=[self._key("running")] + [self._key("queued", n) for n in names],
+            args=[time.time(), worker_id, self._prefix] + leases,
+        )
+        if not job_id:
+            return None
+        job = self._client.hgetall(self._key("job", job_id))
+        return _job_dict(int(job_id), job["name"], job["args"], job["attempts"], job["max_attempts"])
+
+    def _finish(self, worker_id, job, target, score, status, attempts=0, **fields) -> bool:
+        pairs = [v for item in fields.items() for v in item]
+        return bool(self._finish_script(
+            keys=[self._key("job", job["id"]), self._key("running"), target],
+            args=[worker_id, job["id"], score, status, attempts] + pairs,
+        ))
+
+    def complete(self, worker_id, job, result) -> bool:
+        now = time.time()
+        return self._finish(worker_id, job, self._key("done"), now, "done",
+                            result=_dumps(result), last_error="", finished_at=now)
+
+    def retry(self, worker_id, job, error, run_at) -> bool:
+        return self._finish(worker_id, job, self._key("queued", job["name"]), _epoch(run_at), "queued",
+                            last_error=error)
+
+    def fail(self, worker_id, job, error) -> bool:
+        now = time.time()
+        return self._finish(worker_id, job, self._key("failed"), now, "failed", last_error=error, finished_at=now)
+
+    def release(self, worker_id, job, run_at) -> bool:
+        return self._finish(worker_id, job, self._key("queued", job["name"]), _epoch(run_at), "queued", -1)
+
+    def running_counts(self) -> dict:
+        ids = self._client.zrange(self._key("running"), 0, -1)
+        counts = {}
+        if ids:
+            pipe = self._client.pipeline()
+            for job_id in ids:
+                pipe.hget(self._key("job", job_id), "name")
+            for name in pipe.execute():
+                if name:
+                    counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def recover(self) -> int:
+        now = time.time()
+        recovered = 0
+        for job_id in self._client.zrangebyscore(self._key("running"), "-inf", now):
+            name = self._client.hget(self._key("job", job_id), "name")
+            recovered += self._recover(
+                keys=[self._key("running"), self._key("job", job_id), self._key("queued", name), self._key("failed")],
+                args=[job_id, now],
+            )
+        return recovered
+
+    def requeue(self, job_id: int) -> bool:
+        if self._client.zrem(self._key("failed"), job_id) == 0:
+            return False
+        name = self._client.hget(self._key("job", job_id), "name")
+        self._client.hset(self._key("job", job_id), mapping={"status": "queued", "attempts": 0, "finished_at": ""})
+        self._client.zadd(self._key("queued", name), {job_id: time.time()})
+        return True
+
+    def prune(self, before: datetime, batch_size: int = 1000) -> int:
+        removed = 0
+        for status in ("done", "failed"):
+            while True:
+                ids = self._client.zrangebyscore(self._key(status), "-inf", _epoch(before), start=0, num=batch_size)
+                if not ids:
+                    break
+                pipe = self._client.pipeline()
+                for job_id in ids:
+                    pipe.hget(self._key("job", job_id), "unique_key")
+                keys = pipe.execute()
+                pipe = self._client.pipeline()
+                for job_id, unique_key in zip(ids, keys):
+                    pipe.delete(self._key("job", job_id))
+                    if unique_key:
+                        pipe.delete(self._key("unique", unique_key))
+                pipe.zrem(self._key(status), *ids)
+                pipe.execute()
+                removed += len(ids)
+        return removed
+
+    def counts(self) -> dict:
+        counts = {s: self._client.zcard(self._key(s)) for s in ("running", "done", "failed")}
+        counts["queued"] = sum(self._client.zcard(self._key("queued", n)) for n in self._client.smembers(self._key("names")))
+        return {s: n for s, n in counts.items() if n}
+
+    def recent(self, status: str | None = None, limit: int = 20) -> list:
+        ids = set()
+        for s in [status] if status else ("queued", "running", "done", "failed"):
+            keys = [self._key("queued", n) for n in self._client.smembers(self._key("names"))] if s == "queued" else [self._key(s)]
+            for key in keys:
+                ids.update(int(i) for i in self._client.zrevrange(key, 0, limit - 1))
+        jobs = []
+        for job_id in sorted(ids, reverse=True)[:limit]:
+            j = self._client.hgetall(self._key("job", job_id))
+            if j:
+                jobs.append({"id": job_id, "name": j["name"], "status": j["status"], "attempts": int(j["attempts"]),
+                             "max_attempts": int(j["max_attempts"]), "run_at": None, "last_error": j.get("last_error")})
+        return jobs
+
+
+# Redis pushes wait for the enqueuing session to commit
+def _pending() -> list:
+    from app import db
+
+    return db.session().info.setdefault("jobs_pending", [])
+
+
+def _after_commit(session):
+    for queue, *job in session.info.pop("jobs_pending", ()):
+        try:
+            queue.push(*job)
+        except Exception:
+            logger.exception("could not push job %s (%s)", job[0], job[1])
+
+
+def _after_rollback(session):
+    session.info.pop("jobs_pending", None)
+
+
+_installed = False
+
+
+def _install_session_hooks():
+    global _installed
+    if _installed:
+        return
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _installed = True
+
+
+# -----------------------
+# Extension
+# -----------------------
+class Jobs:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("JOBS_URL", "sql://")
+        app.config.setdefault("JOBS_PREFIX", "languagelift:jobs:")
+        app.config.setdefault("JOBS_CONCURRENCY", 4)
+        app.config.setdefault("JOBS_POLL_SECONDS", 1.0)
+        app.config.setdefault("JOBS_MAX_BACKOFF_SECONDS", 3600.0)
+        app.config.setdefault("JOBS_KEEP_HOURS", 168.0)
+        app.config.setdefault("JOBS_SCHEDULES", "")
+
+        url = app.config["JOBS_URL"]
+        if url.startswith("sql://"):
+            queue = SqlQueue()
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            queue = RedisQueue(url, app.config["JOBS_PREFIX"])
+            _install_session_hooks()
+        else:
+            raise ValueError(f"Unsupported JOBS_URL: {url}")
+        app.extensions["jobs"] = queue
+        app.extensions["job_schedules"] = parse_schedules(app.config["JOBS_SCHEDULES"])
+
+    @property
+    def queue(self):
+        return current_app.extensions["jobs"]
+
+    @property
+    def schedules(self) -> dict:
+        return current_app.extensions["job_schedules"]
+
+    def enqueue(self, name: str, args: dict | None = None, delay: float = 0.0, unique_key: str | None = None):
+        # Returns the job id, or None if unique_key is taken (SQL queue). Commit the
+        # session afterwards, as for any other write.
+        t = tasks.get(name)
+        if t is None:
+            raise ValueError(f"Unknown task: {name}")
+        run_at = datetime.utcnow() + timedelta(seconds=delay)
+        job_id = self.queue.enqueue(name, args or {}, run_at, t.max_attempts, unique_key)
+        from app import metrics
+
+        metrics.inc("languagelift_jobs_enqueued_total", task=name)
+        return job_id
@@ -0,0 +1,202 @@
+import numpy as np
+from sqlalchemy import bindparam, select, update
+
+from app import db
+from app.models.lesson import Lesson, LessonPrerequisite
+from app.models.progress import CourseProgress
+from app.progress_bitmap import covers, pack_slots, packed_matrix, set_bit
+
+# A lesson without prerequisites is always open. A lesson with prerequisites is open
+# once all of them are completed; CourseProgress.unlocked_bits holds those lessons per
+# (user, course), maintained on completion and on graph edits, so reads never walk the
+# graph.
+
+
+class PrerequisiteError(ValueError):
+    pass
+
+
+# -----------------------
+# Graph
+# -----------------------
+def course_edges(course_id: int) -> dict:
+    # {lesson_id: {prerequisite_id, ...}}
+    edges = {}
+    for lesson_id, prerequisite_id in db.session.execute(
+        select(LessonPrerequisite.lesson_id, LessonPrerequisite.prerequisite_id)
+        .where(LessonPrerequisite.course_id == course_id)
+    ):
+        edges.setdefault(lesson_id, set()).add(prerequisite_id)
+    return edges
+
+
+def _reaches(edges: dict, start, target) -> bool:
+    # Iterative DFS along prerequisite edges
+    stack, seen = list(start), set()
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node in seen:
+            continue
+        seen.add(node)
+        stack.extend(edges.get(node, ()))
+    return False
+
+
+def set_prerequisites(lesson: Lesson, prerequisite_ids) -> list:
+    prerequisite_ids = sorted(set(prerequisite_ids))
+    if lesson.id in prerequisite_ids:
+        raise PrerequisiteError("A lesson cannot be its own prerequisite")
+
+    found = set(
+        db.session.execute(
+            select(Lesson.id).where(Lesson.id.in_(prerequisite_ids), Lesson.course_id == lesson.course_id)
+        ).scalars()
+    ) if prerequisite_ids else set()
+    missing = [i for i in prerequisite_ids if i not in found]
+    if missing:
+        raise PrerequisiteError(f"Lessons not found in this course: {missing}")
+
+    # A cycle exists iff lesson is already a (transitive) prerequisite of a new prerequisite
+    edges = course_edges(lesson.course_id)
+    edges.pop(lesson.id, None)
+    if _reaches(edges, prerequisite_ids, lesson.id):
+        raise PrerequisiteError("Prerequisites would create a cycle")
+
+    db.session.execute(LessonPrerequisite.__table__.delete().where(LessonPrerequisite.lesson_id == lesson.id))
+    if prerequisite_ids:
+        db.session.execute(
+            LessonPrerequisite.__table__.insert(),
+            [{"lesson_id": lesson.id, "prerequisite_id": p, "course_id": lesson.course_id} for p in prerequisite_ids],
+        )
+    refresh_unlocked(lesson.course_id, [lesson.id])
+    return prerequisite_ids
+
+
+# -----------------------
+# Unlocked bitmaps
+# -----------------------
+def _prerequisite_slots(lesson_ids) -> dict:
+    # {lesson_id: (lesson slot, [prerequisite slots])}
+    target = Lesson.__table__.alias("target")
+    prereq = Lesson.__table__.alias("prereq")
+    result = {}
+    for lesson_id, slot, prereq_slot in db.session.execute(
+        select(LessonPrerequisite.lesson_id, target.c.slot, prereq.c.slot)
+        .join(target, target.c.id == LessonPrerequisite.lesson_id)
+        .join(prereq, prereq.c.id == LessonPrerequisite.prerequisite_id)
+        .where(LessonPrerequisite.lesson_id.in_(lesson_ids))
+    ):
+        result.setdefault(lesson_id, (slot, []))[1].append(prereq_slot)
+    return result
+
+
+def unlock_dependents(row: CourseProgress, lesson: Lesson):
+    # After `lesson` is completed only its direct dependents can become unlocked
+    dependents = select(LessonPrerequisite.lesson_id).where(LessonPrerequisite.prerequisite_id == lesson.id)
+    bits = row.unlocked_bits or b""
+    completed = row.completed_bits or b""
+    for slot, prereq_slots in _prerequisite_slots(dependents).values():
+        if all(s // 8 < len(completed) and completed[s // 8] & (1 << (s % 8)) for s in prereq_slots):
+            bits, _ = set_bit(bits, slot)
+    if bits != (row.unlocked_bits or b""):
+        row.unlocked_bits = bits
+
+
+def refresh_unlocked(course_id: int, lesson_ids):
+    # Prerequisites of lesson_ids changed: recompute their bits for every student of
+    # the course, vectorized over all CourseProgress rows
+    graph = _prerequisite_slots(lesson_ids)
+    slots = db.session.execute(
+        select(Lesson.id, Lesson.slot).where(Lesson.id.in_(lesson_ids))
+    ).all()
+    n_slots = db.session.query(db.func.max(Lesson.slot)).filter(Lesson.course_id == course_id).scalar()
+    if n_slots is None:
+        return
+    n_slots += 1
+
+    rows = db.session.execute(
+        select(CourseProgress.user_id, CourseProgress.completed_bits, CourseProgress.unlocked_bits)
+        .where(CourseProgress.course_id == course_id)
+    ).all()
+    if not rows:
+        return
+
+    completed = packed_matrix([r.completed_bits or b"" for r in rows], n_slots)
+    before = packed_matrix([r.unlocked_bits or b"" for r in rows], n_slots)
+    unlocked = before.copy()
+    for lesson_id, slot in slots:
+        byte, bit = divmod(slot, 8)
+        unlocked[:, byte] &= np.uint8(~(1 << bit) & 0xFF)
+        if lesson_id in graph:
+            ok = covers(completed, pack_slots(graph[lesson_id][1], n_slots))
+            unlocked[ok, byte] |= np.uint8(1 << bit)
+
+    changed = np.flatnonzero((unlocked != before).any(axis=1))
+    changes = [
+        {"b_user_id": rows[i].user_id, "b_course_id": course_id, "unlocked_bits": unlocked[i].tobytes()}
+        for i in changed
+    ]
+    if changes:
+        table = CourseProgress.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam("b_user_id"), table.c.course_id == bindparam("b_course_id"))
+            .values(unlocked_bits=bindparam("unlocked_bits")),
+            changes,
+        )
+
+
+def refresh_course(course_id: int):
+    gated = db.session.execute(
+        select(LessonPrerequisite.lesson_id).where(LessonPrerequisite.course_id == course_id).distinct()
+    ).scalars().all()
+    if gated:
+        refresh_unlocked(course_id, gated)
+
+
+# -----------------------
+# Reads
+# -----------------------
+def lesson_states(course_id: int, user_id: int):
+    # [(lesson row, completed, unlocked)] in display order: two indexed lookups
+    # (lessons + the user's bitmap row) and the set of gated lessons
+    lessons = db.session.execute(
+        select(Lesson.id, Lesson.title, Lesson.order_index, Lesson.slot)
+        .where(Lesson.course_id == course_id)
+        .order_by(Lesson.order_index.asc(), Lesson.id.asc())
+    ).all()
+    gated = set(
+        db.session.execute(
+            select(LessonPrerequisite.lesson_id).where(LessonPrerequisite.course_id == course_id).distinct()
+        ).scalars()
+    )
+    return states_from(lessons, gated, db.session.get(CourseProgress, (user_id, course_id)))
+
+
+def states_from(lessons, gated, row: CourseProgress | None):
+    # The same, from rows already loaded (POST /batch loads them for many courses)
+    n_slots = max((l.slot for l in lessons), default=-1) + 1
+    completed_bits = np.unpackbits(
+        packed_matrix([row.completed_bits if row else b""], n_slots)[0], count=n_slots, bitorder="little"
+    )
+    unlocked_bits = np.unpackbits(
+        packed_matrix([(row.unlocked_bits or b"") if row else b""], n_slots)[0], count=n_slots, bitorder="little"
+    )
+    return [
+        (l, bool(completed_bits[l.slot]), l.id not in gated or bool(unlocked_bits[l.slot]))
+        for l in lessons
+    ]
+
+
+def is_unlocked(user_id: int, lesson: Lesson) -> bool:
+    gated = db.session.execute(
+        select(LessonPrerequisite.lesson_id).where(LessonPrerequisite.lesson_id == lesson.id).limit(1)
+    ).first()
+    if not gated:
+        return True
+    row = db.session.get(CourseProgress, (user_id, lesson.course_id))
+    bits = (row.unlocked_bits or b"") if row else b""
+    byte, bit = divmod(lesson.slot, 8)
+    return byte < len(bits) and bool(bits[byte] & (1 << bit))
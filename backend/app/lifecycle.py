@@ -0,0 +1,432 @@
+import glob
+import os
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, exists, literal, select, update
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app import db, storage
+from app.jobs import task
+from app.models.archive import EnrollmentArchive, ProgressArchive
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson, LessonPrerequisite
+from app.models.media import LessonMedia, MediaBlob, MediaUpload
+from app.models.progress import CourseProgress, Progress
+from app.models.recommendation import CourseNeighbor
+from app.models.review import ReviewState, VocabularyItem
+from app.media import file_in_use
+from app.progress_bitmap import clear_bit
+
+# Deleting a course or lesson is two steps:
+#   1. soft delete (request): set deleted_at, drop prerequisite edges and search
+#      entries. A handful of small statements whatever the size of the course.
+#   2. purge (`flask courses purge`, cron): progress and enrollments are copied to
+#      the archive tables, then every child table is emptied in chunks of
+#      PURGE_BATCH_SIZE rows, one short transaction per chunk, so locks on
+#      `progress` are held for milliseconds and never on more than one chunk.
+#
+# Deleted rows are filtered out of every ORM query by the do_orm_execute hook below
+# (pass execution_options(include_deleted=True) to see them); Core statements on
+# __table__ are not filtered. Archiving only hides a course from the catalog.
+
+_installed = False
+
+
+def _soft_delete_filter(execute_state):
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Course, lambda cls: cls.deleted_at.is_(None), include_aliases=True),
+            with_loader_criteria(Lesson, lambda cls: cls.deleted_at.is_(None), include_aliases=True),
+        )
+
+
+def install_soft_delete_filter():
+    global _installed
+    if _installed:
+        return
+    event.listen(Session, "do_orm_execute", _soft_delete_filter)
+    _installed = True
+
+
+# -----------------------
+# Archive / soft delete (request time)
+# -----------------------
+def _detach_lessons(course_id: int, lesson_ids):
+    # Drop prerequisite edges touching the lessons and re-open their dependents
+    from app.lesson_graph import refresh_unlocked
+
+    edges = LessonPrerequisite.__table__
+    dependents = db.session.execute(
+        select(edges.c.lesson_id).where(edges.c.prerequisite_id.in_(lesson_ids)).distinct()
+    ).scalars().all()
+    db.session.execute(
+        edges.delete().where(edges.c.lesson_id.in_(lesson_ids) | edges.c.prerequisite_id.in_(lesson_ids))
+    )
+    dependents = [i for i in dependents if i not in set(lesson_ids)]
+    if dependents:
+        refresh_unlocked(course_id, dependents)
+
+
+def delete_lesson(lesson: Lesson):
+    lesson.deleted_at = datetime.utcnow()
+    _detach_lessons(lesson.course_id, [lesson.id])
+
+
+def delete_course(course: Course):
+    now = datetime.utcnow()
+    course.deleted_at = now
+    # Lessons share the course's timestamp so a restore brings back exactly these
+    db.session.execute(
+        update(Lesson.__table__)
+        .where(Lesson.__table__.c.course_id == course.id, Lesson.__table__.c.deleted_at.is_(None))
+        .values(deleted_at=now)
+    )
+
+
+def restore_course(course: Course) -> list:
+    # Undo delete_course before the purge ran; returns the restored lesson ids
+    table = Lesson.__table__
+    lesson_ids = db.session.execute(
+        select(table.c.id).where(table.c.course_id == course.id, table.c.deleted_at == course.deleted_at)
+    ).scalars().all()
+    db.session.execute(update(table).where(table.c.id.in_(lesson_ids)).values(deleted_at=None))
+    course.deleted_at = None
+    return lesson_ids
+
+
+def load_deleted_course(course_id: int):
+    return (
+        Course.query.execution_options(include_deleted=True)
+        .filter(Course.id == course_id, Course.deleted_at.isnot(None))
+        .first()
+    )
+
+
+# -----------------------
+# Purge (background, chunked)
+# -----------------------
+class _Purge:
+    def __init__(self, batch_size: int, pause: float):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.rows = {}  # table -> rows deleted
+        self.chunks = 0
+        self.max_chunk_ms = 0.0
+        self.digests = set()  # media blobs to delete once unreferenced
+
+    def chunk(self, work) -> int:
+        # One transaction: `work` deletes at most batch_size rows and returns how many
+        started = time.perf_counter()
+        count = work()
+        db.session.commit()
+        self.chunks += 1
+        self.max_chunk_ms = max(self.max_chunk_ms, (time.perf_counter() - started) * 1000)
+        if count and self.pause:
+            time.sleep(self.pause)
+        return count
+
+    def count(self, table: str, n: int):
+        self.rows[table] = self.rows.get(table, 0) + n
+
+    def drain(self, table: str, work):
+        # Repeat a chunk until it deletes nothing
+        while True:
+            n = self.chunk(work)
+            self.count(table, n)
+            if n < self.batch_size:
+                return
+
+
+def _archive_progress(ids, now: datetime):
+    # Copy progress rows (lessons still present) to progress_archive, then delete them
+    table, lessons = Progress.__table__, Lesson.__table__
+    db.session.execute(
+        ProgressArchive.__table__.insert().from_select(
+            ["id", "user_id", "lesson_id", "course_id", "lesson_title", "completed", "completed_at", "archived_at"],
+            select(
+                table.c.id, table.c.user_id, table.c.lesson_id, lessons.c.course_id, lessons.c.title,
+                table.c.completed, table.c.completed_at, literal(now),
+            )
+            .join(lessons, lessons.c.id == table.c.lesson_id)
+            .where(table.c.id.in_(ids)),
+        )
+    )
+    db.session.execute(table.delete().where(table.c.id.in_(ids)))
+
+
+def _purge_progress(purge: _Purge, lesson_id: int, now: datetime):
+    # One lesson: its rows in id order (ix_progress_lesson_id_id)
+    table = Progress.__table__
+
+    def work():
+        ids = db.session.execute(
+            select(table.c.id).where(table.c.lesson_id == lesson_id).order_by(table.c.id).limit(purge.batch_size)
+        ).scalars().all()
+        if ids:
+            _archive_progress(ids, now)
+        return len(ids)
+
+    purge.drain("progress", work)
+
+
+def _purge_course_progress(purge: _Purge, lesson_ids, now: datetime):
+    # Whole course: walk the (user_id, lesson_id) index so each chunk deletes rows
+    # that sit next to each other in the user-keyed indexes (far fewer pages touched
+    # than lesson by lesson, where every row lives on a different page)
+    table = Progress.__table__
+    last_user = 0
+
+    def work():
+        nonlocal last_user
+        rows = db.session.execute(
+            select(table.c.id, table.c.user_id)
+            .where(table.c.user_id >= last_user, table.c.lesson_id.in_(lesson_ids))
+            .order_by(table.c.user_id, table.c.lesson_id)
+            .limit(purge.batch_size)
+        ).all()
+        if rows:
+            _archive_progress([r.id for r in rows], now)
+            last_user = rows[-1].user_id
+        return len(rows)
+
+    if lesson_ids:
+        purge.drain("progress", work)
+
+
+def _purge_reviews(purge: _Purge, lesson_id: int):
+    states = ReviewState.__table__
+    item_ids = db.session.execute(
+        select(VocabularyItem.__table__.c.id).where(VocabularyItem.__table__.c.lesson_id == lesson_id)
+    ).scalars().all()
+    for item_id in item_ids:
+        def work():
+            user_ids = db.session.execute(
+                select(states.c.user_id).where(states.c.item_id == item_id)
+                .order_by(states.c.user_id).limit(purge.batch_size)
+            ).scalars().all()
+            if user_ids:
+                db.session.execute(states.delete().where(states.c.item_id == item_id, states.c.user_id.in_(user_ids)))
+            return len(user_ids)
+
+        purge.drain("review_states", work)
+
+    items = VocabularyItem.__table__
+    for i in range(0, len(item_ids), purge.batch_size):
+        batch = item_ids[i:i + purge.batch_size]
+        purge.count("vocabulary_items", purge.chunk(
+            lambda: db.session.execute(items.delete().where(items.c.id.in_(batch))).rowcount
+        ))
+
+
+def _delete_lesson_rows(purge: _Purge, lesson_ids):
+    # What is left of these lessons is a few rows each (media links, uploads,
+    # prerequisite edges): one transaction per batch_size lessons
+    media, uploads = LessonMedia.__table__, MediaUpload.__table__
+    edges, lessons = LessonPrerequisite.__table__, Lesson.__table__
+    for i in range(0, len(lesson_ids), purge.batch_size):
+        batch = lesson_ids[i:i + purge.batch_size]
+        for upload_id in db.session.execute(select(uploads.c.id).where(uploads.c.lesson_id.in_(batch))).scalars():
+            try:
+                os.remove(storage.staging_path(upload_id))
+            except FileNotFoundError:
+                pass
+        purge.digests.update(db.session.execute(select(media.c.sha256).where(media.c.lesson_id.in_(batch))).scalars())
+
+        def work():
+            db.session.execute(uploads.delete().where(uploads.c.lesson_id.in_(batch)))
+            purge.count("lesson_media", db.session.execute(media.delete().where(media.c.lesson_id.in_(batch))).rowcount)
+            db.session.execute(edges.delete().where(edges.c.lesson_id.in_(batch) | edges.c.prerequisite_id.in_(batch)))
+            return db.session.execute(lessons.delete().where(lessons.c.id.in_(batch))).rowcount
+
+        purge.count("lessons", purge.chunk(work))
+
+
+def _clear_slot(purge: _Purge, course_id: int, slot: int):
+    # The lesson's bit in every bitmap of the course, so completion counts and
+    # certificates only see lessons that still exist
+    bitmaps = CourseProgress.__table__
+    last_user = 0
+
+    def work():
+        nonlocal last_user
+        rows = db.session.execute(
+            select(bitmaps.c.user_id, bitmaps.c.completed_bits, bitmaps.c.completed_count, bitmaps.c.unlocked_bits)
+            .where(bitmaps.c.course_id == course_id, bitmaps.c.user_id > last_user)
+            .order_by(bitmaps.c.user_id)
+            .limit(purge.batch_size)
+        ).all()
+        for row in rows:
+            completed, was_completed = clear_bit(row.completed_bits or b"", slot)
+            unlocked, was_unlocked = clear_bit(row.unlocked_bits or b"", slot)
+            if was_completed or was_unlocked:
+                db.session.execute(
+                    update(bitmaps)
+                    .where(bitmaps.c.user_id == row.user_id, bitmaps.c.course_id == course_id)
+                    .values(
+                        completed_bits=completed,
+                        completed_count=row.completed_count - was_completed,
+                        unlocked_bits=unlocked,
+                    )
+                )
+        if rows:
+            last_user = rows[-1].user_id
+        return len(rows)
+
+    while purge.chunk(work) == purge.batch_size:
+        pass
+
+
+def _purge_lesson(purge: _Purge, lesson_id: int, now: datetime):
+    lessons = Lesson.__table__
+    lesson = db.session.execute(select(lessons.c.course_id, lessons.c.slot).where(lessons.c.id == lesson_id)).first()
+    _purge_progress(purge, lesson_id, now)
+    _clear_slot(purge, lesson.course_id, lesson.slot)
+    _purge_reviews(purge, lesson_id)
+    _delete_lesson_rows(purge, [lesson_id])
+
+
+def _purge_course(purge: _Purge, course, now: datetime):
+    lessons = Lesson.__table__
+    lesson_ids = db.session.execute(select(lessons.c.id).where(lessons.c.course_id == course.id)).scalars().all()
+    _purge_course_progress(purge, lesson_ids, now)
+    for lesson_id in lesson_ids:
+        _purge_reviews(purge, lesson_id)
+    _delete_lesson_rows(purge, lesson_ids)
+
+    enrollments = Enrollment.__table__
+
+    def archive_enrollments():
+        ids = db.session.execute(
+            select(enrollments.c.id).where(enrollments.c.course_id == course.id)
+            .order_by(enrollments.c.id).limit(purge.batch_size)
+        ).scalars().all()
+        if not ids:
+            return 0
+        db.session.execute(
+            EnrollmentArchive.__table__.insert().from_select(
+                ["id", "user_id", "course_id", "course_title", "enrolled_at", "archived_at"],
+                select(
+                    enrollments.c.id, enrollments.c.user_id, enrollments.c.course_id,
+                    literal(course.title), enrollments.c.enrolled_at, literal(now),
+                ).where(enrollments.c.id.in_(ids)),
+            )
+        )
+        db.session.execute(enrollments.delete().where(enrollments.c.id.in_(ids)))
+        return len(ids)
+
+    purge.drain("enrollments", archive_enrollments)
+
+    bitmaps = CourseProgress.__table__
+
+    def delete_bitmaps():
+        user_ids = db.session.execute(
+            select(bitmaps.c.user_id).where(bitmaps.c.course_id == course.id)
+            .order_by(bitmaps.c.user_id).limit(purge.batch_size)
+        ).scalars().all()
+        if user_ids:
+            db.session.execute(bitmaps.delete().where(bitmaps.c.course_id == course.id, bitmaps.c.user_id.in_(user_ids)))
+        return len(user_ids)
+
+    purge.drain("course_progress", delete_bitmaps)
+
+    neighbors = CourseNeighbor.__table__
+    courses = Course.__table__
+
+    def delete_course_row():
+        db.session.execute(
+            neighbors.delete().where((neighbors.c.course_id == course.id) | (neighbors.c.neighbor_id == course.id))
+        )
+        return db.session.execute(courses.delete().where(courses.c.id == course.id)).rowcount
+
+    purge.count("courses", purge.chunk(delete_course_row))
+
+    for path in glob.glob(storage.cache_path("bundles", f"course-{course.id}-*")):
+        os.remove(path)
+
+
+def _release_blobs(purge: _Purge):
+    # Blobs no remaining lesson refers to; the files go after the rows are committed
+    blobs = MediaBlob.__table__
+    unused = [
+        digest for digest in purge.digests
+        if not db.session.execute(select(exists().where(LessonMedia.__table__.c.sha256 == digest))).scalar()
+    ]
+    if unused:
+        db.session.execute(blobs.delete().where(blobs.c.sha256.in_(unused)))
+        db.session.commit()
+        for digest in unused:
+            if not file_in_use(digest):  # a certificate PDF with the same bytes
+                storage.backend.delete(digest)
+    purge.count("media_blobs", len(unused))
+
+
+def purge(older_than_hours: float = 0, batch_size: int | None = None, pause: float | None = None, limit: int | None = None):
+    # Purge courses/lessons soft-deleted more than older_than_hours ago
+    cfg = current_app.config
+    state = _Purge(
+        batch_size or cfg["PURGE_BATCH_SIZE"],
+        cfg["PURGE_PAUSE_SECONDS"] if pause is None else pause,
+    )
+    cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+    now = datetime.utcnow()
+
+    courses = Course.__table__
+    lessons = Lesson.__table__
+    course_rows = db.session.execute(
+        select(courses.c.id, courses.c.title).where(courses.c.deleted_at <= cutoff).order_by(courses.c.id).limit(limit)
+    ).all()
+    for course in course_rows:
+        _purge_course(state, course, now)
+
+    lesson_ids = db.session.execute(
+        select(lessons.c.id).where(lessons.c.deleted_at <= cutoff).order_by(lessons.c.id).limit(limit)
+    ).scalars().all()
+    for lesson_id in lesson_ids:
+        _purge_lesson(state, lesson_id, now)
+
+    _release_blobs(state)
+    return {
+        "courses": len(course_rows),
+        "lessons": len(lesson_ids),
+        "rows": state.rows,
+        "chunks": state.chunks,
+        "max_chunk_ms": round(state.max_chunk_ms, 1),
+    }
+
+
+@task("courses.purge", concurrency=1)
+def purge_job(older_than_hours: float | None = None, batch_size: int | None = None, limit: int | None = None) -> dict:
+    hours = older_than_hours if older_than_hours is not None else current_app.config["PURGE_GRACE_HOURS"]
+    return purge(hours, batch_size=batch_size, limit=limit)
+
+
+# -----------------------
+# CLI: flask courses purge
+# -----------------------
+courses_cli = AppGroup("courses", help="Course lifecycle maintenance.")
+
+
+@courses_cli.command("purge")
+@click.option("--older-than-hours", type=float, default=None, help="Default: PURGE_GRACE_HOURS.")
+@click.option("--batch-size", type=int, default=None, help="Rows per transaction (default: PURGE_BATCH_SIZE).")
+@click.option("--pause", type=float, default=None, help="Seconds between chunks (default: PURGE_PAUSE_SECONDS).")
+@click.option("--limit", type=int, default=None, help="At most this many courses and lessons per run.")
+def purge_command(older_than_hours, batch_size, pause, limit):
+    started = time.perf_counter()
+    hours = older_than_hours if older_than_hours is not None else current_app.config["PURGE_GRACE_HOURS"]
+    result = purge(hours, batch_size=batch_size, pause=pause, limit=limit)
+    rows = ", ".join(f"{n} {table}" for table, n in sorted(result["rows"].items()) if n) or "no rows"
+    click.echo(
+        f"Purged {result['courses']} courses and {result['lessons']} lessons ({rows}) in "
+        f"{result['chunks']} chunks, longest {result['max_chunk_ms']} ms, {time.perf_counter() - started:.1f}s"
+    )
@@ -0,0 +1,190 @@
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db, storage
+from app.jobs import task
+from app.models.certificate import Certificate
+from app.models.media import LessonMedia, MediaBlob, MediaUpload
+from app.storage import COPY_CHUNK, file_sha256
+
+# Resumable uploads: a session records how many bytes have been received; each
+# chunk is a PUT with "Content-Range: bytes start-end/size" that must start at that
+# offset, so a client that lost a response asks for the offset and carries on. The
+# request body is streamed into the staging file, never buffered whole.
+
+ALLOWED_TYPES = ("audio/", "video/", "image/")
+
+
+class UploadError(ValueError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    pass
+
+
+def parse_content_range(value: str | None):
+    # "bytes 0-1048575/5000000" -> (0, 1048575, 5000000)
+    if not value or not value.startswith("bytes "):
+        return None
+    try:
+        span, total = value[6:].split("/")
+        start, end = span.split("-")
+        start, end, total = int(start), int(end), int(total)
+    except ValueError:
+        return None
+    if start < 0 or end < start or end >= total:
+        return None
+    return start, end, total
+
+
+def start_upload(lesson, user, filename: str, content_type: str, size: int) -> MediaUpload:
+    if not filename:
+        raise UploadError("Missing field: filename")
+    if not content_type or not content_type.startswith(ALLOWED_TYPES):
+        raise UploadError("content_type must be audio/*, video/* or image/*")
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError("size must be a positive integer")
+    if size > current_app.config["MEDIA_MAX_BYTES"]:
+        raise UploadError(f"Files larger than {current_app.config['MEDIA_MAX_BYTES']} bytes are not accepted")
+
+    upload = MediaUpload(
+        id=secrets.token_hex(16),
+        lesson_id=lesson.id,
+        user_id=user.id,
+        filename=os.path.basename(filename)[:255],
+        content_type=content_type,
+        size=size,
+        received=0,
+    )
+    open(storage.staging_path(upload.id), "wb").close()
+    db.session.add(upload)
+    return upload
+
+
+def write_chunk(upload: MediaUpload, stream, start: int, end: int, total: int):
+    if total != upload.size:
+        raise UploadError(f"Upload size is {upload.size} bytes")
+    if start != upload.received:
+        raise OffsetMismatch(f"Expected a chunk starting at byte {upload.received}")
+
+    remaining = end - start + 1
+    with open(storage.staging_path(upload.id), "r+b") as f:
+        f.seek(start)
+        while remaining > 0:
+            block = stream.read(min(COPY_CHUNK, remaining))
+            if not block:
+                break
+            f.write(block)
+            remaining -= len(block)
+        # Whatever arrived before a dropped connection still counts
+        upload.received = f.tell()
+        f.truncate()
+
+
+def finish_upload(upload: MediaUpload) -> tuple[LessonMedia, bool]:
+    # Returns (media, deduplicated). The staged file is hashed in chunks; if the
+    # same content is already stored it is discarded and the blob shared.
+    staged = storage.staging_path(upload.id)
+    digest = file_sha256(staged)
+    backend = storage.backend
+
+    deduplicated = db.session.get(MediaBlob, digest) is not None and backend.exists(digest)
+    if deduplicated:
+        os.remove(staged)
+    else:
+        backend.put(digest, staged)
+        try:
+            with db.session.begin_nested():
+                db.session.add(MediaBlob(sha256=digest, size=upload.size, storage=backend.name))
+        except IntegrityError:
+            pass  # the same file finished concurrently
+
+    media = LessonMedia(
+        lesson_id=upload.lesson_id,
+        sha256=digest,
+        filename=upload.filename,
+        content_type=upload.content_type,
+    )
+    db.session.add(media)
+    db.session.delete(upload)
+    return media, deduplicated
+
+
+def cancel_upload(upload: MediaUpload):
+    db.session.delete(upload)
+    try:
+        os.remove(storage.staging_path(upload.id))
+    except FileNotFoundError:
+        pass
+
+
+def file_in_use(digest: str) -> bool:
+    # Lesson media and certificate PDFs (app.certificates) share the content-addressed
+    # store: a file with the same bytes is stored once, whichever table points to it
+    return db.session.execute(select(
+        exists().where(LessonMedia.sha256 == digest) | exists().where(Certificate.sha256 == digest)
+    )).scalar()
+
+
+def release(media: LessonMedia) -> str | None:
+    # Detach media from its lesson; returns the blob digest if nothing else uses
+    # it, so the caller can delete the file after committing
+    digest = media.sha256
+    db.session.delete(media)
+    db.session.flush()
+    still_used = db.session.execute(select(exists().where(LessonMedia.sha256 == digest))).scalar()
+    if still_used:
+        return None
+    db.session.execute(MediaBlob.__table__.delete().where(MediaBlob.sha256 == digest))
+    return None if file_in_use(digest) else digest
+
+
+def cleanup(max_age_hours: float) -> tuple[int, int]:
+    # Drop abandoned upload sessions and blobs no lesson refers to any more
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    stale = MediaUpload.query.filter(MediaUpload.updated_at < cutoff).all()
+    for upload in stale:
+        cancel_upload(upload)
+
+    orphans = db.session.execute(
+        select(MediaBlob.sha256)
+        .where(MediaBlob.created_at < cutoff, ~exists().where(LessonMedia.sha256 == MediaBlob.sha256))
+    ).scalars().all()
+    if orphans:
+        db.session.execute(MediaBlob.__table__.delete().where(MediaBlob.sha256.in_(orphans)))
+    db.session.commit()
+    for digest in orphans:
+        if not file_in_use(digest):
+            storage.backend.delete(digest)
+    return len(stale), len(orphans)
+
+
+@task("media.cleanup", concurrency=1)
+def cleanup_job(older_than_hours: float | None = None) -> dict:
+    hours = older_than_hours if older_than_hours is not None else current_app.config["MEDIA_UPLOAD_TTL_HOURS"]
+    uploads, blobs = cleanup(hours)
+    return {"uploads": uploads, "blobs": blobs}
+
+
+# -----------------------
+# CLI: flask media cleanup
+# -----------------------
+media_cli = AppGroup("media", help="Lesson media maintenance.")
+
+
+@media_cli.command("cleanup")
+@click.option("--older-than-hours", type=float, default=None, help="Default: MEDIA_UPLOAD_TTL_HOURS.")
+def cleanup_command(older_than_hours):
+    started = time.perf_counter()
+    hours = older_than_hours if older_than_hours is not None else current_app.config["MEDIA_UPLOAD_TTL_HOURS"]
+    uploads, blobs = cleanup(hours)
+    click.echo(f"Removed {uploads} stale uploads and {blobs} unused blobs in {time.perf_counter() - started:.1f}s")
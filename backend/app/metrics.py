@@ -0,0 +1,259 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRIC_DEFINITIONS = {
+    "languagelift_http_request_duration_seconds": ("histogram", "Request latency by blueprint and route"),
+    "languagelift_http_requests_total": ("counter", "Responses by blueprint, route and status code"),
+    "languagelift_http_requests_in_flight": ("gauge", "Requests currently being handled"),
+    "languagelift_db_pool_connections": ("gauge", "SQLAlchemy pool connections by state"),
+    "languagelift_cache_requests_total": ("counter", "Cache lookups by cache name and result"),
+    "languagelift_cache_hit_ratio": ("gauge", "Cache hits / lookups by cache name"),
+    "languagelift_enrollments_total": ("counter", "Successful course enrollments"),
+    "languagelift_lesson_completions_total": ("counter", "Lessons marked complete"),
+    "languagelift_logins_total": ("counter", "Login attempts by result"),
+    "languagelift_reviews_total": ("counter", "Vocabulary reviews graded, by pass/lapse"),
+    "languagelift_media_uploads_total": ("counter", "Completed media uploads, stored or deduplicated"),
+    "languagelift_rate_limited_total": ("counter", "Requests rejected with 429, by rate limit scope"),
+    "languagelift_token_revocations_total": ("counter", "JWTs revoked, by reason (logout, refresh, refresh_reuse, logout_all)"),
+    "languagelift_events_published_total": ("counter", "Live events published, by type"),
+    "languagelift_event_streams": ("gauge", "Open GET /events streams"),
+    "languagelift_jobs_enqueued_total": ("counter", "Background jobs enqueued, by task"),
+    "languagelift_jobs_total": ("counter", "Background job runs by task and outcome (done, retried, failed)"),
+    "languagelift_job_duration_seconds": ("histogram", "Background job run time by task"),
+    "languagelift_jobs_running": ("gauge", "Background jobs currently running"),
+    "languagelift_exports_running": ("gauge", "Personal data exports currently streaming"),
+    "languagelift_export_rows_total": ("counter", "Rows written to personal data exports, by dataset"),
+}
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    # Each process keeps its own counters in memory (a dict update under a lock
+    # on the hot path). With METRICS_DIR set, every process periodically writes a
+    # snapshot to METRICS_DIR/<pid>.json and /metrics sums all snapshots, so any
+    # gunicorn worker can answer a scrape for the whole server.
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._histograms = {}
+        self._buckets = DEFAULT_BUCKETS
+        self._dir = None
+        self._flush_interval = 1.0
+        self._last_flush = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_DIR", "")
+        app.config.setdefault("METRICS_FLUSH_INTERVAL", 1.0)
+        app.config.setdefault("METRICS_BUCKETS", DEFAULT_BUCKETS)
+
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        self._buckets = tuple(sorted(app.config["METRICS_BUCKETS"]))
+        self._dir = app.config["METRICS_DIR"] or None
+        self._flush_interval = float(app.config["METRICS_FLUSH_INTERVAL"])
+        if self._dir:
+            os.makedirs(self._dir, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view, methods=["GET"])
+        app.extensions["metrics"] = self
+
+    # -----------------------
+    # Recording API
+    # -----------------------
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        idx = bisect_left(self._buckets, value)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(self._buckets) + 1), 0.0, 0]
+            hist[0][idx] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def cache_hit(self, cache: str):
+        self.inc("languagelift_cache_requests_total", cache=cache, result="hit")
+
+    def cache_miss(self, cache: str):
+        self.inc("languagelift_cache_requests_total", cache=cache, result="miss")
+
+    # -----------------------
+    # Request hooks
+    # -----------------------
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        self.inc("languagelift_http_requests_in_flight")
+
+    def _after_request(self, response):
+        start = g.get("_metrics_start")
+        if start is not None:
+            rule = request.url_rule.rule if request.url_rule else "unmatched"
+            blueprint = request.blueprint or ""
+            self.observe(
+                "languagelift_http_request_duration_seconds",
+                time.perf_counter() - start,
+                blueprint=blueprint, route=rule, method=request.method,
+            )
+            self.inc(
+                "languagelift_http_requests_total",
+                blueprint=blueprint, route=rule, method=request.method, status=str(response.status_code),
+            )
+        return response
+
+    def _teardown_request(self, exc):
+        if g.pop("_metrics_start", None) is not None:
+            self.inc("languagelift_http_requests_in_flight", -1)
+        self.maybe_flush()
+
+    # -----------------------
+    # Multi-process snapshots
+    # -----------------------
+    def maybe_flush(self):
+        # Also called by processes that serve no requests (job workers)
+        if self._dir and time.monotonic() - self._last_flush >= self._flush_interval:
+            self._flush()
+
+    def _update_pool_stats(self):
+        engine = current_app.extensions["sqlalchemy"].engine
+        pool = engine.pool
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, state, None)
+            if callable(fn):
+                self.set_gauge("languagelift_db_pool_connections", fn(), state=state)
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "values": [[n, list(map(list, l)), v] for (n, l), v in self._values.items()],
+                "histograms": [[n, list(map(list, l)), h] for (n, l), h in self._histograms.items()],
+            }
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        try:
+            self._update_pool_stats()
+        except Exception:
+            pass
+        path = os.path.join(self._dir, f"{os.getpid()}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._snapshot(), f)
+        os.replace(tmp, path)
+
+    def _collect(self):
+        self._update_pool_stats()
+        if not self._dir:
+            snapshots = [self._snapshot()]
+        else:
+            self._flush()
+            snapshots = []
+            for path in glob.glob(os.path.join(self._dir, "*.json")):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+        values, histograms = {}, {}
+        for snap in snapshots:
+            alive = _pid_alive(snap["pid"])
+            for name, labels, v in snap["values"]:
+                # Gauges of dead workers are stale; their counters still count.
+                if METRIC_DEFINITIONS.get(name, ("counter",))[0] == "gauge" and not alive:
+                    continue
+                key = (name, tuple(map(tuple, labels)))
+                values[key] = values.get(key, 0) + v
+            for name, labels, (buckets, total, count) in snap["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                agg = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                agg[0] = [a + b for a, b in zip(agg[0], buckets)]
+                agg[1] += total
+                agg[2] += count
+
+        for (name, labels), v in list(values.items()):
+            if name != "languagelift_cache_requests_total" or dict(labels)["result"] != "hit":
+                continue
+            cache = dict(labels)["cache"]
+            misses = values.get(_key("languagelift_cache_requests_total", {"cache": cache, "result": "miss"}), 0)
+            values[_key("languagelift_cache_hit_ratio", {"cache": cache})] = v / (v + misses) if v + misses else 0
+
+        return values, histograms
+
+    # -----------------------
+    # Exposition
+    # -----------------------
+    def render(self) -> str:
+        values, histograms = self._collect()
+        lines = []
+        for name, (kind, help_text) in METRIC_DEFINITIONS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (n, labels), (buckets, total, count) in sorted(histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, c in zip(self._buckets + (float("inf"),), buckets):
+                        cumulative += c
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_fmt_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+            else:
+                for (n, labels), v in sorted(values.items()):
+                    if n == name:
+                        lines.append(f"{name}{_fmt_labels(labels)} {v}")
+        return "\n".join(lines) + "\n"
+
+    def _metrics_view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels
+    )
+    return "{" + inner + "}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,5 +1,11 @@
 from .course import Course
-from .lesson import Lesson
+from .lesson import Lesson, LessonPrerequisite
 from .user import User
 from .enrollment import Enrollment
-from .progress import Progress
+from .progress import Progress, CourseProgress
+from .recommendation import CourseNeighbor, RecommendationBuild
+from .review import VocabularyItem, ReviewState
+from .media import MediaBlob, LessonMedia, MediaUpload
+from .archive import ProgressArchive, EnrollmentArchive
+from .job import Job
+from .certificate import Certificate
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app import db
+
+class ProgressArchive(db.Model):
+    __tablename__ = "progress_archive"
+
+    # Progress rows of purged lessons/courses, kept for history. No foreign keys:
+    # the lessons and courses they point to are gone, so titles are copied.
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # original progress.id
+
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    lesson_id = db.Column(db.Integer, nullable=False)
+    course_id = db.Column(db.Integer, nullable=False)
+    lesson_title = db.Column(db.String(200), nullable=True)
+
+    completed = db.Column(db.Boolean, nullable=False, default=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ProgressArchive user={self.user_id} lesson={self.lesson_id}>"
+
+
+class EnrollmentArchive(db.Model):
+    __tablename__ = "enrollments_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # original enrollments.id
+
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    course_id = db.Column(db.Integer, nullable=False)
+    course_title = db.Column(db.String(200), nullable=True)
+
+    enrolled_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<EnrollmentArchive user={self.user_id} course={self.course_id}>"
@@ -0,0 +1,28 @@
+from datetime import datetime
+from app import db
+
+class Certificate(db.Model):
+    __tablename__ = "certificates"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "course_id", name="uq_certificates_user_course"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    # No foreign key: a certificate outlives a purged course, so the title is copied
+    course_id = db.Column(db.Integer, nullable=False, index=True)
+    code = db.Column(db.String(12), nullable=False, unique=True)  # verification code
+
+    student_name = db.Column(db.String(120), nullable=False)
+    course_title = db.Column(db.String(200), nullable=False)
+    issued_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # The rendered PDF in storage, by content; NULL until a worker renders it
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.Integer, nullable=True)
+    template = db.Column(db.String(16), nullable=True)  # fingerprint of the layout and settings used
+    rendered_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Certificate {self.code} user={self.user_id} course={self.course_id}>"
@@ -13,9 +13,33 @@ class Course(db.Model):
     instructor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Relationship: one course → many lessons
-    lessons = db.relationship("Lesson", backref="course", cascade="all, delete", lazy=True)
+    # Archived: out of the catalog/search, closed for enrollment, content kept.
+    # Deleted: hidden from every query (app.lifecycle) until purged.
+    archived_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Bumped by every edit; the ETag clients send back as If-Match (app.editing)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # Slot for the next lesson (app.progress_bitmap); only ever grows, so slots of
+    # deleted or purged lessons are never handed out again
+    next_slot = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Popularity, maintained by enroll/complete and `flask popularity reconcile`
+    # (app.popularity); the catalog sorts on these instead of counting enrollments
+    enrollment_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    completion_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    trending_score = db.Column(db.Float(precision=53), nullable=False, default=0.0, server_default="0")
+
+    __table_args__ = (
+        db.Index("ix_courses_created_at", "created_at"),
+        db.Index("ix_courses_instructor_id", "instructor_id"),
+        # ?sort=popular / ?sort=trending, read backwards
+        db.Index("ix_courses_enrollment_count_id", "enrollment_count", "id"),
+        db.Index("ix_courses_trending_score_id", "trending_score", "id"),
+    )
+
+    # Relationship: one course → many lessons. Never cascaded by the ORM (that loads
+    # every lesson); courses are removed by app.lifecycle.purge in bounded chunks
+    lessons = db.relationship("Lesson", backref="course", lazy=True, passive_deletes="all")
 
     # Relationship: one instructor → many courses
     instructor = db.relationship("User", backref="courses", lazy=True)
@@ -14,6 +14,10 @@ class Enrollment(db.Model):
     # Prevent duplicate enrollments for same user-course pair
     __table_args__ = (
         db.UniqueConstraint("user_id", "course_id", name="uq_user_course_enrollment"),
+        # "My enrollments", newest first
+        db.Index("ix_enrollments_user_id_enrolled_at", "user_id", "enrolled_at"),
+        # Course roster in enrollment order
+        db.Index("ix_enrollments_course_id_id", "course_id", "id"),
     )
 
     # Relationships (optional but helpful)
@@ -0,0 +1,35 @@
+from datetime import datetime
+from app import db
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest due job: WHERE status = 'queued' AND run_at <= now
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    name = db.Column(db.String(100), nullable=False)
+    args = db.Column(db.Text, nullable=False, default="{}")  # JSON keyword arguments
+    # One job per key (periodic runs, per-user work); NULL for ordinary jobs
+    unique_key = db.Column(db.String(200), nullable=True, unique=True)
+
+    status = db.Column(db.String(10), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Lease: a running job whose worker died is retried once locked_until passes
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+
+    result = db.Column(db.Text, nullable=True)  # JSON returned by the task
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status}>"
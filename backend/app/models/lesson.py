@@ -7,13 +7,39 @@ class Lesson(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=True)  # Can later hold markdown / HTML / video URL
+    content = db.Column(db.Text, nullable=True)  # Markdown source (may be a bare video URL)
+    # Sanitized HTML rendered from content at write time (app.rendering); content_hash
+    # is sha256 of the source + renderer version, so stale renders are detectable
+    content_html = db.Column(db.Text, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
 
     order_index = db.Column(db.Integer, nullable=False, default=1)
+    # Stable bit position in CourseProgress.completed_bits; never reused or reordered
+    slot = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)  # soft delete, see app.lifecycle
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # see app.editing
 
     # Foreign Key → Course
     course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
 
+    # Lessons are always listed per course in order_index order
+    __table_args__ = (
+        db.Index("ix_lessons_course_id_order_index", "course_id", "order_index"),
+        db.UniqueConstraint("course_id", "slot", name="uq_lesson_course_slot"),
+    )
+
     def __repr__(self):
         return f"<Lesson {self.title}>"
+
+
+class LessonPrerequisite(db.Model):
+    __tablename__ = "lesson_prerequisites"
+
+    # Edge prerequisite -> lesson; both lessons belong to course_id, edges form a DAG
+    lesson_id = db.Column(db.Integer, db.ForeignKey("lessons.id"), primary_key=True)
+    prerequisite_id = db.Column(db.Integer, db.ForeignKey("lessons.id"), primary_key=True, index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LessonPrerequisite {self.prerequisite_id} -> {self.lesson_id}>"
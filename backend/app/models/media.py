@@ -0,0 +1,54 @@
+from datetime import datetime
+from app import db
+
+class MediaBlob(db.Model):
+    __tablename__ = "media_blobs"
+
+    # Content-addressed: one row (and one stored file) per distinct file content
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    storage = db.Column(db.String(20), nullable=False)  # backend that holds it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MediaBlob {self.sha256[:12]}>"
+
+
+class LessonMedia(db.Model):
+    __tablename__ = "lesson_media"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    lesson_id = db.Column(db.Integer, db.ForeignKey("lessons.id"), nullable=False, index=True)
+    sha256 = db.Column(db.String(64), db.ForeignKey("media_blobs.sha256"), nullable=False, index=True)
+
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    blob = db.relationship("MediaBlob", lazy="joined")
+    lesson = db.relationship("Lesson", backref="media", lazy=True)
+
+    def __repr__(self):
+        return f"<LessonMedia {self.filename}>"
+
+
+class MediaUpload(db.Model):
+    __tablename__ = "media_uploads"
+
+    # Resumable upload session; bytes are staged in MEDIA_ROOT/uploads/<id>
+    id = db.Column(db.String(32), primary_key=True)
+
+    lesson_id = db.Column(db.Integer, db.ForeignKey("lessons.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MediaUpload {self.id} {self.received}/{self.size}>"
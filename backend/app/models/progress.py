@@ -15,6 +15,10 @@ class Progress(db.Model):
     # One progress row per (user, lesson)
     __table_args__ = (
         db.UniqueConstraint("user_id", "lesson_id", name="uq_user_lesson_progress"),
+        # Covers "completed lesson ids for user" without touching the table
+        db.Index("ix_progress_user_id_completed_lesson_id", "user_id", "completed", "lesson_id"),
+        # A lesson's rows in id order: chunked purge of deleted lessons
+        db.Index("ix_progress_lesson_id_id", "lesson_id", "id"),
     )
 
     # Relationships (helpful)
@@ -27,3 +31,21 @@ class Progress(db.Model):
 
     def __repr__(self):
         return f"<Progress user={self.user_id} lesson={self.lesson_id} completed={self.completed}>"
+
+
+class CourseProgress(db.Model):
+    __tablename__ = "course_progress"
+
+    # Denormalized copy of Progress: one bitmap per (user, course), bit i = lesson slot i
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), primary_key=True, index=True)
+
+    completed_bits = db.Column(db.LargeBinary, nullable=False, default=b"")
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    # Lessons with prerequisites that are all completed (see app/lesson_graph.py)
+    unlocked_bits = db.Column(db.LargeBinary, nullable=True, default=b"")
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CourseProgress user={self.user_id} course={self.course_id} completed={self.completed_count}>"
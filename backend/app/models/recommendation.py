@@ -0,0 +1,35 @@
+from datetime import datetime
+from app import db
+
+class CourseNeighbor(db.Model):
+    __tablename__ = "course_neighbors"
+
+    # Top-K "students who enrolled in this also took" per course, rank 1 = best
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), primary_key=True)
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+
+    neighbor_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
+    score = db.Column(db.Float, nullable=False)  # cosine similarity of enrollment vectors
+    co_enrollments = db.Column(db.Integer, nullable=False)
+
+    neighbor = db.relationship("Course", foreign_keys=[neighbor_id], lazy=True)
+
+    def __repr__(self):
+        return f"<CourseNeighbor course={self.course_id} rank={self.rank} neighbor={self.neighbor_id}>"
+
+
+class RecommendationBuild(db.Model):
+    __tablename__ = "recommendation_builds"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    mode = db.Column(db.String(20), nullable=False)  # full / incremental
+    # Enrollments with id <= this are reflected in course_neighbors
+    max_enrollment_id = db.Column(db.Integer, nullable=False, default=0)
+    courses_updated = db.Column(db.Integer, nullable=False, default=0)
+    duration_ms = db.Column(db.Integer, nullable=False, default=0)
+
+    built_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<RecommendationBuild {self.mode} through={self.max_enrollment_id}>"
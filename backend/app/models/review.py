@@ -0,0 +1,48 @@
+from datetime import datetime
+from app import db
+
+class VocabularyItem(db.Model):
+    __tablename__ = "vocabulary_items"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    lesson_id = db.Column(db.Integer, db.ForeignKey("lessons.id"), nullable=False, index=True)
+
+    term = db.Column(db.String(200), nullable=False)
+    translation = db.Column(db.String(200), nullable=False)
+    example = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    lesson = db.relationship("Lesson", backref="vocabulary", lazy=True)
+
+    def __repr__(self):
+        return f"<VocabularyItem {self.term}>"
+
+
+class ReviewState(db.Model):
+    __tablename__ = "review_states"
+
+    # One SM-2 schedule per (user, item)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey("vocabulary_items.id"), primary_key=True)
+
+    ease = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Integer, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+
+    due_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_reviewed_at = db.Column(db.DateTime, nullable=True)
+
+    # Due queue: "next N items for user ordered by due_at" is a range scan
+    __table_args__ = (
+        db.Index("ix_review_states_user_id_due_at", "user_id", "due_at"),
+        # An item's schedules: chunked purge of deleted lessons
+        db.Index("ix_review_states_item_id_user_id", "item_id", "user_id"),
+    )
+
+    item = db.relationship("VocabularyItem", lazy=True)
+
+    def __repr__(self):
+        return f"<ReviewState user={self.user_id} item={self.item_id} due={self.due_at}>"
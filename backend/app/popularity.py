@@ -0,0 +1,177 @@
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func, select, update
+
+from app import db
+from app.jobs import task
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+
+# Denormalized popularity on Course, so the catalog sorts from an index instead of
+# COUNT(*) over enrollments:
+#   enrollment_count   enrollments
+#   completion_count   completed lessons (first completion only)
+#   trending_score     recent enrollments and completions, each weighing half as
+#                      much every TRENDING_HALF_LIFE_HOURS
+#
+# Requests only add to the counters (UPDATE ... SET x = x + 1, in the request's own
+# transaction), so concurrent requests never lose an update. `flask popularity
+# reconcile` (cron, about hourly) recomputes all three from the source tables:
+# it corrects drift and applies the decay. Between runs new events count with
+# weight 1 against scores decayed to the last run, which all courses share, so the
+# ranking is off by at most 2^(interval / half-life) for the newest events.
+
+
+def _weights():
+    return current_app.config["TRENDING_ENROLL_WEIGHT"], current_app.config["TRENDING_COMPLETION_WEIGHT"]
+
+
+# -----------------------
+# Request time
+# -----------------------
+def record_enrollment(course_id: int):
+    enroll_weight, _ = _weights()
+    db.session.execute(
+        update(Course.__table__)
+        .where(Course.__table__.c.id == course_id)
+        .values(
+            enrollment_count=Course.__table__.c.enrollment_count + 1,
+            trending_score=Course.__table__.c.trending_score + enroll_weight,
+        )
+    )
+
+
+def record_completion(course_id: int):
+    _, completion_weight = _weights()
+    db.session.execute(
+        update(Course.__table__)
+        .where(Course.__table__.c.id == course_id)
+        .values(
+            completion_count=Course.__table__.c.completion_count + 1,
+            trending_score=Course.__table__.c.trending_score + completion_weight,
+        )
+    )
+
+
+# -----------------------
+# Reconciliation
+# -----------------------
+def _decay(half_life: float, now: datetime):
+    def weight(at: datetime | None) -> float:
+        if at is None:
+            return 0.0
+        return 0.5 ** (max((now - at).total_seconds(), 0.0) / half_life)
+    return weight
+
+
+def _chunk_counts(course_ids, since: datetime, weight):
+    # {course_id: [enrollments, completions, trending]} for one chunk of courses
+    enroll_weight, completion_weight = _weights()
+    counts = {cid: [0, 0, 0.0] for cid in course_ids}
+
+    for cid, n in db.session.execute(
+        select(Enrollment.course_id, func.count())
+        .where(Enrollment.course_id.in_(course_ids))
+        .group_by(Enrollment.course_id)
+    ):
+        counts[cid][0] = n
+    for cid, n in db.session.execute(
+        select(Lesson.course_id, func.count())
+        .join(Progress, Progress.lesson_id == Lesson.id)
+        .where(Lesson.course_id.in_(course_ids), Progress.completed.is_(True))
+        .group_by(Lesson.course_id)
+    ):
+        counts[cid][1] = n
+
+    for cid, at in db.session.execute(
+        select(Enrollment.course_id, Enrollment.enrolled_at)
+        .where(Enrollment.course_id.in_(course_ids), Enrollment.enrolled_at >= since)
+    ):
+        counts[cid][2] += enroll_weight * weight(at)
+    for cid, at in db.session.execute(
+        select(Lesson.course_id, Progress.completed_at)
+        .join(Progress, Progress.lesson_id == Lesson.id)
+        .where(Lesson.course_id.in_(course_ids), Progress.completed.is_(True), Progress.completed_at >= since)
+    ):
+        counts[cid][2] += completion_weight * weight(at)
+    return counts
+
+
+@task("popularity.reconcile", concurrency=1)
+def reconcile(batch_size: int = 500) -> dict:
+    # Courses in id order, batch_size per transaction. Only counts that differ are
+    # rewritten (drift); trending_score is rewritten whenever it moved noticeably.
+    half_life = current_app.config["TRENDING_HALF_LIFE_HOURS"] * 3600
+    now = datetime.utcnow()
+    # Events older than 20 half-lives weigh under a millionth
+    since = now - timedelta(seconds=half_life * 20)
+    weight = _decay(half_life, now)
+
+    table = Course.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            enrollment_count=bindparam("enrollment_count"),
+            completion_count=bindparam("completion_count"),
+            trending_score=bindparam("trending_score"),
+        )
+    )
+    stats = {"courses": 0, "drifted": 0, "updated": 0}
+    last_id = 0
+    while True:
+        # FOR UPDATE: enroll/complete on these courses wait (milliseconds) until the
+        # chunk commits, so no increment falls between counting and writing
+        rows = db.session.execute(
+            select(Course.id, Course.enrollment_count, Course.completion_count, Course.trending_score)
+            .where(Course.id > last_id)
+            .order_by(Course.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        counts = _chunk_counts([r.id for r in rows], since, weight)
+        changes = []
+        for r in rows:
+            enrollments, completions, trending = counts[r.id]
+            drifted = (r.enrollment_count, r.completion_count) != (enrollments, completions)
+            stats["drifted"] += drifted
+            if drifted or abs((r.trending_score or 0.0) - trending) > 1e-6:
+                changes.append({
+                    "b_id": r.id,
+                    "enrollment_count": enrollments,
+                    "completion_count": completions,
+                    "trending_score": trending,
+                })
+        if changes:
+            db.session.execute(write, changes)
+        db.session.commit()
+        stats["courses"] += len(rows)
+        stats["updated"] += len(changes)
+    return stats
+
+
+# -----------------------
+# CLI: flask popularity reconcile
+# -----------------------
+popularity_cli = AppGroup("popularity", help="Course popularity counters and trending scores.")
+
+
+@popularity_cli.command("reconcile")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Courses per transaction.")
+def reconcile_command(batch_size):
+    started = time.perf_counter()
+    stats = reconcile(batch_size)
+    click.echo(
+        f"Reconciled {stats['courses']} courses in {time.perf_counter() - started:.1f}s: "
+        f"{stats['drifted']} had drifted counters, {stats['updated']} rewritten"
+    )
@@ -0,0 +1,213 @@
+import cProfile
+import heapq
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("languagelift.profiling")
+
+_listeners_installed = False
+
+
+class RequestStats:
+    __slots__ = ("started", "sampled", "query_count", "db_time", "slow", "timers", "profiler")
+
+    def __init__(self, sampled: bool):
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.query_count = 0
+        self.db_time = 0.0
+        self.slow = []  # min-heap of (duration, statement), keeps the N slowest
+        self.timers = {}
+        self.profiler = None
+
+    def add_timer(self, name: str, elapsed: float):
+        self.timers[name] = self.timers.get(name, 0.0) + elapsed
+
+
+def current_stats():
+    if not has_request_context():
+        return None
+    return g.get("_request_stats")
+
+
+@contextmanager
+def timed(name: str):
+    # Accumulates wall time under `name` for the current request (e.g. "bcrypt")
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_timer(name, time.perf_counter() - start)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        with timed("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    starts = conn.info.get("_query_start")
+    if stats is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats.query_count += 1
+    stats.db_time += elapsed
+    heapq.heappush(stats.slow, (elapsed, statement))
+    if len(stats.slow) > g.get("_slow_query_limit", 3):
+        heapq.heappop(stats.slow)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute: drop its start time,
+    # or the next query on this connection would be timed from it
+    conn = context.connection
+    starts = conn.info.get("_query_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def _install_engine_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listeners_installed = True
+
+
+# Counters are collected for every request and reported via Server-Timing;
+# structured log lines and profiler dumps are only produced for sampled (or slow)
+# requests, so this can stay enabled in production.
+class RequestProfiler:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PROFILING_ENABLED", True)
+        app.config.setdefault("PROFILING_SAMPLE_RATE", 0.01)
+        app.config.setdefault("PROFILING_SLOW_QUERIES", 3)
+        app.config.setdefault("PROFILING_SLOW_REQUEST_MS", 500.0)
+        app.config.setdefault("PROFILING_SERVER_TIMING", True)
+        app.config.setdefault("PROFILING_PROFILER", "")
+        app.config.setdefault("PROFILING_DUMP_DIR", "profiles")
+
+        if not app.config["PROFILING_ENABLED"]:
+            return
+
+        _install_engine_listeners()
+        app.json = TimedJSONProvider(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.extensions["profiler"] = self
+
+    def _before_request(self):
+        cfg = current_app.config
+        stats = RequestStats(sampled=random.random() < cfg["PROFILING_SAMPLE_RATE"])
+        g._request_stats = stats
+        g._slow_query_limit = cfg["PROFILING_SLOW_QUERIES"]
+
+        if stats.sampled and cfg["PROFILING_PROFILER"]:
+            stats.profiler = _start_profiler(cfg["PROFILING_PROFILER"])
+
+    def _after_request(self, response):
+        stats = g.pop("_request_stats", None)
+        if stats is None:
+            return response
+
+        cfg = current_app.config
+        total = time.perf_counter() - stats.started
+
+        if cfg["PROFILING_SERVER_TIMING"]:
+            response.headers.add("Server-Timing", _server_timing(stats, total))
+
+        slow_request = total * 1000 >= cfg["PROFILING_SLOW_REQUEST_MS"]
+        if stats.sampled or slow_request:
+            logger.info(json.dumps(_log_record(stats, total, response.status_code, slow_request)))
+
+        if stats.profiler is not None:
+            try:
+                _dump_profile(stats.profiler, cfg["PROFILING_DUMP_DIR"])
+            except OSError:
+                logger.exception("Failed to write profile dump")
+
+        return response
+
+
+def _server_timing(stats: RequestStats, total: float) -> str:
+    parts = [f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries"']
+    for name, elapsed in stats.timers.items():
+        parts.append(f"{name};dur={elapsed * 1000:.2f}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _log_record(stats: RequestStats, total: float, status: int, slow_request: bool) -> dict:
+    return {
+        "event": "request_profile",
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": status,
+        "total_ms": round(total * 1000, 2),
+        "db_ms": round(stats.db_time * 1000, 2),
+        "query_count": stats.query_count,
+        "timers_ms": {k: round(v * 1000, 2) for k, v in stats.timers.items()},
+        "slow_queries": [
+            {"ms": round(d * 1000, 2), "statement": " ".join(s.split())[:500]}
+            for d, s in sorted(stats.slow, reverse=True)
+        ],
+        "sampled": stats.sampled,
+        "slow_request": slow_request,
+    }
+
+
+def _start_profiler(kind: str):
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed, falling back to cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _dump_profile(profiler, dump_dir: str):
+    os.makedirs(dump_dir, exist_ok=True)
+    endpoint = (request.endpoint or "unknown").replace(".", "-")
+    base = os.path.join(dump_dir, f"{int(time.time() * 1000)}-{os.getpid()}-{endpoint}")
+
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(base + ".prof")
+    else:
+        profiler.stop()
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
@@ -0,0 +1,178 @@
+import click
+import numpy as np
+from flask.cli import AppGroup
+from sqlalchemy import select, update
+
+from app import db
+from app.jobs import task
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.progress import CourseProgress, Progress
+
+# Bit i of a bitmap is lesson slot i: byte i // 8, bit i % 8 (little-endian bit order),
+# so appending lessons only ever grows the bitmap.
+
+
+# -----------------------
+# Single bitmaps
+# -----------------------
+def pack_slots(slots, n_slots: int | None = None) -> bytes:
+    slots = np.asarray(list(slots), dtype=np.int64)
+    width = n_slots if n_slots is not None else (int(slots.max()) + 1 if slots.size else 0)
+    bools = np.zeros(width, dtype=bool)
+    bools[slots] = True
+    return np.packbits(bools, bitorder="little").tobytes()
+
+
+def set_bit(bits: bytes, slot: int) -> tuple[bytes, bool]:
+    # Returns (new bitmap, True if the bit was not set before)
+    buf = bytearray(bits)
+    byte, bit = divmod(slot, 8)
+    if len(buf) <= byte:
+        buf.extend(b"\0" * (byte + 1 - len(buf)))
+    if buf[byte] & (1 << bit):
+        return bits, False
+    buf[byte] |= 1 << bit
+    return bytes(buf), True
+
+
+def clear_bit(bits: bytes, slot: int) -> tuple[bytes, bool]:
+    # Returns (new bitmap, True if the bit was set before)
+    byte, bit = divmod(slot, 8)
+    if len(bits) <= byte or not bits[byte] & (1 << bit):
+        return bits, False
+    buf = bytearray(bits)
+    buf[byte] &= ~(1 << bit) & 0xFF
+    return bytes(buf), True
+
+
+# -----------------------
+# Vectorized over many bitmaps
+# -----------------------
+def packed_matrix(bitmaps, n_slots: int) -> np.ndarray:
+    # (len(bitmaps), ceil(n_slots / 8)) uint8; short bitmaps are zero padded
+    width = (n_slots + 7) // 8
+    joined = b"".join(bytes(b[:width]).ljust(width, b"\0") for b in bitmaps)
+    return np.frombuffer(joined, dtype=np.uint8).reshape(len(bitmaps), width)
+
+
+def unpack(packed: np.ndarray, n_slots: int) -> np.ndarray:
+    # students x slots boolean matrix
+    return np.unpackbits(packed, axis=1, count=n_slots, bitorder="little").astype(bool)
+
+
+def popcount(packed: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(packed).sum(axis=1, dtype=np.int64)
+
+
+def covers(packed: np.ndarray, mask: bytes) -> np.ndarray:
+    # Rows that have every bit of mask set, e.g. "completed lessons 1..k"
+    mask_arr = np.frombuffer(mask.ljust(packed.shape[1], b"\0"), dtype=np.uint8)
+    return ((packed & mask_arr) == mask_arr).all(axis=1)
+
+
+# -----------------------
+# Course helpers
+# -----------------------
+def course_slots(course_id: int):
+    # [(lesson_id, slot, title, order_index)] in display order
+    return db.session.execute(
+        select(Lesson.id, Lesson.slot, Lesson.title, Lesson.order_index)
+        .where(Lesson.course_id == course_id)
+        .order_by(Lesson.order_index.asc(), Lesson.id.asc())
+    ).all()
+
+
+def lessons_mask(lessons, n_slots: int) -> bytes:
+    return pack_slots([l.slot for l in lessons], n_slots)
+
+
+def course_matrix(course_id: int, user_ids=None):
+    # (lessons in display order, n_slots, user ids, packed bitmaps); bits of lessons
+    # that no longer exist are cleared
+    lessons = course_slots(course_id)
+    n_slots = max((l.slot for l in lessons), default=-1) + 1
+
+    stmt = select(CourseProgress.user_id, CourseProgress.completed_bits).where(CourseProgress.course_id == course_id)
+    if user_ids is not None:
+        stmt = stmt.where(CourseProgress.user_id.in_(user_ids))
+    rows = db.session.execute(stmt).all()
+
+    mask = np.frombuffer(lessons_mask(lessons, n_slots), dtype=np.uint8)
+    packed = packed_matrix([bits for _, bits in rows], n_slots) & mask
+    return lessons, n_slots, [user_id for user_id, _ in rows], packed
+
+
+def next_slot(course_id: int) -> int:
+    # Claims a slot from the course counter. The UPDATE locks the course row until
+    # commit, so concurrent lesson creations get distinct slots.
+    courses = Course.__table__
+    db.session.execute(
+        update(courses).where(courses.c.id == course_id).values(next_slot=courses.c.next_slot + 1)
+    )
+    return db.session.execute(select(courses.c.next_slot).where(courses.c.id == course_id)).scalar() - 1
+
+
+def mark_completed(user_id: int, lesson: Lesson):
+    # Called in the same transaction as the Progress write
+    row = (
+        CourseProgress.query
+        .filter_by(user_id=user_id, course_id=lesson.course_id)
+        .with_for_update()
+        .first()
+    )
+    if not row:
+        row = CourseProgress(user_id=user_id, course_id=lesson.course_id, completed_bits=b"", completed_count=0)
+        db.session.add(row)
+    bits, changed = set_bit(row.completed_bits or b"", lesson.slot)
+    if changed:
+        row.completed_bits = bits
+        row.completed_count = (row.completed_count or 0) + 1
+    return row
+
+
+@task("progress.rebuild_bitmaps", concurrency=1)
+def rebuild(course_id: int | None = None) -> int:
+    # Recompute bitmaps from Progress (the source of truth)
+    stmt = (
+        select(Progress.user_id, Lesson.course_id, Lesson.slot)
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Progress.completed.is_(True))
+        .order_by(Lesson.course_id, Progress.user_id)
+    )
+    delete = CourseProgress.__table__.delete()
+    if course_id is not None:
+        stmt = stmt.where(Lesson.course_id == course_id)
+        delete = delete.where(CourseProgress.course_id == course_id)
+
+    slots_by_key = {}
+    for user_id, cid, slot in db.session.execute(stmt.execution_options(yield_per=50_000)):
+        slots_by_key.setdefault((user_id, cid), []).append(slot)
+
+    db.session.execute(delete)
+    rows = [
+        {"user_id": user_id, "course_id": cid, "completed_bits": pack_slots(slots), "completed_count": len(set(slots))}
+        for (user_id, cid), slots in slots_by_key.items()
+    ]
+    for i in range(0, len(rows), 5000):
+        db.session.execute(CourseProgress.__table__.insert(), rows[i:i + 5000])
+
+    from app.lesson_graph import refresh_course
+
+    for cid in {cid for _, cid in slots_by_key}:
+        refresh_course(cid)
+    db.session.commit()
+    return len(rows)
+
+
+# -----------------------
+# CLI: flask progress rebuild-bitmaps
+# -----------------------
+progress_cli = AppGroup("progress", help="Maintain per-course progress bitmaps.")
+
+
+@progress_cli.command("rebuild-bitmaps")
+@click.option("--course-id", type=int, default=None, help="Only this course (default: all).")
+def rebuild_command(course_id):
+    count = rebuild(course_id)
+    click.echo(f"Rebuilt {count} progress bitmaps")
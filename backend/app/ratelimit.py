@@ -0,0 +1,240 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger("languagelift.ratelimit")
+
+# Token buckets keyed by (scope, identity). A bucket holds up to `capacity` tokens
+# and refills at `rate` tokens per second; each request takes one. The check is a
+# dict lookup (memory) or one Lua script call (Redis) and never touches the database.
+#
+# Where a limit comes from, most specific first:
+#   RATELIMIT_LIMITS["<blueprint>.<view>"]  e.g. {"auth.login": "5/minute burst 10"}
+#   RATELIMIT_LIMITS["<blueprint>"]         one bucket shared by the blueprint's routes
+#   @limiter.limit("...") on the view
+#   RATELIMIT_DEFAULT                        one bucket shared by every other route
+#
+# Identity: key="user" uses the JWT subject when a valid token is sent and the client
+# IP otherwise; key="ip" always uses the IP. Behind RATELIMIT_TRUSTED_PROXIES proxies
+# the IP is read from X-Forwarded-For, as many entries from the right as there are
+# proxies (each appends the address it got the request from); entries further left
+# are whatever the client sent and are never trusted.
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_SPEC_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(second|minute|hour|day)s?\s*(?:burst\s*(\d+))?\s*$")
+
+
+def client_ip() -> str:
+    hops = current_app.config["RATELIMIT_TRUSTED_PROXIES"]
+    forwarded = request.headers.get("X-Forwarded-For")
+    if hops and forwarded:
+        route = [ip.strip() for ip in forwarded.split(",")]
+        if len(route) >= hops:
+            return route[-hops]
+    return request.remote_addr
+
+
+class Limit:
+    __slots__ = ("spec", "rate", "capacity", "key", "scope")
+
+    def __init__(self, spec: str, key: str = "user", scope: str = ""):
+        m = _SPEC_RE.match(spec)
+        if not m:
+            raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '10/minute' or '10/minute burst 20'")
+        if key not in ("user", "ip"):
+            raise ValueError(f"Invalid rate limit key {key!r}; expected 'user' or 'ip'")
+        count, period, burst = int(m.group(1)), m.group(2), m.group(3)
+        self.spec = spec
+        self.rate = count / _PERIODS[period]
+        self.capacity = int(burst) if burst else count
+        self.key = key
+        self.scope = scope
+
+
+def parse_limits(value: str) -> dict:
+    # "auth.login=5/minute burst 10; progress=120/minute" -> {scope: spec}
+    limits = {}
+    for part in filter(None, (p.strip() for p in value.split(";"))):
+        scope, _, spec = part.partition("=")
+        limits[scope.strip()] = spec.strip()
+    return limits
+
+
+# -----------------------
+# Stores
+# -----------------------
+class MemoryStore:
+    # Per process: with several gunicorn workers each one enforces the limit on its
+    # own, so the effective limit is workers x limit. Use Redis to share buckets.
+    def __init__(self, max_keys: int = 100_000):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated); least recently used first
+        self._max_keys = max_keys
+
+    def take(self, key: str, rate: float, capacity: int, cost: int = 1):
+        # Returns (allowed, tokens left, seconds until `cost` tokens are available)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                allowed, wait = True, 0.0
+            else:
+                allowed, wait = False, (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                # Oldest entries are idle buckets that have refilled anyway
+                self._buckets.popitem(last=False)
+        return allowed, tokens, wait
+
+
+_TOKEN_BUCKET_LUA = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+
+class RedisStore:
+    # Shared by all workers and servers; works with any Redis-compatible server
+    # (Redis, Valkey, KeyDB). Refill uses the server clock, so worker clocks don't
+    # matter. If Redis is unreachable requests are allowed (fail open).
+    def __init__(self, url: str, prefix: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+
+    def take(self, key: str, rate: float, capacity: int, cost: int = 1):
+        try:
+            allowed, tokens, wait = self._script(keys=[self._prefix + key], args=[rate, capacity, cost])
+        except Exception as e:
+            logger.warning("rate limit store unavailable, allowing request: %s", e)
+            return True, float(capacity), 0.0
+        return bool(allowed), float(tokens), float(wait)
+
+
+# -----------------------
+# Extension
+# -----------------------
+class RateLimiter:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RATELIMIT_ENABLED", True)
+        app.config.setdefault("RATELIMIT_STORAGE_URL", "memory://")
+        app.config.setdefault("RATELIMIT_KEY_PREFIX", "languagelift:rl:")
+        app.config.setdefault("RATELIMIT_DEFAULT", "")
+        app.config.setdefault("RATELIMIT_LIMITS", {})
+        app.config.setdefault("RATELIMIT_TRUSTED_PROXIES", 0)
+
+        if not app.config["RATELIMIT_ENABLED"]:
+            return
+
+        url = app.config["RATELIMIT_STORAGE_URL"]
+        if url.startswith("memory://"):
+            store = MemoryStore()
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            store = RedisStore(url, app.config["RATELIMIT_KEY_PREFIX"])
+        else:
+            raise ValueError(f"Unsupported RATELIMIT_STORAGE_URL: {url}")
+
+        limits = app.config["RATELIMIT_LIMITS"]
+        if isinstance(limits, str):
+            limits = parse_limits(limits)
+        app.extensions["ratelimit"] = {
+            "store": store,
+            "limits": {scope: Limit(spec, scope=scope) for scope, spec in limits.items()},
+            "default": Limit(app.config["RATELIMIT_DEFAULT"], scope="default") if app.config["RATELIMIT_DEFAULT"] else None,
+            "resolved": {},  # endpoint -> Limit | None, filled on first request
+        }
+        app.before_request(self._before_request)
+
+    def limit(self, spec: str, key: str = "user"):
+        # Code-level limit for one view; config (RATELIMIT_LIMITS) can override it
+        parsed = Limit(spec, key=key)
+
+        def decorator(fn):
+            fn._rate_limit = parsed
+            return fn
+
+        return decorator
+
+    def _resolve(self, endpoint: str):
+        state = current_app.extensions["ratelimit"]
+        limits = state["limits"]
+        view = current_app.view_functions.get(endpoint)
+        code_limit = getattr(view, "_rate_limit", None)
+        key = code_limit.key if code_limit else "user"
+
+        if endpoint in limits:
+            configured = limits[endpoint]
+        elif "." in endpoint and endpoint.split(".", 1)[0] in limits:
+            configured = limits[endpoint.split(".", 1)[0]]
+        elif code_limit:
+            return Limit(code_limit.spec, key=key, scope=endpoint)
+        else:
+            return state["default"]
+        return Limit(configured.spec, key=key, scope=configured.scope)
+
+    def _identity(self, limit: Limit) -> str:
+        if limit.key == "user":
+            from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+            try:
+                if verify_jwt_in_request(optional=True):
+                    return f"u:{get_jwt_identity()}"
+            except Exception:
+                pass  # invalid/expired token: the view rejects it; limit by IP
+        return f"ip:{client_ip()}"
+
+    def _before_request(self):
+        endpoint = request.endpoint
+        if endpoint is None or request.method == "OPTIONS":
+            return None
+        state = current_app.extensions["ratelimit"]
+        resolved = state["resolved"]
+        if endpoint not in resolved:
+            resolved[endpoint] = self._resolve(endpoint)
+        limit = resolved[endpoint]
+        if limit is None:
+            return None
+
+        allowed, _, wait = state["store"].take(f"{limit.scope}:{self._identity(limit)}", limit.rate, limit.capacity)
+        if allowed:
+            return None
+
+        from app import metrics
+
+        metrics.inc("languagelift_rate_limited_total", scope=limit.scope)
+        retry_after = max(1, math.ceil(wait))
+        resp = jsonify({"error": f"Too many requests, retry in {retry_after}s"})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(retry_after)
+        return resp
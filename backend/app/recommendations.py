@@ -0,0 +1,220 @@
+import time
+
+import click
+import numpy as np
+from flask.cli import AppGroup
+from scipy import sparse
+from sqlalchemy import func, select
+
+from app import db
+from app.jobs import task
+from app.models.enrollment import Enrollment
+from app.models.recommendation import CourseNeighbor, RecommendationBuild
+
+DEFAULT_TOP_K = 10
+DEFAULT_MIN_SUPPORT = 2  # ignore pairs co-enrolled by fewer students
+FETCH_CHUNK = 200_000
+
+
+# -----------------------
+# Vectorized co-occurrence
+# -----------------------
+def compute_neighbors(user_ids, course_ids, row_courses=None, course_counts=None,
+                      top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT) -> dict:
+    # user_ids / course_ids: parallel int arrays, one entry per enrollment.
+    # row_courses: only compute neighbors for these courses (default: all).
+    # course_counts: {course_id: total enrollments}, needed when the arrays hold only
+    # a subset of all enrollments (incremental builds).
+    # Returns {course_id: [(neighbor_id, score, co_enrollments), ...]} best first.
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    course_ids = np.asarray(course_ids, dtype=np.int64)
+    if user_ids.size == 0:
+        return {}
+
+    users, u_idx = np.unique(user_ids, return_inverse=True)
+    courses, c_idx = np.unique(course_ids, return_inverse=True)
+
+    # users x courses incidence matrix; C = X^T X counts co-enrollments
+    x = sparse.csr_matrix(
+        (np.ones(len(u_idx), dtype=np.int32), (u_idx, c_idx)),
+        shape=(len(users), len(courses)),
+    )
+
+    if row_courses is None:
+        rows = np.arange(len(courses))
+    else:
+        rows = np.flatnonzero(np.isin(courses, np.fromiter(row_courses, dtype=np.int64)))
+
+    x_csc = x.tocsc()
+    co = (x_csc[:, rows].T @ x).tocsr()  # len(rows) x courses
+
+    if course_counts is None:
+        counts = np.asarray(x.sum(axis=0)).ravel().astype(np.float64)
+    else:
+        counts = np.array([course_counts.get(int(c), 0) for c in courses], dtype=np.float64)
+
+    result = {}
+    for i, row in enumerate(rows):
+        start, end = co.indptr[i], co.indptr[i + 1]
+        cols = co.indices[start:end]
+        vals = co.data[start:end]
+        keep = (cols != row) & (vals >= min_support)
+        cols, vals = cols[keep], vals[keep]
+        if cols.size == 0:
+            result[int(courses[row])] = []
+            continue
+
+        scores = vals / np.sqrt(counts[row] * counts[cols])
+        if cols.size > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(cols.size)
+        top = top[np.lexsort((cols[top], -scores[top]))]
+        result[int(courses[row])] = [
+            (int(courses[cols[j]]), float(scores[j]), int(vals[j])) for j in top
+        ]
+    return result
+
+
+# -----------------------
+# Loading / storing
+# -----------------------
+def _fetch_pairs(stmt):
+    users, courses = [], []
+    result = db.session.execute(stmt.execution_options(yield_per=FETCH_CHUNK))
+    for chunk in result.partitions():
+        arr = np.array(chunk, dtype=np.int64)
+        users.append(arr[:, 0])
+        courses.append(arr[:, 1])
+    if not users:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(users), np.concatenate(courses)
+
+
+def _store(neighbors: dict):
+    if not neighbors:
+        return
+    course_ids = list(neighbors)
+    for i in range(0, len(course_ids), 1000):
+        db.session.execute(
+            CourseNeighbor.__table__.delete().where(CourseNeighbor.course_id.in_(course_ids[i:i + 1000]))
+        )
+    rows = [
+        {"course_id": cid, "rank": rank, "neighbor_id": nid, "score": score, "co_enrollments": co}
+        for cid, items in neighbors.items()
+        for rank, (nid, score, co) in enumerate(items, start=1)
+    ]
+    for i in range(0, len(rows), 5000):
+        db.session.execute(CourseNeighbor.__table__.insert(), rows[i:i + 5000])
+
+
+def _last_watermark() -> int:
+    return db.session.query(func.max(RecommendationBuild.max_enrollment_id)).scalar() or 0
+
+
+def build_full(top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT) -> RecommendationBuild:
+    started = time.perf_counter()
+    watermark = db.session.query(func.max(Enrollment.id)).scalar() or 0
+
+    users, courses = _fetch_pairs(
+        select(Enrollment.user_id, Enrollment.course_id).where(Enrollment.id <= watermark)
+    )
+    neighbors = compute_neighbors(users, courses, top_k=top_k, min_support=min_support)
+
+    db.session.execute(CourseNeighbor.__table__.delete())
+    _store(neighbors)
+    build = RecommendationBuild(
+        mode="full",
+        max_enrollment_id=watermark,
+        courses_updated=len(neighbors),
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
+    db.session.add(build)
+    db.session.commit()
+    return build
+
+
+def build_incremental(top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT) -> RecommendationBuild:
+    # Recompute only the rows that can change: courses of students who enrolled since
+    # the last build (their co-enrollment counts moved), and courses that list a course
+    # with new enrollments as a neighbor (its cosine norm moved). Those rows need the
+    # enrollments of every student in them, plus global per-course counts.
+    # Unenrollments are not tracked by the watermark; run --full after deletes.
+    started = time.perf_counter()
+    since = _last_watermark()
+    watermark = db.session.query(func.max(Enrollment.id)).scalar() or 0
+
+    new_rows = select(Enrollment.user_id, Enrollment.course_id).where(
+        Enrollment.id > since, Enrollment.id <= watermark
+    ).subquery()
+    affected = {
+        cid for (cid,) in db.session.execute(
+            select(Enrollment.course_id).where(Enrollment.user_id.in_(select(new_rows.c.user_id))).distinct()
+        )
+    }
+    affected |= {
+        cid for (cid,) in db.session.execute(
+            select(CourseNeighbor.course_id)
+            .where(CourseNeighbor.neighbor_id.in_(select(new_rows.c.course_id)))
+            .distinct()
+        )
+    }
+
+    neighbors = {}
+    if affected:
+        related_users = select(Enrollment.user_id).where(Enrollment.course_id.in_(affected)).distinct()
+        users, courses = _fetch_pairs(
+            select(Enrollment.user_id, Enrollment.course_id)
+            .where(Enrollment.user_id.in_(related_users), Enrollment.id <= watermark)
+        )
+        counts = dict(
+            db.session.execute(
+                select(Enrollment.course_id, func.count())
+                .where(Enrollment.id <= watermark)
+                .group_by(Enrollment.course_id)
+            ).all()
+        )
+        neighbors = compute_neighbors(
+            users, courses, row_courses=affected, course_counts=counts, top_k=top_k, min_support=min_support
+        )
+        _store(neighbors)
+
+    build = RecommendationBuild(
+        mode="incremental",
+        max_enrollment_id=watermark,
+        courses_updated=len(neighbors),
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
+    db.session.add(build)
+    db.session.commit()
+    return build
+
+
+def build(full: bool = False, top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT) -> RecommendationBuild:
+    if full or _last_watermark() == 0:
+        return build_full(top_k=top_k, min_support=min_support)
+    return build_incremental(top_k=top_k, min_support=min_support)
+
+
+@task("recommendations.build", concurrency=1)
+def build_job(full: bool = False, top_k: int = DEFAULT_TOP_K, min_support: int = DEFAULT_MIN_SUPPORT) -> dict:
+    b = build(full, top_k, min_support)
+    return {"mode": b.mode, "courses_updated": b.courses_updated, "max_enrollment_id": b.max_enrollment_id}
+
+
+# -----------------------
+# CLI: flask recommendations build [--full]
+# -----------------------
+recommendations_cli = AppGroup("recommendations", help="Build course co-enrollment recommendations.")
+
+
+@recommendations_cli.command("build")
+@click.option("--full", is_flag=True, help="Recompute every course instead of only those with new enrollments.")
+@click.option("--top-k", default=DEFAULT_TOP_K, show_default=True)
+@click.option("--min-support", default=DEFAULT_MIN_SUPPORT, show_default=True)
+def build_command(full, top_k, min_support):
+    b = build(full, top_k, min_support)
+    click.echo(
+        f"{b.mode} build: {b.courses_updated} courses updated through enrollment "
+        f"{b.max_enrollment_id} in {b.duration_ms} ms"
+    )
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bleach
+import click
+import markdown
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, or_, select, update
+
+from app import db
+from app.jobs import task
+from app.models.lesson import Lesson
+
+# Bump when the markdown extensions or the sanitizer rules change: every lesson's
+# stored hash stops matching and is re-rendered when it is next read on its own
+# (GET /lessons/<id>, /batch) or by `flask lessons render --recheck`. Bundle
+# versions hash the stored content_hash, so run the CLI to rebuild bundles.
+RENDERER_VERSION = "1"
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "nl2br"]
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt", "em",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p", "pre", "span",
+    "strong", "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title", "rel"],
+    "abbr": ["title"],
+    "img": ["src", "alt", "title"],
+    "td": ["align"],
+    "th": ["align"],
+}
+ALLOWED_PROTOCOLS = {"http", "https", "mailto"}
+
+
+def content_hash(content: str | None) -> str:
+    return hashlib.sha256(f"{RENDERER_VERSION}:{content or ''}".encode("utf-8")).hexdigest()
+
+
+def render_markdown(content: str | None) -> str:
+    html = markdown.markdown(content or "", extensions=MARKDOWN_EXTENSIONS, output_format="html")
+    html = bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+    # Bare URLs (e.g. a video link as the whole lesson) become links
+    return bleach.linkify(html, skip_tags={"pre", "code"})
+
+
+def is_stale(lesson: Lesson) -> bool:
+    # Never rendered, or rendered from other content or by another RENDERER_VERSION
+    return lesson.content_html is None or lesson.content_hash != content_hash(lesson.content)
+
+
+def ensure_rendered(lesson: Lesson) -> bool:
+    # Returns True if the lesson was (re-)rendered and needs saving
+    if not is_stale(lesson):
+        return False
+    lesson.content_html = render_markdown(lesson.content)
+    lesson.content_hash = content_hash(lesson.content)
+    return True
+
+
+# -----------------------
+# Bulk rendering (imports, legacy rows, renderer upgrades)
+# -----------------------
+def _render_batch(items):
+    # Runs in a worker process: [(id, content)] -> [(id, html, hash)]
+    return [(lesson_id, render_markdown(content), content_hash(content)) for lesson_id, content in items]
+
+
+@task("lessons.render", concurrency=1)
+def render_pending(workers: int | None = None, batch_size: int = 500, recheck: bool = False) -> int:
+    # Renders lessons without HTML (or, with recheck, every lesson whose hash is
+    # stale). Reads are keyset-paginated by id, rendering is spread across a
+    # process pool and results are written back with one executemany per batch.
+    workers = workers or os.cpu_count() or 1
+    stmt = select(Lesson.id, Lesson.content, Lesson.content_hash).order_by(Lesson.id).limit(batch_size)
+    if not recheck:
+        stmt = stmt.where(or_(Lesson.content_html.is_(None), Lesson.content_hash.is_(None)))
+
+    table = Lesson.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(content_html=bindparam("content_html"), content_hash=bindparam("content_hash"))
+    )
+
+    rendered, last_id = 0, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            rows = db.session.execute(stmt.where(Lesson.id > last_id)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            if recheck:
+                stale = [(r.id, r.content) for r in rows if r.content_hash != content_hash(r.content)]
+            else:
+                stale = [(r.id, r.content) for r in rows]
+            if not stale:
+                continue
+
+            chunk = max(1, len(stale) // (workers * 4))
+            batches = [stale[i:i + chunk] for i in range(0, len(stale), chunk)]
+            results = [item for batch in pool.map(_render_batch, batches) for item in batch]
+            db.session.execute(
+                write,
+                [{"b_id": lesson_id, "content_html": html, "content_hash": digest} for lesson_id, html, digest in results],
+            )
+            db.session.commit()
+            rendered += len(results)
+    return rendered
+
+
+# -----------------------
+# CLI: flask lessons render
+# -----------------------
+lessons_cli = AppGroup("lessons", help="Lesson content maintenance.")
+
+
+@lessons_cli.command("render")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@click.option("--recheck", is_flag=True, help="Also re-render lessons whose content hash is stale.")
+def render_command(workers, batch_size, recheck):
+    started = time.perf_counter()
+    count = render_pending(workers=workers, batch_size=batch_size, recheck=recheck)
+    click.echo(f"Rendered {count} lessons in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, exists, insert, literal, select, update
+
+from app import db
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+from app.models.review import ReviewState, VocabularyItem
+
+MIN_EASE = 1.3
+PASSING_GRADE = 3  # SM-2 grades are 0..5; below 3 is a lapse
+CHUNK = 1000  # ids per IN (...) list
+
+_states = ReviewState.__table__
+
+
+# -----------------------
+# SM-2
+# -----------------------
+def sm2(ease: float, interval_days: int, repetitions: int, grade: int):
+    if grade < PASSING_GRADE:
+        repetitions = 0
+        interval_days = 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * ease))
+        repetitions += 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return ease, interval_days, repetitions
+
+
+# -----------------------
+# Seeding
+# -----------------------
+def _seed_from(select_pairs, now: datetime) -> int:
+    # INSERT ... SELECT user_id, item_id for pairs that have no state yet
+    pairs = select_pairs.subquery()
+    missing = select(
+        pairs.c.user_id,
+        pairs.c.item_id,
+        literal(2.5),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(now),
+    ).where(
+        ~exists().where(and_(_states.c.user_id == pairs.c.user_id, _states.c.item_id == pairs.c.item_id))
+    )
+    result = db.session.execute(
+        insert(_states).from_select(
+            ["user_id", "item_id", "ease", "interval_days", "repetitions", "lapses", "due_at"], missing
+        )
+    )
+    return result.rowcount
+
+
+def seed_lesson_reviews(user_id: int, lesson_id: int, now: datetime | None = None) -> int:
+    # A completed lesson puts its vocabulary in the user's queue, due immediately
+    pairs = select(literal(user_id).label("user_id"), VocabularyItem.id.label("item_id")).where(
+        VocabularyItem.lesson_id == lesson_id
+    )
+    return _seed_from(pairs, now or datetime.utcnow())
+
+
+def seed_item_reviews(lesson_id: int, item_ids, now: datetime | None = None) -> int:
+    # Items added to a lesson later go to everyone who already completed it
+    pairs = (
+        select(Progress.user_id.label("user_id"), VocabularyItem.id.label("item_id"))
+        .join(VocabularyItem, VocabularyItem.lesson_id == Progress.lesson_id)
+        .where(Progress.lesson_id == lesson_id, Progress.completed.is_(True), VocabularyItem.id.in_(item_ids))
+    )
+    return _seed_from(pairs, now or datetime.utcnow())
+
+
+# -----------------------
+# Queue
+# -----------------------
+def due_reviews(user_id: int, limit: int, now: datetime | None = None):
+    # Range scan on ix_review_states_user_id_due_at, stops after `limit` rows
+    return db.session.execute(
+        select(ReviewState, VocabularyItem)
+        .join(VocabularyItem, VocabularyItem.id == ReviewState.item_id)
+        .where(ReviewState.user_id == user_id, ReviewState.due_at <= (now or datetime.utcnow()))
+        .order_by(ReviewState.due_at, ReviewState.item_id)
+        .limit(limit)
+    ).all()
+
+
+def _reviewable_items(user_id: int, item_ids) -> set:
+    # Items of lessons in courses the user is enrolled in
+    allowed = set()
+    for i in range(0, len(item_ids), CHUNK):
+        allowed.update(
+            db.session.execute(
+                select(VocabularyItem.id)
+                .join(Lesson, Lesson.id == VocabularyItem.lesson_id)
+                .join(Enrollment, and_(Enrollment.course_id == Lesson.course_id, Enrollment.user_id == user_id))
+                .where(VocabularyItem.id.in_(item_ids[i:i + CHUNK]))
+            ).scalars()
+        )
+    return allowed
+
+
+def grade_reviews(user_id: int, grades: dict, now: datetime | None = None) -> dict:
+    # grades: {item_id: grade}. One SELECT per CHUNK items, then a single executemany
+    # UPDATE for existing states and one executemany INSERT for first reviews.
+    now = now or datetime.utcnow()
+    item_ids = list(grades)
+
+    current = {}
+    for i in range(0, len(item_ids), CHUNK):
+        for row in db.session.execute(
+            select(_states.c.item_id, _states.c.ease, _states.c.interval_days, _states.c.repetitions, _states.c.lapses)
+            .where(_states.c.user_id == user_id, _states.c.item_id.in_(item_ids[i:i + CHUNK]))
+        ):
+            current[row.item_id] = row
+
+    new_ids = [item_id for item_id in item_ids if item_id not in current]
+    allowed = _reviewable_items(user_id, new_ids) if new_ids else set()
+
+    updates, inserts, skipped, lapses = [], [], [], 0
+    for item_id, grade in grades.items():
+        state = current.get(item_id)
+        if state is None and item_id not in allowed:
+            skipped.append(item_id)
+            continue
+
+        ease, interval_days, repetitions, lapse_count = (
+            (state.ease, state.interval_days, state.repetitions, state.lapses) if state else (2.5, 0, 0, 0)
+        )
+        ease, interval_days, repetitions = sm2(ease, interval_days, repetitions, grade)
+        if grade < PASSING_GRADE:
+            lapse_count += 1
+            lapses += 1
+        values = {
+            "ease": ease,
+            "interval_days": interval_days,
+            "repetitions": repetitions,
+            "lapses": lapse_count,
+            "due_at": now + timedelta(days=interval_days),
+            "last_reviewed_at": now,
+        }
+        if state:
+            updates.append({"b_user_id": user_id, "b_item_id": item_id, **values})
+        else:
+            inserts.append({"user_id": user_id, "item_id": item_id, **values})
+
+    if updates:
+        db.session.execute(
+            update(_states)
+            .where(_states.c.user_id == bindparam("b_user_id"), _states.c.item_id == bindparam("b_item_id"))
+            .values(
+                ease=bindparam("ease"),
+                interval_days=bindparam("interval_days"),
+                repetitions=bindparam("repetitions"),
+                lapses=bindparam("lapses"),
+                due_at=bindparam("due_at"),
+                last_reviewed_at=bindparam("last_reviewed_at"),
+            ),
+            updates,
+        )
+    if inserts:
+        db.session.execute(insert(_states), inserts)
+    db.session.commit()
+
+    return {
+        "graded": len(updates) + len(inserts),
+        "lapses": lapses,
+        "skipped": skipped,
+        "next_due_at": min((r["due_at"] for r in updates + inserts), default=None),
+    }
@@ -0,0 +1,274 @@
+import hashlib
+import heapq
+import logging
+import math
+import threading
+import time
+
+from flask import current_app
+
+logger = logging.getLogger("languagelift.revocation")
+
+# Revoked JWTs, checked on every @jwt_required call through the token_in_blocklist
+# loader. Entries live exactly as long as the token they revoke could still be used
+# (TTL = exp - now), so the denylist only ever holds unexpired tokens. Keys:
+#   jti:<jti>    one token (logout, or a refresh token that was rotated)
+#   fam:<id>     every refresh token of a login session (refresh token reuse)
+#   user:<id>    value = unix time; the user's tokens issued before it (logout everywhere)
+#
+# Stores (JWT_DENYLIST_URL):
+#   memory://  dict in this process; for a single process (dev, tests)
+#   redis://   shared by all workers/servers; one MGET per check, or none when the
+#              Bloom filter (JWT_DENYLIST_BLOOM) says the token cannot be revoked
+#
+# Rotated refresh tokens (one jti: per /auth/refresh, the bulk of all entries) stay
+# out of the Bloom filter: refresh tokens are always checked against the store,
+# which costs one round trip per refresh, not per request.
+
+
+# -----------------------
+# Bloom filter
+# -----------------------
+class BloomFilter:
+    # No false negatives: "not in the filter" means not revoked, without asking the store
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _hashes(self, key: str):
+        # Kirsch-Mitzenmacher: position i is (h1 + i * h2) mod size
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, key: str):
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        # Most keys were never added and miss on the first or second bit
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+# -----------------------
+# Stores
+# -----------------------
+class MemoryDenylist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, expires_at)
+        self._expiry = []  # heap of (expires_at, key) for purging
+
+    def add(self, key: str, ttl: float, value: float = 1.0, bloom: bool = True):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            heapq.heappush(self._expiry, (expires_at, key))
+            self._purge(time.time())
+
+    def _purge(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry and entry[1] <= now:
+                del self._entries[key]
+
+    def get_many(self, keys, bloom: bool = True):
+        now = time.time()
+        values = []
+        for key in keys:
+            entry = self._entries.get(key)
+            values.append(entry[0] if entry and entry[1] > now else None)
+        return values
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisDenylist:
+    # Keys that go through the Bloom filter are logged twice:
+    LOG_KEY = "revocations"  # sorted set: member = key, score = expiry; full rebuilds
+    STREAM_KEY = "revocations:stream"  # stream, insertion order; incremental syncs
+    # A full rebuild drops expired keys from the filter; in between, each sync only
+    # reads the stream entries added since the last one. The stream keeps twice that
+    # long, so entries a worker has not seen yet are never trimmed.
+    REBUILD_SECONDS = 600.0
+
+    def __init__(self, url: str, prefix: str, bloom_capacity: int = 0, sync_interval: float = 1.0):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._prefix = prefix
+        self._bloom_capacity = bloom_capacity
+        self._sync_interval = sync_interval
+        self._bloom = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._last_id = "0-0"  # last stream entry in the filter
+        self._lock = threading.Lock()
+
+    def add(self, key: str, ttl: float, value: float = 1.0, bloom: bool = True):
+        now = time.time()
+        pipe = self._client.pipeline()
+        pipe.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+        if bloom:
+            pipe.zadd(self._prefix + self.LOG_KEY, {key: now + ttl})
+            pipe.zremrangebyscore(self._prefix + self.LOG_KEY, "-inf", now)
+            min_id = int((now - 2 * self.REBUILD_SECONDS) * 1000)
+            pipe.xadd(self._prefix + self.STREAM_KEY, {"k": key}, minid=min_id, approximate=True)
+        pipe.execute()
+        if bloom and self._bloom is not None:
+            self._bloom.add(key)
+
+    def _rebuild(self):
+        # Live keys, and the stream position they correspond to (one transaction)
+        pipe = self._client.pipeline()
+        pipe.zrangebyscore(self._prefix + self.LOG_KEY, time.time(), "+inf")
+        pipe.xrevrange(self._prefix + self.STREAM_KEY, count=1)
+        keys, last = pipe.execute()
+        bloom = BloomFilter(max(self._bloom_capacity, len(keys) * 2))
+        for key in keys:
+            bloom.add(key.decode("utf-8"))
+        self._bloom, self._built_at = bloom, time.monotonic()
+        self._last_id = last[0][0].decode("ascii") if last else "0-0"
+
+    def _catch_up(self):
+        # Only what other workers revoked since the last sync ("(" = exclusive)
+        entries = self._client.xrange(self._prefix + self.STREAM_KEY, min=f"({self._last_id}")
+        for entry_id, fields in entries:
+            self._bloom.add(fields[b"k"].decode("utf-8"))
+        if entries:
+            self._last_id = entries[-1][0].decode("ascii")
+
+    def _sync_bloom(self):
+        # At most every sync_interval; revocations made by other workers are seen
+        # within that window, this worker's own immediately
+        now = time.monotonic()
+        if self._bloom is not None and now - self._synced_at < self._sync_interval:
+            return
+        with self._lock:
+            if self._bloom is not None and now - self._synced_at < self._sync_interval:
+                return
+            if (
+                self._bloom is None
+                or now - self._built_at >= self.REBUILD_SECONDS
+                or self._bloom.count > self._bloom.capacity
+            ):
+                self._rebuild()
+            else:
+                self._catch_up()
+            self._synced_at = now
+
+    def get_many(self, keys, bloom: bool = True):
+        if self._bloom_capacity and bloom:
+            try:
+                self._sync_bloom()
+            except Exception as e:
+                logger.warning("denylist sync failed, checking the store directly: %s", e)
+            else:
+                # Common case: nothing about this token was ever revoked, no round trip
+                if not any(k in self._bloom for k in keys):
+                    return [None] * len(keys)
+        values = self._client.mget([self._prefix + k for k in keys])
+        return [float(v) if v is not None else None for v in values]
+
+
+# -----------------------
+# Extension
+# -----------------------
+class TokenRevocation:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("JWT_DENYLIST_URL", "memory://")
+        app.config.setdefault("JWT_DENYLIST_PREFIX", "languagelift:jwt:")
+        app.config.setdefault("JWT_DENYLIST_BLOOM", False)
+        app.config.setdefault("JWT_DENYLIST_BLOOM_CAPACITY", 1_000_000)
+        app.config.setdefault("JWT_DENYLIST_SYNC_INTERVAL", 1.0)
+
+        url = app.config["JWT_DENYLIST_URL"]
+        if url.startswith("memory://"):
+            store = MemoryDenylist()
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            store = RedisDenylist(
+                url,
+                app.config["JWT_DENYLIST_PREFIX"],
+                bloom_capacity=app.config["JWT_DENYLIST_BLOOM_CAPACITY"] if app.config["JWT_DENYLIST_BLOOM"] else 0,
+                sync_interval=app.config["JWT_DENYLIST_SYNC_INTERVAL"],
+            )
+        else:
+            raise ValueError(f"Unsupported JWT_DENYLIST_URL: {url}")
+        app.extensions["revocation"] = store
+
+        manager = app.extensions["flask-jwt-extended"]
+        manager.token_in_blocklist_loader(self._is_revoked)
+
+    @property
+    def store(self):
+        return current_app.extensions["revocation"]
+
+    # -----------------------
+    # Revoking
+    # -----------------------
+    def _refresh_ttl(self) -> float:
+        expires = current_app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+        return expires.total_seconds() if hasattr(expires, "total_seconds") else float(expires or 0) or 365 * 86400
+
+    def revoke(self, payload: dict):
+        # One token, until it would have expired anyway
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            self.store.add(f"jti:{payload['jti']}", ttl, bloom=payload.get("type") != "refresh")
+
+    def revoke_family(self, family: str):
+        self.store.add(f"fam:{family}", self._refresh_ttl())
+
+    def revoke_user(self, user_id):
+        # Every token issued to the user before this second (iat has one second
+        # resolution); the entry outlives the longest-lived token
+        self.store.add(f"user:{user_id}", self._refresh_ttl(), value=int(time.time()))
+
+    # -----------------------
+    # Checking (every @jwt_required call)
+    # -----------------------
+    def _is_revoked(self, jwt_header, jwt_payload) -> bool:
+        keys = [f"jti:{jwt_payload['jti']}", f"user:{jwt_payload['sub']}"]
+        family = jwt_payload.get("fam")
+        if family:
+            keys.append(f"fam:{family}")
+        refresh = jwt_payload.get("type") == "refresh"
+        try:
+            # Rotated refresh tokens are not in the Bloom filter
+            values = self.store.get_many(keys, bloom=not refresh)
+        except Exception as e:
+            # Shared store down: fail closed only for refresh tokens, which can mint
+            # new access tokens; short-lived access tokens keep working
+            logger.warning("denylist unavailable: %s", e)
+            return refresh
+
+        token_revoked, user_cutoff = values[0] is not None, values[1]
+        if user_cutoff is not None and jwt_payload["iat"] < user_cutoff:
+            return True
+        if family and values[2] is not None:
+            return True
+        if token_revoked and refresh and family:
+            # A rotated refresh token was used again: it leaked, end the session
+            from app import metrics
+
+            self.revoke_family(family)
+            metrics.inc("languagelift_token_revocations_total", reason="refresh_reuse")
+        return token_revoked
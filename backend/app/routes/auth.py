@@ -1,18 +1,33 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, current_app, request, jsonify
+from app import db, limiter, metrics, revocation, tickets
 from app.models.user import User
+from app.profiling import timed
 import bcrypt
+import secrets
 
 from flask_jwt_extended import (
     create_access_token,
+    create_refresh_token,
     jwt_required,
+    get_jwt,
     get_jwt_identity,
 )
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
+def _issue_tokens(user_id: str, family: str) -> dict:
+    # Both tokens carry the login session ("fam"): revoking the family ends the
+    # session's access tokens too, not only its refresh tokens
+    claims = {"fam": family}
+    return {
+        "access_token": create_access_token(identity=user_id, additional_claims=claims),
+        "refresh_token": create_refresh_token(identity=user_id, additional_claims=claims),
+    }
+
+
 @auth_bp.route("/register", methods=["POST"])
+@limiter.limit("5/minute burst 10", key="ip")
 def register():
     data = request.get_json() or {}
 
@@ -28,7 +43,8 @@ def register():
     if existing_user:
         return jsonify({"error": "Email already registered"}), 400
 
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    with timed("bcrypt"):
+        hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
 
     new_user = User(
         name=name,
@@ -43,7 +59,9 @@ def register():
     return jsonify({"message": "User registered successfully"}), 201
 
 
+# Each attempt costs a bcrypt check: 10 quick tries per IP, then one every 12s
 @auth_bp.route("/login", methods=["POST"])
+@limiter.limit("5/minute burst 10", key="ip")
 def login():
     data = request.get_json() or {}
 
@@ -55,23 +73,77 @@ def login():
 
     user = User.query.filter_by(email=email).first()
     if not user:
+        metrics.inc("languagelift_logins_total", result="failure")
         return jsonify({"error": "Invalid email or password"}), 401
 
-    ok = bcrypt.checkpw(password.encode("utf-8"), user.password_hash.encode("utf-8"))
+    with timed("bcrypt"):
+        ok = bcrypt.checkpw(password.encode("utf-8"), user.password_hash.encode("utf-8"))
     if not ok:
+        metrics.inc("languagelift_logins_total", result="failure")
         return jsonify({"error": "Invalid email or password"}), 401
 
-    # identity can be user.id (recommended)
-    access_token = create_access_token(identity=str(user.id))
+    metrics.inc("languagelift_logins_total", result="success")
+
+    tokens = _issue_tokens(str(user.id), secrets.token_hex(8))
 
     return jsonify(
         {
-            "access_token": access_token,
+            **tokens,
             "user": {"id": user.id, "name": user.name, "email": user.email, "role": user.role},
         }
     ), 200
 
 
+# ✅ Rotate: a refresh token buys one new access + refresh pair and is revoked.
+#    Presenting it again (stolen copy or replay) revokes the whole session.
+@auth_bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    payload = get_jwt()
+    revocation.revoke(payload)
+    metrics.inc("languagelift_token_revocations_total", reason="refresh")
+    return jsonify(_issue_tokens(payload["sub"], payload.get("fam") or secrets.token_hex(8))), 200
+
+
+# ✅ Logout: ends this session (access + refresh tokens of this login)
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    payload = get_jwt()
+    revocation.revoke(payload)
+    if payload.get("fam"):
+        revocation.revoke_family(payload["fam"])
+    metrics.inc("languagelift_token_revocations_total", reason="logout")
+    return jsonify({"message": "Logged out"}), 200
+
+
+# ✅ Logout everywhere: every token issued to the user so far
+@auth_bp.route("/logout-all", methods=["POST"])
+@jwt_required()
+def logout_all():
+    payload = get_jwt()
+    revocation.revoke_user(payload["sub"])
+    revocation.revoke(payload)
+    metrics.inc("languagelift_token_revocations_total", reason="logout_all")
+    return jsonify({"message": "Logged out on all devices"}), 200
+
+
+# ✅ Ticket for a URL the browser opens without headers (EventSource, download
+#    link): pass it as ?ticket=. One scope, valid for TICKET_SECONDS (app/tickets.py)
+@auth_bp.route("/tickets", methods=["POST"])
+@jwt_required()
+def issue_ticket():
+    scope = (request.get_json(silent=True) or {}).get("scope")
+    if scope not in tickets.SCOPES:
+        return jsonify({"error": f"scope must be one of: {', '.join(tickets.SCOPES)}"}), 400
+
+    payload = get_jwt()
+    return jsonify({
+        "ticket": tickets.issue(payload["sub"], scope, payload["exp"]),
+        "expires_in": current_app.config["TICKET_SECONDS"],
+    }), 201
+
+
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def me():
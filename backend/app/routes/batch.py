@@ -0,0 +1,226 @@
+from flask import Blueprint, g, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import db
+from app.models.user import User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.certificate import Certificate
+from app.dataloader import loader
+from app.lesson_graph import states_from
+from app.rendering import ensure_rendered
+from app.serializers import certificate_json, course_json, enrollment_json, lesson_json, lesson_state_json, related_json
+
+batch_bp = Blueprint("batch", __name__)
+
+# POST /batch {"requests": [{"resource": "course", "id": 3}, ...]} answers every
+# sub-request in order as {"status": 200, "body": ...} or {"status": 404, "error": ...}.
+# Bodies are the same JSON as the matching REST endpoint. Resolvers only queue keys
+# on the request's DataLoaders (app.dataloader) and return a thunk, so a batch costs
+# one query per entity type, not one per sub-request.
+MAX_BATCH_REQUESTS = 50
+
+
+class BatchError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id) if user_id else None
+
+
+def _int_arg(sub: dict, name: str) -> int:
+    value = sub.get(name)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise BatchError(400, f"Missing or invalid field: {name}")
+    return value
+
+
+def _require_user(user):
+    if not user:
+        raise BatchError(401, "Unauthorized")
+
+
+def _found(course):
+    if not course:
+        raise BatchError(404, "Course not found")
+    return course
+
+
+# -----------------------
+# Resolvers: (sub-request, user) -> thunk
+# -----------------------
+def _course(sub, user):
+    course = loader("course").load(_int_arg(sub, "id"))
+    return lambda: course_json(_found(course()))
+
+
+def _lesson(sub, user):
+    lesson = loader("lesson").load(_int_arg(sub, "id"))
+
+    def resolve():
+        l = lesson()
+        if not l:
+            raise BatchError(404, "Lesson not found")
+        # Legacy rows are rendered once, as in GET /lessons/<id>
+        if ensure_rendered(l):
+            g.batch_dirty = True
+        return lesson_json(l)
+    return resolve
+
+
+def _course_lessons(sub, user):
+    course_id = _int_arg(sub, "course_id")
+    course, lessons = loader("course").load(course_id), loader("course_lessons").load(course_id)
+
+    def resolve():
+        _found(course())
+        return [lesson_json(l, html=False) for l in lessons()]
+    return resolve
+
+
+def _lesson_states(sub, user):
+    _require_user(user)
+    course_id = _int_arg(sub, "course_id")
+    course = loader("course").load(course_id)
+    lessons = loader("course_lessons").load(course_id)
+    gated = loader("gated").load(course_id)
+    row = loader("course_progress").load((user.id, course_id))
+
+    def resolve():
+        _found(course())
+        return [lesson_state_json(*state) for state in states_from(lessons(), gated(), row())]
+    return resolve
+
+
+def _progress_json(course_id, user, lessons, row) -> dict:
+    # Same shape as GET /courses/<id>/progress, from the progress bitmap
+    states = states_from(lessons, set(), row)
+    completed = sum(1 for _, done, _ in states if done)
+    return {
+        "course_id": course_id,
+        "user_id": user.id,
+        "total_lessons": len(states),
+        "completed_lessons": completed,
+        "completion_percent": 0 if not states else round(completed / len(states) * 100, 2),
+        "lessons": [
+            {"lesson_id": l.id, "title": l.title, "order_index": l.order_index, "completed": done}
+            for l, done, _ in states
+        ],
+    }
+
+
+def _progress(sub, user):
+    _require_user(user)
+    course_id = _int_arg(sub, "course_id")
+    course = loader("course").load(course_id)
+    enrolled = loader("enrollment").load((user.id, course_id))
+    lessons = loader("course_lessons").load(course_id)
+    row = loader("course_progress").load((user.id, course_id))
+
+    def resolve():
+        _found(course())
+        if not enrolled() and user.role != "admin":
+            raise BatchError(403, "You must be enrolled in this course to view progress")
+        return _progress_json(course_id, user, lessons(), row())
+    return resolve
+
+
+def _enrollments(sub, user):
+    # My enrollments; "progress": true adds each course's progress (still one
+    # query for all lessons and one for all bitmaps)
+    _require_user(user)
+    rows = (
+        db.session.query(Enrollment, Course)
+        .join(Course, Course.id == Enrollment.course_id)
+        .filter(Enrollment.user_id == user.id)
+        .order_by(Enrollment.enrolled_at.desc())
+        .all()
+    )
+    for e, c in rows:
+        loader("course").prime(c.id, c)
+        loader("enrollment").prime((user.id, c.id), e)
+    if not sub.get("progress"):
+        return lambda: [enrollment_json(e, c) for e, c in rows]
+
+    lessons = loader("course_lessons").load_many([c.id for _, c in rows])
+    bitmaps = loader("course_progress").load_many([(user.id, c.id) for _, c in rows])
+
+    def resolve():
+        return [
+            {**enrollment_json(e, c), "progress": _progress_json(c.id, user, ls, row)}
+            for (e, c), ls, row in zip(rows, lessons(), bitmaps())
+        ]
+    return resolve
+
+
+def _certificates(sub, user):
+    # My certificates, as GET /me/certificates
+    _require_user(user)
+    certs = Certificate.query.filter_by(user_id=user.id).order_by(Certificate.issued_at.desc()).all()
+    return lambda: [certificate_json(c) for c in certs]
+
+
+def _related(sub, user):
+    course_id = _int_arg(sub, "course_id")
+    limit = min(max(sub["limit"], 1), 50) if type(sub.get("limit")) is int else 10
+    course = loader("course").load(course_id)
+    related = loader("related").load((course_id, limit))
+
+    def resolve():
+        _found(course())
+        return [related_json(n, c) for n, c in related()]
+    return resolve
+
+
+RESOLVERS = {
+    "course": _course,
+    "lesson": _lesson,
+    "course_lessons": _course_lessons,
+    "lesson_states": _lesson_states,
+    "progress": _progress,
+    "enrollments": _enrollments,
+    "certificates": _certificates,
+    "related": _related,
+}
+
+
+# ✅ Many reads in one round trip; auth is optional and applies to every sub-request
+@batch_bp.route("/batch", methods=["POST"])
+@jwt_required(optional=True)
+def batch():
+    data = request.get_json(silent=True) or {}
+    subs = data.get("requests") if isinstance(data, dict) else None
+    if not isinstance(subs, list) or not subs:
+        return jsonify({"error": "requests must be a non-empty list"}), 400
+    if len(subs) > MAX_BATCH_REQUESTS:
+        return jsonify({"error": f"At most {MAX_BATCH_REQUESTS} requests per batch"}), 400
+
+    user = _current_user()
+    results = []
+    for sub in subs:
+        resolver = RESOLVERS.get(sub.get("resource")) if isinstance(sub, dict) else None
+        try:
+            if not resolver:
+                raise BatchError(400, f"Unknown resource; one of: {', '.join(RESOLVERS)}")
+            results.append(resolver(sub, user))
+        except BatchError as e:
+            results.append(e)
+
+    # Every resolver has queued its keys; the first read on each loader runs its query
+    responses = []
+    for result in results:
+        try:
+            if isinstance(result, BatchError):
+                raise result
+            responses.append({"status": 200, "body": result()})
+        except BatchError as e:
+            responses.append({"status": e.status, "error": e.message})
+
+    if g.get("batch_dirty"):
+        db.session.commit()
+    return jsonify({"responses": responses}), 200
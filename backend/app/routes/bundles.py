@@ -0,0 +1,116 @@
+import os
+
+from flask import Blueprint, Response, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import metrics, storage
+from app.models.user import User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.bundles import (
+    STREAMS,
+    build_manifest,
+    cache_path,
+    cached_manifest,
+    course_version,
+    evict_old_versions,
+    stream_and_cache,
+    zstd_available,
+)
+
+bundles_bp = Blueprint("bundles", __name__)
+
+MIMETYPES = {"zip": "application/zip", "tar.zst": "application/zstd"}
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _can_download(user: User, course: Course) -> bool:
+    if user.role == "admin" or course.instructor_id == user.id:
+        return True
+    return Enrollment.query.filter_by(user_id=user.id, course_id=course.id).first() is not None
+
+
+def _load(course_id: int):
+    user = _current_user()
+    if not user:
+        return None, (jsonify({"error": "Unauthorized"}), 401)
+
+    course = Course.query.get(course_id)
+    if not course:
+        return None, (jsonify({"error": "Course not found"}), 404)
+
+    if not _can_download(user, course):
+        return None, (jsonify({"error": "You must be enrolled in the course to download it"}), 403)
+    return course, None
+
+
+# ✅ Bundle manifest: version + sha256 per lesson/media file (enrolled students, owner, admin)
+@bundles_bp.route("/courses/<int:course_id>/bundle/manifest", methods=["GET"])
+@jwt_required()
+def bundle_manifest(course_id: int):
+    course, error = _load(course_id)
+    if error:
+        return error
+
+    version = course_version(course)
+    if request.if_none_match.contains(version):
+        return Response(status=304)
+
+    resp = jsonify(cached_manifest(course, version))
+    resp.set_etag(version)
+    return resp, 200
+
+
+# ✅ Offline course bundle: ?format=zip (default) | tar.zst
+#    ?lessons=1,2,3 builds a partial bundle (manifest + those lessons and their media)
+@bundles_bp.route("/courses/<int:course_id>/bundle", methods=["GET"])
+@jwt_required()
+def course_bundle(course_id: int):
+    course, error = _load(course_id)
+    if error:
+        return error
+
+    fmt = request.args.get("format", "zip")
+    if fmt not in STREAMS:
+        return jsonify({"error": "format must be zip or tar.zst"}), 400
+    if fmt == "tar.zst" and not zstd_available():
+        return jsonify({"error": "tar.zst bundles need the zstandard package; use format=zip"}), 400
+
+    lesson_ids = None
+    if request.args.get("lessons"):
+        try:
+            lesson_ids = {int(i) for i in request.args["lessons"].split(",") if i.strip()}
+        except ValueError:
+            return jsonify({"error": "lessons must be a comma separated list of ids"}), 400
+
+    version = course_version(course)
+    filename = f"course-{course.id}-{version}.{fmt}"
+
+    if lesson_ids is None:
+        path = cache_path(course.id, version, fmt)
+        if os.path.exists(path):
+            metrics.cache_hit("course_bundle")
+            resp = send_file(path, mimetype=MIMETYPES[fmt], as_attachment=True, download_name=filename,
+                             conditional=True, etag=version)
+            resp.headers["X-Bundle-Version"] = version
+            return resp
+        metrics.cache_miss("course_bundle")
+        evict_old_versions(course.id, version)
+
+    # Everything the stream needs is read from the database here; the generator
+    # itself only reads media from the storage backend
+    _, entries = build_manifest(course, version, lesson_ids)
+    chunks = STREAMS[fmt](entries, storage.backend)
+    if lesson_ids is None:
+        chunks = stream_and_cache(chunks, cache_path(course.id, version, fmt))
+
+    resp = Response(chunks, mimetype=MIMETYPES[fmt])
+    resp.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    resp.headers["X-Bundle-Version"] = version
+    if lesson_ids is None:
+        resp.set_etag(version)
+    return resp
@@ -0,0 +1,111 @@
+import re
+
+from flask import Blueprint, jsonify, redirect, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+
+from app import db, jobs
+from app.certificates import format_code, normalize_code
+from app.models.user import User
+from app.models.course import Course
+from app.models.certificate import Certificate
+from app.routes.media import send_blob
+from app.serializers import certificate_json
+
+certificates_bp = Blueprint("certificates", __name__)
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _is_owner_or_admin(user: User, course: Course) -> bool:
+    if not user:
+        return False
+    return user.role == "admin" or course.instructor_id == user.id
+
+
+# ✅ My certificates (newest first)
+@certificates_bp.route("/me/certificates", methods=["GET"])
+@jwt_required()
+def my_certificates():
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    certs = Certificate.query.filter_by(user_id=user.id).order_by(Certificate.issued_at.desc()).all()
+    return jsonify([certificate_json(c) for c in certs]), 200
+
+
+# ✅ Public verification by code (one unique-index lookup)
+@certificates_bp.route("/certificates/verify/<code>", methods=["GET"])
+def verify_certificate(code: str):
+    normalized = normalize_code(code)
+    row = db.session.execute(
+        select(Certificate.code, Certificate.student_name, Certificate.course_title, Certificate.issued_at)
+        .where(Certificate.code == normalized)
+    ).first() if normalized else None
+    if not row:
+        return jsonify({"valid": False, "error": "Certificate not found"}), 404
+
+    resp = jsonify({
+        "valid": True,
+        "code": format_code(row.code),
+        "student_name": row.student_name,
+        "course_title": row.course_title,
+        "issued_at": row.issued_at.isoformat(),
+    })
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 3600
+    return resp, 200
+
+
+# ✅ Certificate PDF (public, by code): redirects to the current file, or 202 while
+#    it is being rendered
+@certificates_bp.route("/certificates/<code>.pdf", methods=["GET"])
+def certificate_pdf(code: str):
+    normalized = normalize_code(code)
+    cert = Certificate.query.filter_by(code=normalized).first() if normalized else None
+    if not cert:
+        return jsonify({"error": "Certificate not found"}), 404
+    if not cert.sha256:
+        resp = jsonify({"status": "pending", "message": "The certificate is being generated"})
+        resp.headers["Retry-After"] = "5"
+        return resp, 202
+
+    # Short-lived: a regenerated certificate gets a new file URL
+    resp = redirect(url_for("certificates.certificate_file", digest=cert.sha256), code=302)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 300
+    return resp
+
+
+# ✅ Certificate file by content hash; never changes, cached for MEDIA_MAX_AGE
+@certificates_bp.route("/certificates/files/<digest>.pdf", methods=["GET"])
+def certificate_file(digest: str):
+    cert = Certificate.query.filter_by(sha256=digest).first() if SHA256_RE.match(digest) else None
+    if not cert:
+        return jsonify({"error": "Certificate not found"}), 404
+    return send_blob(digest, cert.size, "application/pdf", f"certificate-{format_code(cert.code)}.pdf")
+
+
+# ✅ Re-render a course's certificates after a template change (owner instructor/admin)
+@certificates_bp.route("/courses/<int:course_id>/certificates/regenerate", methods=["POST"])
+@jwt_required()
+def regenerate_certificates(course_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    if not _is_owner_or_admin(user, course):
+        return jsonify({"error": "Only the course instructor or an admin can regenerate certificates"}), 403
+
+    job_id = jobs.enqueue("certificates.regenerate", {"course_id": course_id})
+    db.session.commit()
+    return jsonify({"message": "Regeneration queued", "job_id": job_id}), 202
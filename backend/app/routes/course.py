@@ -1,9 +1,18 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 
-from app import db
+from app import db, search
+from app.asgi import async_view
 from app.models.user import User
 from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.recommendation import CourseNeighbor
+from app.lifecycle import delete_course, load_deleted_course, restore_course
+from app.serializers import course_json, related_json
+from app.editing import PreconditionRequired, VersionConflict, check_if_match, course_etag, edit_course
 
 courses_bp = Blueprint("courses", __name__, url_prefix="/courses")
 
@@ -13,20 +22,67 @@ def _current_user():
     return User.query.get(user_id)
 
 
+def _course_response(course: Course, status: int = 200):
+    resp = jsonify(course_json(course))
+    resp.status_code = status
+    resp.set_etag(course_etag(course))
+    return resp
+
+
+def _owned_course(course: Course | None):
+    # (user, error response)
+    user = _current_user()
+    if not user:
+        return None, (jsonify({"error": "Unauthorized"}), 401)
+    if not course:
+        return None, (jsonify({"error": "Course not found"}), 404)
+    if user.role != "admin" and course.instructor_id != user.id:
+        return None, (jsonify({"error": "Only the course instructor/admin can do this"}), 403)
+    return user, None
+
+
+def _reindex(course: Course):
+    search.index_course(course)
+    for lesson in Lesson.query.filter_by(course_id=course.id):
+        search.index_lesson(lesson)
+
+
+# ?sort= → index-backed order (see app.popularity for the counters)
+CATALOG_SORTS = {
+    "new": (Course.created_at.desc(),),
+    "popular": (Course.enrollment_count.desc(), Course.id.desc()),
+    "trending": (Course.trending_score.desc(), Course.id.desc()),
+}
+
+
+def _catalog_query():
+    # (statement, error response); shared by the sync and async views
+    sort = request.args.get("sort", "new")
+    if sort not in CATALOG_SORTS:
+        return None, (jsonify({"error": f"sort must be one of: {', '.join(CATALOG_SORTS)}"}), 400)
+
+    stmt = select(Course).where(Course.archived_at.is_(None)).order_by(*CATALOG_SORTS[sort])
+    limit = request.args.get("limit", type=int)
+    if limit:
+        stmt = stmt.limit(min(max(limit, 1), 100))
+    return stmt, None
+
+
+# ✅ Catalog (archived courses are left out); ?sort=new|popular|trending, ?limit=
 @courses_bp.route("", methods=["GET"])
 def list_courses():
-    courses = Course.query.order_by(Course.created_at.desc()).all()
-    return jsonify([
-        {
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "level": c.level,
-            "instructor_id": c.instructor_id,
-            "created_at": c.created_at.isoformat(),
-        }
-        for c in courses
-    ]), 200
+    stmt, error = _catalog_query()
+    if error:
+        return error
+    return jsonify([course_json(c) for c in db.session.execute(stmt).scalars()]), 200
+
+
+@async_view("courses.list_courses")
+async def list_courses_async(session):
+    stmt, error = _catalog_query()
+    if error:
+        return error
+    return jsonify([course_json(c) for c in (await session.execute(stmt)).scalars()]), 200
 
 
 @courses_bp.route("", methods=["POST"])
@@ -54,16 +110,11 @@ def create_course():
         instructor_id=user.id,
     )
     db.session.add(course)
+    db.session.flush()
+    search.index_course(course)
     db.session.commit()
 
-    return jsonify({
-        "id": course.id,
-        "title": course.title,
-        "description": course.description,
-        "level": course.level,
-        "instructor_id": course.instructor_id,
-        "created_at": course.created_at.isoformat(),
-    }), 201
+    return _course_response(course, 201)
 
 
 @courses_bp.route("/<int:course_id>", methods=["GET"])
@@ -72,11 +123,146 @@ def get_course(course_id: int):
     if not course:
         return jsonify({"error": "Course not found"}), 404
 
+    return _course_response(course)
+
+
+@async_view("courses.get_course")
+async def get_course_async(session, course_id: int):
+    course = await session.get(Course, course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    return _course_response(course)
+
+
+# ✅ Edit a course (owner instructor/admin); If-Match: the ETag from GET
+@courses_bp.route("/<int:course_id>", methods=["PATCH"])
+@jwt_required()
+def update_course(course_id: int):
+    course = Course.query.get(course_id)
+    _, error = _owned_course(course)
+    if error:
+        return error
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    changes = {k: data[k] for k in ("title", "description", "level") if k in data}
+    unknown = sorted(set(data) - {"title", "description", "level"})
+    if unknown:
+        return jsonify({"error": f"Fields cannot be edited: {unknown}"}), 400
+    if "title" in changes and not changes["title"]:
+        return jsonify({"error": "title cannot be empty"}), 400
+
+    try:
+        check_if_match(course_etag(course))
+        if changes:
+            edit_course(course, changes)
+    except PreconditionRequired:
+        return jsonify({"error": "If-Match header required"}), 428
+    except VersionConflict:
+        course = Course.query.get(course_id)
+        return jsonify({"error": "Course was changed by someone else; reload and retry",
+                        "version": course.version if course else None}), 412
+
+    if changes and course.archived_at is None:
+        search.index_course(course)
+        db.session.commit()
+    return _course_response(course)
+
+
+# ✅ Archive: out of the catalog and search, closed for enrollment; enrolled
+#    students keep their lessons and progress (owner instructor/admin)
+@courses_bp.route("/<int:course_id>/archive", methods=["POST"])
+@jwt_required()
+def archive_course(course_id: int):
+    course = Course.query.get(course_id)
+    _, error = _owned_course(course)
+    if error:
+        return error
+
+    if course.archived_at is None:
+        course.archived_at = datetime.utcnow()
+        search.remove_course(course.id)
+        db.session.commit()
+    return _course_response(course)
+
+
+@courses_bp.route("/<int:course_id>/unarchive", methods=["POST"])
+@jwt_required()
+def unarchive_course(course_id: int):
+    course = Course.query.get(course_id)
+    _, error = _owned_course(course)
+    if error:
+        return error
+
+    if course.archived_at is not None:
+        course.archived_at = None
+        _reindex(course)
+        db.session.commit()
+    return _course_response(course)
+
+
+# ✅ Delete (owner instructor/admin): hidden immediately, restorable for
+#    PURGE_GRACE_HOURS, then purged in the background by `flask courses purge`
+@courses_bp.route("/<int:course_id>", methods=["DELETE"])
+@jwt_required()
+def remove_course(course_id: int):
+    course = Course.query.get(course_id)
+    _, error = _owned_course(course)
+    if error:
+        return error
+
+    delete_course(course)
+    search.remove_course(course.id)
+    db.session.commit()
     return jsonify({
-        "id": course.id,
-        "title": course.title,
-        "description": course.description,
-        "level": course.level,
-        "instructor_id": course.instructor_id,
-        "created_at": course.created_at.isoformat(),
-    }), 200
+        "message": "Course deleted",
+        "restorable_until": (course.deleted_at + timedelta(hours=current_app.config["PURGE_GRACE_HOURS"])).isoformat(),
+    }), 202
+
+
+@courses_bp.route("/<int:course_id>/restore", methods=["POST"])
+@jwt_required()
+def restore_deleted_course(course_id: int):
+    course = load_deleted_course(course_id)
+    _, error = _owned_course(course)
+    if error:
+        return error
+
+    restore_course(course)
+    if course.archived_at is None:
+        _reindex(course)
+    db.session.commit()
+    return _course_response(course)
+
+
+def _related_query(course_id: int):
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    return (
+        select(CourseNeighbor, Course)
+        .join(Course, Course.id == CourseNeighbor.neighbor_id)
+        .where(CourseNeighbor.course_id == course_id, Course.archived_at.is_(None))
+        .order_by(CourseNeighbor.rank)
+        .limit(limit)
+    )
+
+
+@courses_bp.route("/<int:course_id>/related", methods=["GET"])
+def related_courses(course_id: int):
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    rows = db.session.execute(_related_query(course_id)).all()
+    return jsonify([related_json(n, c) for n, c in rows]), 200
+
+
+@async_view("courses.related_courses")
+async def related_courses_async(session, course_id: int):
+    course = await session.get(Course, course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    rows = (await session.execute(_related_query(course_id))).all()
+    return jsonify([related_json(n, c) for n, c in rows]), 200
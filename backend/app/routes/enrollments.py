@@ -1,10 +1,15 @@
 from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import select
 
-from app import db
+from app import db, events, metrics
+from app.asgi import async_view
+from app.events import course_channel, user_channel
 from app.models.user import User
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.popularity import record_enrollment
+from app.serializers import enrollment_json
 
 enrollments_bp = Blueprint("enrollments", __name__)
 
@@ -30,13 +35,27 @@ def enroll(course_id: int):
     if not course:
         return jsonify({"error": "Course not found"}), 404
 
+    if course.archived_at is not None:
+        return jsonify({"error": "This course is archived and closed for enrollment"}), 409
+
     existing = Enrollment.query.filter_by(user_id=user.id, course_id=course_id).first()
     if existing:
         return jsonify({"message": "Already enrolled", "enrollment_id": existing.id}), 200
 
     e = Enrollment(user_id=user.id, course_id=course_id)
     db.session.add(e)
+    record_enrollment(course_id)
     db.session.commit()
+    metrics.inc("languagelift_enrollments_total")
+
+    # course.enrollment_count was bumped in SQL; reading it reloads the row
+    events.publish(course_channel(course_id), "enrollment", {
+        "course_id": course_id,
+        "user_id": user.id,
+        "name": user.name,
+        "enrollment_count": course.enrollment_count,
+    })
+    events.publish(user_channel(user.id), "enrollment", enrollment_json(e, course))
 
     return jsonify({
         "message": "Enrolled successfully",
@@ -54,26 +73,26 @@ def my_enrollments():
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
 
-    enrollments = (
-        Enrollment.query
-        .filter_by(user_id=user.id)
+    rows = db.session.execute(_my_enrollments_query(user.id)).all()
+    return jsonify([enrollment_json(e, c) for e, c in rows]), 200
+
+
+@async_view("enrollments.my_enrollments")
+async def my_enrollments_async(session):
+    verify_jwt_in_request()
+    user = await session.get(User, get_jwt_identity())
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    rows = (await session.execute(_my_enrollments_query(user.id))).all()
+    return jsonify([enrollment_json(e, c) for e, c in rows]), 200
+
+
+def _my_enrollments_query(user_id: int):
+    # The join drops enrollments in deleted courses (not yet purged)
+    return (
+        select(Enrollment, Course)
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.user_id == user_id)
         .order_by(Enrollment.enrolled_at.desc())
-        .all()
     )
-
-    result = []
-    for e in enrollments:
-        c = e.course
-        result.append({
-            "enrollment_id": e.id,
-            "enrolled_at": e.enrolled_at.isoformat(),
-            "course": {
-                "id": c.id,
-                "title": c.title,
-                "description": c.description,
-                "level": c.level,
-                "instructor_id": c.instructor_id,
-            }
-        })
-
-    return jsonify(result), 200
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+from flask import Blueprint, Response, current_app, request, jsonify
+from sqlalchemy import select
+
+from app import events, metrics, tickets
+from app.asgi import async_view
+from app.events import course_channel, user_channel
+from app.models.user import User
+from app.models.course import Course
+
+events_bp = Blueprint("events", __name__)
+
+# EventSource cannot send headers: the browser authenticates with ?ticket= (scope
+# "events", POST /auth/tickets) instead
+MAX_STREAM_COURSES = 20
+
+
+class _ThreadStreams:
+    # Streams served from request threads in this process (the sync view): each one
+    # holds a thread of the gthread pool until it ends
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self, limit: int) -> bool:
+        with self._lock:
+            if self.active >= limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+
+thread_streams = _ThreadStreams()
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+def _reset() -> str:
+    # Events were lost (queue overflow or replay gap): the client reloads its data
+    return "event: reset\ndata: {}\n\n"
+
+
+def _channels(user: User, course_ids, courses):
+    # (channels, error response)
+    if len(courses) != len(set(course_ids)):
+        return None, (jsonify({"error": "Course not found"}), 404)
+    if user.role != "admin" and any(c.instructor_id != user.id for c in courses):
+        return None, (jsonify({"error": "Only the course instructor/admin can follow course activity"}), 403)
+    return [user_channel(user.id)] + [course_channel(c.id) for c in courses], None
+
+
+def _stream_response(channels, expires_at: float, asynchronous: bool = False):
+    broker = events.broker
+    config = current_app.config
+    if broker.connections() >= config["EVENTS_MAX_CONNECTIONS"]:
+        resp = jsonify({"error": "Too many open event streams, retry later"})
+        resp.headers["Retry-After"] = "5"
+        return resp, 503
+    if not asynchronous and not thread_streams.acquire(config["EVENTS_THREAD_STREAMS"]):
+        # Keeps streams from taking every request thread of a gthread/sync worker
+        resp = jsonify({"error": "Live events are busy on this server, retry later"})
+        resp.headers["Retry-After"] = "30"
+        return resp, 503
+
+    heartbeat = config["EVENTS_HEARTBEAT_SECONDS"]
+    # End before the access token expires; the browser reconnects with a fresh one
+    duration = min(config["EVENTS_MAX_STREAM_SECONDS"], expires_at - time.time())
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+
+    # Subscribed on the first chunk, so a stream that never starts leaks nothing.
+    # Not wrapped in stream_with_context: the request context (and its DB session)
+    # is gone before the first chunk, so an idle stream holds no pool connection.
+    def opening():
+        sub, missed, gap = broker.subscribe(channels, last_event_id)
+        metrics.inc("languagelift_event_streams")
+        head = "retry: 3000\n\n" + (_reset() if gap else "") + "".join(_sse(e) for e in missed)
+        return sub, head, time.monotonic() + duration
+
+    def closing(sub):
+        broker.unsubscribe(sub)
+        metrics.inc("languagelift_event_streams", -1)
+
+    def generate():
+        sub, head, deadline = opening()
+        try:
+            yield head
+            while (remaining := deadline - time.monotonic()) > 0:
+                yield _chunk(sub, sub.get(min(heartbeat, remaining)))
+        finally:
+            closing(sub)
+
+    async def agenerate():
+        # The same on the event loop under ASGI (app.asgi)
+        sub, head, deadline = opening()
+        try:
+            yield head
+            while (remaining := deadline - time.monotonic()) > 0:
+                yield _chunk(sub, await sub.get_async(min(heartbeat, remaining)))
+        finally:
+            closing(sub)
+
+    resp = Response(agenerate() if asynchronous else generate(), mimetype="text/event-stream")
+    if not asynchronous:
+        resp.call_on_close(thread_streams.release)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+def _chunk(sub, batch) -> str:
+    if sub.overflowed:
+        sub.overflowed = False
+        return _reset()
+    if batch:
+        return "".join(_sse(e) for e in batch)
+    return ": ping\n\n"
+
+
+# ✅ Live events: my enrollments/progress, plus ?course=<id> activity for instructors/admin
+@events_bp.route("/events", methods=["GET"])
+def stream_events():
+    auth = tickets.authenticate("events")
+    if auth is None:
+        return jsonify({"error": "Invalid or expired ticket"}), 401
+    user_id, expires_at = auth
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course_ids = request.args.getlist("course", type=int)
+    if len(course_ids) > MAX_STREAM_COURSES:
+        return jsonify({"error": f"At most {MAX_STREAM_COURSES} courses per stream"}), 400
+    courses = Course.query.filter(Course.id.in_(course_ids)).all() if course_ids else []
+    channels, error = _channels(user, course_ids, courses)
+    if error:
+        return error
+    return _stream_response(channels, expires_at)
+
+
+@async_view("events.stream_events")
+async def stream_events_async(session):
+    auth = tickets.authenticate("events")
+    if auth is None:
+        return jsonify({"error": "Invalid or expired ticket"}), 401
+    user_id, expires_at = auth
+    user = await session.get(User, user_id)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course_ids = request.args.getlist("course", type=int)
+    if len(course_ids) > MAX_STREAM_COURSES:
+        return jsonify({"error": f"At most {MAX_STREAM_COURSES} courses per stream"}), 400
+    courses = (
+        (await session.execute(select(Course).where(Course.id.in_(course_ids)))).scalars().all()
+        if course_ids else []
+    )
+    channels, error = _channels(user, course_ids, courses)
+    if error:
+        return error
+    return _stream_response(channels, expires_at, asynchronous=True)
@@ -0,0 +1,70 @@
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import limiter, storage, tickets
+from app.bundles import zip_stream
+from app.exports import load_token, part_entries, slots
+from app.models.user import User
+
+exports_bp = Blueprint("exports", __name__)
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _export_response(user: User):
+    position = (1, 0, None)
+    token = request.args.get("token")
+    if token:
+        position = load_token(token, user.id)
+        if position is None:
+            return jsonify({"error": "Invalid export token"}), 400
+
+    if not slots.acquire(current_app.config["EXPORT_MAX_CONCURRENT"]):
+        resp = jsonify({"error": "Too many exports running, retry later"})
+        resp.headers["Retry-After"] = "30"
+        return resp, 503
+
+    part, dataset, after = position
+    chunks = zip_stream(part_entries(user, part, dataset, after), storage.backend)
+    resp = Response(stream_with_context(chunks), mimetype="application/zip")
+    # Runs whether the download finished, failed or never started
+    resp.call_on_close(slots.release)
+    resp.headers["Content-Disposition"] = f"attachment; filename=languagelift-export-{user.id}-part-{part}.zip"
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# ✅ Download my data: a zip of NDJSON files, in parts (?token= from the previous
+#    part's export.json). A browser download authenticates with ?ticket= (scope
+#    "export", POST /auth/tickets) instead of the Authorization header.
+@exports_bp.route("/me/export", methods=["GET"])
+@limiter.limit("6/minute burst 6")
+def my_export():
+    auth = tickets.authenticate("export")
+    if auth is None:
+        return jsonify({"error": "Invalid or expired ticket"}), 401
+    user = User.query.get(auth[0])
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+    return _export_response(user)
+
+
+# ✅ Any user's data (admin only)
+@exports_bp.route("/users/<int:user_id>/export", methods=["GET"])
+@limiter.limit("6/minute burst 6")
+@jwt_required()
+def user_export(user_id: int):
+    admin = _current_user()
+    if not admin:
+        return jsonify({"error": "Unauthorized"}), 401
+    if admin.role != "admin":
+        return jsonify({"error": "Only admins can export another user's data"}), 403
+
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    return _export_response(user)
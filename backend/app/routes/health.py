@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+
+from app import db
+
+health_bp = Blueprint("health", __name__, url_prefix="/health")
+
+
+# ✅ Liveness: the process is up and serving requests (no dependencies checked)
+@health_bp.route("/live", methods=["GET"])
+def live():
+    return jsonify({"status": "ok"}), 200
+
+
+# ✅ Readiness: the worker can reach the database
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    try:
+        db.session.execute(text("SELECT 1"))
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({"status": "unavailable", "database": "error", "error": exc.__class__.__name__}), 503
+
+    return jsonify({"status": "ok", "database": "ok"}), 200
@@ -1,10 +1,22 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 
-from app import db
+from app import db, events, search
+from app.asgi import Fallback, async_view
+from app.events import course_channel
 from app.models.user import User
 from app.models.course import Course
-from app.models.lesson import Lesson
+from app.models.lesson import Lesson, LessonPrerequisite
+from app.progress_bitmap import next_slot
+from app.rendering import ensure_rendered, is_stale
+from app.lesson_graph import PrerequisiteError, lesson_states, set_prerequisites
+from app.lifecycle import delete_lesson
+from app.serializers import lesson_json, lesson_state_json
+from app.editing import (
+    PreconditionRequired, VersionConflict, check_if_match, course_lessons, edit_lesson,
+    lesson_etag, lessons_etag, reorder_lessons,
+)
 
 lessons_bp = Blueprint("lessons", __name__)
 
@@ -20,6 +32,19 @@ def _is_owner_or_admin(user: User, course: Course) -> bool:
     return user.role == "admin" or course.instructor_id == user.id
 
 
+def _lessons_changed(course_id: int, action: str, lesson_id: int | None = None):
+    # Lets other open manage pages of the course reload their lesson list
+    events.publish(course_channel(course_id), "lessons_changed",
+                   {"course_id": course_id, "action": action, "lesson_id": lesson_id})
+
+
+def _lesson_response(lesson: Lesson, status: int = 200):
+    resp = jsonify(lesson_json(lesson))
+    resp.status_code = status
+    resp.set_etag(lesson_etag(lesson))
+    return resp
+
+
 # ✅ List lessons for a course (public)
 @lessons_bp.route("/courses/<int:course_id>/lessons", methods=["GET"])
 def list_lessons(course_id: int):
@@ -27,19 +52,29 @@ def list_lessons(course_id: int):
     if not course:
         return jsonify({"error": "Course not found"}), 404
 
-    lessons = Lesson.query.filter_by(course_id=course_id).order_by(Lesson.order_index.asc()).all()
+    lessons = db.session.execute(_lessons_query(course_id)).scalars().all()
+    return _lessons_response(course_id, lessons)
+
+
+@async_view("lessons.list_lessons")
+async def list_lessons_async(session, course_id: int):
+    course = await session.get(Course, course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    lessons = (await session.execute(_lessons_query(course_id))).scalars().all()
+    return _lessons_response(course_id, lessons)
+
+
+def _lessons_query(course_id: int):
+    return select(Lesson).where(Lesson.course_id == course_id).order_by(Lesson.order_index.asc(), Lesson.id.asc())
 
-    return jsonify([
-        {
-            "id": l.id,
-            "course_id": l.course_id,
-            "title": l.title,
-            "content": l.content,
-            "order_index": l.order_index,
-            "created_at": l.created_at.isoformat(),
-        }
-        for l in lessons
-    ]), 200
+
+def _lessons_response(course_id: int, lessons):
+    # The ETag covers the whole list; PUT .../lessons/order takes it as If-Match
+    resp = jsonify([lesson_json(l, html=False) for l in lessons])
+    resp.set_etag(lessons_etag(course_id, lessons))
+    return resp
 
 
 # ✅ Create lesson (only course owner instructor/admin)
@@ -73,19 +108,130 @@ def create_lesson(course_id: int):
         title=title,
         content=content,
         order_index=order_index,
+        slot=next_slot(course_id),
         course_id=course_id,
     )
+    ensure_rendered(lesson)
     db.session.add(lesson)
+    db.session.flush()
+    if course.archived_at is None:
+        search.index_lesson(lesson)
     db.session.commit()
+    _lessons_changed(course_id, "created", lesson.id)
 
-    return jsonify({
-        "id": lesson.id,
-        "course_id": lesson.course_id,
-        "title": lesson.title,
-        "content": lesson.content,
-        "order_index": lesson.order_index,
-        "created_at": lesson.created_at.isoformat(),
-    }), 201
+    return _lesson_response(lesson, 201)
+
+
+# ✅ Reorder all lessons of a course in one request (only course owner instructor/admin).
+#    lesson_ids: every lesson of the course, in the new order; If-Match: the list ETag
+@lessons_bp.route("/courses/<int:course_id>/lessons/order", methods=["PUT"])
+@jwt_required()
+def reorder_course_lessons(course_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    if not _is_owner_or_admin(user, course):
+        return jsonify({"error": "You can only reorder lessons of your own course"}), 403
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    ids = data.get("lesson_ids")
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return jsonify({"error": "lesson_ids must be a list of lesson ids"}), 400
+
+    # A stale list (a lesson added or removed since) is a conflict, not a bad request
+    current = course_lessons(course_id)
+    try:
+        check_if_match(lessons_etag(course_id, current))
+        if len(ids) != len(set(ids)) or set(ids) != {l.id for l in current}:
+            return jsonify({"error": "lesson_ids must list every lesson of the course exactly once"}), 400
+        moved = reorder_lessons(course_id, current, ids)
+    except PreconditionRequired:
+        return jsonify({"error": "If-Match header required"}), 428
+    except VersionConflict:
+        return jsonify({"error": "Lessons were changed by someone else; reload and retry"}), 412
+    if moved:
+        _lessons_changed(course_id, "reordered")
+
+    resp = jsonify({"course_id": course_id, "lesson_ids": ids, "moved": moved})
+    resp.set_etag(lessons_etag(course_id, course_lessons(course_id)))
+    return resp
+
+
+# ✅ Edit a lesson (course owner instructor/admin); If-Match: the ETag from GET
+@lessons_bp.route("/lessons/<int:lesson_id>", methods=["PATCH"])
+@jwt_required()
+def update_lesson(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if not _is_owner_or_admin(user, lesson.course):
+        return jsonify({"error": "You can only edit lessons of your own course"}), 403
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    unknown = sorted(set(data) - {"title", "content", "order_index"})
+    if unknown:
+        return jsonify({"error": f"Fields cannot be edited: {unknown}"}), 400
+    changes = {k: data[k] for k in ("title", "content", "order_index") if k in data}
+    if "title" in changes and not changes["title"]:
+        return jsonify({"error": "title cannot be empty"}), 400
+    if "order_index" in changes and (not isinstance(changes["order_index"], int) or isinstance(changes["order_index"], bool)):
+        return jsonify({"error": "order_index must be an integer"}), 400
+
+    try:
+        check_if_match(lesson_etag(lesson))
+        if changes:
+            edit_lesson(lesson, changes)
+    except PreconditionRequired:
+        return jsonify({"error": "If-Match header required"}), 428
+    except VersionConflict:
+        lesson = Lesson.query.get(lesson_id)
+        return jsonify({"error": "Lesson was changed by someone else; reload and retry",
+                        "version": lesson.version if lesson else None}), 412
+
+    if changes.keys() & {"title", "content"} and lesson.course.archived_at is None:
+        search.index_lesson(lesson)
+        db.session.commit()
+    if changes:
+        _lessons_changed(lesson.course_id, "edited", lesson.id)
+    return _lesson_response(lesson)
+
+
+# ✅ Delete lesson (course owner instructor/admin): gone from the course at once;
+#    its progress is archived and purged later by `flask courses purge`
+@lessons_bp.route("/lessons/<int:lesson_id>", methods=["DELETE"])
+@jwt_required()
+def remove_lesson(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if not _is_owner_or_admin(user, lesson.course):
+        return jsonify({"error": "You can only delete lessons of your own course"}), 403
+
+    course_id = lesson.course_id
+    delete_lesson(lesson)
+    search.remove("lesson", lesson.id)
+    db.session.commit()
+    _lessons_changed(course_id, "deleted", lesson_id)
+    return jsonify({"message": "Lesson deleted"}), 202
 
 
 # ✅ Get one lesson (public)
@@ -95,11 +241,108 @@ def get_lesson(lesson_id: int):
     if not lesson:
         return jsonify({"error": "Lesson not found"}), 404
 
+    # Rendered at write time; legacy/imported rows and renders from an older
+    # RENDERER_VERSION are rendered once here and kept
+    if ensure_rendered(lesson):
+        db.session.commit()
+
+    return _lesson_response(lesson)
+
+
+@async_view("lessons.get_lesson")
+async def get_lesson_async(session, lesson_id: int):
+    lesson = await session.get(Lesson, lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if is_stale(lesson):
+        raise Fallback()  # rendered and stored by the sync view
+
+    return _lesson_response(lesson)
+
+
+# ✅ Prerequisites of a lesson (public)
+@lessons_bp.route("/lessons/<int:lesson_id>/prerequisites", methods=["GET"])
+def get_prerequisites(lesson_id: int):
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    ids = [
+        p.prerequisite_id
+        for p in LessonPrerequisite.query.filter_by(lesson_id=lesson_id).order_by(LessonPrerequisite.prerequisite_id)
+    ]
+    return jsonify({"lesson_id": lesson_id, "prerequisite_ids": ids}), 200
+
+
+# ✅ Replace prerequisites of a lesson (only course owner instructor/admin)
+@lessons_bp.route("/lessons/<int:lesson_id>/prerequisites", methods=["PUT"])
+@jwt_required()
+def update_prerequisites(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if not _is_owner_or_admin(user, lesson.course):
+        return jsonify({"error": "You can only edit lessons of your own course"}), 403
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    ids = data.get("prerequisite_ids")
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return jsonify({"error": "prerequisite_ids must be a list of lesson ids"}), 400
+
+    try:
+        ids = set_prerequisites(lesson, ids)
+    except PrerequisiteError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+
+    return jsonify({"lesson_id": lesson_id, "prerequisite_ids": ids}), 200
+
+
+# ✅ Lessons of a course with my completed/unlocked state
+@lessons_bp.route("/courses/<int:course_id>/lessons/unlocked", methods=["GET"])
+@jwt_required()
+def list_unlocked_lessons(course_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    return jsonify([lesson_state_json(*state) for state in lesson_states(course_id, user.id)]), 200
+
+
+# ✅ Previous lesson and next lesson I can open, in course order
+@lessons_bp.route("/lessons/<int:lesson_id>/navigation", methods=["GET"])
+@jwt_required()
+def lesson_navigation(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    states = lesson_states(lesson.course_id, user.id)
+    index = next(i for i, (l, _, _) in enumerate(states) if l.id == lesson_id)
+    previous = states[index - 1] if index > 0 else None
+    following = next((s for s in states[index + 1:] if s[2]), None)
+    locked_ahead = sum(1 for s in states[index + 1:] if not s[2])
+
     return jsonify({
-        "id": lesson.id,
-        "course_id": lesson.course_id,
-        "title": lesson.title,
-        "content": lesson.content,
-        "order_index": lesson.order_index,
-        "created_at": lesson.created_at.isoformat(),
+        "lesson_id": lesson_id,
+        "previous": lesson_state_json(*previous) if previous else None,
+        "next": lesson_state_json(*following) if following else None,
+        "locked_ahead": locked_ahead,
     }), 200
@@ -0,0 +1,256 @@
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import db, metrics, storage
+from app.models.user import User
+from app.models.lesson import Lesson
+from app.models.media import LessonMedia, MediaUpload
+from app.media import (
+    OffsetMismatch,
+    UploadError,
+    cancel_upload,
+    finish_upload,
+    parse_content_range,
+    release,
+    start_upload,
+    write_chunk,
+)
+
+media_bp = Blueprint("media", __name__)
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _can_manage(user: User, lesson: Lesson) -> bool:
+    if not user or user.role not in ("instructor", "admin"):
+        return False
+    return user.role == "admin" or lesson.course.instructor_id == user.id
+
+
+def _media_json(media: LessonMedia):
+    return {
+        "id": media.id,
+        "lesson_id": media.lesson_id,
+        "filename": media.filename,
+        "content_type": media.content_type,
+        "size": media.blob.size,
+        "sha256": media.sha256,
+        "url": f"/media/{media.id}",
+        "created_at": media.created_at.isoformat(),
+    }
+
+
+def _upload_json(upload: MediaUpload):
+    return {
+        "upload_id": upload.id,
+        "lesson_id": upload.lesson_id,
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": upload.received,
+        "chunk_size": current_app.config["MEDIA_CHUNK_BYTES"],
+    }
+
+
+def _own_upload(upload_id: str):
+    user = _current_user()
+    if not user:
+        return None, (jsonify({"error": "Unauthorized"}), 401)
+    upload = MediaUpload.query.get(upload_id)
+    if not upload or (upload.user_id != user.id and user.role != "admin"):
+        return None, (jsonify({"error": "Upload not found"}), 404)
+    return upload, None
+
+
+# ✅ List a lesson's media (public)
+@media_bp.route("/lessons/<int:lesson_id>/media", methods=["GET"])
+def list_media(lesson_id: int):
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    items = LessonMedia.query.filter_by(lesson_id=lesson_id).order_by(LessonMedia.id.asc()).all()
+    return jsonify([_media_json(m) for m in items]), 200
+
+
+# ✅ Start a resumable upload (course owner instructor/admin)
+#    {"filename", "content_type", "size"} -> upload_id; then PUT chunks to /media/uploads/<id>
+@media_bp.route("/lessons/<int:lesson_id>/media/uploads", methods=["POST"])
+@jwt_required()
+def create_upload(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if not _can_manage(user, lesson):
+        return jsonify({"error": "Only the course instructor/admin can upload media"}), 403
+
+    data = request.get_json() or {}
+    try:
+        upload = start_upload(lesson, user, data.get("filename"), data.get("content_type"), data.get("size"))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+
+    resp = jsonify(_upload_json(upload))
+    resp.headers["Location"] = f"/media/uploads/{upload.id}"
+    return resp, 201
+
+
+# ✅ Upload status: where to resume from
+@media_bp.route("/media/uploads/<upload_id>", methods=["GET"])
+@jwt_required()
+def upload_status(upload_id: str):
+    upload, error = _own_upload(upload_id)
+    if error:
+        return error
+    return jsonify(_upload_json(upload)), 200
+
+
+# ✅ Upload one chunk: raw body + "Content-Range: bytes start-end/size"
+#    200 {offset} while incomplete, 201 {media} once the last byte arrives
+@media_bp.route("/media/uploads/<upload_id>", methods=["PUT"])
+@jwt_required()
+def upload_chunk(upload_id: str):
+    upload, error = _own_upload(upload_id)
+    if error:
+        return error
+
+    span = parse_content_range(request.headers.get("Content-Range"))
+    if not span:
+        return jsonify({"error": "Content-Range: bytes start-end/size is required"}), 400
+    start, end, total = span
+    length = end - start + 1
+    if length > current_app.config["MEDIA_CHUNK_BYTES"]:
+        return jsonify({"error": f"Chunks are limited to {current_app.config['MEDIA_CHUNK_BYTES']} bytes"}), 413
+    if request.content_length is not None and request.content_length != length:
+        return jsonify({"error": "Content-Length does not match Content-Range"}), 400
+
+    # Serialize chunks of one session across workers
+    upload = MediaUpload.query.filter_by(id=upload.id).with_for_update().first()
+    try:
+        write_chunk(upload, request.stream, start, end, total)
+    except OffsetMismatch as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "offset": upload.received}), 409
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    if upload.received < upload.size:
+        db.session.commit()
+        return jsonify(_upload_json(upload)), 200
+
+    media, deduplicated = finish_upload(upload)
+    db.session.commit()
+    metrics.inc("languagelift_media_uploads_total", result="deduplicated" if deduplicated else "stored")
+    return jsonify({**_media_json(media), "deduplicated": deduplicated}), 201
+
+
+# ✅ Abandon an upload
+@media_bp.route("/media/uploads/<upload_id>", methods=["DELETE"])
+@jwt_required()
+def delete_upload(upload_id: str):
+    upload, error = _own_upload(upload_id)
+    if error:
+        return error
+    cancel_upload(upload)
+    db.session.commit()
+    return jsonify({"message": "Upload cancelled"}), 200
+
+
+def _stream_range(digest: str, size: int, content_type: str, max_age: int):
+    # Backends without a filesystem path (object storage): stream the requested
+    # range from the backend in chunks
+    start, stop, status = 0, size, 200
+    if request.range is not None:
+        span = request.range.range_for_length(size)
+        if span is None:
+            resp = Response(status=416)
+            resp.headers["Content-Range"] = f"bytes */{size}"
+            return resp
+        start, stop, status = span[0], span[1], 206
+
+    resp = Response(
+        storage.backend.open_range(digest, start, stop - start),
+        status=status,
+        mimetype=content_type,
+        direct_passthrough=True,
+    )
+    resp.content_length = stop - start
+    if status == 206:
+        resp.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    resp.headers["Accept-Ranges"] = "bytes"
+    resp.cache_control.public = True
+    resp.cache_control.max_age = max_age
+    resp.set_etag(digest)
+    return resp.make_conditional(request)
+
+
+def send_blob(digest: str, size: int, content_type: str, download_name: str | None = None):
+    # A stored file by content (media, certificates): it never changes, so cache forever
+    max_age = current_app.config["MEDIA_MAX_AGE"]
+    backend = storage.backend
+    accel_prefix = current_app.config["MEDIA_ACCEL_PREFIX"]
+
+    if accel_prefix:
+        # Nginx serves the file (Range, sendfile) from its internal location
+        resp = Response(mimetype=content_type)
+        resp.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{backend.key(digest)}"
+        resp.cache_control.public = True
+        resp.cache_control.max_age = max_age
+        resp.set_etag(digest)
+    elif backend.path(digest):
+        # Full responses go out through wsgi.file_wrapper (sendfile under gunicorn);
+        # Range requests are answered by Werkzeug reading only the requested bytes
+        resp = send_file(
+            backend.path(digest),
+            mimetype=content_type,
+            download_name=download_name,
+            conditional=True,
+            etag=digest,
+            max_age=max_age,
+        )
+    else:
+        resp = _stream_range(digest, size, content_type, max_age)
+
+    resp.cache_control.immutable = True
+    return resp
+
+
+# ✅ Media delivery (public) with Range support
+@media_bp.route("/media/<int:media_id>", methods=["GET"])
+def get_media(media_id: int):
+    media = LessonMedia.query.get(media_id)
+    if not media:
+        return jsonify({"error": "Media not found"}), 404
+    return send_blob(media.sha256, media.blob.size, media.content_type, media.filename)
+
+
+# ✅ Remove media from a lesson (course owner instructor/admin); the file is
+#    deleted once no lesson uses it
+@media_bp.route("/media/<int:media_id>", methods=["DELETE"])
+@jwt_required()
+def delete_media(media_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    media = LessonMedia.query.get(media_id)
+    if not media or not media.lesson:
+        return jsonify({"error": "Media not found"}), 404
+
+    if not _can_manage(user, media.lesson):
+        return jsonify({"error": "Only the course instructor/admin can delete media"}), 403
+
+    digest = release(media)
+    db.session.commit()
+    if digest:
+        storage.backend.delete(digest)
+    return jsonify({"message": "Media deleted"}), 200
@@ -1,12 +1,22 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import select
 
-from app import db
+from app import db, events, limiter, metrics
+from app.asgi import async_view
+from app.events import course_channel, user_channel
 from app.models.user import User
 from app.models.course import Course
 from app.models.lesson import Lesson
 from app.models.enrollment import Enrollment
 from app.models.progress import Progress
+from app.reviews import seed_lesson_reviews
+from app.progress_bitmap import course_matrix, covers, lessons_mask, popcount, unpack
+from app.progress_bitmap import mark_completed as mark_bitmap_completed
+from app.lesson_graph import is_unlocked, states_from, unlock_dependents
+from app.popularity import record_completion
+from app.certificates import issue as issue_certificate
+from app.serializers import certificate_json
 
 progress_bp = Blueprint("progress", __name__)
 
@@ -18,6 +28,7 @@ def _current_user():
 
 # ✅ Mark a lesson as complete (student)
 @progress_bp.route("/lessons/<int:lesson_id>/complete", methods=["POST"])
+@limiter.limit("60/minute burst 20")
 @jwt_required()
 def complete_lesson(lesson_id: int):
     user = _current_user()
@@ -36,13 +47,46 @@ def complete_lesson(lesson_id: int):
     if not enrolled and user.role != "admin":
         return jsonify({"error": "You must be enrolled in the course to mark progress"}), 403
 
+    if user.role != "admin" and not is_unlocked(user.id, lesson):
+        return jsonify({"error": "Complete the prerequisite lessons first"}), 403
+
     entry = Progress.query.filter_by(user_id=user.id, lesson_id=lesson_id).first()
     if not entry:
         entry = Progress(user_id=user.id, lesson_id=lesson_id)
+    first_completion = not entry.completed
 
     entry.mark_completed()
     db.session.add(entry)
+    if first_completion:
+        record_completion(lesson.course_id)
+    row = mark_bitmap_completed(user.id, lesson)
+    unlock_dependents(row, lesson)
+    seed_lesson_reviews(user.id, lesson_id)
+    progress = certificate = None
+    if first_completion:
+        # Counted from the bitmap row before commit expires it
+        slots = db.session.execute(
+            select(Lesson.id, Lesson.slot).where(Lesson.course_id == lesson.course_id)
+        ).all()
+        completed = sum(1 for _, done, _ in states_from(slots, set(), row) if done)
+        progress = {
+            "course_id": lesson.course_id,
+            "lesson_id": lesson_id,
+            "user_id": user.id,
+            "total_lessons": len(slots),
+            "completed_lessons": completed,
+            "completion_percent": 0 if not slots else round(completed / len(slots) * 100, 2),
+        }
+        name = user.name
+        if slots and completed == len(slots) and enrolled:
+            # Last lesson of the course: the PDF is rendered by a job worker
+            certificate = issue_certificate(user, lesson.course_id)
     db.session.commit()
+    metrics.inc("languagelift_lesson_completions_total")
+
+    if progress:
+        events.publish(user_channel(user.id), "progress", progress)
+        events.publish(course_channel(progress["course_id"]), "completion", {**progress, "name": name})
 
     return jsonify({
         "message": "Lesson marked complete",
@@ -50,7 +94,8 @@ def complete_lesson(lesson_id: int):
         "lesson_id": lesson_id,
         "course_id": lesson.course_id,
         "completed": entry.completed,
-        "completed_at": entry.completed_at.isoformat() if entry.completed_at else None
+        "completed_at": entry.completed_at.isoformat() if entry.completed_at else None,
+        "certificate": certificate_json(certificate) if certificate else None,
     }), 200
 
 
@@ -67,18 +112,53 @@ def course_progress(course_id: int):
         return jsonify({"error": "Course not found"}), 404
 
     # Ensure enrolled (admins can view anyway)
-    enrolled = Enrollment.query.filter_by(user_id=user.id, course_id=course_id).first()
+    enrolled = db.session.execute(_enrolled_query(user.id, course_id)).first()
     if not enrolled and user.role != "admin":
         return jsonify({"error": "You must be enrolled in this course to view progress"}), 403
 
-    lessons = Lesson.query.filter_by(course_id=course_id).order_by(Lesson.order_index.asc()).all()
-    total = len(lessons)
+    lessons = db.session.execute(_course_lessons_query(course_id)).scalars().all()
+    completed_ids = set(db.session.execute(_completed_query(user.id, course_id)).scalars())
+    return jsonify(_progress_json(course_id, user.id, lessons, completed_ids)), 200
+
+
+@async_view("progress.course_progress")
+async def course_progress_async(session, course_id: int):
+    verify_jwt_in_request()
+    user = await session.get(User, get_jwt_identity())
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = await session.get(Course, course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    enrolled = (await session.execute(_enrolled_query(user.id, course_id))).first()
+    if not enrolled and user.role != "admin":
+        return jsonify({"error": "You must be enrolled in this course to view progress"}), 403
+
+    lessons = (await session.execute(_course_lessons_query(course_id))).scalars().all()
+    completed_ids = set((await session.execute(_completed_query(user.id, course_id))).scalars())
+    return jsonify(_progress_json(course_id, user.id, lessons, completed_ids)), 200
+
+
+def _enrolled_query(user_id: int, course_id: int):
+    return select(Enrollment.id).where(Enrollment.user_id == user_id, Enrollment.course_id == course_id).limit(1)
 
-    completed_ids = {
-        p.lesson_id
-        for p in Progress.query.filter_by(user_id=user.id, completed=True).all()
-    }
 
+def _course_lessons_query(course_id: int):
+    return select(Lesson).where(Lesson.course_id == course_id).order_by(Lesson.order_index.asc())
+
+
+def _completed_query(user_id: int, course_id: int):
+    # Only this course's lessons; answered from ix_progress_user_id_completed_lesson_id
+    return (
+        select(Progress.lesson_id)
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Progress.user_id == user_id, Progress.completed.is_(True), Lesson.course_id == course_id)
+    )
+
+
+def _progress_json(course_id: int, user_id: int, lessons, completed_ids) -> dict:
     lesson_rows = []
     completed_count = 0
     for l in lessons:
@@ -92,13 +172,65 @@ def course_progress(course_id: int):
             "completed": is_done,
         })
 
+    total = len(lessons)
     percent = 0 if total == 0 else round((completed_count / total) * 100, 2)
 
-    return jsonify({
+    return {
         "course_id": course_id,
-        "user_id": user.id,
+        "user_id": user_id,
         "total_lessons": total,
         "completed_lessons": completed_count,
         "completion_percent": percent,
         "lessons": lesson_rows,
+    }
+
+
+# ✅ Completion summary for a course (owner instructor/admin), from progress bitmaps
+@progress_bp.route("/courses/<int:course_id>/progress/summary", methods=["GET"])
+@jwt_required()
+def course_progress_summary(course_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    if user.role != "admin" and course.instructor_id != user.id:
+        return jsonify({"error": "Only the course instructor/admin can view this"}), 403
+
+    lessons, n_slots, _, packed = course_matrix(course_id)
+    total = len(lessons)
+
+    # Enrolled students without a bitmap have completed nothing
+    students = Enrollment.query.filter_by(course_id=course_id).count()
+    per_lesson = unpack(packed, n_slots).sum(axis=0)
+    completed = int(popcount(packed).sum())
+    full = int(covers(packed, lessons_mask(lessons, n_slots)).sum()) if total else 0
+
+    through = request.args.get("through", type=int)
+    completed_through = None
+    if through is not None:
+        if through < 1:
+            return jsonify({"error": "through must be at least 1"}), 400
+        mask = lessons_mask(lessons[:through], n_slots)
+        completed_through = {"lessons": min(through, total), "students": int(covers(packed, mask).sum())}
+
+    return jsonify({
+        "course_id": course_id,
+        "students": students,
+        "total_lessons": total,
+        "average_percent": 0 if not (students and total) else round(completed / (students * total) * 100, 2),
+        "completed_course": full,
+        "completed_through": completed_through,
+        "lessons": [
+            {
+                "lesson_id": l.id,
+                "title": l.title,
+                "order_index": l.order_index,
+                "completed_students": int(per_lesson[l.slot]),
+            }
+            for l in lessons
+        ],
     }), 200
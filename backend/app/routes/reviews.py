@@ -0,0 +1,142 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import db, metrics
+from app.models.user import User
+from app.models.lesson import Lesson
+from app.models.review import VocabularyItem
+from app.reviews import due_reviews, grade_reviews, seed_item_reviews
+
+reviews_bp = Blueprint("reviews", __name__)
+
+MAX_DUE = 500
+MAX_BATCH = 5000
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _item_json(item: VocabularyItem):
+    return {
+        "id": item.id,
+        "lesson_id": item.lesson_id,
+        "term": item.term,
+        "translation": item.translation,
+        "example": item.example,
+    }
+
+
+# ✅ List vocabulary for a lesson (public)
+@reviews_bp.route("/lessons/<int:lesson_id>/vocabulary", methods=["GET"])
+def list_vocabulary(lesson_id: int):
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    items = VocabularyItem.query.filter_by(lesson_id=lesson_id).order_by(VocabularyItem.id.asc()).all()
+    return jsonify([_item_json(i) for i in items]), 200
+
+
+# ✅ Add vocabulary to a lesson (course owner instructor/admin); accepts one item or {"items": [...]}
+@reviews_bp.route("/lessons/<int:lesson_id>/vocabulary", methods=["POST"])
+@jwt_required()
+def add_vocabulary(lesson_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    lesson = Lesson.query.get(lesson_id)
+    if not lesson:
+        return jsonify({"error": "Lesson not found"}), 404
+
+    if user.role not in ("instructor", "admin"):
+        return jsonify({"error": "Only instructors/admin can add vocabulary"}), 403
+    if user.role != "admin" and lesson.course.instructor_id != user.id:
+        return jsonify({"error": "You can only add vocabulary to your own course"}), 403
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected an item or {\"items\": [...]}"}), 400
+    entries = data.get("items", [data])
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+
+    items = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("term") or not entry.get("translation"):
+            return jsonify({"error": "Each item needs term and translation"}), 400
+        items.append(VocabularyItem(
+            lesson_id=lesson_id,
+            term=entry["term"],
+            translation=entry["translation"],
+            example=entry.get("example"),
+        ))
+    db.session.add_all(items)
+    db.session.flush()
+    seed_item_reviews(lesson_id, [i.id for i in items])
+    db.session.commit()
+
+    return jsonify([_item_json(i) for i in items]), 201
+
+
+# ✅ Next due reviews for me, oldest first
+@reviews_bp.route("/me/reviews/due", methods=["GET"])
+@jwt_required()
+def my_due_reviews():
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    limit = min(max(request.args.get("limit", 20, type=int), 1), MAX_DUE)
+    rows = due_reviews(user.id, limit)
+
+    return jsonify([
+        {
+            **_item_json(item),
+            "due_at": state.due_at.isoformat(),
+            "repetitions": state.repetitions,
+            "interval_days": state.interval_days,
+        }
+        for state, item in rows
+    ]), 200
+
+
+# ✅ Grade a batch of reviews: {"reviews": [{"item_id": 1, "grade": 4}, ...]}, grade 0-5
+@reviews_bp.route("/me/reviews", methods=["POST"])
+@jwt_required()
+def submit_reviews():
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected {\"reviews\": [...]}"}), 400
+    reviews = data.get("reviews")
+    if not isinstance(reviews, list) or not reviews:
+        return jsonify({"error": "reviews must be a non-empty list"}), 400
+    if len(reviews) > MAX_BATCH:
+        return jsonify({"error": f"At most {MAX_BATCH} reviews per request"}), 400
+
+    grades = {}
+    for r in reviews:
+        if not isinstance(r, dict):
+            return jsonify({"error": "Each review needs an integer item_id and grade 0-5"}), 400
+        item_id, grade = r.get("item_id"), r.get("grade")
+        # bool is an int subclass: true would pass as grade 1
+        if type(item_id) is not int or type(grade) is not int or not 0 <= grade <= 5:
+            return jsonify({"error": "Each review needs an integer item_id and grade 0-5"}), 400
+        grades[item_id] = grade  # last grade wins for duplicates
+
+    result = grade_reviews(user.id, grades)
+    metrics.inc("languagelift_reviews_total", result["graded"] - result["lapses"], result="pass")
+    metrics.inc("languagelift_reviews_total", result["lapses"], result="lapse")
+
+    return jsonify({
+        "graded": result["graded"],
+        "lapses": result["lapses"],
+        "skipped": result["skipped"],
+        "next_due_at": result["next_due_at"].isoformat() if result["next_due_at"] else None,
+    }), 200
@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, func, select
+
+from app import db
+from app.models.user import User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.progress import CourseProgress
+from app.progress_bitmap import course_slots, packed_matrix, unpack
+
+roster_bp = Blueprint("roster", __name__)
+
+MAX_PER_PAGE = 500
+STREAM_CHUNK = 1000  # rows per server-side cursor fetch
+
+
+def _current_user():
+    user_id = get_jwt_identity()
+    return User.query.get(user_id)
+
+
+def _is_owner_or_admin(user: User, course: Course) -> bool:
+    if not user:
+        return False
+    return user.role == "admin" or course.instructor_id == user.id
+
+
+def _roster_query(course_id: int):
+    return (
+        select(
+            Enrollment.id.label("enrollment_id"),
+            User.id.label("user_id"),
+            User.name,
+            User.email,
+            Enrollment.enrolled_at,
+            CourseProgress.completed_bits,
+        )
+        .join(User, User.id == Enrollment.user_id)
+        .outerjoin(
+            CourseProgress,
+            and_(CourseProgress.user_id == Enrollment.user_id, CourseProgress.course_id == Enrollment.course_id),
+        )
+        .where(Enrollment.course_id == course_id)
+        .order_by(Enrollment.id)
+    )
+
+
+def _roster_rows(rows, lessons, n_slots):
+    # One vectorized unpack per chunk; columns follow lesson display order
+    if not rows:
+        return []
+    cols = [l.slot for l in lessons]
+    matrix = unpack(packed_matrix([r.completed_bits or b"" for r in rows], n_slots), n_slots)[:, cols]
+    done = matrix.sum(axis=1)
+    total = len(lessons)
+    return [
+        {
+            "user_id": r.user_id,
+            "name": r.name,
+            "email": r.email,
+            "enrolled_at": r.enrolled_at.isoformat() if r.enrolled_at else None,
+            "completed_lessons": int(done[i]),
+            "completion_percent": 0 if total == 0 else round(int(done[i]) / total * 100, 2),
+            "lessons": matrix[i].astype(int).tolist(),
+        }
+        for i, r in enumerate(rows)
+    ]
+
+
+def _stream(course_id, lessons, n_slots, fmt):
+    # yield_per streams from a server-side cursor (PyMySQL SSCursor); memory stays
+    # at one chunk no matter how many students are enrolled
+    result = db.session.execute(_roster_query(course_id).execution_options(yield_per=STREAM_CHUNK))
+
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(
+            ["user_id", "name", "email", "enrolled_at", "completed_lessons", "completion_percent"]
+            + [f"{l.order_index}. {l.title}" for l in lessons]
+        )
+        yield buf.getvalue()
+        for chunk in result.partitions():
+            buf.seek(0)
+            buf.truncate()
+            for row in _roster_rows(chunk, lessons, n_slots):
+                lesson_flags = row.pop("lessons")
+                writer.writerow(list(row.values()) + lesson_flags)
+            yield buf.getvalue()
+    else:
+        yield json.dumps({"lessons": [{"id": l.id, "title": l.title, "order_index": l.order_index} for l in lessons]}) + "\n"
+        for chunk in result.partitions():
+            yield "".join(json.dumps(row) + "\n" for row in _roster_rows(chunk, lessons, n_slots))
+
+
+# ✅ Enrolled students with per-lesson completion (course owner instructor/admin)
+#    ?format=json (paginated, default) | csv | ndjson (streamed, whole roster)
+@roster_bp.route("/courses/<int:course_id>/roster", methods=["GET"])
+@jwt_required()
+def course_roster(course_id: int):
+    user = _current_user()
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    course = Course.query.get(course_id)
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+
+    if not _is_owner_or_admin(user, course):
+        return jsonify({"error": "Only the course instructor/admin can view the roster"}), 403
+
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "csv", "ndjson"):
+        return jsonify({"error": "format must be json, csv or ndjson"}), 400
+
+    lessons = course_slots(course_id)
+    n_slots = max((l.slot for l in lessons), default=-1) + 1
+
+    if fmt != "json":
+        mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+        resp = Response(stream_with_context(_stream(course_id, lessons, n_slots, fmt)), mimetype=mimetype)
+        resp.headers["Content-Disposition"] = f"attachment; filename=course-{course_id}-roster.{fmt}"
+        return resp
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), MAX_PER_PAGE)
+    total = db.session.query(func.count(Enrollment.id)).filter(Enrollment.course_id == course_id).scalar()
+    rows = db.session.execute(_roster_query(course_id).limit(per_page).offset((page - 1) * per_page)).all()
+
+    return jsonify({
+        "course_id": course_id,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "lessons": [{"id": l.id, "title": l.title, "order_index": l.order_index} for l in lessons],
+        "students": _roster_rows(rows, lessons, n_slots),
+    }), 200
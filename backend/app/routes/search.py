@@ -0,0 +1,37 @@
+from flask import Blueprint, request, jsonify
+
+from app import search
+
+search_bp = Blueprint("search", __name__, url_prefix="/search")
+
+
+def _limit(default: int, maximum: int) -> int:
+    try:
+        return max(1, min(int(request.args.get("limit", default)), maximum))
+    except ValueError:
+        return default
+
+
+# ✅ Full-text search over courses and lessons (public)
+@search_bp.route("", methods=["GET"])
+def search_all():
+    q = (request.args.get("q") or "").strip()
+    kind = request.args.get("type")
+
+    if not q:
+        return jsonify({"error": "Missing query parameter: q"}), 400
+    if kind not in (None, "course", "lesson"):
+        return jsonify({"error": "type must be 'course' or 'lesson'"}), 400
+
+    results = search.search(q, kind=kind, limit=_limit(20, 100))
+    return jsonify({"query": q, "results": results}), 200
+
+
+# ✅ Title autocomplete; the last word is treated as a prefix (public)
+@search_bp.route("/suggest", methods=["GET"])
+def suggest():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"query": q, "suggestions": []}), 200
+
+    return jsonify({"query": q, "suggestions": search.suggest(q, limit=_limit(10, 25))}), 200
@@ -0,0 +1,514 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from flask import current_app
+from sqlalchemy import text
+
+# Search over Course.title/description/level and Lesson.title/content.
+#
+# Engines (SEARCH_ENGINE):
+#   "mysql"  - InnoDB FULLTEXT indexes (migration 6a2d0c4b8f31), maintained by MySQL
+#   "sqlite" - FTS5 virtual table with bm25(), maintained by the write views
+#   "memory" - pure-Python inverted index with BM25, built lazily per process. A
+#              worker only sees its own writes: single-process use only (dev,
+#              tests, benchmarks); gunicorn.conf.py refuses it with several workers
+#   "auto"   - by database dialect (default)
+#
+# The write views call index_*/remove* before their commit, so index and rows
+# change in the same transaction.
+#
+# Results are dicts: {"type": "course"|"lesson", "id", "course_id", "title", "score"},
+# higher score = better match.
+
+TITLE_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Queries whose rarest term matches more documents than this are answered from
+# impact-ordered postings with early termination instead of scoring every match.
+IMPACT_MIN_DF = 1000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: str | None) -> list[str]:
+    if not value:
+        return []
+    # "Café" and "cafe" should match; language learners rarely type accents
+    folded = unicodedata.normalize("NFKD", value.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(folded)
+
+
+def course_fields(course) -> tuple[str, str]:
+    return course.title or "", " ".join(filter(None, [course.description, course.level]))
+
+
+def lesson_fields(lesson) -> tuple[str, str]:
+    return lesson.title or "", lesson.content or ""
+
+
+# -----------------------
+# Pure-Python engine
+# -----------------------
+class MemorySearchEngine:
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._postings = {}  # term -> {doc_key: weighted tf}
+        self._title_postings = {}  # term -> set(doc_key)
+        self._doc_terms = {}  # doc_key -> {term: weighted tf}
+        self._doc_len = {}
+        self._docs = {}  # doc_key -> (course_id, title)
+        self._total_len = 0
+        self._vocab = []  # sorted, for prefix lookups
+
+        # term -> [(-contribution, doc_key)] ascending, i.e. best match first. Scores
+        # use the idf/avgdl snapshot taken when the lists were (re)built.
+        self._impact = {}
+        self._impact_idf = {}
+        self._snapshot = (0, 1.0)  # (n_docs, avgdl)
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            from app.models import Course, Lesson
+
+            # Deleted rows are filtered globally (app.lifecycle); archived courses and
+            # their lessons are not searchable
+            for course in Course.query.filter(Course.archived_at.is_(None)).yield_per(1000):
+                self._add(("course", course.id), course.id, *course_fields(course))
+            lessons = Lesson.query.join(Course, Course.id == Lesson.course_id).filter(Course.archived_at.is_(None))
+            for lesson in lessons.yield_per(1000):
+                self._add(("lesson", lesson.id), lesson.course_id, *lesson_fields(lesson))
+            self._built = True
+
+    def _add(self, key, course_id, title, body):
+        self._remove(key)
+        title_tokens = tokenize(title)
+        terms = {}
+        for t in title_tokens:
+            terms[t] = terms.get(t, 0) + TITLE_WEIGHT
+        for t in tokenize(body):
+            terms[t] = terms.get(t, 0) + 1
+
+        length = sum(terms.values())
+        for t, tf in terms.items():
+            postings = self._postings.get(t)
+            if postings is None:
+                postings = self._postings[t] = {}
+                insort(self._vocab, t)
+            postings[key] = tf
+            if t in self._impact:
+                insort(self._impact[t], (-self._impact_score(t, tf, length), key))
+        for t in set(title_tokens):
+            self._title_postings.setdefault(t, set()).add(key)
+
+        self._doc_terms[key] = terms
+        self._doc_len[key] = length
+        self._total_len += length
+        self._docs[key] = (course_id, title)
+
+    def _remove(self, key):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        length = self._doc_len[key]
+        for t, tf in terms.items():
+            self._postings[t].pop(key, None)
+            self._title_postings.get(t, set()).discard(key)
+            impact = self._impact.get(t)
+            if impact is not None:
+                entry = (-self._impact_score(t, tf, length), key)
+                i = bisect_left(impact, entry)
+                if i < len(impact) and impact[i] == entry:
+                    del impact[i]
+                else:
+                    self._impact.pop(t)
+        self._total_len -= self._doc_len.pop(key)
+        self._docs.pop(key, None)
+
+    def index_course(self, course):
+        if self._built:
+            with self._lock:
+                self._add(("course", course.id), course.id, *course_fields(course))
+
+    def index_lesson(self, lesson):
+        if self._built:
+            with self._lock:
+                self._add(("lesson", lesson.id), lesson.course_id, *lesson_fields(lesson))
+
+    def remove(self, kind: str, ref_id: int):
+        if self._built:
+            with self._lock:
+                self._remove((kind, ref_id))
+
+    def remove_course(self, course_id: int):
+        # The course and all of its lessons
+        if self._built:
+            with self._lock:
+                for key in [k for k, (cid, _) in self._docs.items() if cid == course_id]:
+                    self._remove(key)
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> list[str]:
+        i = bisect_left(self._vocab, prefix)
+        out = []
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix) and len(out) < limit:
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+    @staticmethod
+    def _idf(n_docs: int, df: int) -> float:
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _impact_score(self, term: str, tf: int, doc_len: int) -> float:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / self._snapshot[1])
+        return self._impact_idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def _impact_list(self, term: str) -> list:
+        n_docs = len(self._doc_len) or 1
+        avgdl = self._total_len / n_docs
+        snap_n, snap_avgdl = self._snapshot
+        if abs(n_docs - snap_n) > 0.1 * snap_n or abs(avgdl - snap_avgdl) > 0.1 * snap_avgdl:
+            self._impact.clear()
+            self._impact_idf.clear()
+            self._snapshot = (n_docs, avgdl)
+
+        impact = self._impact.get(term)
+        if impact is None:
+            postings = self._postings[term]
+            self._impact_idf[term] = self._idf(self._snapshot[0], len(postings))
+            impact = sorted((-self._impact_score(term, tf, self._doc_len[k]), k) for k, tf in postings.items())
+            self._impact[term] = impact
+        return impact
+
+    def _search_top_k(self, terms, kind, limit):
+        # Threshold algorithm over impact-ordered lists: stop once the k-th best
+        # score beats the best score any unseen document could still reach.
+        lists = [self._impact_list(t) for t in terms]
+        postings = [self._postings[t] for t in terms]
+        heap, seen = [], set()
+        for depth in range(max(len(lst) for lst in lists)):
+            threshold = 0.0
+            for lst in lists:
+                if depth >= len(lst):
+                    # AND semantics: every full match has been seen already
+                    return sorted(heap, reverse=True)
+                neg, key = lst[depth]
+                threshold -= neg
+                if key in seen:
+                    continue
+                seen.add(key)
+                if (kind and key[0] != kind) or not all(key in p for p in postings):
+                    continue
+                dl = self._doc_len[key]
+                score = sum(self._impact_score(t, p[key], dl) for t, p in zip(terms, postings))
+                if len(heap) < limit:
+                    heapq.heappush(heap, (score, key))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, key))
+            if len(heap) >= limit and heap[0][0] >= threshold:
+                break
+        return sorted(heap, reverse=True)
+
+    def search(self, query: str, kind: str | None = None, limit: int = 20) -> list[dict]:
+        self._ensure_built()
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            unique = list(dict.fromkeys(terms))
+            if any(t not in self._postings or not self._postings[t] for t in unique):
+                return []
+            if min(len(self._postings[t]) for t in unique) > IMPACT_MIN_DF:
+                return [self._result(key, score) for score, key in self._search_top_k(unique, kind, limit)]
+
+            n_docs = len(self._doc_len) or 1
+            avgdl = self._total_len / n_docs if n_docs else 1.0
+            # Rarest term first: its postings bound the candidate set (AND semantics)
+            postings = sorted((self._postings[t] for t in unique), key=len)
+            candidates = [k for k in postings[0] if kind is None or k[0] == kind]
+            for p in postings[1:]:
+                candidates = [k for k in candidates if k in p]
+
+            scores = {}
+            for p in postings:
+                idf = self._idf(n_docs, len(p))
+                for key in candidates:
+                    tf = p[key]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[key] / avgdl)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            return [self._result(key, score) for key, score in ranked]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        self._ensure_built()
+        terms = tokenize(prefix)
+        if not terms:
+            return []
+        with self._lock:
+            head, last = terms[:-1], terms[-1]
+            matches = set()
+            for t in self._expand_prefix(last):
+                matches |= self._title_postings.get(t, set())
+            for t in head:
+                matches &= self._title_postings.get(t, set())
+            # Short titles first: "Spanish" before "Spanish for travellers, part 3"
+            ranked = sorted(matches, key=lambda k: (len(self._docs[k][1]), k))[:limit]
+            return [self._result(key, None) for key in ranked]
+
+    def _result(self, key, score):
+        course_id, title = self._docs[key]
+        return {"type": key[0], "id": key[1], "course_id": course_id, "title": title,
+                "score": round(score, 4) if score is not None else None}
+
+
+# -----------------------
+# SQLite FTS5 engine
+# -----------------------
+class SQLiteSearchEngine:
+    name = "sqlite"
+
+    # rowid encodes the document: courses even, lessons odd, so updates are by rowid
+    @staticmethod
+    def _rowid(kind: str, ref_id: int) -> int:
+        return ref_id * 2 + (1 if kind == "lesson" else 0)
+
+    def __init__(self, db):
+        self.db = db
+        self._ready = False
+
+    def _table_exists(self, conn) -> bool:
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+        ).first() is not None
+
+    def _ensure_table(self):
+        # Created and backfilled on first search, in a transaction of its own
+        if self._ready:
+            return
+        with self.db.engine.begin() as conn:
+            if not self._table_exists(conn):
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE search_index USING fts5("
+                    "title, body, kind UNINDEXED, ref_id UNINDEXED, course_id UNINDEXED, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                ))
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS search_vocab USING fts5vocab(search_index, 'row')"
+                ))
+                self._backfill(conn)
+        self._ready = True
+
+    def _backfill(self, conn):
+        conn.execute(text("DELETE FROM search_index"))
+        conn.execute(text(
+            "INSERT INTO search_index (rowid, title, body, kind, ref_id, course_id) "
+            "SELECT id * 2, title, COALESCE(description, '') || ' ' || COALESCE(level, ''), 'course', id, id "
+            "FROM courses WHERE deleted_at IS NULL AND archived_at IS NULL"
+        ))
+        conn.execute(text(
+            "INSERT INTO search_index (rowid, title, body, kind, ref_id, course_id) "
+            "SELECT id * 2 + 1, title, COALESCE(content, ''), 'lesson', id, course_id FROM lessons "
+            "WHERE deleted_at IS NULL AND course_id IN "
+            "(SELECT id FROM courses WHERE deleted_at IS NULL AND archived_at IS NULL)"
+        ))
+
+    # Index maintenance runs in the caller's session and is committed with the
+    # caller's own changes. Before the first search there is no table yet, and the
+    # backfill will pick up whatever was committed.
+    def _maintained(self) -> bool:
+        if not self._ready:
+            self._ready = self._table_exists(self.db.session)
+        return self._ready
+
+    def _upsert(self, kind, ref_id, course_id, title, body):
+        if not self._maintained():
+            return
+        rowid = self._rowid(kind, ref_id)
+        self.db.session.execute(text("DELETE FROM search_index WHERE rowid = :r"), {"r": rowid})
+        self.db.session.execute(
+            text("INSERT INTO search_index (rowid, title, body, kind, ref_id, course_id) "
+                 "VALUES (:r, :title, :body, :kind, :ref_id, :course_id)"),
+            {"r": rowid, "title": title, "body": body, "kind": kind, "ref_id": ref_id, "course_id": course_id},
+        )
+
+    def index_course(self, course):
+        self._upsert("course", course.id, course.id, *course_fields(course))
+
+    def index_lesson(self, lesson):
+        self._upsert("lesson", lesson.id, lesson.course_id, *lesson_fields(lesson))
+
+    def remove(self, kind: str, ref_id: int):
+        if self._maintained():
+            self.db.session.execute(text("DELETE FROM search_index WHERE rowid = :r"), {"r": self._rowid(kind, ref_id)})
+
+    def remove_course(self, course_id: int):
+        if self._maintained():
+            self.db.session.execute(text("DELETE FROM search_index WHERE course_id = :c"), {"c": course_id})
+
+    def _run(self, match: str, kind, limit):
+        sql = (
+            "SELECT kind, ref_id, course_id, title, bm25(search_index, :tw, 1.0) AS rank "
+            "FROM search_index WHERE search_index MATCH :q"
+        )
+        params = {"q": match, "tw": float(TITLE_WEIGHT), "limit": limit}
+        if kind:
+            sql += " AND kind = :kind"
+            params["kind"] = kind
+        sql += " ORDER BY rank LIMIT :limit"
+        return self.db.session.execute(text(sql), params).all()
+
+    def search(self, query: str, kind: str | None = None, limit: int = 20) -> list[dict]:
+        self._ensure_table()
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{t}"' for t in terms)
+        return [
+            {"type": r.kind, "id": r.ref_id, "course_id": r.course_id, "title": r.title, "score": round(-r.rank, 6)}
+            for r in self._run(match, kind, limit)
+        ]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        self._ensure_table()
+        terms = tokenize(prefix)
+        if not terms:
+            return []
+        match = "title : (" + " ".join([f'"{t}"' for t in terms[:-1]] + [f'"{terms[-1]}"*']) + ")"
+        rows = self.db.session.execute(
+            text("SELECT kind, ref_id, course_id, title FROM search_index WHERE search_index MATCH :q "
+                 "ORDER BY length(title), rowid LIMIT :limit"),
+            {"q": match, "limit": limit},
+        ).all()
+        return [{"type": r.kind, "id": r.ref_id, "course_id": r.course_id, "title": r.title, "score": None}
+                for r in rows]
+
+
+# -----------------------
+# MySQL FULLTEXT engine
+# -----------------------
+class MySQLSearchEngine:
+    name = "mysql"
+
+    # InnoDB keeps FULLTEXT indexes up to date on INSERT/UPDATE; its relevance is
+    # a TF-IDF / BM25-style score.
+    def __init__(self, db):
+        self.db = db
+
+    def index_course(self, course):
+        pass
+
+    def index_lesson(self, lesson):
+        pass
+
+    def remove(self, kind: str, ref_id: int):
+        pass
+
+    def remove_course(self, course_id: int):
+        pass
+
+    def search(self, query: str, kind: str | None = None, limit: int = 20) -> list[dict]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Boolean mode with every term required (+term), matching the other engines
+        q = " ".join(f"+{t}" for t in terms)
+        parts, params = [], {"q": q, "limit": limit, "tw": TITLE_WEIGHT}
+        if kind in (None, "course"):
+            parts.append(
+                "SELECT 'course' AS kind, id AS ref_id, id AS course_id, title, "
+                "MATCH(title) AGAINST (:q IN BOOLEAN MODE) * :tw "
+                "+ MATCH(title, description, level) AGAINST (:q IN BOOLEAN MODE) AS score "
+                "FROM courses WHERE MATCH(title, description, level) AGAINST (:q IN BOOLEAN MODE) "
+                "AND deleted_at IS NULL AND archived_at IS NULL"
+            )
+        if kind in (None, "lesson"):
+            parts.append(
+                "SELECT 'lesson' AS kind, id AS ref_id, course_id, title, "
+                "MATCH(title) AGAINST (:q IN BOOLEAN MODE) * :tw "
+                "+ MATCH(title, content) AGAINST (:q IN BOOLEAN MODE) AS score "
+                "FROM lessons WHERE MATCH(title, content) AGAINST (:q IN BOOLEAN MODE) "
+                "AND deleted_at IS NULL AND course_id IN (SELECT id FROM courses WHERE deleted_at IS NULL AND archived_at IS NULL)"
+            )
+        sql = " UNION ALL ".join(f"({p})" for p in parts) + " ORDER BY score DESC LIMIT :limit"
+        return [
+            {"type": r.kind, "id": r.ref_id, "course_id": r.course_id, "title": r.title, "score": round(float(r.score), 4)}
+            for r in self.db.session.execute(text(sql), params).all()
+        ]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        terms = tokenize(prefix)
+        if not terms:
+            return []
+        q = " ".join(f"+{t}" for t in terms[:-1]) + f" +{terms[-1]}*"
+        sql = (
+            "(SELECT 'course' AS kind, id AS ref_id, id AS course_id, title FROM courses "
+            " WHERE MATCH(title) AGAINST (:q IN BOOLEAN MODE) AND deleted_at IS NULL AND archived_at IS NULL) "
+            "UNION ALL "
+            "(SELECT 'lesson' AS kind, id AS ref_id, course_id, title FROM lessons "
+            " WHERE MATCH(title) AGAINST (:q IN BOOLEAN MODE) AND deleted_at IS NULL AND course_id IN "
+            "  (SELECT id FROM courses WHERE deleted_at IS NULL AND archived_at IS NULL)) "
+            "ORDER BY CHAR_LENGTH(title), ref_id LIMIT :limit"
+        )
+        return [{"type": r.kind, "id": r.ref_id, "course_id": r.course_id, "title": r.title, "score": None}
+                for r in self.db.session.execute(text(sql), {"q": q, "limit": limit}).all()]
+
+
+# -----------------------
+# Extension
+# -----------------------
+class Search:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SEARCH_ENGINE", "auto")
+        app.extensions["search"] = None  # created on first use (needs the engine dialect)
+
+    @property
+    def engine(self):
+        engine = current_app.extensions.get("search")
+        if engine is None:
+            from app import db
+
+            kind = current_app.config["SEARCH_ENGINE"]
+            if kind == "auto":
+                kind = {"mysql": "mysql", "sqlite": "sqlite"}.get(db.engine.dialect.name, "memory")
+            engine = {
+                "mysql": lambda: MySQLSearchEngine(db),
+                "sqlite": lambda: SQLiteSearchEngine(db),
+                "memory": MemorySearchEngine,
+            }[kind]()
+            current_app.extensions["search"] = engine
+        return engine
+
+    def index_course(self, course):
+        self.engine.index_course(course)
+
+    def index_lesson(self, lesson):
+        self.engine.index_lesson(lesson)
+
+    def remove(self, kind: str, ref_id: int):
+        self.engine.remove(kind, ref_id)
+
+    def remove_course(self, course_id: int):
+        self.engine.remove_course(course_id)
+
+    def search(self, query: str, kind: str | None = None, limit: int = 20) -> list[dict]:
+        return self.engine.search(query, kind=kind, limit=limit)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        return self.engine.suggest(prefix, limit=limit)
@@ -0,0 +1,95 @@
+from app.certificates import format_code
+from app.models.certificate import Certificate
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson import Lesson
+
+# JSON shapes shared by the REST routes and POST /batch, so a resource looks the
+# same whichever way it was fetched.
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def course_json(course: Course) -> dict:
+    return {
+        "id": course.id,
+        "title": course.title,
+        "description": course.description,
+        "level": course.level,
+        "instructor_id": course.instructor_id,
+        "created_at": course.created_at.isoformat(),
+        "archived_at": _iso(course.archived_at),
+        "version": course.version,
+        "enrollment_count": course.enrollment_count,
+        "completion_count": course.completion_count,
+        "trending_score": round(course.trending_score or 0.0, 3),
+    }
+
+
+def lesson_json(lesson: Lesson, html: bool = True) -> dict:
+    # html=False for lists: the rendered body is fetched per lesson
+    data = {
+        "id": lesson.id,
+        "course_id": lesson.course_id,
+        "title": lesson.title,
+        "content": lesson.content,
+        "content_html": lesson.content_html,
+        "order_index": lesson.order_index,
+        "version": lesson.version,
+        "created_at": lesson.created_at.isoformat(),
+    }
+    if not html:
+        del data["content_html"]
+    return data
+
+
+def lesson_state_json(lesson, completed: bool, unlocked: bool) -> dict:
+    return {
+        "id": lesson.id,
+        "title": lesson.title,
+        "order_index": lesson.order_index,
+        "completed": completed,
+        "unlocked": unlocked,
+    }
+
+
+def enrollment_json(enrollment: Enrollment, course: Course) -> dict:
+    return {
+        "enrollment_id": enrollment.id,
+        "enrolled_at": enrollment.enrolled_at.isoformat(),
+        "course": {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "level": course.level,
+            "instructor_id": course.instructor_id,
+            "archived_at": _iso(course.archived_at),
+        },
+    }
+
+
+def related_json(neighbor, course: Course) -> dict:
+    return {
+        "id": course.id,
+        "title": course.title,
+        "level": course.level,
+        "score": round(neighbor.score, 4),
+        "co_enrollments": neighbor.co_enrollments,
+    }
+
+
+def certificate_json(cert: Certificate) -> dict:
+    # "pending" until a job worker has rendered the PDF
+    return {
+        "id": cert.id,
+        "code": format_code(cert.code),
+        "course_id": cert.course_id,
+        "course_title": cert.course_title,
+        "student_name": cert.student_name,
+        "issued_at": cert.issued_at.isoformat(),
+        "status": "ready" if cert.sha256 else "pending",
+        "pdf_url": f"/certificates/{cert.code}.pdf",
+        "verify_url": f"/certificates/verify/{cert.code}",
+    }
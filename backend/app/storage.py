@@ -0,0 +1,152 @@
+import hashlib
+import os
+import shutil
+
+from flask import current_app
+
+# Content-addressed media storage: a blob's key is derived from its sha256, so the
+# same file uploaded twice (or to two lessons) is stored once and never changes.
+#
+# Backends (MEDIA_STORAGE):
+#   "local"  - files under MEDIA_ROOT/objects/ab/cd/<sha256>; served with sendfile
+#   "object" - stand-in for an S3-style bucket under MEDIA_ROOT/buckets/<MEDIA_BUCKET>:
+#              whole-object puts and ranged gets only, no filesystem paths exposed
+#
+# Uploads are always staged on local disk (MEDIA_ROOT/uploads) and handed to the
+# backend once complete; generated artifacts (e.g. course bundles) are cached per
+# server under MEDIA_ROOT/cache. Everything is copied in COPY_CHUNK pieces; no file is
+# ever read into memory as a whole.
+
+COPY_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COPY_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_range(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(COPY_CHUNK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+class LocalStorage:
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, "objects")
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, digest: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def path(self, digest: str) -> str | None:
+        return os.path.join(self.root, self.key(digest))
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, digest: str, staged_path: str):
+        # Staging and objects share MEDIA_ROOT, so this is an atomic rename
+        target = self.path(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(staged_path, target)
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self.path(digest))
+
+    def open_range(self, digest: str, start: int, length: int):
+        return read_range(self.path(digest), start, length)
+
+    def delete(self, digest: str):
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+class ObjectStorage:
+    name = "object"
+
+    def __init__(self, root: str, bucket: str):
+        self.bucket = bucket
+        self._dir = os.path.join(root, "buckets", bucket)
+        os.makedirs(os.path.join(self._dir, "media"), exist_ok=True)
+
+    def key(self, digest: str) -> str:
+        return f"media/{digest}"
+
+    def _object(self, key: str) -> str:
+        return os.path.join(self._dir, key)
+
+    def path(self, digest: str) -> str | None:
+        return None
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._object(self.key(digest)))
+
+    def put(self, digest: str, staged_path: str):
+        # A PUT streams the body and the object appears only once fully written
+        target = self._object(self.key(digest))
+        tmp = f"{target}.part"
+        with open(staged_path, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK)
+        os.replace(tmp, target)
+        os.remove(staged_path)
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self._object(self.key(digest)))
+
+    def open_range(self, digest: str, start: int, length: int):
+        # GET with "Range: bytes=start-(start+length-1)"
+        return read_range(self._object(self.key(digest)), start, length)
+
+    def delete(self, digest: str):
+        try:
+            os.remove(self._object(self.key(digest)))
+        except FileNotFoundError:
+            pass
+
+
+class Storage:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MEDIA_STORAGE", "local")
+        app.config.setdefault("MEDIA_ROOT", "media")
+        app.config.setdefault("MEDIA_BUCKET", "languagelift-media")
+        app.config.setdefault("MEDIA_ACCEL_PREFIX", "")
+
+        root = os.path.abspath(app.config["MEDIA_ROOT"])
+        os.makedirs(os.path.join(root, "uploads"), exist_ok=True)
+        kind = app.config["MEDIA_STORAGE"]
+        if kind == "local":
+            backend = LocalStorage(root)
+        elif kind == "object":
+            backend = ObjectStorage(root, app.config["MEDIA_BUCKET"])
+        else:
+            raise ValueError(f"Unknown MEDIA_STORAGE: {kind}")
+        app.extensions["storage"] = {"backend": backend, "root": root, "uploads": os.path.join(root, "uploads")}
+
+    @property
+    def backend(self):
+        return current_app.extensions["storage"]["backend"]
+
+    def staging_path(self, upload_id: str) -> str:
+        return os.path.join(current_app.extensions["storage"]["uploads"], upload_id)
+
+    def cache_path(self, *parts: str) -> str:
+        path = os.path.join(current_app.extensions["storage"]["root"], "cache", *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
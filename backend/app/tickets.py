@@ -0,0 +1,47 @@
+import time
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+# Tickets: for URLs the browser opens itself (EventSource, download links), which
+# cannot carry an Authorization header. An access token in the query string would
+# end up in access logs and browser history and stay valid for its full lifetime;
+# a ticket is signed for one user and one scope ("events", "export"), cannot be
+# used as a bearer token anywhere else and expires after TICKET_SECONDS.
+#
+# POST /auth/tickets {"scope": ...} (Bearer access token) issues one. It only has
+# to be valid when the request starts: a stream opened with it still ends when the
+# access token it was issued for expires.
+
+SCOPES = ("events", "export")
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="languagelift-ticket")
+
+
+def issue(user_id: str, scope: str, expires_at: int) -> str:
+    return _serializer().dumps({"u": user_id, "s": scope, "e": expires_at})
+
+
+def load(ticket: str, scope: str):
+    # (user id, access token expiry), or None if the ticket is not valid for scope
+    try:
+        data = _serializer().loads(ticket, max_age=current_app.config["TICKET_SECONDS"])
+    except BadSignature:
+        return None
+    if data.get("s") != scope or data.get("e", 0) <= time.time():
+        return None
+    return data["u"], data["e"]
+
+
+def authenticate(scope: str):
+    # (user id, expiry) from ?ticket= or the Authorization header, or None for a bad
+    # ticket. A missing or bad header raises as jwt_required does (401).
+    ticket = request.args.get("ticket")
+    if ticket is not None:
+        return load(ticket, scope)
+    verify_jwt_in_request()
+    payload = get_jwt()
+    return payload["sub"], payload["exp"]
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import db, jobs, metrics
+from app.jobs import task, tasks
+
+logger = logging.getLogger("languagelift.jobs")
+
+# `flask jobs worker` runs JOBS_CONCURRENCY threads, each claiming and running one
+# job at a time in its own app context, plus the scheduler thread. Run more worker
+# processes for more throughput; CPU-bound tasks (lessons.render) bring their own
+# process pool. SIGTERM / Ctrl-C stops claiming and waits for running jobs.
+
+
+class Worker:
+    def __init__(self, app, concurrency: int, names=None, schedule: bool = True, burst: bool = False):
+        self.app = app
+        self.id = f"{socket.gethostname()}:{os.getpid()}"[:64]
+        self.concurrency = concurrency
+        self.names = set(names or tasks)
+        self.schedule = schedule
+        self.burst = burst  # run what is due, then exit (cron, tests)
+        self.processed = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_tick = None
+
+    def stop(self, *_):
+        self._stop.set()
+
+    def run(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        if self.schedule:
+            self._tick()
+        threads = [
+            threading.Thread(target=self._loop, name=f"jobs-{i}", daemon=True) for i in range(self.concurrency)
+        ]
+        if self.schedule and not self.burst:
+            threads.append(threading.Thread(target=self._schedule_loop, name="jobs-scheduler", daemon=True))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.processed
+
+    # -----------------------
+    # Running jobs
+    # -----------------------
+    def _loop(self):
+        poll = self.app.config["JOBS_POLL_SECONDS"]
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    ran = self._run_one()
+                except Exception:
+                    logger.exception("job worker error")
+                    db.session.rollback()
+                    ran = False
+                metrics.maybe_flush()
+            if not ran:
+                if self.burst:
+                    return
+                self._stop.wait(poll)
+
+    def _available(self, queue) -> list:
+        # Tasks this worker runs, minus those at their concurrency limit
+        limited = [n for n in self.names if tasks[n].concurrency]
+        running = queue.running_counts() if limited else {}
+        return [n for n in self.names if not tasks[n].concurrency or running.get(n, 0) < tasks[n].concurrency]
+
+    def _run_one(self) -> bool:
+        queue = jobs.queue
+        names = self._available(queue)
+        job = queue.claim(self.id, names) if names else None
+        if job is None:
+            return False
+        t = tasks[job["name"]]
+        # Two workers may have claimed the last free slot at once
+        if t.concurrency and queue.running_counts().get(t.name, 0) > t.concurrency:
+            queue.release(self.id, job, datetime.utcnow() + timedelta(seconds=1))
+            return False
+
+        metrics.inc("languagelift_jobs_running")
+        started = time.perf_counter()
+        try:
+            result = t.fn(**job["args"])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            if job["attempts"] >= job["max_attempts"]:
+                outcome = "failed"
+                queue.fail(self.id, job, error)
+                logger.exception("job %s (%s) failed after %d attempts", job["id"], t.name, job["attempts"])
+            else:
+                outcome = "retried"
+                delay = t.retry_delay(job["attempts"], self.app.config["JOBS_MAX_BACKOFF_SECONDS"])
+                queue.retry(self.id, job, error, datetime.utcnow() + timedelta(seconds=delay))
+                logger.warning("job %s (%s) attempt %d failed, retrying in %.0fs: %s",
+                               job["id"], t.name, job["attempts"], delay, error)
+        else:
+            outcome = "done"
+            if not queue.complete(self.id, job, result):
+                logger.warning("job %s (%s) finished after its lease expired", job["id"], t.name)
+        finally:
+            metrics.inc("languagelift_jobs_running", -1)
+        metrics.observe("languagelift_job_duration_seconds", time.perf_counter() - started, task=t.name)
+        metrics.inc("languagelift_jobs_total", task=t.name, outcome=outcome)
+        with self._lock:
+            self.processed += 1
+        return True
+
+    # -----------------------
+    # Scheduler
+    # -----------------------
+    def _schedule_loop(self):
+        while not self._stop.wait(15.0):
+            self._tick()
+
+    def _tick(self):
+        # Enqueue every scheduled slot since the last tick (at most an hour back),
+        # and put jobs of dead workers back in the queue
+        now = datetime.utcnow().replace(second=0, microsecond=0)
+        minute = max(self._last_tick or now, now - timedelta(hours=1))
+        if self._last_tick is not None:
+            minute += timedelta(minutes=1)
+        with self.app.app_context():
+            try:
+                recovered = jobs.queue.recover()
+                if recovered:
+                    logger.warning("requeued %d jobs with expired leases", recovered)
+                while minute <= now:
+                    for name, cron in jobs.schedules.items():
+                        if name in self.names and cron.matches(minute):
+                            jobs.enqueue(name, unique_key=f"cron:{name}:{minute:%Y%m%d%H%M}")
+                    minute += timedelta(minutes=1)
+                db.session.commit()
+            except Exception:
+                logger.exception("job scheduler error")
+                db.session.rollback()
+                return
+        self._last_tick = now
+
+
+@task("jobs.prune", concurrency=1)
+def prune_jobs(keep_hours: float | None = None):
+    hours = keep_hours if keep_hours is not None else current_app.config["JOBS_KEEP_HOURS"]
+    return {"removed": jobs.queue.prune(datetime.utcnow() - timedelta(hours=hours))}
+
+
+# -----------------------
+# CLI: flask jobs ...
+# -----------------------
+jobs_cli = AppGroup("jobs", help="Background jobs: workers, queue and schedules.")
+
+
+def _json_args(value) -> dict:
+    try:
+        args = json.loads(value) if value else {}
+    except ValueError as e:
+        raise click.BadParameter(f"not JSON: {e}")
+    if not isinstance(args, dict):
+        raise click.BadParameter("must be a JSON object")
+    return args
+
+
+def _task_name(name):
+    if name not in tasks:
+        raise click.BadParameter(f"unknown task; one of: {', '.join(sorted(tasks))}")
+    return name
+
+
+@jobs_cli.command("worker")
+@click.option("--concurrency", type=int, default=None, help="Jobs run at once (default: JOBS_CONCURRENCY).")
+@click.option("--only", multiple=True, help="Only run this task (repeatable).")
+@click.option("--no-schedule", is_flag=True, help="Do not enqueue periodic jobs from this worker.")
+@click.option("--burst", is_flag=True, help="Run the jobs that are due, then exit.")
+def worker_command(concurrency, only, no_schedule, burst):
+    for name in only:
+        _task_name(name)
+    unknown = set(jobs.schedules) - set(tasks)
+    if unknown:
+        raise click.ClickException(f"JOBS_SCHEDULES names unknown tasks: {', '.join(sorted(unknown))}")
+    app = current_app._get_current_object()
+    worker = Worker(
+        app,
+        concurrency or app.config["JOBS_CONCURRENCY"],
+        names=only or None,
+        schedule=not no_schedule,
+        burst=burst,
+    )
+    click.echo(f"Worker {worker.id}: {worker.concurrency} threads, {jobs.queue.name} queue, "
+               f"{len(worker.names)} tasks")
+    processed = worker.run()
+    click.echo(f"Worker stopped after {processed} jobs")
+
+
+@jobs_cli.command("enqueue")
+@click.argument("name", callback=lambda ctx, param, value: _task_name(value))
+@click.option("--args", "args", default="", help="Task arguments as a JSON object.")
+@click.option("--delay", type=float, default=0.0, help="Seconds before the job is due.")
+def enqueue_command(name, args, delay):
+    job_id = jobs.enqueue(name, _json_args(args), delay=delay)
+    db.session.commit()
+    click.echo(f"Enqueued job {job_id} ({name})")
+
+
+@jobs_cli.command("run")
+@click.argument("name", callback=lambda ctx, param, value: _task_name(value))
+@click.option("--args", "args", default="", help="Task arguments as a JSON object.")
+def run_command(name, args):
+    # In this process, now, without the queue
+    started = time.perf_counter()
+    result = tasks[name].fn(**_json_args(args))
+    db.session.commit()
+    click.echo(f"{name}: {json.dumps(result, default=str)} in {time.perf_counter() - started:.1f}s")
+
+
+@jobs_cli.command("list")
+@click.option("--status", type=click.Choice(["queued", "running", "done", "failed"]), default=None)
+@click.option("--limit", type=int, default=20, show_default=True)
+def list_command(status, limit):
+    counts = jobs.queue.counts()
+    click.echo(", ".join(f"{n} {s}" for s, n in sorted(counts.items())) or "No jobs")
+    for j in jobs.queue.recent(status, limit):
+        line = f"{j['id']:>8}  {j['name']:<24} {j['status']:<8} attempt {j['attempts']}/{j['max_attempts']}"
+        if j["status"] == "queued" and j["run_at"]:
+            line += f"  due {j['run_at']:%Y-%m-%d %H:%M:%S}"
+        if j["last_error"]:
+            line += f"  {j['last_error'][:80]}"
+        click.echo(line)
+
+
+@jobs_cli.command("retry")
+@click.argument("job_id", type=int)
+def retry_command(job_id):
+    if not jobs.queue.requeue(job_id):
+        raise click.ClickException(f"Job {job_id} is not failed")
+    click.echo(f"Requeued job {job_id}")
+
+
+@jobs_cli.command("schedules")
+def schedules_command():
+    now = datetime.utcnow()
+    if not jobs.schedules:
+        click.echo("No schedules (JOBS_SCHEDULES)")
+    for name, cron in sorted(jobs.schedules.items()):
+        following = cron.next_after(now)
+        click.echo(f"{name:<24} {cron.expr:<16} next {following:%Y-%m-%d %H:%M} UTC" if following else
+                   f"{name:<24} {cron.expr:<16} never")
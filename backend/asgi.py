@@ -0,0 +1,6 @@
+# ASGI entry point: GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py asgi:app
+# (or `uvicorn asgi:app` in development). See app/asgi.py.
+from app import create_app
+from app.asgi import AsyncApp
+
+app = AsyncApp(create_app())
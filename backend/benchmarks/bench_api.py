@@ -0,0 +1,73 @@
+from benchmarks.datagen import BENCH_PASSWORD
+
+
+def test_login(benchmark, client, seeded):
+    email = f"bench{seeded.student_ids[0]}@example.com"
+
+    def run():
+        return client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+
+    r = benchmark(run)
+    assert r.status_code == 200
+
+
+def test_catalog_browse(benchmark, client, seeded):
+    r = benchmark(client.get, "/courses")
+    assert r.status_code == 200
+    assert len(r.get_json()) == len(seeded.course_ids)
+
+
+def test_course_detail(benchmark, client, seeded):
+    course_id = seeded.popular_course_ids[0]
+
+    def run():
+        client.get(f"/courses/{course_id}")
+        return client.get(f"/courses/{course_id}/lessons")
+
+    r = benchmark(run)
+    assert r.status_code == 200
+
+
+def test_complete_lesson(benchmark, client, seeded, power_learner):
+    user_id, headers = power_learner
+    course_id = seeded.courses_by_user[user_id][0]
+    lesson_id = seeded.lesson_ids_by_course[course_id][-1]
+
+    r = benchmark(client.post, f"/lessons/{lesson_id}/complete", headers=headers)
+    assert r.status_code == 200
+
+
+def test_my_courses(benchmark, client, power_learner):
+    _, headers = power_learner
+
+    def run():
+        r = client.get("/me/enrollments", headers=headers)
+        for e in r.get_json():
+            client.get(f"/courses/{e['course']['id']}/progress", headers=headers)
+        return r
+
+    r = benchmark(run)
+    assert r.status_code == 200
+
+
+def test_my_courses_batch(benchmark, client, power_learner):
+    # The same page through POST /batch: one round trip, one query per entity type
+    _, headers = power_learner
+    body = {"requests": [{"resource": "enrollments", "progress": True}]}
+
+    r = benchmark(client.post, "/batch", json=body, headers=headers)
+    assert r.status_code == 200
+    assert r.get_json()["responses"][0]["status"] == 200
+
+
+def test_course_detail_batch(benchmark, client, seeded, power_learner):
+    _, headers = power_learner
+    course_id = seeded.popular_course_ids[0]
+    body = {"requests": [
+        {"resource": "course", "id": course_id},
+        {"resource": "lesson_states", "course_id": course_id},
+        {"resource": "related", "course_id": course_id},
+    ]}
+
+    r = benchmark(client.post, "/batch", json=body, headers=headers)
+    assert r.status_code == 200
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token, jwt_required
+
+from app import create_app, revocation
+from app.revocation import BloomFilter, MemoryDenylist
+
+# Per-request cost of JWT auth with the revocation check: the denylist lookup alone
+# (empty and with 100k revoked tokens), the Bloom filter that fronts Redis, and a
+# whole request to a trivial endpoint without auth, with auth, and with auth plus a
+# full denylist.
+
+DENYLIST_SIZE = 100_000
+
+
+def _fill(store, n=DENYLIST_SIZE):
+    for i in range(n):
+        store.add(f"jti:revoked-{i}", 3600)
+
+
+def test_denylist_lookup_empty(benchmark):
+    store = MemoryDenylist()
+    benchmark(store.get_many, ["jti:abc", "user:1", "fam:def"])
+
+
+def test_denylist_lookup_full(benchmark):
+    store = MemoryDenylist()
+    _fill(store)
+    benchmark(store.get_many, ["jti:abc", "user:1", "fam:def"])
+
+
+def test_bloom_lookup(benchmark):
+    bloom = BloomFilter(1_000_000)
+    for i in range(DENYLIST_SIZE):
+        bloom.add(f"jti:revoked-{i}")
+    benchmark(lambda: any(k in bloom for k in ("jti:abc", "user:1", "fam:def")))
+
+
+def test_bloom_false_positive_rate():
+    bloom = BloomFilter(DENYLIST_SIZE, error_rate=0.001)
+    for i in range(DENYLIST_SIZE):
+        bloom.add(f"jti:revoked-{i}")
+    hits = sum(f"jti:other-{i}" in bloom for i in range(DENYLIST_SIZE))
+    print(f"\nbloom: {bloom.size // 8 // 1024} KiB, {bloom.hashes} hashes, false positives {hits / DENYLIST_SIZE:.4%}")
+    assert hits / DENYLIST_SIZE < 0.003
+
+
+@pytest.fixture(params=["no-auth", "auth", "auth-full-denylist"])
+def auth_client(request):
+    from config import TestConfig
+
+    class AuthBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+    app = create_app(AuthBenchConfig)
+
+    @app.route("/bench/open")
+    def bench_open():
+        return {"ok": True}
+
+    @app.route("/bench/protected")
+    @jwt_required()
+    def bench_protected():
+        return {"ok": True}
+
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"fam": "bench"})
+        if request.param == "auth-full-denylist":
+            _fill(revocation.store)
+            revocation.store.add("user:1", 3600, value=int(time.time()) - 60)
+
+    client = app.test_client()
+    if request.param == "no-auth":
+        return lambda: client.get("/bench/open")
+    headers = {"Authorization": f"Bearer {token}"}
+    return lambda: client.get("/bench/protected", headers=headers)
+
+
+def test_request_overhead(benchmark, auth_client):
+    resp = auth_client()
+    assert resp.status_code == 200
+    benchmark(auth_client)
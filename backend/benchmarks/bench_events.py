@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+import tracemalloc
+
+from app.events import MemoryBroker, course_channel, user_channel
+
+# The live-event broker (app.events) with many open streams: publishing must not
+# cost more as idle streams pile up, an idle stream should only cost a small queue,
+# and a fan-out to every follower of a course should reach them all quickly.
+IDLE_STREAMS = int(os.getenv("BENCH_EVENTS_IDLE", "5000"))
+FOLLOWERS = int(os.getenv("BENCH_EVENTS_FOLLOWERS", "1000"))
+
+
+def _event(channel, n=0):
+    return {"id": f"{n:013d}-bench000", "channel": channel, "type": "progress", "data": {"completion_percent": 50.0}}
+
+
+def _idle_broker(n):
+    broker = MemoryBroker()
+    subs = [broker.subscribe([user_channel(i)])[0] for i in range(n)]
+    return broker, subs
+
+
+def test_idle_stream_memory():
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    broker, subs = _idle_broker(IDLE_STREAMS)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"\n{IDLE_STREAMS} idle streams: {used / 1024 / 1024:.1f} MiB, {used / IDLE_STREAMS / 1024:.1f} KiB each")
+    assert broker.connections() == IDLE_STREAMS
+
+
+def test_publish_no_streams(benchmark):
+    broker = MemoryBroker()
+    benchmark(broker.publish, _event(user_channel(0)))
+
+
+def test_publish_with_idle_streams(benchmark):
+    # One stream is listening; thousands of others are idle on other channels
+    broker, subs = _idle_broker(IDLE_STREAMS)
+    benchmark(broker.publish, _event(user_channel(1)))
+    assert subs[1].get(0)
+
+
+def test_publish_fanout(benchmark):
+    broker = MemoryBroker()
+    subs = [broker.subscribe([course_channel(1)])[0] for _ in range(FOLLOWERS)]
+    benchmark(broker.publish, _event(course_channel(1)))
+    assert all(s.get(0) for s in subs)
+
+
+def test_fanout_wakeup_latency():
+    # Every follower blocked in get(), as a stream is between heartbeats
+    broker = MemoryBroker()
+    subs = [broker.subscribe([course_channel(1)])[0] for _ in range(min(FOLLOWERS, 500))]
+    woke = []
+
+    def wait(sub):
+        if sub.get(5.0):
+            woke.append(time.perf_counter())
+
+    threads = [threading.Thread(target=wait, args=(s,)) for s in subs]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    broker.publish(_event(course_channel(1)))
+    for t in threads:
+        t.join()
+    print(f"\n{len(subs)} waiting streams woken in {(max(woke) - started) * 1000:.1f} ms")
+    assert len(woke) == len(subs)
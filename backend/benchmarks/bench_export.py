@@ -0,0 +1,95 @@
+import os
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Course, Enrollment, Lesson, Progress, ProgressArchive, User
+from benchmarks.datagen import _bulk_insert
+
+# GET /me/export for one user with a small and a large history
+# (BENCH_EXPORT_ROWS progress rows, plus as many archived ones). Peak Python memory
+# while streaming should not depend on the history size: rows come from a
+# server-side cursor one chunk at a time and go straight into the zip stream.
+EXPORT_ROWS = int(os.getenv("BENCH_EXPORT_ROWS", "200000"))
+SMALL_ROWS = 10000
+LESSONS_PER_COURSE = 200
+
+
+def _app(tmp_path, rows: int):
+    from config import TestConfig
+
+    class ExportBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / f'export-{rows}.sqlite3'}"
+        EXPORT_PART_ROWS = 10 * rows
+        EXPORT_ROWS_PER_SECOND = 0
+
+    app = create_app(ExportBenchConfig)
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        _bulk_insert(User, [
+            {"id": 1, "name": "Learner", "email": "learner@example.com", "password_hash": "x", "role": "student", "created_at": now},
+            {"id": 2, "name": "Teacher", "email": "teacher@example.com", "password_hash": "x", "role": "instructor", "created_at": now},
+        ], 5000)
+        courses = rows // LESSONS_PER_COURSE
+        _bulk_insert(Course, [
+            {"id": c, "title": f"Course {c}", "description": "", "level": "A1", "instructor_id": 2, "created_at": now,
+             "next_slot": LESSONS_PER_COURSE}
+            for c in range(1, courses + 1)
+        ], 5000)
+        _bulk_insert(Lesson, [
+            {"id": i, "title": f"Lesson {i}", "content": "", "order_index": i, "slot": (i - 1) % LESSONS_PER_COURSE,
+             "course_id": (i - 1) // LESSONS_PER_COURSE + 1, "created_at": now}
+            for i in range(1, rows + 1)
+        ], 5000)
+        _bulk_insert(Enrollment, [{"user_id": 1, "course_id": c, "enrolled_at": now} for c in range(1, courses + 1)], 5000)
+        _bulk_insert(Progress, [
+            {"user_id": 1, "lesson_id": i, "completed": True, "completed_at": now} for i in range(1, rows + 1)
+        ], 5000)
+        _bulk_insert(ProgressArchive, [
+            {"id": i, "user_id": 1, "lesson_id": rows + i, "course_id": 0, "lesson_title": f"Old {i}",
+             "completed": True, "completed_at": now, "archived_at": now}
+            for i in range(1, rows + 1)
+        ], 5000)
+        db.session.commit()
+        token = create_access_token(identity="1")
+    return app, {"Authorization": f"Bearer {token}"}
+
+
+def _stream_export(app, headers, path):
+    # Written to disk as it arrives, so only the server side counts towards the peak
+    client = app.test_client()
+    tracemalloc.start()
+    started = time.perf_counter()
+    resp = client.get("/me/export", headers=headers, buffered=False)
+    size, first = 0, None
+    with open(path, "wb") as out:
+        for chunk in resp.response:
+            if first is None:
+                first = time.perf_counter() - started
+            size += len(chunk)
+            out.write(chunk)
+    resp.close()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, first, elapsed, peak
+
+
+@pytest.mark.parametrize("rows", [SMALL_ROWS, EXPORT_ROWS])
+def test_export_memory(tmp_path, rows):
+    app, headers = _app(tmp_path, rows)
+    path = tmp_path / "export.zip"
+    size, first, elapsed, peak = _stream_export(app, headers, path)
+    print(
+        f"\n{rows} progress + {rows} archived rows: {size / 1024 / 1024:.1f} MiB zip, "
+        f"first byte {first * 1000:.0f} ms, total {elapsed:.2f} s, peak {peak / 1024 / 1024:.1f} MiB"
+    )
+    with zipfile.ZipFile(path) as z:
+        assert sum(1 for _ in z.open("progress.ndjson")) == rows
+    assert peak < 32 * 1024 * 1024
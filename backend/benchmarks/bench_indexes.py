@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+
+from app import db
+from benchmarks.explain import assert_uses_index, hot_queries
+
+QUERY_NAMES = [
+    "catalog",
+    "courses_by_instructor",
+    "course_lessons",
+    "my_enrollments",
+    "enrollment_check",
+    "course_roster",
+    "completed_lessons",
+]
+
+
+@pytest.fixture(scope="module")
+def analyzed(app, seeded):
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            db.session.execute(text("ANALYZE"))
+        else:
+            for table in ("courses", "lessons", "enrollments", "progress"):
+                db.session.execute(text(f"ANALYZE TABLE {table}"))
+        db.session.commit()
+    return seeded
+
+
+@pytest.mark.parametrize("name", QUERY_NAMES)
+def test_hot_query_uses_index(app, analyzed, name):
+    user_id = analyzed.power_learner_ids[0]
+    course_id = analyzed.popular_course_ids[0]
+    with app.app_context():
+        assert_uses_index(hot_queries(user_id, course_id)[name], name)
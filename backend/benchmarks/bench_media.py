@@ -0,0 +1,98 @@
+import os
+import time
+import tracemalloc
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Course, Lesson, User
+
+# One MEDIA_MB file uploaded in MEDIA_CHUNK_BYTES chunks and downloaded back; peak
+# Python memory should stay around one chunk regardless of the file size.
+MEDIA_MB = int(os.getenv("BENCH_MEDIA_MB", "256"))
+CHUNK = 8 * 1024 * 1024
+
+
+@pytest.fixture(scope="module", params=["local", "object"])
+def media_app(request, tmp_path_factory):
+    from config import TestConfig
+
+    class MediaBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('media') / 'media.sqlite3'}"
+        MEDIA_ROOT = str(tmp_path_factory.mktemp("media-root"))
+        MEDIA_STORAGE = request.param
+        MEDIA_CHUNK_BYTES = CHUNK
+
+    app = create_app(MediaBenchConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(name="i", email="i@example.com", password_hash="x", role="instructor")
+        db.session.add(user)
+        db.session.flush()
+        course = Course(title="Media", description="", level="A1", instructor_id=user.id, next_slot=1)
+        db.session.add(course)
+        db.session.flush()
+        lesson = Lesson(title="Listening", content="", order_index=1, slot=0, course_id=course.id)
+        db.session.add(lesson)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        yield app, lesson.id, headers
+
+
+def _upload(client, lesson_id, headers):
+    size = MEDIA_MB * 1024 * 1024
+    r = client.post(
+        f"/lessons/{lesson_id}/media/uploads",
+        json={"filename": "big.mp4", "content_type": "video/mp4", "size": size},
+        headers=headers,
+    )
+    upload_id = r.get_json()["upload_id"]
+    block = os.urandom(CHUNK)  # random content per run, so nothing is deduplicated
+    for start in range(0, size, CHUNK):
+        r = client.put(
+            f"/media/uploads/{upload_id}",
+            data=block,
+            headers={**headers, "Content-Range": f"bytes {start}-{start + CHUNK - 1}/{size}"},
+        )
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()["id"]
+
+
+def _measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def test_upload_and_download_memory(media_app):
+    app, lesson_id, headers = media_app
+    client = app.test_client()
+    backend = app.config["MEDIA_STORAGE"]
+
+    media_id, elapsed, peak = _measure(lambda: _upload(client, lesson_id, headers))
+    print(f"\n[{backend}] upload {MEDIA_MB} MB: {elapsed:.2f}s, peak Python memory {peak / 1e6:.1f} MB")
+
+    def download():
+        r = client.get(f"/media/{media_id}", buffered=False)
+        total = sum(len(part) for part in r.response)
+        r.close()
+        return total
+
+    total, elapsed, peak = _measure(download)
+    assert total == MEDIA_MB * 1024 * 1024
+    print(f"[{backend}] download {MEDIA_MB} MB: {elapsed:.2f}s, peak Python memory {peak / 1e6:.1f} MB")
+
+    def seek():
+        r = client.get(f"/media/{media_id}", headers={"Range": "bytes=100000000-100999999"}, buffered=False)
+        total = sum(len(part) for part in r.response)
+        r.close()
+        return total
+
+    total, elapsed, peak = _measure(seek)
+    assert total == 1_000_000
+    print(f"[{backend}] 1 MB range from the middle: {elapsed * 1000:.1f} ms, peak {peak / 1e6:.1f} MB")
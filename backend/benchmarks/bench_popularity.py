@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import func
+
+from app import create_app, db
+from app.models import Course, Enrollment
+from app.popularity import reconcile
+from benchmarks.datagen import seed
+
+# The "most popular" catalog page (top POP_LIMIT courses): COUNT(*) over enrollments
+# on every request vs the enrollment_count column read through its index. The
+# dataset is bigger than the shared one so the GROUP BY has something to chew on.
+POP_USERS = int(os.getenv("BENCH_POP_USERS", "20000"))
+POP_COURSES = int(os.getenv("BENCH_POP_COURSES", "2000"))
+POP_LIMIT = 20
+
+
+@pytest.fixture(scope="module")
+def popularity_app(tmp_path_factory):
+    from config import TestConfig
+
+    class PopularityBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('popularity') / 'pop.sqlite3'}"
+
+    app = create_app(PopularityBenchConfig)
+    with app.app_context():
+        db.create_all()
+        seeded = seed(users=POP_USERS, courses=POP_COURSES, lessons_per_course=5)
+        # The seed bulk-inserts enrollments; the counters start from a reconcile
+        started = time.perf_counter()
+        stats = reconcile()
+        print(f"\n{seeded.summary()}\nreconcile: {stats['courses']} courses in {time.perf_counter() - started:.2f}s")
+        db.session.execute(db.text("ANALYZE"))
+    return app
+
+
+def _count_star():
+    return (
+        db.session.query(Course.id, func.count(Enrollment.id).label("n"))
+        .outerjoin(Enrollment, Enrollment.course_id == Course.id)
+        .filter(Course.archived_at.is_(None))
+        .group_by(Course.id)
+        .order_by(func.count(Enrollment.id).desc(), Course.id.desc())
+        .limit(POP_LIMIT)
+        .all()
+    )
+
+
+def _counter():
+    return (
+        db.session.query(Course.id, Course.enrollment_count)
+        .filter(Course.archived_at.is_(None))
+        .order_by(Course.enrollment_count.desc(), Course.id.desc())
+        .limit(POP_LIMIT)
+        .all()
+    )
+
+
+def test_top_courses_same_answer(popularity_app):
+    with popularity_app.app_context():
+        assert [tuple(r) for r in _count_star()] == [tuple(r) for r in _counter()]
+
+
+def test_top_courses_count_star(benchmark, popularity_app):
+    with popularity_app.app_context():
+        benchmark(_count_star)
+
+
+def test_top_courses_counter(benchmark, popularity_app):
+    with popularity_app.app_context():
+        benchmark(_counter)
+
+
+def test_catalog_popular_request(benchmark, popularity_app):
+    client = popularity_app.test_client()
+    assert client.get(f"/courses?sort=popular&limit={POP_LIMIT}").status_code == 200
+    benchmark(client.get, f"/courses?sort=popular&limit={POP_LIMIT}")
@@ -0,0 +1,134 @@
+import os
+import tracemalloc
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select, text
+
+from app import create_app, db
+from app.models import Lesson, Progress
+from app.progress_bitmap import course_matrix, covers, lessons_mask, popcount, unpack
+from benchmarks.datagen import seed
+
+# One course with ROSTER_STUDENTS students and ROSTER_LESSONS lessons; completion
+# is a prefix of the course, 30% on average (see benchmarks.datagen).
+ROSTER_STUDENTS = int(os.getenv("BENCH_ROSTER_STUDENTS", "5000"))
+ROSTER_LESSONS = int(os.getenv("BENCH_ROSTER_LESSONS", "200"))
+THROUGH = ROSTER_LESSONS // 4
+
+
+@pytest.fixture(scope="module")
+def course(tmp_path_factory):
+    from config import TestConfig
+
+    class RosterBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('roster') / 'roster.sqlite3'}"
+
+    app = create_app(RosterBenchConfig)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    # 2% of users are instructors; with one course every student enrolls in it
+    seeded = seed(users=int(ROSTER_STUDENTS / 0.98) + 1, courses=1, lessons_per_course=ROSTER_LESSONS)
+    db.session.execute(text("ANALYZE"))
+    print(f"\n{seeded.summary()}")
+    yield seeded.course_ids[0]
+    ctx.pop()
+
+
+def _rows_matrix(course_id):
+    # Baseline: one Progress row per completed (student, lesson)
+    lessons = db.session.execute(
+        select(Lesson.id).where(Lesson.course_id == course_id).order_by(Lesson.order_index)
+    ).scalars().all()
+    column = {lesson_id: i for i, lesson_id in enumerate(lessons)}
+    rows = db.session.execute(
+        select(Progress.user_id, Progress.lesson_id)
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Lesson.course_id == course_id, Progress.completed.is_(True))
+    ).all()
+    users = {}
+    r = np.fromiter((users.setdefault(u, len(users)) for u, _ in rows), dtype=np.int64, count=len(rows))
+    c = np.fromiter((column[l] for _, l in rows), dtype=np.int64, count=len(rows))
+    matrix = np.zeros((len(users), len(lessons)), dtype=bool)
+    matrix[r, c] = True
+    return matrix
+
+
+def _bitmap_matrix(course_id):
+    _, n_slots, _, packed = course_matrix(course_id)
+    return unpack(packed, n_slots)
+
+
+def test_roster_matrix_equal(course):
+    a, b = _rows_matrix(course), _bitmap_matrix(course)
+    assert a.sum() == b.sum() and a.shape[1] == b.shape[1]
+
+
+def test_roster_matrix_progress_rows(benchmark, course):
+    benchmark(_rows_matrix, course)
+
+
+def test_roster_matrix_bitmaps(benchmark, course):
+    benchmark(_bitmap_matrix, course)
+
+
+def test_percentages_progress_rows(benchmark, course):
+    def run():
+        return db.session.execute(
+            select(Progress.user_id, func.count())
+            .join(Lesson, Lesson.id == Progress.lesson_id)
+            .where(Lesson.course_id == course, Progress.completed.is_(True))
+            .group_by(Progress.user_id)
+        ).all()
+
+    benchmark(run)
+
+
+def test_percentages_bitmaps(benchmark, course):
+    def run():
+        lessons, _, _, packed = course_matrix(course)
+        return popcount(packed) * 100.0 / len(lessons)
+
+    benchmark(run)
+
+
+def test_completed_through_progress_rows(benchmark, course):
+    def run():
+        first_ids = select(Lesson.id).where(Lesson.course_id == course).order_by(Lesson.order_index).limit(THROUGH)
+        return db.session.execute(
+            select(func.count()).select_from(
+                select(Progress.user_id)
+                .where(Progress.lesson_id.in_(first_ids), Progress.completed.is_(True))
+                .group_by(Progress.user_id)
+                .having(func.count() == THROUGH)
+                .subquery()
+            )
+        ).scalar()
+
+    benchmark(run)
+
+
+def test_completed_through_bitmaps(benchmark, course):
+    def run():
+        lessons, n_slots, _, packed = course_matrix(course)
+        return int(covers(packed, lessons_mask(lessons[:THROUGH], n_slots)).sum())
+
+    benchmark(run)
+
+
+def test_memory(course):
+    sizes = dict(db.session.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all())
+    print(
+        "\non disk: progress + indexes %.1f MB, course_progress + indexes %.2f MB"
+        % (
+            sum(v for k, v in sizes.items() if "progress" in k and "course_progress" not in k) / 1e6,
+            sum(v for k, v in sizes.items() if "course_progress" in k) / 1e6,
+        )
+    )
+    for name, fn in (("progress rows", _rows_matrix), ("bitmaps", _bitmap_matrix)):
+        tracemalloc.start()
+        fn(course)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"peak Python memory building the roster from {name}: {peak / 1e6:.1f} MB")
@@ -0,0 +1,87 @@
+import os
+import time
+import tracemalloc
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app import create_app, db
+from app.lifecycle import delete_course, purge
+from app.models import Course, CourseProgress, Enrollment, Lesson, Progress, ProgressArchive
+from benchmarks.datagen import seed
+
+# Deleting one large course (PURGE_STUDENTS students x PURGE_LESSONS lessons, ~30%
+# completion): one big transaction vs the soft delete + chunked purge. The number
+# that matters for other requests is the longest transaction, which bounds how long
+# rows of `progress` stay locked.
+PURGE_STUDENTS = int(os.getenv("BENCH_PURGE_STUDENTS", "5000"))
+PURGE_LESSONS = int(os.getenv("BENCH_PURGE_LESSONS", "200"))
+BATCH_SIZE = int(os.getenv("BENCH_PURGE_BATCH", "2000"))
+
+
+@pytest.fixture
+def course(tmp_path):
+    from config import TestConfig
+
+    class PurgeBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'purge.sqlite3'}"
+        MEDIA_ROOT = str(tmp_path / "media")
+
+    app = create_app(PurgeBenchConfig)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    seeded = seed(users=int(PURGE_STUDENTS / 0.98) + 1, courses=1, lessons_per_course=PURGE_LESSONS)
+    db.session.execute(text("ANALYZE"))
+    rows = db.session.query(func.count(Progress.id)).scalar()
+    print(f"\n{seeded.summary()} ({rows} progress rows)")
+    yield db.session.get(Course, seeded.course_ids[0])
+    ctx.pop()
+
+
+def _measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def _remaining(course_id):
+    lesson_ids = select(Lesson.__table__.c.id).where(Lesson.__table__.c.course_id == course_id)
+    return (
+        db.session.query(func.count(Progress.id)).filter(Progress.lesson_id.in_(lesson_ids)).scalar()
+        + db.session.query(func.count(Enrollment.id)).filter(Enrollment.course_id == course_id).scalar()
+        + db.session.query(func.count()).select_from(CourseProgress).filter(CourseProgress.course_id == course_id).scalar()
+    )
+
+
+def test_delete_single_transaction(course):
+    # Baseline: bulk DELETEs of every child table in one transaction (no ORM loads)
+    def run():
+        lesson_ids = select(Lesson.__table__.c.id).where(Lesson.__table__.c.course_id == course.id)
+        db.session.execute(Progress.__table__.delete().where(Progress.__table__.c.lesson_id.in_(lesson_ids)))
+        db.session.execute(Enrollment.__table__.delete().where(Enrollment.__table__.c.course_id == course.id))
+        db.session.execute(CourseProgress.__table__.delete().where(CourseProgress.__table__.c.course_id == course.id))
+        db.session.execute(Lesson.__table__.delete().where(Lesson.__table__.c.course_id == course.id))
+        db.session.execute(Course.__table__.delete().where(Course.__table__.c.id == course.id))
+        db.session.commit()
+
+    _, elapsed, peak = _measure(run)
+    print(f"single transaction: {elapsed * 1000:.0f} ms locked, peak Python memory {peak / 1e6:.1f} MB")
+
+
+def test_delete_chunked_purge(course):
+    course_id = course.id
+    _, elapsed, _ = _measure(lambda: (delete_course(course), db.session.commit()))
+    print(f"soft delete request: {elapsed * 1000:.1f} ms")
+
+    result, elapsed, peak = _measure(lambda: purge(0, batch_size=BATCH_SIZE, pause=0))
+    assert _remaining(course_id) == 0
+    print(
+        f"purge: {elapsed * 1000:.0f} ms total in {result['chunks']} transactions, longest "
+        f"{result['max_chunk_ms']:.0f} ms, peak Python memory {peak / 1e6:.1f} MB, "
+        f"{db.session.query(func.count(ProgressArchive.id)).scalar()} progress rows archived"
+    )
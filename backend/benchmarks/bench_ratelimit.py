@@ -0,0 +1,37 @@
+import pytest
+
+from app import create_app
+from app.ratelimit import MemoryStore
+
+# Cost of the rate-limit check: the store operation alone, and a whole request to a
+# cheap endpoint with and without the limiter.
+
+
+def test_memory_store_take(benchmark):
+    store = MemoryStore()
+    benchmark(store.take, "auth.login:ip:127.0.0.1", 5 / 60, 10)
+
+
+def test_memory_store_take_many_keys(benchmark):
+    # Full store: every call also evicts the least recently used bucket
+    store = MemoryStore(max_keys=100_000)
+    for i in range(100_000):
+        store.take(f"default:ip:10.0.{i // 256}.{i % 256}", 10.0, 100)
+    keys = iter(range(10**9))
+    benchmark(lambda: store.take(f"default:ip:new-{next(keys)}", 10.0, 100))
+
+
+@pytest.fixture(params=[False, True], ids=["limiter-off", "limiter-on"])
+def limited_client(request):
+    from config import TestConfig
+
+    class RateLimitBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+        RATELIMIT_ENABLED = request.param
+        RATELIMIT_DEFAULT = "1000000/second"
+
+    return create_app(RateLimitBenchConfig).test_client()
+
+
+def test_request_overhead(benchmark, limited_client):
+    benchmark(limited_client.get, "/health/live")
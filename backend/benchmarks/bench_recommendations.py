@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.recommendations import compute_neighbors
+
+REC_USERS = int(os.getenv("BENCH_REC_USERS", "400000"))
+REC_COURSES = int(os.getenv("BENCH_REC_COURSES", "5000"))
+REC_PER_USER = float(os.getenv("BENCH_REC_ENROLLMENTS_PER_USER", "5"))  # ~2M enrollments by default
+
+
+@pytest.fixture(scope="module")
+def enrollments():
+    # Same shape as benchmarks.datagen: Zipf course popularity, Pareto courses per user
+    rng = np.random.default_rng(42)
+    per_user = np.minimum(rng.pareto(1.5, REC_USERS) * REC_PER_USER / 2 + 1, REC_COURSES).astype(np.int64)
+    popularity = 1.0 / np.arange(1, REC_COURSES + 1) ** 1.1
+    users = np.repeat(np.arange(REC_USERS), per_user)
+    courses = rng.choice(REC_COURSES, size=users.size, p=popularity / popularity.sum())
+    # (user, course) is unique in the table
+    pairs = np.unique(users * REC_COURSES + courses)
+    print(f"\n{pairs.size:,} enrollments, {REC_USERS:,} users, {REC_COURSES:,} courses")
+    return pairs // REC_COURSES, pairs % REC_COURSES
+
+
+def test_full_build(benchmark, enrollments):
+    users, courses = enrollments
+    result = benchmark.pedantic(compute_neighbors, args=(users, courses), rounds=3, iterations=1)
+    assert len(result) > REC_COURSES * 0.9
+
+
+def test_incremental_build(benchmark, enrollments):
+    # 1% of students enrolled since the last build
+    users, courses = enrollments
+    counts = dict(zip(*np.unique(courses, return_counts=True)))
+    new_users = np.unique(users)[:: 100]
+    mask = np.isin(users, new_users)
+    affected = set(np.unique(courses[mask]).tolist())
+    related = np.isin(users, np.unique(users[np.isin(courses, list(affected))]))
+
+    result = benchmark.pedantic(
+        compute_neighbors,
+        args=(users[related], courses[related]),
+        kwargs={"row_courses": affected, "course_counts": counts},
+        rounds=3,
+        iterations=1,
+    )
+    assert set(result) == affected
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Course, Lesson
+from benchmarks.datagen import seed
+
+# Reversing the order of one course's lessons (REORDER_LESSONS of them): one PATCH
+# per lesson, each with its If-Match, vs one PUT /courses/<id>/lessons/order.
+REORDER_LESSONS = int(os.getenv("BENCH_REORDER_LESSONS", "200"))
+
+
+@pytest.fixture
+def course(tmp_path):
+    from config import TestConfig
+
+    class ReorderBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'reorder.sqlite3'}"
+        RATELIMIT_ENABLED = False
+
+    app = create_app(ReorderBenchConfig)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    seeded = seed(users=100, courses=1, lessons_per_course=REORDER_LESSONS)
+    course = db.session.get(Course, seeded.course_ids[0])
+    token = create_access_token(identity=str(course.instructor_id))
+    yield app.test_client(), course.id, {"Authorization": f"Bearer {token}"}
+    ctx.pop()
+
+
+def _lessons(client, course_id):
+    resp = client.get(f"/courses/{course_id}/lessons")
+    return resp.get_json(), resp.headers["ETag"]
+
+
+def _reversed_order(course_id):
+    return db.session.query(Lesson.id).filter_by(course_id=course_id).order_by(Lesson.order_index.desc(), Lesson.id.desc()).all()
+
+
+def test_reorder_one_patch_per_lesson(course):
+    client, course_id, headers = course
+    lessons, _ = _lessons(client, course_id)
+    target = [i for (i,) in _reversed_order(course_id)]
+
+    started = time.perf_counter()
+    for position, lesson_id in enumerate(target, start=1):
+        etag = client.get(f"/lessons/{lesson_id}").headers["ETag"]
+        resp = client.patch(f"/lessons/{lesson_id}", json={"order_index": position}, headers={**headers, "If-Match": etag})
+        assert resp.status_code == 200
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(lessons)} lessons, one PATCH each: {elapsed * 1000:.0f} ms, {2 * len(target)} requests")
+
+
+def test_reorder_bulk(course):
+    client, course_id, headers = course
+    lessons, etag = _lessons(client, course_id)
+    target = [i for (i,) in _reversed_order(course_id)]
+
+    started = time.perf_counter()
+    resp = client.put(f"/courses/{course_id}/lessons/order", json={"lesson_ids": target}, headers={**headers, "If-Match": etag})
+    elapsed = time.perf_counter() - started
+    assert resp.status_code == 200
+    assert [l["id"] for l in _lessons(client, course_id)[0]] == target
+    print(f"\n{len(lessons)} lessons, one PUT: {elapsed * 1000:.1f} ms, {resp.get_json()['moved']} lessons moved")
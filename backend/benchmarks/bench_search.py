@@ -0,0 +1,70 @@
+import os
+import time
+
+import pytest
+
+from app import create_app, db
+from app.search import MemorySearchEngine, SQLiteSearchEngine
+from benchmarks.datagen import seed
+
+SEARCH_COURSES = int(os.getenv("BENCH_SEARCH_COURSES", "1000"))
+SEARCH_LESSONS = int(os.getenv("BENCH_SEARCH_LESSONS_PER_COURSE", "100"))  # 100k lessons by default
+
+QUERIES = {
+    "rare_term": "spanish idioms",
+    "common_term": "lesson",
+    "course_title": "japanese advanced",
+}
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    from config import TestConfig
+
+    class SearchBenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('search') / 'search.sqlite3'}"
+
+    app = create_app(SearchBenchConfig)
+    with app.app_context():
+        db.create_all()
+        seed(users=200, courses=SEARCH_COURSES, lessons_per_course=SEARCH_LESSONS)
+    return app
+
+
+@pytest.fixture(scope="module", params=["memory", "sqlite"])
+def engine(request, corpus):
+    ctx = corpus.app_context()
+    ctx.push()
+    engine = MemorySearchEngine() if request.param == "memory" else SQLiteSearchEngine(db)
+    start = time.perf_counter()
+    if request.param == "memory":
+        engine._ensure_built()
+    else:
+        engine._ensure_table()
+    print(f"\n{request.param}: index built in {time.perf_counter() - start:.2f}s")
+    yield engine
+    ctx.pop()
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_search(benchmark, engine, name):
+    results = benchmark(engine.search, QUERIES[name], limit=20)
+    assert results
+
+
+def test_suggest(benchmark, engine):
+    results = benchmark(engine.suggest, "span", limit=10)
+    assert results
+
+
+def test_incremental_update(benchmark, engine):
+    from app.models import Lesson
+
+    lesson = Lesson.query.first()
+
+    def update():
+        # The write views commit the index change with their own
+        engine.index_lesson(lesson)
+        db.session.commit()
+
+    benchmark(update)
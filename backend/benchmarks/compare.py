@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+
+
+# Compares two JSON reports (either from `python -m benchmarks.scenarios --out`
+# or from `pytest --benchmark-json`) and exits non-zero on regressions.
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "benchmarks" in data:  # pytest-benchmark
+        return {b["name"]: b["stats"]["median"] * 1000 for b in data["benchmarks"]}
+    if "scenario" in data:  # scenario runner
+        return {name: stats["p95_ms"] for name, stats in data["scenario"]["tasks"].items()}
+    raise SystemExit(f"{path}: unrecognised benchmark report")
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    rows, regressions = [], []
+    for name in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(name), current.get(name)
+        if old is None or new is None or old == 0:
+            rows.append((name, old, new, None))
+            continue
+        change = (new - old) / old
+        rows.append((name, old, new, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+
+    print(f"{'benchmark':<40} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+    for name, old, new, change in rows:
+        old_s = f"{old:.3f}" if old is not None else "-"
+        new_s = f"{new:.3f}" if new is not None else "-"
+        change_s = f"{change * 100:+.1f}%" if change is not None else "n/a"
+        flag = "  <-- regression" if name in regressions else ""
+        print(f"{name:<40} {old_s:>12} {new_s:>12} {change_s:>9}{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from benchmarks.datagen import seed
+
+BENCH_USERS = int(os.getenv("BENCH_USERS", "2000"))
+BENCH_COURSES = int(os.getenv("BENCH_COURSES", "100"))
+BENCH_LESSONS = int(os.getenv("BENCH_LESSONS", "20"))
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    from config import TestConfig
+
+    url = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{tmp_path_factory.mktemp('bench') / 'bench.sqlite3'}"
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    with app.app_context():
+        return seed(users=BENCH_USERS, courses=BENCH_COURSES, lessons_per_course=BENCH_LESSONS)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def power_learner(app, seeded):
+    # The heaviest "My Courses" page in the dataset
+    user_id = max(seeded.power_learner_ids, key=lambda uid: len(seeded.courses_by_user.get(uid, [])))
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return user_id, {"Authorization": f"Bearer {token}"}
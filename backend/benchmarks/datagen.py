@@ -0,0 +1,235 @@
+import random
+from datetime import datetime, timedelta
+
+import bcrypt
+
+from app import db
+from app.models import Course, CourseProgress, Enrollment, Lesson, Progress, User
+from app.progress_bitmap import pack_slots
+
+BENCH_PASSWORD = "bench-password"
+
+LEVELS = ("Beginner", "Elementary", "Intermediate", "Upper Intermediate", "Advanced")
+LANGUAGES = ("Spanish", "French", "German", "Italian", "Japanese", "Korean", "Mandarin", "Portuguese", "Arabic", "Hindi")
+TOPICS = ("Greetings", "Numbers", "Food", "Travel", "Family", "Work", "Weather", "Shopping", "Health", "Verbs", "Past tense", "Idioms")
+
+
+class SeedResult:
+    def __init__(self):
+        self.user_ids = []
+        self.student_ids = []
+        self.instructor_ids = []
+        self.power_learner_ids = []
+        self.course_ids = []
+        self.popular_course_ids = []
+        self.lesson_ids_by_course = {}
+        self.enrollments = []  # (user_id, course_id)
+        self.courses_by_user = {}
+        self.progress_rows = 0
+
+    def summary(self) -> dict:
+        return {
+            "users": len(self.user_ids),
+            "instructors": len(self.instructor_ids),
+            "power_learners": len(self.power_learner_ids),
+            "courses": len(self.course_ids),
+            "lessons": sum(len(v) for v in self.lesson_ids_by_course.values()),
+            "enrollments": len(self.enrollments),
+            "progress": self.progress_rows,
+        }
+
+
+def _bulk_insert(model, rows, chunk_size: int):
+    for i in range(0, len(rows), chunk_size):
+        db.session.execute(model.__table__.insert(), rows[i:i + chunk_size])
+
+
+def _zipf_weights(n: int, s: float):
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def _weighted_sample(rng: random.Random, population, cum_weights, k: int):
+    # random.choices with replacement, deduplicated; fine for k << len(population)
+    picked = []
+    seen = set()
+    attempts = 0
+    while len(picked) < k and attempts < k * 10:
+        attempts += 1
+        item = rng.choices(population, cum_weights=cum_weights, k=1)[0]
+        if item not in seen:
+            seen.add(item)
+            picked.append(item)
+    return picked
+
+
+def seed(
+    users: int = 1000,
+    courses: int = 50,
+    lessons_per_course: int = 20,
+    instructor_ratio: float = 0.02,
+    power_learner_ratio: float = 0.05,
+    popularity_skew: float = 1.1,
+    max_enrollments_per_user: int = 25,
+    random_seed: int = 42,
+    chunk_size: int = 5000,
+    now: datetime | None = None,
+) -> SeedResult:
+    # Seeds a realistic, reproducible dataset with bulk INSERTs and explicit ids.
+    #
+    # Course popularity follows a Zipf distribution (a handful of courses get most
+    # enrollments); enrollments per user are Pareto distributed, and "power
+    # learners" enroll in more courses and finish most of them.
+    rng = random.Random(random_seed)
+    now = now or datetime.utcnow()
+    result = SeedResult()
+
+    # One real bcrypt hash shared by every user: /auth/login still pays full cost,
+    # seeding does not.
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    base_user = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+    base_course = (db.session.query(db.func.max(Course.id)).scalar() or 0) + 1
+    base_lesson = (db.session.query(db.func.max(Lesson.id)).scalar() or 0) + 1
+
+    n_instructors = max(1, int(users * instructor_ratio))
+    n_power = int((users - n_instructors) * power_learner_ratio)
+
+    user_rows = []
+    for i in range(users):
+        uid = base_user + i
+        if i < n_instructors:
+            role = "instructor"
+            result.instructor_ids.append(uid)
+        else:
+            role = "student"
+            result.student_ids.append(uid)
+            if i < n_instructors + n_power:
+                result.power_learner_ids.append(uid)
+        user_rows.append({
+            "id": uid,
+            "name": f"Bench User {uid}",
+            "email": f"bench{uid}@example.com",
+            "password_hash": password_hash,
+            "role": role,
+            "created_at": now - timedelta(days=rng.randint(0, 720)),
+        })
+        result.user_ids.append(uid)
+    _bulk_insert(User, user_rows, chunk_size)
+
+    # Instructors are skewed too: a few instructors own many courses
+    instructor_cum = _cumulative(_zipf_weights(len(result.instructor_ids), 0.8))
+    course_rows, lesson_rows = [], []
+    lesson_id = base_lesson
+    for i in range(courses):
+        cid = base_course + i
+        language = LANGUAGES[i % len(LANGUAGES)]
+        course_rows.append({
+            "id": cid,
+            "title": f"{language} {LEVELS[i % len(LEVELS)]} #{cid}",
+            "description": f"Learn {language} step by step: " + ", ".join(rng.sample(TOPICS, 4)),
+            "level": LEVELS[i % len(LEVELS)],
+            "instructor_id": rng.choices(result.instructor_ids, cum_weights=instructor_cum, k=1)[0],
+            "created_at": now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400)),
+            "next_slot": lessons_per_course,
+        })
+        result.course_ids.append(cid)
+
+        ids = []
+        for position in range(1, lessons_per_course + 1):
+            topic = rng.choice(TOPICS)
+            lesson_rows.append({
+                "id": lesson_id,
+                "title": f"{topic} {position}",
+                "content": f"{language} lesson about {topic.lower()}. " * rng.randint(5, 40),
+                "order_index": position,
+                "slot": position - 1,
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+                "course_id": cid,
+            })
+            ids.append(lesson_id)
+            lesson_id += 1
+        result.lesson_ids_by_course[cid] = ids
+    _bulk_insert(Course, course_rows, chunk_size)
+    _bulk_insert(Lesson, lesson_rows, chunk_size)
+
+    # Popularity rank is independent of course id / creation date
+    by_popularity = result.course_ids[:]
+    rng.shuffle(by_popularity)
+    result.popular_course_ids = by_popularity[: max(1, courses // 10)]
+    course_cum = _cumulative(_zipf_weights(courses, popularity_skew))
+
+    power = set(result.power_learner_ids)
+    enrollment_rows, progress_rows, bitmap_rows = [], [], []
+    for uid in result.student_ids:
+        if uid in power:
+            k = rng.randint(max_enrollments_per_user // 2, max_enrollments_per_user)
+        else:
+            k = min(max_enrollments_per_user, int(rng.paretovariate(1.6)))
+        for cid in _weighted_sample(rng, by_popularity, course_cum, min(k, courses)):
+            enrolled_at = now - timedelta(days=rng.randint(0, 180), seconds=rng.randint(0, 86400))
+            enrollment_rows.append({"user_id": uid, "course_id": cid, "enrolled_at": enrolled_at})
+            result.enrollments.append((uid, cid))
+            result.courses_by_user.setdefault(uid, []).append(cid)
+
+            # Completed lessons are a prefix of the course (students go in order)
+            fraction = rng.betavariate(5, 1.5) if uid in power else rng.betavariate(1.2, 3)
+            lesson_ids = result.lesson_ids_by_course[cid]
+            done = int(len(lesson_ids) * fraction)
+            for lid in lesson_ids[:done]:
+                progress_rows.append({
+                    "user_id": uid,
+                    "lesson_id": lid,
+                    "completed": True,
+                    "completed_at": enrolled_at + timedelta(hours=rng.randint(1, 24 * 60)),
+                })
+            if done:
+                bitmap_rows.append({
+                    "user_id": uid,
+                    "course_id": cid,
+                    "completed_bits": pack_slots(range(done)),
+                    "completed_count": done,
+                })
+    _bulk_insert(Enrollment, enrollment_rows, chunk_size)
+    _bulk_insert(Progress, progress_rows, chunk_size)
+    _bulk_insert(CourseProgress, bitmap_rows, chunk_size)
+    result.progress_rows = len(progress_rows)
+
+    db.session.commit()
+    return result
+
+
+def _cumulative(weights):
+    total = 0.0
+    out = []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description="Seed a LanguageLift database with synthetic data")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--lessons-per-course", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--config", default="config.Config")
+    parser.add_argument("--create-all", action="store_true", help="create tables first (no migrations)")
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        if args.create_all:
+            db.create_all()
+        res = seed(
+            users=args.users,
+            courses=args.courses,
+            lessons_per_course=args.lessons_per_course,
+            random_seed=args.seed,
+        )
+        print(json.dumps(res.summary(), indent=2))
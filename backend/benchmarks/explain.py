@@ -0,0 +1,61 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import Course, Enrollment, Lesson, Progress
+
+
+# EXPLAIN helpers for checking that hot-path queries are index backed.
+# Supported: SQLite (EXPLAIN QUERY PLAN) and MySQL (EXPLAIN).
+def _sql(query) -> str:
+    stmt = getattr(query, "statement", query)
+    return str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(query) -> list[dict]:
+    sql = _sql(query)
+    if db.engine.dialect.name == "sqlite":
+        rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql)).mappings().all()
+        return [{"detail": r["detail"]} for r in rows]
+    if db.engine.dialect.name == "mysql":
+        return [dict(r) for r in db.session.execute(text("EXPLAIN " + sql)).mappings().all()]
+    raise NotImplementedError(f"EXPLAIN not supported for {db.engine.dialect.name}")
+
+
+def plan_problems(query) -> list[str]:
+    # Full table scans and sorts that no index satisfies; empty means the plan is fine.
+    problems = []
+    for row in explain(query):
+        if "detail" in row:
+            detail = row["detail"]
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                problems.append(f"full scan: {detail}")
+            elif "USE TEMP B-TREE" in detail:
+                problems.append(f"unindexed sort: {detail}")
+        else:
+            if row.get("type") == "ALL":
+                problems.append(f"full scan: {row.get('table')}")
+            if "filesort" in (row.get("Extra") or ""):
+                problems.append(f"unindexed sort: {row.get('table')}")
+    return problems
+
+
+def assert_uses_index(query, name: str = ""):
+    problems = plan_problems(query)
+    assert not problems, f"{name or _sql(query)}: " + "; ".join(problems)
+
+
+def hot_queries(user_id: int, course_id: int) -> dict:
+    # The queries the API issues on every catalog / course / My Courses request
+    return {
+        "catalog": Course.query.order_by(Course.created_at.desc()),
+        "courses_by_instructor": Course.query.filter(Course.instructor_id == user_id),
+        "course_lessons": Lesson.query.filter_by(course_id=course_id).order_by(Lesson.order_index.asc()),
+        "my_enrollments": Enrollment.query.filter_by(user_id=user_id).order_by(Enrollment.enrolled_at.desc()),
+        "enrollment_check": Enrollment.query.filter_by(user_id=user_id, course_id=course_id),
+        "course_roster": Enrollment.query.filter_by(course_id=course_id).order_by(Enrollment.id.asc()),
+        "completed_lessons": (
+            db.session.query(Progress.lesson_id)
+            .join(Lesson, Lesson.id == Progress.lesson_id)
+            .filter(Progress.user_id == user_id, Progress.completed.is_(True), Lesson.course_id == course_id)
+        ),
+    }
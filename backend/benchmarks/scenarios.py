@@ -0,0 +1,207 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+
+from benchmarks.datagen import BENCH_PASSWORD
+
+
+# -----------------------
+# Tasks (one simulated user action each, mirroring the Dash pages)
+# -----------------------
+def login(user):
+    r = user.client.post("/auth/login", json={"email": user.email, "password": BENCH_PASSWORD})
+    return r.status_code
+
+
+def browse_catalog(user):
+    return user.client.get("/courses").status_code
+
+
+def course_detail(user):
+    course_id = user.pick_course()
+    r1 = user.client.get(f"/courses/{course_id}")
+    r2 = user.client.get(f"/courses/{course_id}/lessons")
+    return max(r1.status_code, r2.status_code)
+
+
+def complete_lesson(user):
+    if not user.enrolled:
+        return 200
+    course_id = user.rng.choice(user.enrolled)
+    lesson_id = user.rng.choice(user.seed.lesson_ids_by_course[course_id])
+    return user.client.post(f"/lessons/{lesson_id}/complete", headers=user.headers).status_code
+
+
+def my_courses(user):
+    # Same calls as load_my_courses in the Dash app
+    r = user.client.get("/me/enrollments", headers=user.headers)
+    status = r.status_code
+    for e in r.get_json() or []:
+        pr = user.client.get(f"/courses/{e['course']['id']}/progress", headers=user.headers)
+        status = max(status, pr.status_code)
+    return status
+
+
+DEFAULT_TASKS = {
+    "browse_catalog": (browse_catalog, 5),
+    "course_detail": (course_detail, 4),
+    "my_courses": (my_courses, 3),
+    "complete_lesson": (complete_lesson, 2),
+    "login": (login, 1),
+}
+
+
+class VirtualUser:
+    def __init__(self, app, seed_result, user_id: int, rng: random.Random):
+        self.client = app.test_client()
+        self.seed = seed_result
+        self.user_id = user_id
+        self.email = f"bench{user_id}@example.com"
+        self.rng = rng
+        self.enrolled = seed_result.courses_by_user.get(user_id, [])
+        with app.app_context():
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+    def pick_course(self):
+        if self.rng.random() < 0.7:
+            return self.rng.choice(self.seed.popular_course_ids)
+        return self.rng.choice(self.seed.course_ids)
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_scenario(app, seed_result, users: int = 10, duration: float = 10.0, tasks=None,
+                 random_seed: int = 1, wait: float = 0.0) -> dict:
+    # Locust-style runner: `users` threads, each picking weighted tasks until
+    # `duration` elapses, against the in-process Flask test client.
+    tasks = tasks or DEFAULT_TASKS
+    names = list(tasks)
+    weights = [tasks[n][1] for n in names]
+    samples = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    master_rng = random.Random(random_seed)
+    population = seed_result.power_learner_ids + seed_result.student_ids
+    picked = [master_rng.choice(population) for _ in range(users)]
+
+    def worker(user_id: int, rng_seed: int):
+        rng = random.Random(rng_seed)
+        user = VirtualUser(app, seed_result, user_id, rng)
+        local = {n: [] for n in names}
+        local_errors = {n: 0 for n in names}
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=weights, k=1)[0]
+            start = time.perf_counter()
+            status = tasks[name][0](user)
+            local[name].append(time.perf_counter() - start)
+            if status >= 400:
+                local_errors[name] += 1
+            if wait:
+                time.sleep(rng.uniform(0, wait))
+        with lock:
+            for n in names:
+                samples[n].extend(local[n])
+                errors[n] += local_errors[n]
+
+    threads = [
+        threading.Thread(target=worker, args=(uid, master_rng.randrange(1 << 30)))
+        for uid in picked
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for n in names:
+        values = sorted(samples[n])
+        report[n] = {
+            "requests": len(values),
+            "errors": errors[n],
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0,
+            "p50_ms": round(_percentile(values, 50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 99) * 1000, 3),
+        }
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 3),
+        "total_requests": sum(len(v) for v in samples.values()),
+        "tasks": report,
+    }
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app import create_app, db
+    from benchmarks.datagen import seed
+
+    parser = argparse.ArgumentParser(description="Run the LanguageLift load scenario against the Flask test client")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--seed-users", type=int, default=1000)
+    parser.add_argument("--seed-courses", type=int, default=50)
+    parser.add_argument("--seed-lessons", type=int, default=20)
+    parser.add_argument("--database-url", default="", help="defaults to a fresh SQLite file")
+    parser.add_argument("--out", default="", help="write the JSON report here")
+    args = parser.parse_args()
+
+    db_url = args.database_url
+    if not db_url:
+        path = os.path.abspath("bench.sqlite3")
+        if os.path.exists(path):
+            os.remove(path)
+        db_url = f"sqlite:///{path}"
+
+    from config import TestConfig
+
+    TestConfig.SQLALCHEMY_DATABASE_URI = db_url
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seeded = seed(users=args.seed_users, courses=args.seed_courses, lessons_per_course=args.seed_lessons)
+
+    result = {
+        "environment": environment_info(),
+        "dataset": seeded.summary(),
+        "database": db_url.split("://")[0],
+        "scenario": run_scenario(app, seeded, users=args.users, duration=args.duration),
+    }
+    text = json.dumps(result, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
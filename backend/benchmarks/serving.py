@@ -0,0 +1,176 @@
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.scenarios import _percentile, environment_info
+
+# Throughput of each gunicorn worker model on the catalog endpoints.
+#
+#   python -m benchmarks.serving --workers sync gthread gevent --concurrency 32 --duration 20
+#   python -m benchmarks.serving --workers gthread uvicorn --processes 2 --concurrency 16 64 256
+#
+# Seeds a SQLite file (or uses --database-url), starts `gunicorn -c gunicorn.conf.py
+# wsgi:app` (asgi:app for uvicorn) once per worker class and drives it with
+# keep-alive HTTP clients at each concurrency. The resident memory of the master
+# and its workers is reported next to the throughput.
+
+ENDPOINTS = ("/courses", "/courses/{course_id}", "/courses/{course_id}/lessons")
+
+
+def _wait_ready(port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def _drive(port: int, course_ids, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(n: int):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, local_errors, i = [], 0, n
+        while time.perf_counter() < deadline:
+            path = ENDPOINTS[i % len(ENDPOINTS)].format(course_id=course_ids[i % len(course_ids)])
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _rss_mb(pid: int):
+    # Master + workers, from /proc (Linux only)
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids = [pid] + [int(p) for p in f.read().split()]
+        total = 0
+        for p in pids:
+            with open(f"/proc/{p}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        return round(total / 1024, 1)
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker models on the catalog endpoints")
+    parser.add_argument("--workers", nargs="+", default=["sync", "gthread", "gevent"],
+                        help="sync, gthread, gevent and/or uvicorn (serves asgi:app)")
+    parser.add_argument("--processes", type=int, default=0, help="GUNICORN_WORKERS (default: from cores)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[32])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--seed-courses", type=int, default=200)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args(argv)
+
+    db_url = args.database_url
+    if not db_url:
+        path = os.path.abspath("bench.sqlite3")
+        if os.path.exists(path):
+            os.remove(path)
+        db_url = f"sqlite:///{path}"
+
+    from app import create_app, db
+    from benchmarks.datagen import seed
+    from config import TestConfig
+
+    TestConfig.SQLALCHEMY_DATABASE_URI = db_url
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seeded = seed(users=1000, courses=args.seed_courses, lessons_per_course=20)
+        db.engine.dispose()
+
+    results = {}
+    for worker_class in args.workers:
+        env = dict(
+            os.environ,
+            DATABASE_URL=db_url,
+            GUNICORN_BIND=f"127.0.0.1:{args.port}",
+            GUNICORN_WORKER_CLASS=worker_class,
+            GUNICORN_ACCESSLOG="",
+            GUNICORN_LOGLEVEL="warning",
+            PROFILING_SAMPLE_RATE="0",
+        )
+        if args.processes:
+            env["GUNICORN_WORKERS"] = str(args.processes)
+        module = "asgi:app" if worker_class == "uvicorn" else "wsgi:app"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", module],
+            env=env,
+        )
+        try:
+            _wait_ready(args.port)
+            _drive(args.port, seeded.course_ids, args.concurrency[0], min(3.0, args.duration))  # warm-up
+            for concurrency in args.concurrency:
+                result = _drive(args.port, seeded.course_ids, concurrency, args.duration)
+                result["rss_mb"] = _rss_mb(proc.pid)
+                results.setdefault(worker_class, {})[concurrency] = result
+                print(worker_class, concurrency, json.dumps(result), flush=True)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=60)
+
+    report = {
+        "environment": environment_info(),
+        "database": db_url.split("://")[0],
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
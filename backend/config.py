@@ -1,17 +1,144 @@
 import os
+import tempfile
+from datetime import timedelta
 
 class Config:
     SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret")  # for flask-jwt-extended
 
+    # Short-lived access tokens, rotated refresh tokens (POST /auth/refresh) and a
+    # jti denylist checked on every request (app/revocation.py). "memory://" is per
+    # process; use redis://host:6379/0 so a logout is seen by every worker, and
+    # JWT_DENYLIST_BLOOM=1 to skip the Redis round trip for tokens never revoked.
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", "15")))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_DAYS", "30")))
+    JWT_DENYLIST_URL = os.getenv("JWT_DENYLIST_URL", "memory://")
+    JWT_DENYLIST_BLOOM = os.getenv("JWT_DENYLIST_BLOOM", "0") == "1"
+    JWT_DENYLIST_SYNC_INTERVAL = float(os.getenv("JWT_DENYLIST_SYNC_INTERVAL", "1.0"))
+    # Single-scope tickets for ?ticket= URLs (EventSource, downloads; app/tickets.py)
+    TICKET_SECONDS = int(os.getenv("TICKET_SECONDS", "60"))
+
     MYSQL_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")
     MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
     MYSQL_DB = os.getenv("MYSQL_DB", "languagelift")
     MYSQL_USER = os.getenv("MYSQL_USER", "appuser")
     MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "apppassword")
 
-    SQLALCHEMY_DATABASE_URI = (
+    # DATABASE_URL (any SQLAlchemy URL) takes precedence over the MYSQL_* parts
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or (
         f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}"
         f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # ASGI mode (asgi.py): async read views use ASYNC_DATABASE_URL, by default
+    # DATABASE_URL with the async driver (mysql+aiomysql, sqlite+aiosqlite), with
+    # their own pool per worker; other requests run on ASGI_WSGI_THREADS threads.
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+    ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "10"))
+    ASYNC_MAX_OVERFLOW = int(os.getenv("ASYNC_MAX_OVERFLOW", "10"))
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "8"))
+
+    # Per-request profiling (app/profiling.py)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    PROFILING_SLOW_QUERIES = int(os.getenv("PROFILING_SLOW_QUERIES", "3"))
+    PROFILING_SLOW_REQUEST_MS = float(os.getenv("PROFILING_SLOW_REQUEST_MS", "500"))
+    PROFILING_SERVER_TIMING = os.getenv("PROFILING_SERVER_TIMING", "1") == "1"
+    PROFILING_PROFILER = os.getenv("PROFILING_PROFILER", "")  # "", "cprofile" or "pyinstrument"
+    PROFILING_DUMP_DIR = os.getenv("PROFILING_DUMP_DIR", "profiles")
+
+    # Prometheus-style /metrics (app/metrics.py). Set METRICS_DIR to a shared,
+    # per-deployment directory when running several gunicorn workers.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+
+    # Full-text search backend (app/search.py): auto, mysql, sqlite or memory
+    SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "auto")
+
+    # Lesson media (app/storage.py): "local" or "object" (object-storage stand-in).
+    # Behind Nginx set MEDIA_ACCEL_PREFIX to an internal location aliased to
+    # MEDIA_ROOT so downloads are served with X-Accel-Redirect.
+    MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "local")
+    MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+    MEDIA_BUCKET = os.getenv("MEDIA_BUCKET", "languagelift-media")
+    MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "")
+    MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(2 * 1024 ** 3)))
+    MEDIA_CHUNK_BYTES = int(os.getenv("MEDIA_CHUNK_BYTES", str(8 * 1024 ** 2)))
+    MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", str(365 * 24 * 3600)))
+    MEDIA_UPLOAD_TTL_HOURS = float(os.getenv("MEDIA_UPLOAD_TTL_HOURS", "24"))
+
+    # Deleted courses/lessons stay restorable for PURGE_GRACE_HOURS; then
+    # `flask courses purge` archives their progress and deletes them in chunks of
+    # PURGE_BATCH_SIZE rows (one short transaction each, PURGE_PAUSE_SECONDS apart).
+    PURGE_GRACE_HOURS = float(os.getenv("PURGE_GRACE_HOURS", "24"))
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "2000"))
+    PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", "0.05"))
+
+    # Trending courses (app.popularity): an event's weight halves every
+    # TRENDING_HALF_LIFE_HOURS; run `flask popularity reconcile` about hourly.
+    TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "72"))
+    TRENDING_ENROLL_WEIGHT = float(os.getenv("TRENDING_ENROLL_WEIGHT", "1.0"))
+    TRENDING_COMPLETION_WEIGHT = float(os.getenv("TRENDING_COMPLETION_WEIGHT", "0.1"))
+
+    # Live events (GET /events, app/events.py). "memory://" only reaches streams in
+    # the publishing process; use redis://host:6379/0 with more than one worker.
+    # Each stream ends after EVENTS_MAX_STREAM_SECONDS and the browser reconnects
+    # with Last-Event-ID; at most EVENTS_MAX_CONNECTIONS streams per worker.
+    # EVENTS_THREAD_STREAMS caps the streams served from request threads (WSGI
+    # workers), each holding a thread for up to EVENTS_MAX_STREAM_SECONDS;
+    # gunicorn.conf.py sets it from the worker class (0 refuses them).
+    EVENTS_URL = os.getenv("EVENTS_URL", "memory://")
+    EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_MAX_STREAM_SECONDS = float(os.getenv("EVENTS_MAX_STREAM_SECONDS", "300"))
+    EVENTS_MAX_CONNECTIONS = int(os.getenv("EVENTS_MAX_CONNECTIONS", "1000"))
+    EVENTS_THREAD_STREAMS = int(os.getenv("EVENTS_THREAD_STREAMS", "1"))
+
+    # Background jobs (app/jobs.py, `flask jobs worker`). "sql://" queues in the
+    # jobs table; redis://host:6379/0 queues in Redis. JOBS_SCHEDULES is
+    # "task=cron; ..." in UTC; every worker runs the scheduler unless --no-schedule.
+    JOBS_URL = os.getenv("JOBS_URL", "sql://")
+    JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "4"))
+    JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "1.0"))
+    JOBS_MAX_BACKOFF_SECONDS = float(os.getenv("JOBS_MAX_BACKOFF_SECONDS", "3600"))
+    JOBS_KEEP_HOURS = float(os.getenv("JOBS_KEEP_HOURS", "168"))
+    JOBS_SCHEDULES = os.getenv(
+        "JOBS_SCHEDULES",
+        "popularity.reconcile=7 * * * *; recommendations.build=*/30 * * * *; "
+        "courses.purge=30 3 * * *; media.cleanup=45 3 * * *; jobs.prune=15 4 * * *",
+    )
+
+    # Course certificates (app/certificates.py), rendered by job workers into media
+    # storage. {code} in CERTIFICATE_VERIFY_URL becomes the verification code.
+    CERTIFICATE_ISSUER = os.getenv("CERTIFICATE_ISSUER", "LanguageLift")
+    CERTIFICATE_VERIFY_URL = os.getenv("CERTIFICATE_VERIFY_URL", "http://localhost:5000/certificates/verify/{code}")
+
+    # Personal data exports (GET /me/export, app/exports.py). A part holds at most
+    # EXPORT_PART_ROWS rows; reads are paced to EXPORT_ROWS_PER_SECOND per export
+    # (0 = unpaced) and a worker streams at most EXPORT_MAX_CONCURRENT at once.
+    EXPORT_PART_ROWS = int(os.getenv("EXPORT_PART_ROWS", "100000"))
+    EXPORT_ROWS_PER_SECOND = float(os.getenv("EXPORT_ROWS_PER_SECOND", "5000"))
+    EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+
+    # Token-bucket rate limits (app/ratelimit.py). "memory://" is per process; use
+    # redis://host:6379/0 to share buckets between gunicorn workers and servers.
+    # RATELIMIT_LIMITS overrides per endpoint or blueprint, e.g.
+    # "auth.login=5/minute burst 10; reviews=120/minute".
+    # RATELIMIT_TRUSTED_PROXIES: reverse proxies in front of the app (1 behind one
+    # Nginx); the client IP then comes from X-Forwarded-For instead of the proxy's.
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "1") == "1"
+    RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
+    RATELIMIT_DEFAULT = os.getenv("RATELIMIT_DEFAULT", "")
+    RATELIMIT_LIMITS = os.getenv("RATELIMIT_LIMITS", "")
+    RATELIMIT_TRUSTED_PROXIES = int(os.getenv("RATELIMIT_TRUSTED_PROXIES", "0"))
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+
+    PROFILING_SAMPLE_RATE = 0.0
+    METRICS_DIR = ""
+    RATELIMIT_ENABLED = False
+    MEDIA_ROOT = os.getenv("TEST_MEDIA_ROOT", os.path.join(tempfile.gettempdir(), "languagelift-test-media"))
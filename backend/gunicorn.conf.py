@@ -0,0 +1,92 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+# GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py asgi:app
+#
+# Every setting can be overridden with a GUNICORN_* environment variable.
+# Graceful reload: `kill -HUP <master>` restarts workers one by one after they
+# finish in-flight requests. With preload_app the code is loaded in the master,
+# so deploying new code needs `kill -USR2 <master>` (start a new master) followed
+# by `kill -QUIT <old master>`, or set GUNICORN_PRELOAD=0 to reload code on HUP.
+import glob
+import multiprocessing
+import os
+
+cores = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# gthread: a few processes with a thread pool each; good default for MySQL-bound views.
+# gevent:  cooperative greenlets; best for many slow/idle connections (e.g. streaming).
+# uvicorn: asyncio event loop for asgi:app; read views await an async engine and
+#          the rest of the app runs on a small thread pool (app/asgi.py).
+# sync:    one request per process; only for comparison.
+#
+# GET /events streams last up to EVENTS_MAX_STREAM_SECONDS. Under gevent and uvicorn
+# an idle stream costs a greenlet / a coroutine; under gthread and sync it holds a
+# request thread, so only EVENTS_THREAD_STREAMS of them are accepted per worker
+# (a quarter of the threads, none on sync) and the rest get 503. Serve /events
+# from gevent or uvicorn workers when many clients keep a stream open.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "uvicorn":
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+if worker_class == "gevent":
+    # Patch before the app (and PyMySQL) are imported by preload_app
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    workers = int(os.getenv("GUNICORN_WORKERS", cores + 1))
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+    os.environ.setdefault("EVENTS_THREAD_STREAMS", os.getenv("EVENTS_MAX_CONNECTIONS", "1000"))
+elif worker_class == "uvicorn.workers.UvicornWorker":
+    workers = int(os.getenv("GUNICORN_WORKERS", cores + 1))
+elif worker_class == "gthread":
+    workers = int(os.getenv("GUNICORN_WORKERS", cores * 2 + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", "4"))
+    os.environ.setdefault("EVENTS_THREAD_STREAMS", str(threads // 4))
+else:
+    workers = int(os.getenv("GUNICORN_WORKERS", cores * 2 + 1))
+    os.environ.setdefault("EVENTS_THREAD_STREAMS", "0")
+
+# The in-memory search index lives in each worker and only sees that worker's writes
+if os.getenv("SEARCH_ENGINE") == "memory" and workers > 1:
+    raise RuntimeError("SEARCH_ENGINE=memory is per process; use sqlite/mysql or GUNICORN_WORKERS=1")
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Recycle workers periodically; jitter keeps them from restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None  # empty disables
+# The default format without the query string (%(U)s instead of %(r)s): ?ticket=
+# and export ?token= values are credentials and stay out of the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def on_starting(server):
+    # Snapshots from a previous run would be summed into /metrics
+    metrics_dir = os.getenv("METRICS_DIR")
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    # With preload_app the master may have opened DB connections; never share
+    # them across processes.
+    if preload_app:
+        from app import db
+        from app.asgi import AsyncApp
+
+        app = server.app.wsgi()
+        if isinstance(app, AsyncApp):
+            app = app.app
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -0,0 +1,46 @@
+"""add hot path indexes
+
+Revision ID: 4c1f2a7d9e10
+Revises: e31625492ff0
+Create Date: 2026-10-19 10:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f2a7d9e10'
+down_revision = 'e31625492ff0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('ix_courses_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_courses_instructor_id', ['instructor_id'], unique=False)
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.create_index('ix_lessons_course_id_order_index', ['course_id', 'order_index'], unique=False)
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_enrollments_user_id_enrolled_at', ['user_id', 'enrolled_at'], unique=False)
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_user_id_completed_lesson_id', ['user_id', 'completed', 'lesson_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.drop_index('ix_progress_user_id_completed_lesson_id')
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_index('ix_enrollments_user_id_enrolled_at')
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_index('ix_lessons_course_id_order_index')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_instructor_id')
+        batch_op.drop_index('ix_courses_created_at')
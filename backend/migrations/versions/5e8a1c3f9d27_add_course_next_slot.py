@@ -0,0 +1,35 @@
+"""add course next slot
+
+Revision ID: 5e8a1c3f9d27
+Revises: 7c2e4b9d1f38
+Create Date: 2026-10-20 09:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1c3f9d27'
+down_revision = '7c2e4b9d1f38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('next_slot', sa.Integer(), server_default='0', nullable=False))
+
+    # Past every slot ever handed out, soft-deleted lessons included
+    courses = sa.table('courses', sa.column('id'), sa.column('next_slot'))
+    lessons = sa.table('lessons', sa.column('course_id'), sa.column('slot'))
+    op.get_bind().execute(courses.update().values(next_slot=(
+        sa.select(sa.func.coalesce(sa.func.max(lessons.c.slot) + 1, 0))
+        .where(lessons.c.course_id == courses.c.id)
+        .scalar_subquery()
+    )))
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('next_slot')
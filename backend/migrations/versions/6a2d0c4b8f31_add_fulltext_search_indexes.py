@@ -0,0 +1,36 @@
+"""add fulltext search indexes
+
+Revision ID: 6a2d0c4b8f31
+Revises: 4c1f2a7d9e10
+Create Date: 2026-10-19 11:02:17.904511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2d0c4b8f31'
+down_revision = '4c1f2a7d9e10'
+branch_labels = None
+depends_on = None
+
+
+# MySQL only: SQLite builds its FTS5 table on first search (see app/search.py),
+# other databases use the in-process index.
+def upgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index('ft_courses_title', 'courses', ['title'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_courses_title_description_level', 'courses', ['title', 'description', 'level'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_lessons_title', 'lessons', ['title'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_lessons_title_content', 'lessons', ['title', 'content'], mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_lessons_title_content', table_name='lessons')
+    op.drop_index('ft_lessons_title', table_name='lessons')
+    op.drop_index('ft_courses_title_description_level', table_name='courses')
+    op.drop_index('ft_courses_title', table_name='courses')
@@ -0,0 +1,47 @@
+"""add certificates
+
+Revision ID: 7c2e4b9d1f38
+Revises: 3f9a6c1e7b52
+Create Date: 2026-10-20 02:04:31.877152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e4b9d1f38'
+down_revision = '3f9a6c1e7b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('certificates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=12), nullable=False),
+    sa.Column('student_name', sa.String(length=120), nullable=False),
+    sa.Column('course_title', sa.String(length=200), nullable=False),
+    sa.Column('issued_at', sa.DateTime(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('template', sa.String(length=16), nullable=True),
+    sa.Column('rendered_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code'),
+    sa.UniqueConstraint('user_id', 'course_id', name='uq_certificates_user_course')
+    )
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_certificates_course_id'), ['course_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_certificates_sha256'), ['sha256'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('certificates', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_certificates_sha256'))
+        batch_op.drop_index(batch_op.f('ix_certificates_course_id'))
+
+    op.drop_table('certificates')
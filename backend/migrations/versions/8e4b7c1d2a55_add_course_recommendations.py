@@ -0,0 +1,43 @@
+"""add course recommendations
+
+Revision ID: 8e4b7c1d2a55
+Revises: 6a2d0c4b8f31
+Create Date: 2026-10-19 13:41:08.220734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b7c1d2a55'
+down_revision = '6a2d0c4b8f31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('course_neighbors',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('co_enrollments', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['courses.id'], ),
+    sa.PrimaryKeyConstraint('course_id', 'rank')
+    )
+    op.create_table('recommendation_builds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mode', sa.String(length=20), nullable=False),
+    sa.Column('max_enrollment_id', sa.Integer(), nullable=False),
+    sa.Column('courses_updated', sa.Integer(), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('recommendation_builds')
+    op.drop_table('course_neighbors')
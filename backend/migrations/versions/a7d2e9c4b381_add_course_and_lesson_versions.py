@@ -0,0 +1,32 @@
+"""add course and lesson versions
+
+Revision ID: a7d2e9c4b381
+Revises: e6b0d3f71a28
+Create Date: 2026-10-19 23:48:37.102954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e9c4b381'
+down_revision = 'e6b0d3f71a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('version')
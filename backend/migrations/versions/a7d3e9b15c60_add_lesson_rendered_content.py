@@ -0,0 +1,29 @@
+"""add lesson rendered content
+
+Revision ID: a7d3e9b15c60
+Revises: f19d6c2e8a43
+Create Date: 2026-10-19 21:34:05.118420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9b15c60'
+down_revision = 'f19d6c2e8a43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing lessons stay NULL: rendered on first read or by `flask lessons render`
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('content_html')
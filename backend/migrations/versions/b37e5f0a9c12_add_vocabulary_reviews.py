@@ -0,0 +1,58 @@
+"""add vocabulary reviews
+
+Revision ID: b37e5f0a9c12
+Revises: 8e4b7c1d2a55
+Create Date: 2026-10-19 15:12:44.581023
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b37e5f0a9c12'
+down_revision = '8e4b7c1d2a55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vocabulary_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=200), nullable=False),
+    sa.Column('translation', sa.String(length=200), nullable=False),
+    sa.Column('example', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('vocabulary_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vocabulary_items_lesson_id'), ['lesson_id'], unique=False)
+
+    op.create_table('review_states',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('ease', sa.Float(), nullable=False),
+    sa.Column('interval_days', sa.Integer(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('lapses', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['vocabulary_items.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'item_id')
+    )
+    with op.batch_alter_table('review_states', schema=None) as batch_op:
+        batch_op.create_index('ix_review_states_user_id_due_at', ['user_id', 'due_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('review_states', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_states_user_id_due_at')
+
+    op.drop_table('review_states')
+    with op.batch_alter_table('vocabulary_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vocabulary_items_lesson_id'))
+
+    op.drop_table('vocabulary_items')
@@ -0,0 +1,34 @@
+"""add course popularity counters
+
+Revision ID: b5c1f8e2d047
+Revises: a7d2e9c4b381
+Create Date: 2026-10-20 00:31:09.554120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c1f8e2d047'
+down_revision = 'a7d2e9c4b381'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrollment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('completion_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('trending_score', sa.Float(precision=53), server_default='0', nullable=False))
+        batch_op.create_index('ix_courses_enrollment_count_id', ['enrollment_count', 'id'], unique=False)
+        batch_op.create_index('ix_courses_trending_score_id', ['trending_score', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_trending_score_id')
+        batch_op.drop_index('ix_courses_enrollment_count_id')
+        batch_op.drop_column('trending_score')
+        batch_op.drop_column('completion_count')
+        batch_op.drop_column('enrollment_count')
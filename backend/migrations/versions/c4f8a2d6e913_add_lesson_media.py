@@ -0,0 +1,70 @@
+"""add lesson media
+
+Revision ID: c4f8a2d6e913
+Revises: a7d3e9b15c60
+Create Date: 2026-10-19 22:12:40.582317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f8a2d6e913'
+down_revision = 'a7d3e9b15c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('storage', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_table('lesson_media',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.ForeignKeyConstraint(['sha256'], ['media_blobs.sha256'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('lesson_media', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lesson_media_lesson_id'), ['lesson_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_lesson_media_sha256'), ['sha256'], unique=False)
+
+    op.create_table('media_uploads',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('received', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('media_uploads', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_uploads_lesson_id'), ['lesson_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_uploads', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_uploads_lesson_id'))
+
+    op.drop_table('media_uploads')
+    with op.batch_alter_table('lesson_media', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lesson_media_sha256'))
+        batch_op.drop_index(batch_op.f('ix_lesson_media_lesson_id'))
+
+    op.drop_table('lesson_media')
+    op.drop_table('media_blobs')
@@ -0,0 +1,88 @@
+"""add course progress bitmaps
+
+Revision ID: d52a9e3f6b70
+Revises: b37e5f0a9c12
+Create Date: 2026-10-19 17:26:51.043318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52a9e3f6b70'
+down_revision = 'b37e5f0a9c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('slot', sa.Integer(), nullable=True))
+
+    # Existing lessons get slots in their current order
+    lessons = sa.table('lessons', sa.column('id'), sa.column('course_id'), sa.column('order_index'), sa.column('slot'))
+    rows = bind.execute(
+        sa.select(lessons.c.id, lessons.c.course_id).order_by(lessons.c.course_id, lessons.c.order_index, lessons.c.id)
+    ).all()
+    slots, next_slot = [], {}
+    for lesson_id, course_id in rows:
+        slot = next_slot.get(course_id, 0)
+        next_slot[course_id] = slot + 1
+        slots.append({'b_id': lesson_id, 'slot': slot})
+    if slots:
+        bind.execute(lessons.update().where(lessons.c.id == sa.bindparam('b_id')).values(slot=sa.bindparam('slot')), slots)
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.alter_column('slot', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('uq_lesson_course_slot', ['course_id', 'slot'])
+
+    op.create_table('course_progress',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('completed_bits', sa.LargeBinary(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'course_id')
+    )
+    with op.batch_alter_table('course_progress', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_course_progress_course_id'), ['course_id'], unique=False)
+
+    # Backfill from progress; bit i of the bitmap is lesson slot i (little-endian)
+    progress = sa.table('progress', sa.column('user_id'), sa.column('lesson_id'), sa.column('completed'))
+    bitmaps = {}
+    for user_id, course_id, slot in bind.execute(
+        sa.select(progress.c.user_id, lessons.c.course_id, lessons.c.slot)
+        .join(lessons, lessons.c.id == progress.c.lesson_id)
+        .where(progress.c.completed.is_(True))
+    ):
+        bitmaps[(user_id, course_id)] = bitmaps.get((user_id, course_id), 0) | (1 << slot)
+    course_progress = sa.table(
+        'course_progress', sa.column('user_id'), sa.column('course_id'),
+        sa.column('completed_bits'), sa.column('completed_count'),
+    )
+    rows = [
+        {
+            'user_id': user_id,
+            'course_id': course_id,
+            'completed_bits': bits.to_bytes((bits.bit_length() + 7) // 8, 'little'),
+            'completed_count': bin(bits).count('1'),
+        }
+        for (user_id, course_id), bits in bitmaps.items()
+    ]
+    for i in range(0, len(rows), 5000):
+        bind.execute(course_progress.insert(), rows[i:i + 5000])
+
+
+def downgrade():
+    with op.batch_alter_table('course_progress', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_course_progress_course_id'))
+
+    op.drop_table('course_progress')
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_lesson_course_slot', type_='unique')
+        batch_op.drop_column('slot')
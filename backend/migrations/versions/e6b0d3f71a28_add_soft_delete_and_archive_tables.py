@@ -0,0 +1,84 @@
+"""add soft delete and archive tables
+
+Revision ID: e6b0d3f71a28
+Revises: c4f8a2d6e913
+Create Date: 2026-10-19 23:05:12.418236
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b0d3f71a28'
+down_revision = 'c4f8a2d6e913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archived_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_courses_deleted_at'), ['deleted_at'], unique=False)
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_lessons_deleted_at'), ['deleted_at'], unique=False)
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_lesson_id_id', ['lesson_id', 'id'], unique=False)
+
+    with op.batch_alter_table('review_states', schema=None) as batch_op:
+        batch_op.create_index('ix_review_states_item_id_user_id', ['item_id', 'user_id'], unique=False)
+
+    op.create_table('progress_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('lesson_title', sa.String(length=200), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('progress_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_progress_archive_user_id'), ['user_id'], unique=False)
+
+    op.create_table('enrollments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('course_title', sa.String(length=200), nullable=True),
+    sa.Column('enrolled_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('enrollments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_enrollments_archive_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrollments_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_enrollments_archive_user_id'))
+
+    op.drop_table('enrollments_archive')
+    with op.batch_alter_table('progress_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_progress_archive_user_id'))
+
+    op.drop_table('progress_archive')
+    with op.batch_alter_table('review_states', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_states_item_id_user_id')
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.drop_index('ix_progress_lesson_id_id')
+
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lessons_deleted_at'))
+        batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_courses_deleted_at'))
+        batch_op.drop_column('deleted_at')
+        batch_op.drop_column('archived_at')
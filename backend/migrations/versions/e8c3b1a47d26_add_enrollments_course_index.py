@@ -0,0 +1,26 @@
+"""add enrollments course index
+
+Revision ID: e8c3b1a47d26
+Revises: d52a9e3f6b70
+Create Date: 2026-10-19 19:05:37.662190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c3b1a47d26'
+down_revision = 'd52a9e3f6b70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_enrollments_course_id_id', ['course_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_index('ix_enrollments_course_id_id')
@@ -0,0 +1,46 @@
+"""add lesson prerequisites
+
+Revision ID: f19d6c2e8a43
+Revises: e8c3b1a47d26
+Create Date: 2026-10-19 20:48:12.337509
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19d6c2e8a43'
+down_revision = 'e8c3b1a47d26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('lesson_prerequisites',
+    sa.Column('lesson_id', sa.Integer(), nullable=False),
+    sa.Column('prerequisite_id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.ForeignKeyConstraint(['prerequisite_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('lesson_id', 'prerequisite_id')
+    )
+    with op.batch_alter_table('lesson_prerequisites', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lesson_prerequisites_course_id'), ['course_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_lesson_prerequisites_prerequisite_id'), ['prerequisite_id'], unique=False)
+
+    with op.batch_alter_table('course_progress', schema=None) as batch_op:
+        # Nullable: MySQL BLOBs cannot have a literal default; NULL reads as empty
+        batch_op.add_column(sa.Column('unlocked_bits', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('course_progress', schema=None) as batch_op:
+        batch_op.drop_column('unlocked_bits')
+
+    with op.batch_alter_table('lesson_prerequisites', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lesson_prerequisites_prerequisite_id'))
+        batch_op.drop_index(batch_op.f('ix_lesson_prerequisites_course_id'))
+
+    op.drop_table('lesson_prerequisites')
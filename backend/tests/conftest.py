@@ -0,0 +1,57 @@
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def config(tmp_path):
+    # Override in a test module to change settings
+    from config import TestConfig
+
+    class UnitTestConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+        SECRET_KEY = JWT_SECRET_KEY = "unit-test-secret-unit-test-secret"
+        MEDIA_ROOT = str(tmp_path / "media")
+        METRICS_ENABLED = False
+
+    return UnitTestConfig
+
+
+@pytest.fixture
+def app(config):
+    # No app context is kept pushed: each request gets its own, as in production
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    # login("a@x", "instructor") -> Authorization headers for a fresh user
+    def login(email: str, role: str = "student") -> dict:
+        client.post("/auth/register", json={"name": email, "email": email, "password": "pw", "role": role})
+        resp = client.post("/auth/login", json={"email": email, "password": "pw"})
+        return {"Authorization": "Bearer " + resp.get_json()["access_token"]}
+
+    return login
+
+
+@pytest.fixture
+def course(client, login):
+    # An instructor's course with three lessons: (instructor headers, course id, lesson ids)
+    instructor = login("instructor@example.com", "instructor")
+    course_id = client.post("/courses", json={"title": "Spanish", "description": "d"}, headers=instructor).get_json()["id"]
+    lesson_ids = [
+        client.post(f"/courses/{course_id}/lessons", json={"title": f"L{i}", "content": "hola", "order_index": i},
+                    headers=instructor).get_json()["id"]
+        for i in range(1, 4)
+    ]
+    return instructor, course_id, lesson_ids
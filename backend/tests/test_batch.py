@@ -0,0 +1,17 @@
+def _batch(client, body, headers=None):
+    return client.post("/batch", json=body, headers=headers or {})
+
+
+def test_batch(client, course):
+    _, course_id, lesson_ids = course
+    resp = _batch(client, {"requests": [
+        {"resource": "course", "id": course_id}, {"resource": "lesson", "id": lesson_ids[0]},
+        {"resource": "lesson", "id": 12345}, {"resource": "nope"}, "course",
+    ]})
+    assert resp.status_code == 200
+    assert [r["status"] for r in resp.get_json()["responses"]] == [200, 200, 404, 400, 400]
+
+
+def test_batch_needs_a_list_of_requests(client):
+    for body in ({"requests": []}, {"requests": "course"}, [{"resource": "course", "id": 1}]):
+        assert _batch(client, body).status_code == 400
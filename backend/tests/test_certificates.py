@@ -0,0 +1,47 @@
+import io
+
+from app import db, storage
+from app.certificates import _release, normalize_code
+from app.models import Certificate, LessonMedia
+from app.worker import Worker
+
+
+def test_normalize_code():
+    assert normalize_code("abcd-efgh-jk") == normalize_code("ABCDEFGHJK")
+    assert normalize_code("ZZZZ") is None
+
+
+def _certificate(app, client, login, course):
+    _, course_id, lesson_ids = course
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    for lesson_id in lesson_ids:
+        resp = client.post(f"/lessons/{lesson_id}/complete", headers=student).get_json()
+    assert resp["certificate"]["code"]
+    Worker(app, 1, schedule=False, burst=True).run()
+    pdf = client.get(client.get(f"/certificates/{resp['certificate']['code']}.pdf").headers["Location"]).data
+    assert pdf.startswith(b"%PDF")
+    return pdf
+
+
+def test_certificate_and_media_share_files(app, client, login, course):
+    instructor, _, lesson_ids = course
+    pdf = _certificate(app, client, login, course)
+
+    # The same bytes uploaded as lesson media: one stored file, two owners
+    upload_id = client.post(f"/lessons/{lesson_ids[0]}/media/uploads", headers=instructor, json={
+        "filename": "certificate.pdf", "content_type": "image/pdf", "size": len(pdf),
+    }).get_json()["upload_id"]
+    media_id = client.put(f"/media/uploads/{upload_id}", data=io.BytesIO(pdf), headers={
+        **instructor, "Content-Range": f"bytes 0-{len(pdf) - 1}/{len(pdf)}",
+    }).get_json()["id"]
+
+    with app.app_context():
+        digest = Certificate.query.one().sha256
+        assert db.session.get(LessonMedia, media_id).sha256 == digest
+        _release([digest])  # e.g. the certificate re-rendered elsewhere; media still uses it
+        assert storage.backend.exists(digest)
+
+    client.delete(f"/media/{media_id}", headers=instructor)
+    with app.app_context():
+        assert storage.backend.exists(digest)  # the certificate still uses it
@@ -0,0 +1,35 @@
+def _order(client, headers, course_id, ids, etag):
+    return client.put(f"/courses/{course_id}/lessons/order", headers={**headers, "If-Match": etag},
+                      json={"lesson_ids": ids})
+
+
+def test_reorder_lessons(client, course):
+    instructor, course_id, lesson_ids = course
+    etag = client.get(f"/courses/{course_id}/lessons", headers=instructor).headers["ETag"]
+
+    resp = _order(client, instructor, course_id, lesson_ids[::-1], etag)
+    assert resp.status_code == 200
+    assert resp.get_json()["moved"] == 2
+    assert _order(client, instructor, course_id, lesson_ids, etag).status_code == 412  # stale ETag
+
+    etag = resp.headers["ETag"]
+    assert _order(client, instructor, course_id, lesson_ids[:2], etag).status_code == 400
+    assert client.put(f"/courses/{course_id}/lessons/order", headers=instructor,
+                      json={"lesson_ids": lesson_ids}).status_code == 428
+
+
+def test_reorder_a_stale_list_is_a_conflict(client, course):
+    # Someone added a lesson since the list was loaded: 412 (reload), not 400
+    instructor, course_id, lesson_ids = course
+    etag = client.get(f"/courses/{course_id}/lessons", headers=instructor).headers["ETag"]
+    client.post(f"/courses/{course_id}/lessons", json={"title": "L4", "content": "hola", "order_index": 4},
+                headers=instructor)
+
+    assert _order(client, instructor, course_id, lesson_ids[::-1], etag).status_code == 412
+
+
+def test_edits_need_a_json_object(client, course):
+    instructor, course_id, lesson_ids = course
+    for path, method in ((f"/courses/{course_id}/lessons/order", client.put), (f"/courses/{course_id}", client.patch),
+                         (f"/lessons/{lesson_ids[0]}", client.patch)):
+        assert method(path, headers={**instructor, "If-Match": "*"}, json=["title"]).status_code == 400
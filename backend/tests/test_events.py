@@ -0,0 +1,21 @@
+from app.routes.events import thread_streams
+
+
+def test_thread_streams_are_capped(app, client, login):
+    student = login("student@example.com")
+    app.config["EVENTS_THREAD_STREAMS"] = 1
+
+    first = client.get("/events", headers=student, buffered=False)
+    assert first.status_code == 200 and first.mimetype == "text/event-stream"
+    refused = client.get("/events", headers=student, buffered=False)
+    assert refused.status_code == 503 and refused.headers["Retry-After"] == "30"
+    refused.close()
+
+    first.close()  # the server's close() frees the thread slot
+    assert thread_streams.active == 0
+    second = client.get("/events", headers=student, buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+    app.config["EVENTS_THREAD_STREAMS"] = 0
+    assert client.get("/events", headers=student).status_code == 503
@@ -0,0 +1,69 @@
+import io
+import json
+import zipfile
+
+from app.exports import dump_token, load_token
+
+
+def _export(client, headers, token=None):
+    resp = client.get("/me/export", headers=headers, query_string={"token": token} if token else None)
+    data = resp.data
+    resp.close()  # releases the export slot, as a WSGI server would
+    return resp, data
+
+
+def test_part_tokens(app):
+    with app.test_request_context():
+        token = dump_token(7, 2, 1, 40)
+        assert load_token(token, 7) == (2, 1, 40)
+        assert load_token(token, 8) is None
+        assert load_token(token[:-2] + "xx", 7) is None
+        assert load_token(dump_token(7, 2, 99, 40), 7) is None
+
+
+def test_export_in_parts(app, client, login, course):
+    _, course_id, lesson_ids = course
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    for lesson_id in lesson_ids:
+        client.post(f"/lessons/{lesson_id}/complete", headers=student)
+
+    resp, data = _export(client, student)
+    assert resp.status_code == 200 and resp.headers["Cache-Control"] == "no-store"
+    whole = zipfile.ZipFile(io.BytesIO(data))
+    assert json.loads(whole.read("export.json"))["next"] is None
+    progress = whole.read("progress.ndjson").splitlines()
+    assert [json.loads(line)["lesson_id"] for line in progress] == lesson_ids
+
+    app.config["EXPORT_PART_ROWS"] = 2
+    lines, token, parts = [], None, 0
+    while True:
+        resp, data = _export(client, student, token)
+        part = zipfile.ZipFile(io.BytesIO(data))
+        parts += 1
+        if "progress.ndjson" in part.namelist():
+            lines += part.read("progress.ndjson").splitlines()
+        token = json.loads(part.read("export.json"))["next"]
+        if token is None:
+            break
+    assert parts > 1 and lines == progress
+
+    # Tokens are bound to the user they were issued to
+    other = login("other@example.com")
+    first = zipfile.ZipFile(io.BytesIO(_export(client, student)[1]))
+    resp, _ = _export(client, other, json.loads(first.read("export.json"))["next"])
+    assert resp.status_code == 400
+
+
+def test_download_link_takes_an_export_ticket(client, login):
+    student = login("student@example.com")
+
+    def ticket(scope):
+        return client.post("/auth/tickets", headers=student, json={"scope": scope}).get_json()["ticket"]
+
+    resp = client.get("/me/export", query_string={"ticket": ticket("export")})
+    assert resp.status_code == 200 and zipfile.ZipFile(io.BytesIO(resp.data)).namelist()[0] == "profile.json"
+    resp.close()
+    assert client.get("/me/export", query_string={"ticket": ticket("events")}).status_code == 401
+    token = student["Authorization"].split()[1]
+    assert client.get("/me/export", query_string={"jwt": token}).status_code == 401
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+
+from app.jobs import Cron, parse_schedules
+
+
+def test_cron_fields():
+    cron = Cron("*/15 9-17 * * 1-5")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == set(range(9, 18))
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+    assert Cron("5/20 0 * * 7").minutes == {5, 25, 45}
+    assert Cron("0 0 * * 7").weekdays == {0}
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 5-3 * * *", "*/0 * * * *", "x * * * *"])
+def test_cron_rejects_bad_expressions(expr):
+    with pytest.raises(ValueError):
+        Cron(expr)
+
+
+def test_cron_matching():
+    monday_9 = datetime(2024, 1, 1, 9, 0)
+    assert Cron("0 9 * * 1").matches(monday_9)
+    assert not Cron("0 9 * * 2").matches(monday_9)
+    # Both day fields restricted: either one matches, as in cron
+    assert Cron("0 9 15 * 1").matches(monday_9)
+    assert not Cron("0 9 15 * 2").matches(monday_9)
+
+
+def test_cron_next_after():
+    assert Cron("30 3 * * *").next_after(datetime(2024, 1, 1, 3, 30, 12)) == datetime(2024, 1, 2, 3, 30)
+    assert Cron("*/15 * * * *").next_after(datetime(2024, 1, 1, 23, 59)) == datetime(2024, 1, 2, 0, 0)
+    assert Cron("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+    assert Cron("0 0 31 2 *").next_after(datetime(2024, 1, 1)) is None
+
+
+def test_parse_schedules():
+    schedules = parse_schedules("popularity.reconcile=7 * * * *; courses.purge=30 3 * * *;")
+    assert {name: cron.expr for name, cron in schedules.items()} == {
+        "popularity.reconcile": "7 * * * *", "courses.purge": "30 3 * * *",
+    }
+    assert parse_schedules({"a": "0 0 * * *"})["a"].hours == {0}
+    assert parse_schedules("") == {}
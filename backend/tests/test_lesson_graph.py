@@ -0,0 +1,33 @@
+def _set(client, headers, lesson_id, ids):
+    return client.put(f"/lessons/{lesson_id}/prerequisites", headers=headers, json={"prerequisite_ids": ids})
+
+
+def test_cycles_are_rejected(client, course):
+    instructor, _, (l1, l2, l3) = course
+    assert _set(client, instructor, l2, [l1]).status_code == 200
+    assert _set(client, instructor, l3, [l2]).status_code == 200
+
+    resp = _set(client, instructor, l1, [l3])
+    assert resp.status_code == 400 and "cycle" in resp.get_json()["error"]
+    assert "own prerequisite" in _set(client, instructor, l1, [l1]).get_json()["error"]
+    assert _set(client, instructor, l1, [12345]).status_code == 400
+    assert client.put(f"/lessons/{l1}/prerequisites", headers=instructor, json=[l2]).status_code == 400
+    # Replacing a lesson's edges may remove the path that made a cycle
+    assert _set(client, instructor, l3, []).status_code == 200
+    assert _set(client, instructor, l1, [l3]).status_code == 200
+
+
+def test_unlocking(client, login, course):
+    instructor, course_id, (l1, l2, l3) = course
+    _set(client, instructor, l2, [l1])
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+
+    def unlocked():
+        states = client.get(f"/courses/{course_id}/lessons/unlocked", headers=student).get_json()
+        return {s["id"]: s["unlocked"] for s in states}
+
+    assert unlocked() == {l1: True, l2: False, l3: True}
+    assert client.post(f"/lessons/{l2}/complete", headers=student).status_code == 403
+    client.post(f"/lessons/{l1}/complete", headers=student)
+    assert unlocked()[l2] is True
@@ -0,0 +1,84 @@
+from app import db
+from app.lifecycle import purge
+from app.models import Course, CourseProgress, Lesson, Progress, ProgressArchive
+
+
+def test_course_soft_delete_and_restore(client, course):
+    instructor, course_id, lesson_ids = course
+    assert client.delete(f"/courses/{course_id}", headers=instructor).status_code == 202
+    assert client.get(f"/courses/{course_id}").status_code == 404
+    assert client.get(f"/lessons/{lesson_ids[0]}").status_code == 404
+
+    assert client.post(f"/courses/{course_id}/restore", headers=instructor).status_code == 200
+    assert client.get(f"/courses/{course_id}").status_code == 200
+    assert [l["id"] for l in client.get(f"/courses/{course_id}/lessons").get_json()] == lesson_ids
+
+
+def test_restore_keeps_lessons_deleted_before(client, course):
+    instructor, course_id, (l1, l2, l3) = course
+    client.delete(f"/lessons/{l2}", headers=instructor)
+    client.delete(f"/courses/{course_id}", headers=instructor)
+    client.post(f"/courses/{course_id}/restore", headers=instructor)
+    assert [l["id"] for l in client.get(f"/courses/{course_id}/lessons").get_json()] == [l1, l3]
+
+
+def test_purge_archives_progress(app, client, login, course):
+    instructor, course_id, (l1, l2, l3) = course
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    client.post(f"/lessons/{l1}/complete", headers=student)
+    client.post(f"/lessons/{l2}/complete", headers=student)
+    client.delete(f"/lessons/{l2}", headers=instructor)
+
+    with app.app_context():
+        result = purge(0, pause=0)
+        assert result["lessons"] == 1
+        assert db.session.get(Lesson, l2) is None
+        assert Progress.query.filter_by(lesson_id=l2).count() == 0
+        archived = ProgressArchive.query.one()
+        assert (archived.lesson_id, archived.course_id, archived.lesson_title) == (l2, course_id, "L2")
+
+    client.delete(f"/courses/{course_id}", headers=instructor)
+    with app.app_context():
+        assert purge(0, pause=0)["courses"] == 1
+        assert Course.query.execution_options(include_deleted=True).count() == 0
+        assert ProgressArchive.query.count() == 2
+
+
+def _add_lesson(client, headers, course_id, title):
+    resp = client.post(f"/courses/{course_id}/lessons", json={"title": title, "content": "x", "order_index": 9},
+                       headers=headers)
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def test_slots_of_deleted_lessons_are_not_reused(app, client, course):
+    instructor, course_id, (l1, l2, l3) = course
+    client.delete(f"/lessons/{l3}", headers=instructor)
+    l4 = _add_lesson(client, instructor, course_id, "L4")
+
+    with app.app_context():
+        purge(0, pause=0)
+    l5 = _add_lesson(client, instructor, course_id, "L5")
+    with app.app_context():
+        assert [db.session.get(Lesson, i).slot for i in (l1, l2, l4, l5)] == [0, 1, 3, 4]
+
+
+def test_purge_clears_completion_bits(app, client, login, course):
+    instructor, course_id, (l1, l2, l3) = course
+    client.delete(f"/lessons/{l3}", headers=instructor)
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    client.post(f"/lessons/{l2}/complete", headers=student)
+    client.delete(f"/lessons/{l2}", headers=instructor)
+    with app.app_context():
+        purge(0, pause=0)
+        row = CourseProgress.query.one()
+        assert (row.completed_bits.rstrip(b"\0"), row.completed_count) == (b"", 0)
+
+    new = _add_lesson(client, instructor, course_id, "L4")
+    resp = client.post(f"/lessons/{l1}/complete", headers=student).get_json()
+    assert resp["certificate"] is None
+    states = client.get(f"/courses/{course_id}/lessons/unlocked", headers=student).get_json()
+    assert {s["id"]: s["completed"] for s in states} == {l1: True, new: False}
+    assert client.get(f"/courses/{course_id}/progress", headers=student).get_json()["completion_percent"] == 50
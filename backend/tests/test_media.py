@@ -0,0 +1,58 @@
+import os
+
+from app.media import parse_content_range
+
+
+def test_parse_content_range():
+    assert parse_content_range("bytes 0-1048575/5000000") == (0, 1048575, 5000000)
+    assert parse_content_range("bytes 4-4/5") == (4, 4, 5)
+    for bad in (None, "", "bytes */5", "bytes 5-4/10", "bytes 0-10/10", "bytes -1-3/10", "items 0-1/2", "bytes a-b/c"):
+        assert parse_content_range(bad) is None
+
+
+def _upload(client, headers, lesson_id, data, chunk):
+    upload_id = client.post(f"/lessons/{lesson_id}/media/uploads", headers=headers, json={
+        "filename": "a.mp3", "content_type": "audio/mpeg", "size": len(data),
+    }).get_json()["upload_id"]
+    for start in range(0, len(data), chunk):
+        end = min(start + chunk, len(data)) - 1
+        resp = client.put(f"/media/uploads/{upload_id}", data=data[start:end + 1],
+                          headers={**headers, "Content-Range": f"bytes {start}-{end}/{len(data)}"})
+    return upload_id, resp
+
+
+def test_resumable_upload_and_range(client, course):
+    instructor, _, lesson_ids = course
+    data = os.urandom(3000)
+    upload_id = client.post(f"/lessons/{lesson_ids[0]}/media/uploads", headers=instructor, json={
+        "filename": "a.mp3", "content_type": "audio/mpeg", "size": len(data),
+    }).get_json()["upload_id"]
+
+    def put(start, end):
+        return client.put(f"/media/uploads/{upload_id}", data=data[start:end + 1],
+                          headers={**instructor, "Content-Range": f"bytes {start}-{end}/{len(data)}"})
+
+    assert put(0, 999).get_json()["offset"] == 1000
+    skipped = put(2000, 2999)
+    assert skipped.status_code == 409 and skipped.get_json()["offset"] == 1000
+    assert put(1000, 1999).status_code == 200
+    done = put(2000, 2999)
+    assert done.status_code == 201
+    media_id = done.get_json()["id"]
+
+    full = client.get(f"/media/{media_id}")
+    assert full.data == data and "immutable" in full.headers["Cache-Control"]
+    part = client.get(f"/media/{media_id}", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206 and part.data == data[100:200]
+    assert client.get(f"/media/{media_id}", headers={"Range": "bytes=5000-"}).status_code == 416
+
+
+def test_identical_uploads_share_a_blob(app, client, course):
+    instructor, _, lesson_ids = course
+    data = os.urandom(2000)
+    _, first = _upload(client, instructor, lesson_ids[0], data, 1000)
+    _, second = _upload(client, instructor, lesson_ids[1], data, 1000)
+    assert (first.get_json()["deduplicated"], second.get_json()["deduplicated"]) == (False, True)
+
+    assert client.delete(f"/media/{first.get_json()['id']}", headers=instructor).status_code in (200, 204)
+    assert client.get(f"/media/{second.get_json()['id']}").data == data
@@ -0,0 +1,21 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.profiling import RequestStats
+
+
+def test_failed_query_does_not_skew_the_next_one(app):
+    with app.test_request_context():
+        g._request_stats = stats = RequestStats(sampled=False)
+        conn = db.session.connection()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info.get("_query_start") == []
+
+        db.session.rollback()
+        db.session.execute(text("SELECT 1"))
+        assert stats.query_count == 1
+        assert not db.session.connection().info.get("_query_start")
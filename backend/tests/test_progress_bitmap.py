@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.progress_bitmap import clear_bit, covers, pack_slots, packed_matrix, popcount, set_bit, unpack
+
+
+def test_pack_slots_little_endian():
+    assert pack_slots([0, 9]) == bytes([0b1, 0b10])
+    assert pack_slots([], 10) == b"\0\0"
+    assert pack_slots([]) == b""
+
+
+def test_set_bit_grows_and_reports_change():
+    bits, changed = set_bit(b"", 10)
+    assert (bits, changed) == (bytes([0, 0b100]), True)
+    assert set_bit(bits, 10) == (bits, False)
+    assert set_bit(bits, 0) == (bytes([1, 0b100]), True)
+
+
+def test_clear_bit():
+    bits = pack_slots([0, 10])
+    assert clear_bit(bits, 10) == (bytes([1, 0]), True)
+    assert clear_bit(bits, 3) == (bits, False)
+    assert clear_bit(bits, 40) == (bits, False)
+
+
+def test_matrix_helpers():
+    bitmaps = [pack_slots([0, 1, 2]), pack_slots([1]), b"", pack_slots([0, 1, 2, 11])]
+    packed = packed_matrix(bitmaps, 4)  # slots >= 4 are cut off
+    assert packed.shape == (4, 1)
+    assert unpack(packed, 4).tolist() == [
+        [True, True, True, False], [False, True, False, False], [False] * 4, [True, True, True, False],
+    ]
+    assert popcount(packed).tolist() == [3, 1, 0, 3]
+    assert covers(packed, pack_slots([0, 1])).tolist() == [True, False, False, True]
+    assert covers(packed, b"").dtype == np.bool_
+
+
+def test_summary_completed_through(client, login, course):
+    instructor, course_id, (l1, l2, l3) = course
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    client.post(f"/lessons/{l1}/complete", headers=student)
+
+    def summary(through):
+        return client.get(f"/courses/{course_id}/progress/summary?through={through}", headers=instructor)
+
+    assert summary(1).get_json()["completed_through"] == {"lessons": 1, "students": 1}
+    assert summary(9).get_json()["completed_through"] == {"lessons": 3, "students": 0}
+    assert summary(0).status_code == summary(-1).status_code == 400
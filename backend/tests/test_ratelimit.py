@@ -0,0 +1,94 @@
+import pytest
+
+from app import ratelimit
+from app.ratelimit import Limit, MemoryStore, parse_limits
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_limit_spec():
+    limit = Limit("5/minute burst 10")
+    assert (limit.rate, limit.capacity) == (5 / 60, 10)
+    assert Limit("2 per second").capacity == 2
+    with pytest.raises(ValueError):
+        Limit("5 a minute")
+    with pytest.raises(ValueError):
+        Limit("5/minute", key="session")
+
+
+def test_parse_limits():
+    assert parse_limits("auth.login=5/minute burst 10; progress = 120/minute ;") == {
+        "auth.login": "5/minute burst 10", "progress": "120/minute",
+    }
+
+
+def test_bucket_burst_then_refill(clock):
+    store = MemoryStore()
+    assert [store.take("k", 1.0, 3)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, _, wait = store.take("k", 1.0, 3)
+    assert not allowed and wait == pytest.approx(1.0)
+    clock.now += 1.0
+    assert store.take("k", 1.0, 3)[0]
+    assert not store.take("k", 1.0, 3)[0]
+
+
+def test_bucket_caps_at_capacity(clock):
+    store = MemoryStore()
+    store.take("k", 1.0, 2)
+    clock.now += 3600
+    assert [store.take("k", 1.0, 2)[0] for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_per_key_and_bounded(clock):
+    store = MemoryStore(max_keys=2)
+    assert store.take("a", 1.0, 1)[0] and store.take("b", 1.0, 1)[0]
+    assert not store.take("a", 1.0, 1)[0]
+    store.take("c", 1.0, 1)  # evicts the least recently used bucket ("b")
+    assert store.take("b", 1.0, 1)[0]
+
+
+def test_login_limited(app, client):
+    app.config["RATELIMIT_ENABLED"] = True
+    app.config["RATELIMIT_LIMITS"] = "auth.login=2/minute"
+    ratelimit.RateLimiter().init_app(app)
+    codes = [client.post("/auth/login", json={"email": "x@x", "password": "x"}).status_code for _ in range(3)]
+    assert codes[:2] == [401, 401] and codes[2] == 429
+
+
+def test_client_ip_behind_proxies(app):
+    def ip(forwarded=None, hops=0):
+        app.config["RATELIMIT_TRUSTED_PROXIES"] = hops
+        headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+        with app.test_request_context(headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+            return ratelimit.client_ip()
+
+    assert ip("203.0.113.7") == "10.0.0.1"  # no trusted proxy: the header is ignored
+    assert ip("203.0.113.7", hops=1) == "203.0.113.7"
+    assert ip("1.2.3.4, 203.0.113.7", hops=1) == "203.0.113.7"  # client-sent entry skipped
+    assert ip("1.2.3.4, 203.0.113.7, 10.0.0.2", hops=2) == "203.0.113.7"
+    assert ip("203.0.113.7", hops=2) == "10.0.0.1"
+    assert ip(None, hops=1) == "10.0.0.1"
+
+
+def test_login_buckets_per_forwarded_client(app, client):
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_LIMITS="auth.login=1/minute", RATELIMIT_TRUSTED_PROXIES=1)
+    ratelimit.RateLimiter().init_app(app)
+
+    def login(ip):
+        return client.post("/auth/login", json={"email": "x@x", "password": "x"},
+                           headers={"X-Forwarded-For": ip}).status_code
+
+    assert [login("203.0.113.7"), login("203.0.113.8"), login("203.0.113.7")] == [401, 401, 429]
@@ -0,0 +1,37 @@
+import pytest
+
+from app import db
+from app.models.recommendation import CourseNeighbor
+
+
+@pytest.fixture
+def related(app, client, course):
+    # The course with two neighbors
+    instructor, course_id, _ = course
+    others = [client.post("/courses", json={"title": f"C{i}", "description": "d"}, headers=instructor).get_json()["id"]
+              for i in range(2)]
+    with app.app_context():
+        db.session.add_all([
+            CourseNeighbor(course_id=course_id, rank=rank, neighbor_id=other, score=0.5, co_enrollments=3)
+            for rank, other in enumerate(others, start=1)
+        ])
+        db.session.commit()
+    return course_id, others
+
+
+@pytest.mark.parametrize("limit, expected", [("", 2), ("1", 1), ("0", 1), ("-1", 1), ("500", 2)])
+def test_related_limit(client, related, limit, expected):
+    course_id, others = related
+    resp = client.get(f"/courses/{course_id}/related?limit={limit}")
+    assert resp.status_code == 200
+    assert len(resp.get_json()) == expected
+
+
+@pytest.mark.parametrize("limit, expected", [(None, 2), (1, 1), (0, 1), (-1, 1), (500, 2)])
+def test_batch_related_limit(client, related, limit, expected):
+    course_id, _ = related
+    sub = {"resource": "related", "course_id": course_id}
+    if limit is not None:
+        sub["limit"] = limit
+    body = client.post("/batch", json={"requests": [sub]}).get_json()["responses"][0]
+    assert body["status"] == 200 and len(body["body"]) == expected
@@ -0,0 +1,22 @@
+from app import db, rendering
+from app.models import Lesson
+
+
+def test_markdown_is_sanitized():
+    html = rendering.render_markdown("**hi** <script>alert(1)</script> [x](javascript:alert(1)) https://example.com")
+    assert "<strong>hi</strong>" in html
+    assert "<script" not in html and "javascript:" not in html
+    assert 'href="https://example.com"' in html
+
+
+def test_renderer_upgrade_rerenders_on_read(app, client, course, monkeypatch):
+    _, _, (lesson_id, _, _) = course
+    assert client.get(f"/lessons/{lesson_id}").get_json()["content_html"] == "<p>hola</p>"
+
+    monkeypatch.setattr(rendering, "RENDERER_VERSION", "2")
+    monkeypatch.setattr(rendering, "MARKDOWN_EXTENSIONS", [])
+    monkeypatch.setattr(rendering, "ALLOWED_TAGS", {"em"})
+    assert client.get(f"/lessons/{lesson_id}").get_json()["content_html"] == "hola"
+    with app.app_context():
+        lesson = db.session.get(Lesson, lesson_id)
+        assert lesson.content_hash == rendering.content_hash("hola") and not rendering.is_stale(lesson)
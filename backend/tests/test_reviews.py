@@ -0,0 +1,61 @@
+import pytest
+
+from app.reviews import MIN_EASE, sm2
+
+
+def test_sm2_first_repetitions():
+    assert sm2(2.5, 0, 0, 5)[1:] == (1, 1)
+    assert sm2(2.5, 1, 1, 5)[1:] == (6, 2)
+
+
+def test_sm2_interval_grows_by_ease():
+    ease, interval, reps = sm2(2.5, 6, 2, 4)
+    assert (interval, reps) == (15, 3)
+    assert ease == pytest.approx(2.5)
+
+
+def test_sm2_lapse_resets():
+    ease, interval, reps = sm2(2.5, 15, 3, 1)
+    assert (interval, reps) == (1, 0)
+    assert ease == pytest.approx(2.5 - 0.54)
+
+
+def test_sm2_ease_floor():
+    ease = 1.4
+    for _ in range(5):
+        ease, _, _ = sm2(ease, 1, 0, 0)
+    assert ease == MIN_EASE
+
+
+def test_review_flow(client, login, course):
+    instructor, course_id, lesson_ids = course
+    resp = client.post(f"/lessons/{lesson_ids[0]}/vocabulary", headers=instructor,
+                       json={"items": [{"term": "hola", "translation": "hello"}, {"term": "adiós", "translation": "bye"}]})
+    assert resp.status_code == 201
+    item_ids = [i["id"] for i in resp.get_json()]
+
+    student = login("student@example.com")
+    client.post(f"/courses/{course_id}/enroll", headers=student)
+    client.post(f"/lessons/{lesson_ids[0]}/complete", headers=student)
+    due = client.get("/me/reviews/due", headers=student).get_json()
+    assert sorted(d["id"] for d in due) == sorted(item_ids)
+
+    result = client.post("/me/reviews", headers=student, json={"reviews": [
+        {"item_id": item_ids[0], "grade": 5}, {"item_id": item_ids[1], "grade": 1}, {"item_id": 999, "grade": 4},
+    ]}).get_json()
+    assert (result["graded"], result["lapses"], result["skipped"]) == (2, 1, [999])
+    assert client.get("/me/reviews/due", headers=student).get_json() == []
+
+
+def test_review_validation(client, login, course):
+    student = login("student@example.com")
+    assert client.post("/me/reviews", headers=student, json={"reviews": []}).status_code == 400
+    assert client.post("/me/reviews", headers=student, json={"reviews": [{"item_id": 1, "grade": 6}]}).status_code == 400
+    for body in ({"reviews": [1]}, [{"item_id": 1, "grade": 4}], {"reviews": [{"item_id": 1, "grade": True}]}):
+        assert client.post("/me/reviews", headers=student, json=body).status_code == 400
+
+
+@pytest.mark.parametrize("body", [{"items": ["hola"]}, {"items": [None]}, ["hola"], {"term": "hola"}])
+def test_vocabulary_validation(client, course, body):
+    instructor, _, lesson_ids = course
+    assert client.post(f"/lessons/{lesson_ids[0]}/vocabulary", headers=instructor, json=body).status_code == 400
@@ -0,0 +1,45 @@
+from app.revocation import MemoryDenylist
+
+
+class RecordingDenylist(MemoryDenylist):
+    # Which keys went to the Bloom filter log, and which checks could use the filter
+    def __init__(self):
+        super().__init__()
+        self.logged, self.unlogged, self.checks = [], [], []
+
+    def add(self, key, ttl, value=1.0, bloom=True):
+        (self.logged if bloom else self.unlogged).append(key.split(":")[0])
+        super().add(key, ttl, value, bloom)
+
+    def get_many(self, keys, bloom=True):
+        self.checks.append(bloom)
+        return super().get_many(keys, bloom)
+
+
+def _login(client):
+    client.post("/auth/register", json={"name": "s", "email": "s@example.com", "password": "pw", "role": "student"})
+    return client.post("/auth/login", json={"email": "s@example.com", "password": "pw"}).get_json()
+
+
+def _refresh(client, token):
+    return client.post("/auth/refresh", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_rotated_refresh_tokens_stay_out_of_the_bloom_log(app, client):
+    store = app.extensions["revocation"] = RecordingDenylist()
+    first = _login(client)["refresh_token"]
+
+    resp = _refresh(client, first)
+    assert resp.status_code == 200
+    second = resp.get_json()
+    assert store.unlogged == ["jti"] and store.logged == []
+    assert store.checks == [False]  # refresh tokens always ask the store
+
+    # Reuse of the rotated token is still caught, and ends the session
+    assert _refresh(client, first).status_code == 401
+    assert store.logged == ["fam"]
+    assert _refresh(client, second["refresh_token"]).status_code == 401
+
+    headers = {"Authorization": f"Bearer {second['access_token']}"}
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert store.checks[-1] is True  # access tokens may skip the store
@@ -0,0 +1,29 @@
+from app import db, search
+from app.models import Course
+
+
+def _titles(client, q):
+    return [r["title"] for r in client.get(f"/search?q={q}").get_json()["results"]]
+
+
+def test_index_follows_writes(client, course):
+    instructor, course_id, lesson_ids = course
+    assert _titles(client, "spanish") == ["Spanish"]  # first search builds the index
+
+    client.post("/courses", json={"title": "Spanish verbs", "description": "d"}, headers=instructor)
+    assert sorted(_titles(client, "spanish")) == ["Spanish", "Spanish verbs"]
+    client.delete(f"/courses/{course_id}", headers=instructor)
+    assert _titles(client, "spanish") == ["Spanish verbs"]
+
+
+def test_indexing_leaves_the_commit_to_the_caller(app, client, course):
+    _titles(client, "spanish")
+    with app.app_context():
+        course = Course(title="Italian", description="d", level="A1", instructor_id=1)
+        db.session.add(course)
+        db.session.flush()
+        search.index_course(course)
+        db.session.rollback()  # the request failed after indexing
+
+        assert Course.query.filter_by(title="Italian").count() == 0
+        assert search.search("italian") == []
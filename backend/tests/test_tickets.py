@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from app import tickets
+
+
+def _ticket(client, headers, scope):
+    resp = client.post("/auth/tickets", headers=headers, json={"scope": scope})
+    assert resp.status_code == 201
+    return resp.get_json()["ticket"]
+
+
+def _events(client, query):
+    resp = client.get(f"/events?{query}", buffered=False)
+    resp.close()
+    return resp.status_code
+
+
+def test_events_take_a_ticket(client, login):
+    student = login("student@example.com")
+    token = student["Authorization"].split()[1]
+
+    assert _events(client, f"ticket={_ticket(client, student, 'events')}") == 200
+    assert _events(client, f"ticket={_ticket(client, student, 'export')}") == 401  # other scope
+    assert _events(client, "ticket=forged") == 401
+    assert _events(client, f"jwt={token}") == 401  # access tokens stay out of URLs
+
+    assert client.post("/auth/tickets", headers=student, json={"scope": "admin"}).status_code == 400
+    assert client.post("/auth/tickets", json={"scope": "events"}).status_code == 401
+
+
+def test_tickets_expire(app, monkeypatch):
+    with app.test_request_context():
+        ticket = tickets.issue("7", "events", int(time.time()) + 900)
+        assert tickets.load(ticket, "events") == ("7", pytest.approx(time.time() + 900, abs=2))
+        # A ticket never outlives the access token it was issued for
+        assert tickets.load(tickets.issue("7", "events", int(time.time()) - 1), "events") is None
+
+        monkeypatch.setitem(app.config, "TICKET_SECONDS", -1)
+        assert tickets.load(ticket, "events") is None
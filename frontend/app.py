@@ -1,9 +1,13 @@
+import base64
+
 import dash
-from dash import dcc, html, Input, Output, State, ALL
+from dash import dcc, html, dash_table, Input, Output, State, ALL
 import requests
 from dash.exceptions import PreventUpdate
 
 API_BASE = "http://localhost:5000"  # ✅ use localhost (matches your working PowerShell)
+TOKEN_REFRESH_MS = 10 * 60 * 1000  # access tokens live 15 minutes (JWT_ACCESS_MINUTES)
+ROSTER_PAGE_SIZE = 200
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 server = app.server  # for deployment later
@@ -32,6 +36,26 @@ def safe_json(resp):
         return {}
 
 
+def fetch_batch(token: str | None, subrequests: list) -> list:
+    # POST /batch: one response per sub-request, {"status", "body"} or {"status", "error"}
+    r = requests.post(f"{API_BASE}/batch", json={"requests": subrequests}, headers=auth_headers(token), timeout=10)
+    if r.status_code != 200:
+        error = safe_json(r).get("error", r.text)
+        return [{"status": r.status_code, "error": error} for _ in subrequests]
+    return r.json()["responses"]
+
+
+def media_player(m):
+    # preload="metadata": the browser fetches byte ranges as playback needs them
+    src = f"{API_BASE}{m['url']}"
+    kind = m["content_type"].split("/")[0]
+    if kind == "audio":
+        return html.Audio(src=src, controls=True, preload="metadata", style={"width": "100%"})
+    if kind == "video":
+        return html.Video(src=src, controls=True, preload="metadata", style={"maxWidth": "100%"})
+    return html.Img(src=src, alt=m["filename"], style={"maxWidth": "100%"})
+
+
 # -----------------------
 # Pages (Layouts)
 # -----------------------
@@ -88,6 +112,7 @@ def top_nav(user):
         dcc.Link("Dashboard", href="/dashboard"),
         dcc.Link("Courses", href="/courses"),
         dcc.Link("My Courses", href="/my-courses"),
+        dcc.Link("Reviews", href="/reviews"),
     ]
 
     if user.get("role") in ("instructor", "admin"):
@@ -132,6 +157,21 @@ def courses_page(user):
             top_nav(user),
             html.Hr(),
             html.H2("Course Catalog"),
+            dcc.Input(
+                id="courses-search", type="search", placeholder="Search courses and lessons…",
+                debounce=True, style={"width": "100%", "marginBottom": "10px"},
+            ),
+            dcc.RadioItems(
+                id="courses-sort",
+                options=[
+                    {"label": "Newest", "value": "new"},
+                    {"label": "Most popular", "value": "popular"},
+                    {"label": "Trending", "value": "trending"},
+                ],
+                value="new",
+                inline=True,
+                style={"marginBottom": "10px"},
+            ),
             html.Div(id="courses-msg", style={"marginBottom": "10px"}),
             html.Div(id="courses-list"),
         ],
@@ -153,6 +193,9 @@ def course_detail_page(user, course_id: int):
             html.H3("Lessons"),
             html.Div(id="course-lessons"),
             html.Div(id="course-detail-msg", style={"marginTop": "10px"}),
+            html.Hr(),
+            html.H3("Students who enrolled in this also took…"),
+            html.Div(id="course-related"),
         ],
     )
 
@@ -166,9 +209,15 @@ def lesson_page(user, lesson_id: int):
             dcc.Link("← Back", href="/courses"),
             html.H2(f"Lesson #{lesson_id}"),
             html.Div(id="lesson-detail"),
+            # content_html is set as the div's innerHTML (clientside callback below)
+            html.Div(id="lesson-body"),
+            dcc.Store(id="lesson-html"),
+            html.Div(id="lesson-media"),
             html.Br(),
             html.Button("Mark Complete", id="mark-complete-btn", n_clicks=0),
             html.Div(id="lesson-msg", style={"marginTop": "10px"}),
+            html.Hr(),
+            html.Div(id="lesson-nav"),
             dcc.Store(id="current-lesson-id", data=lesson_id),
         ],
     )
@@ -181,18 +230,40 @@ def my_courses_page(user):
             top_nav(user),
             html.Hr(),
             html.H2("My Courses"),
+            dcc.Store(id="my-courses-role", data=user.get("role")),
             html.Div(id="my-courses-msg", style={"marginBottom": "10px"}),
             html.Div(id="my-courses-list"),
         ],
     )
 
 
+def reviews_page(user):
+    return html.Div(
+        style={"maxWidth": "900px", "margin": "30px auto", "fontFamily": "Arial"},
+        children=[
+            top_nav(user),
+            html.Hr(),
+            html.H2("Vocabulary Reviews"),
+            html.Div("Grade each word: 0 = forgot, 3 = hard, 4 = good, 5 = easy."),
+            html.Br(),
+            html.Div(id="reviews-list"),
+            html.Br(),
+            html.Button("Submit reviews", id="reviews-submit", n_clicks=0),
+            html.Div(id="reviews-msg", style={"marginTop": "10px"}),
+        ],
+    )
+
+
 # -----------------------
 # App Layout
 # -----------------------
 app.layout = html.Div([
     dcc.Location(id="url"),
     dcc.Store(id="auth-store", storage_type="session"),
+    dcc.Interval(id="auth-refresh", interval=TOKEN_REFRESH_MS),
+    # Live events from GET /events; the clientside callback below fills live-event
+    dcc.Store(id="live-stream"),
+    dcc.Store(id="live-event"),
     html.Div(id="page-content")
 ])
 
@@ -209,6 +280,10 @@ def route(pathname, auth_data):
     auth_data = auth_data or {}
     token = auth_data.get("access_token")
 
+    # A rotated token (auth-refresh) must not re-render the page the user is on
+    if token and list(dash.ctx.triggered_prop_ids) == ["auth-store.data"] and pathname not in ("/login", "/register"):
+        raise PreventUpdate
+
     # Public routes
     if pathname == "/register":
         return register_page()
@@ -248,6 +323,9 @@ def route(pathname, auth_data):
     if pathname == "/my-courses":
         return my_courses_page(user)
 
+    if pathname == "/reviews":
+        return reviews_page(user)
+
     if pathname == "/instructor":
         if user.get("role") not in ("instructor", "admin"):
             return html.Div("403 - Instructor access only", style={"padding": "20px", "color": "crimson"})
@@ -423,8 +501,8 @@ def do_login(n, email, password):
         )
         if r.status_code == 200:
             data = r.json()
-            token = data.get("access_token")
-            return {"access_token": token}, html.Div("Login successful!", style={"color": "green"}), "/dashboard"
+            tokens = {"access_token": data.get("access_token"), "refresh_token": data.get("refresh_token")}
+            return tokens, html.Div("Login successful!", style={"color": "green"}), "/dashboard"
 
         msg = safe_json(r).get("error", "Login failed")
         return dash.no_update, html.Div(msg, style={"color": "crimson"}), dash.no_update
@@ -432,6 +510,32 @@ def do_login(n, email, password):
         return dash.no_update, html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"}), dash.no_update
 
 
+# -----------------------
+# Token refresh (rotation: every refresh returns a new refresh token)
+# -----------------------
+@app.callback(
+    Output("auth-store", "data", allow_duplicate=True),
+    Input("auth-refresh", "n_intervals"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def refresh_tokens(n, auth_data):
+    refresh_token = (auth_data or {}).get("refresh_token")
+    if not refresh_token:
+        raise PreventUpdate
+
+    try:
+        r = requests.post(f"{API_BASE}/auth/refresh", headers=auth_headers(refresh_token), timeout=5)
+    except Exception:
+        raise PreventUpdate  # backend down: keep the tokens and retry next interval
+    if r.status_code == 200:
+        data = r.json()
+        return {"access_token": data.get("access_token"), "refresh_token": data.get("refresh_token")}
+    if r.status_code in (401, 422):
+        return None  # session revoked or expired: back to login
+    raise PreventUpdate
+
+
 # -----------------------
 # Logout
 # -----------------------
@@ -439,24 +543,79 @@ def do_login(n, email, password):
     Output("auth-store", "clear_data"),
     Output("url", "pathname", allow_duplicate=True),
     Input("logout-btn", "n_clicks"),
+    State("auth-store", "data"),
     prevent_initial_call=True,
 )
-def logout(n):
+def logout(n, auth_data):
     if not n or n < 1:
         raise PreventUpdate
+
+    token = (auth_data or {}).get("access_token")
+    if token:
+        try:
+            # Revokes this session's access and refresh tokens server-side
+            requests.post(f"{API_BASE}/auth/logout", headers=auth_headers(token), timeout=5)
+        except Exception:
+            pass
     return True, "/login"
 
 
 # -----------------------
 # Courses: load catalog
 # -----------------------
+def course_card(c):
+    return html.Div(
+        style={"border": "1px solid #ddd", "borderRadius": "8px", "padding": "12px", "marginBottom": "10px"},
+        children=[
+            html.H4(c["title"], style={"margin": "0 0 6px 0"}),
+            html.Div(c.get("description", "")),
+            html.Small(
+                f"Level: {c.get('level','')} | Instructor ID: {c.get('instructor_id')}"
+                + (f" | {c['enrollment_count']} enrolled" if c.get("enrollment_count") is not None else "")
+            ),
+            html.Br(), html.Br(),
+            html.Div(style={"display": "flex", "gap": "10px"}, children=[
+                dcc.Link("View", href=f"/course/{c['id']}"),
+                html.Button("Enroll", id={"type": "enroll-btn", "course_id": c["id"]}, n_clicks=0),
+            ]),
+        ]
+    )
+
+
+def search_results(query):
+    r = requests.get(f"{API_BASE}/search", params={"q": query, "limit": 50}, timeout=5)
+    if r.status_code != 200:
+        return [], html.Div("Search failed.", style={"color": "crimson"})
+
+    results = r.json().get("results", [])
+    if not results:
+        return [html.Div(f"No matches for “{query}”.")], ""
+
+    items = []
+    for hit in results:
+        if hit["type"] == "course":
+            items.append(course_card({"id": hit["id"], "title": hit["title"]}))
+        else:
+            items.append(html.Div(
+                style={"padding": "6px 12px", "marginBottom": "6px", "borderLeft": "3px solid #ddd"},
+                children=[
+                    dcc.Link(f"Lesson: {hit['title']}", href=f"/lesson/{hit['id']}"),
+                    html.Small(" in "),
+                    dcc.Link(f"course #{hit['course_id']}", href=f"/course/{hit['course_id']}"),
+                ],
+            ))
+    return items, html.Small(f"{len(results)} result(s) for “{query}”")
+
+
 @app.callback(
     Output("courses-list", "children"),
     Output("courses-msg", "children"),
     Input("url", "pathname"),
+    Input("courses-search", "value"),
+    Input("courses-sort", "value"),
     State("auth-store", "data"),
 )
-def load_courses(pathname, auth_data):
+def load_courses(pathname, query, sort, auth_data):
     if pathname != "/courses":
         raise PreventUpdate
 
@@ -464,7 +623,10 @@ def load_courses(pathname, auth_data):
     token = auth_data.get("access_token")
 
     try:
-        r = requests.get(f"{API_BASE}/courses", timeout=5)
+        if query and query.strip():
+            return search_results(query.strip())
+
+        r = requests.get(f"{API_BASE}/courses", params={"sort": sort or "new"}, timeout=5)
         if r.status_code != 200:
             return [], html.Div("Failed to load courses.", style={"color": "crimson"})
 
@@ -472,22 +634,7 @@ def load_courses(pathname, auth_data):
         if not courses:
             return [html.Div("No courses yet.")], ""
 
-        cards = []
-        for c in courses:
-            cards.append(html.Div(
-                style={"border": "1px solid #ddd", "borderRadius": "8px", "padding": "12px", "marginBottom": "10px"},
-                children=[
-                    html.H4(c["title"], style={"margin": "0 0 6px 0"}),
-                    html.Div(c.get("description", "")),
-                    html.Small(f"Level: {c.get('level','')} | Instructor ID: {c.get('instructor_id')}"),
-                    html.Br(), html.Br(),
-                    html.Div(style={"display": "flex", "gap": "10px"}, children=[
-                        dcc.Link("View", href=f"/course/{c['id']}"),
-                        html.Button("Enroll", id={"type": "enroll-btn", "course_id": c["id"]}, n_clicks=0),
-                    ]),
-                ]
-            ))
-        return cards, ""
+        return [course_card(c) for c in courses], ""
     except Exception:
         return [], html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
 
@@ -532,6 +679,7 @@ def enroll_course(n_clicks_list, auth_data):
     Output("course-detail", "children"),
     Output("course-actions", "children"),
     Output("course-lessons", "children"),
+    Output("course-related", "children"),
     Input("url", "pathname"),
     State("auth-store", "data"),
 )
@@ -547,15 +695,19 @@ def load_course_detail(pathname, auth_data):
     try:
         course_id = int(pathname.split("/course/")[1])
     except Exception:
-        return html.Div("Invalid course id.", style={"color": "crimson"}), "", ""
+        return html.Div("Invalid course id.", style={"color": "crimson"}), "", "", ""
 
     try:
-        # Course info
-        rc = requests.get(f"{API_BASE}/courses/{course_id}", timeout=5)
-        if rc.status_code != 200:
-            return html.Div("Course not found.", style={"color": "crimson"}), "", ""
+        # Course, my lesson states and related courses in one round trip
+        course_r, lessons_r, related_r = fetch_batch(token, [
+            {"resource": "course", "id": course_id},
+            {"resource": "lesson_states", "course_id": course_id},
+            {"resource": "related", "course_id": course_id},
+        ])
+        if course_r.get("status") != 200:
+            return html.Div("Course not found.", style={"color": "crimson"}), "", "", ""
 
-        c = rc.json()
+        c = course_r["body"]
         course_info = html.Div([
             html.H3(c["title"], style={"marginTop": "0"}),
             html.Div(c.get("description", "")),
@@ -565,26 +717,59 @@ def load_course_detail(pathname, auth_data):
         # Actions
         actions = html.Div([
             html.Button("Enroll in this course", id="enroll-course-detail-btn", n_clicks=0),
+            html.Button("Download for offline use", id="course-bundle-btn", n_clicks=0, style={"marginLeft": "10px"}),
+            dcc.Download(id="course-bundle-download"),
             dcc.Store(id="current-course-id", data=course_id),
         ])
 
-        # Lessons
-        rl = requests.get(f"{API_BASE}/courses/{course_id}/lessons", timeout=5)
-        lessons = rl.json() if rl.status_code == 200 else []
+        # Lessons with my completed/unlocked state
+        lessons = lessons_r.get("body") or []
         if not lessons:
             lessons_view = html.Div("No lessons yet.")
         else:
             lessons_view = html.Ul([
                 html.Li([
                     dcc.Link(f"{l['order_index']}. {l['title']}", href=f"/lesson/{l['id']}")
+                    if l["unlocked"] else html.Span(f"{l['order_index']}. {l['title']} 🔒", style={"opacity": 0.6}),
+                    html.Span(" ✅" if l["completed"] else ""),
                 ])
                 for l in lessons
             ])
 
-        return course_info, actions, lessons_view
+        # Related courses (built offline, may be empty)
+        related = related_r.get("body") or []
+        if not related:
+            related_view = html.Div("No recommendations yet.")
+        else:
+            related_view = html.Ul([
+                html.Li(dcc.Link(r["title"], href=f"/course/{r['id']}"))
+                for r in related
+            ])
+
+        return course_info, actions, lessons_view, related_view
 
     except Exception:
-        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"}), "", ""
+        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"}), "", "", ""
+
+
+# Offline bundle (zip of lessons, rendered content and media)
+@app.callback(
+    Output("course-bundle-download", "data"),
+    Input("course-bundle-btn", "n_clicks"),
+    State("current-course-id", "data"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def download_bundle(n, course_id, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not n or not token:
+        raise PreventUpdate
+
+    r = requests.get(f"{API_BASE}/courses/{course_id}/bundle", headers=auth_headers(token), timeout=300)
+    if r.status_code != 200:
+        raise PreventUpdate
+    version = r.headers.get("X-Bundle-Version", "latest")
+    return dcc.send_bytes(r.content, f"course-{course_id}-{version}.zip")
 
 
 # Enroll button on course detail page
@@ -619,6 +804,8 @@ def enroll_from_course_detail(n, course_id, auth_data):
 # -----------------------
 @app.callback(
     Output("lesson-detail", "children"),
+    Output("lesson-html", "data"),
+    Output("lesson-media", "children"),
     Input("url", "pathname"),
 )
 def load_lesson(pathname):
@@ -628,21 +815,71 @@ def load_lesson(pathname):
     try:
         lesson_id = int(pathname.split("/lesson/")[1])
     except Exception:
-        return html.Div("Invalid lesson id.", style={"color": "crimson"})
+        return html.Div("Invalid lesson id.", style={"color": "crimson"}), "", []
 
     try:
         r = requests.get(f"{API_BASE}/lessons/{lesson_id}", timeout=5)
         if r.status_code != 200:
-            return html.Div("Lesson not found.", style={"color": "crimson"})
+            return html.Div("Lesson not found.", style={"color": "crimson"}), "", []
         l = r.json()
-        return html.Div([
+        m = requests.get(f"{API_BASE}/lessons/{lesson_id}/media", timeout=5)
+        media = m.json() if m.status_code == 200 else []
+        return (
             html.H3(l["title"], style={"marginTop": "0"}),
-            html.Div(l.get("content", "") or "", style={"whiteSpace": "pre-wrap"}),
-            html.Br(),
-            html.Small(f"Course ID: {l.get('course_id')} | Order: {l.get('order_index')}"),
-        ])
+            # Already HTML, rendered and sanitized by the API (app.rendering): shown
+            # as is, not parsed as Markdown a second time
+            l.get("content_html") or "",
+            [
+                *[html.Div(media_player(m), style={"margin": "10px 0"}) for m in media],
+                html.Br(),
+                html.Small(f"Course ID: {l.get('course_id')} | Order: {l.get('order_index')}"),
+            ],
+        )
     except Exception:
-        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
+        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"}), "", []
+
+
+app.clientside_callback(
+    """
+    function(content) {
+        const el = document.getElementById("lesson-body");
+        if (el) { el.innerHTML = content || ""; }
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output("lesson-body", "title"),
+    Input("lesson-html", "data"),
+)
+
+
+# Lesson: previous / next (refreshes after marking complete, which may unlock lessons)
+@app.callback(
+    Output("lesson-nav", "children"),
+    Input("current-lesson-id", "data"),
+    Input("lesson-msg", "children"),
+    State("auth-store", "data"),
+)
+def load_lesson_nav(lesson_id, _msg, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not lesson_id or not token:
+        raise PreventUpdate
+
+    try:
+        r = requests.get(f"{API_BASE}/lessons/{lesson_id}/navigation", headers=auth_headers(token), timeout=5)
+    except Exception:
+        return ""
+    if r.status_code != 200:
+        return ""
+
+    nav = r.json()
+    prev_link = dcc.Link(f"← {nav['previous']['title']}", href=f"/lesson/{nav['previous']['id']}") if nav["previous"] else html.Span()
+    if nav["next"]:
+        next_link = dcc.Link(f"{nav['next']['title']} →", href=f"/lesson/{nav['next']['id']}")
+    elif nav["locked_ahead"]:
+        next_link = html.Span(f"🔒 {nav['locked_ahead']} locked lesson(s) ahead", style={"opacity": 0.7})
+    else:
+        next_link = html.Span("Last lesson 🎉")
+    return html.Div(style={"display": "flex", "justifyContent": "space-between"}, children=[prev_link, next_link])
 
 
 # Lesson: mark complete
@@ -676,6 +913,80 @@ def mark_complete(n, lesson_id, auth_data):
         return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
 
 
+# -----------------------
+# Reviews: due queue + batched grading
+# -----------------------
+@app.callback(
+    Output("reviews-list", "children"),
+    Input("url", "pathname"),
+    Input("reviews-msg", "children"),
+    State("auth-store", "data"),
+)
+def load_reviews(pathname, _msg, auth_data):
+    if pathname != "/reviews":
+        raise PreventUpdate
+
+    token = (auth_data or {}).get("access_token")
+    if not token:
+        raise PreventUpdate
+
+    try:
+        r = requests.get(f"{API_BASE}/me/reviews/due", params={"limit": 20}, headers=auth_headers(token), timeout=5)
+        items = r.json() if r.status_code == 200 else []
+    except Exception:
+        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
+
+    if not items:
+        return html.Div("Nothing due right now. Complete lessons to add vocabulary. 🎉")
+
+    return html.Div([
+        html.Div(
+            style={"border": "1px solid #ddd", "padding": "10px", "marginBottom": "8px"},
+            children=[
+                html.Details([html.Summary(html.B(i["term"])), html.Div(i["translation"]),
+                              html.Small(i.get("example") or "")]),
+                dcc.RadioItems(
+                    id={"type": "review-grade", "item_id": i["id"]},
+                    options=[{"label": str(g), "value": g} for g in (0, 3, 4, 5)],
+                    inline=True,
+                ),
+            ],
+        )
+        for i in items
+    ])
+
+
+@app.callback(
+    Output("reviews-msg", "children"),
+    Input("reviews-submit", "n_clicks"),
+    State({"type": "review-grade", "item_id": ALL}, "value"),
+    State({"type": "review-grade", "item_id": ALL}, "id"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def submit_reviews(n, grades, ids, auth_data):
+    if not n or n < 1:
+        raise PreventUpdate
+
+    token = (auth_data or {}).get("access_token")
+    if not token:
+        return html.Div("Please login first.", style={"color": "crimson"})
+
+    # One request for the whole page
+    reviews = [{"item_id": i["item_id"], "grade": g} for g, i in zip(grades, ids) if g is not None]
+    if not reviews:
+        return html.Div("Grade at least one word.", style={"color": "crimson"})
+
+    try:
+        r = requests.post(f"{API_BASE}/me/reviews", json={"reviews": reviews}, headers=auth_headers(token), timeout=10)
+        if r.status_code == 200:
+            return html.Div(f"Saved {r.json()['graded']} reviews ✅", style={"color": "green"})
+        msg = safe_json(r).get("error", r.text)
+        return html.Div(f"Failed: {msg}", style={"color": "crimson"})
+    except Exception:
+        return html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
+
+
 # -----------------------
 # My Courses: list enrollments + progress
 # -----------------------
@@ -726,43 +1037,188 @@ def load_my_courses(pathname, auth_data):
             ))
         return cards, html.Div("Showing courses you teach.", style={"color": "#444"})
 
-    # ✅ Student view: enrolled courses + progress (your existing behavior)
+    # ✅ Student view: enrolled courses + progress, one request for the whole page
     try:
-        r = requests.get(f"{API_BASE}/me/enrollments", headers=auth_headers(token), timeout=5)
-        if r.status_code != 200:
-            msg = safe_json(r).get("error", r.text)
+        enrollments_r, certificates_r = fetch_batch(token, [
+            {"resource": "enrollments", "progress": True},
+            {"resource": "certificates"},
+        ])
+        if enrollments_r.get("status") != 200:
+            msg = enrollments_r.get("error", "unknown error")
             return [], html.Div(f"Failed to load enrollments: {msg}", style={"color": "crimson"})
 
-        enrollments = r.json()
+        enrollments = enrollments_r["body"]
         if not enrollments:
             return [html.Div("You are not enrolled in any courses yet.")], ""
 
-        rows = []
-        for e in enrollments:
-            c = e["course"]
-            course_id = c["id"]
+        certs = {c["course_id"]: c for c in certificates_r.get("body") or []}
+        rows = [
+            my_course_card(e["course"], e["progress"]["completion_percent"], certs.get(e["course"]["id"]))
+            for e in enrollments
+        ]
+        # Starts the download with a fresh ticket (clientside callback below)
+        export = html.Button("⬇️ Download my data", id="export-btn", n_clicks=0)
+        return rows, export
+    except Exception:
+        return [], html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
 
-            progress_percent = None
-            pr = requests.get(f"{API_BASE}/courses/{course_id}/progress", headers=auth_headers(token), timeout=5)
-            if pr.status_code == 200:
-                progress_percent = pr.json().get("completion_percent")
+# Download my data: a ticket (scope "export") instead of the access token in the URL
+app.clientside_callback(
+    """
+    function(n, authData) {
+        const token = authData && authData.access_token;
+        if (!n || !token) { return window.dash_clientside.no_update; }
+        fetch("%s/auth/tickets", {
+            method: "POST",
+            headers: {"Authorization": "Bearer " + token, "Content-Type": "application/json"},
+            body: JSON.stringify({scope: "export"}),
+        })
+        .then(function(r) { return r.ok ? r.json() : null; })
+        .then(function(data) {
+            // Content-Disposition: attachment, so the page stays where it is
+            if (data) { window.location.href = "%s/me/export?ticket=" + encodeURIComponent(data.ticket); }
+        })
+        .catch(function() {});
+        return window.dash_clientside.no_update;
+    }
+    """ % (API_BASE, API_BASE),
+    Output("export-btn", "title"),
+    Input("export-btn", "n_clicks"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
 
-            rows.append(html.Div(
-                style={"border": "1px solid #ddd", "borderRadius": "8px", "padding": "12px", "marginBottom": "10px"},
-                children=[
-                    html.H4(c["title"], style={"margin": "0 0 6px 0"}),
-                    html.Div(c.get("description", "")),
-                    html.Small(f"Level: {c.get('level','')}"),
-                    html.Br(),
-                    html.Div(f"Progress: {progress_percent if progress_percent is not None else '—'}%"),
-                    html.Br(),
-                    dcc.Link("Open course", href=f"/course/{course_id}"),
-                ]
-            ))
 
-        return rows, ""
-    except Exception:
-        return [], html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
+def my_course_card(c, progress_percent, cert=None):
+    # The progress line has its own id so live events update it in place
+    links = [dcc.Link("Open course", href=f"/course/{c['id']}")]
+    if cert:
+        links.append(html.A("🎓 Certificate", href=f"{API_BASE}/certificates/{cert['code']}.pdf", target="_blank"))
+    return html.Div(
+        style={"border": "1px solid #ddd", "borderRadius": "8px", "padding": "12px", "marginBottom": "10px"},
+        children=[
+            html.H4(c["title"], style={"margin": "0 0 6px 0"}),
+            html.Div(c.get("description", "")),
+            html.Small(f"Level: {c.get('level','')}"),
+            html.Br(),
+            html.Div(
+                f"Progress: {progress_percent if progress_percent is not None else '—'}%",
+                id={"type": "mc-progress", "course_id": c["id"]},
+            ),
+            html.Br(),
+            html.Div(style={"display": "flex", "gap": "10px"}, children=links),
+        ]
+    )
+
+
+# -----------------------
+# Live events: one EventSource per tab, reopened when the token rotates or the
+# page changes; /instructor/course/<id> also follows that course's activity.
+# The stream URL carries a short-lived ticket (POST /auth/tickets), so reconnects
+# are done here with a fresh one (and Last-Event-ID) instead of by the browser:
+# after 3 s when a stream ends, 30 s when the server refuses one (e.g. 503).
+# -----------------------
+app.clientside_callback(
+    """
+    function(authData, pathname) {
+        const token = authData && authData.access_token;
+        const prev = window.languageliftEvents;
+        if (prev) { prev.close(); }
+        window.languageliftEvents = null;
+        window.languageliftEventsRun = null;
+        if (!token) { return null; }
+
+        const api = "%s";
+        let query = "";
+        const m = (pathname || "").match(/^\\/instructor\\/course\\/(\\d+)/);
+        if (m) { query += "&course=" + m[1]; }
+
+        // A later run (new token or page) replaces this one
+        const run = {};
+        window.languageliftEventsRun = run;
+
+        const forward = function(e) {
+            if (e.lastEventId) { window.languageliftLastEventId = e.lastEventId; }
+            const event = e.type === "reset" ? {type: "reset"} : JSON.parse(e.data);
+            dash_clientside.set_props("live-event", {data: event});
+        };
+        const open = function() {
+            fetch(api + "/auth/tickets", {
+                method: "POST",
+                headers: {"Authorization": "Bearer " + token, "Content-Type": "application/json"},
+                body: JSON.stringify({scope: "events"}),
+            })
+            .then(function(r) { return r.ok ? r.json() : null; })
+            .then(function(data) {
+                if (!data || window.languageliftEventsRun !== run) { return; }
+                let url = api + "/events?ticket=" + encodeURIComponent(data.ticket) + query;
+                if (window.languageliftLastEventId) {
+                    url += "&last_event_id=" + encodeURIComponent(window.languageliftLastEventId);
+                }
+                const source = new EventSource(url);
+                ["enrollment", "progress", "completion", "lessons_changed", "reset"].forEach(function(type) {
+                    source.addEventListener(type, forward);
+                });
+                source.onerror = function() {
+                    // CONNECTING: the stream ended; CLOSED: the server refused it
+                    const ended = source.readyState === EventSource.CONNECTING;
+                    source.close();
+                    if (window.languageliftEventsRun === run) { setTimeout(open, ended ? 3000 : 30000); }
+                };
+                window.languageliftEvents = source;
+            })
+            .catch(function() {});
+        };
+        open();
+        return api + "/events";
+    }
+    """ % API_BASE,
+    Output("live-stream", "data"),
+    Input("auth-store", "data"),
+    Input("url", "pathname"),
+)
+
+
+@app.callback(
+    Output({"type": "mc-progress", "course_id": ALL}, "children"),
+    Input("live-event", "data"),
+    State({"type": "mc-progress", "course_id": ALL}, "id"),
+    prevent_initial_call=True,
+)
+def live_progress(event, ids):
+    # Only the card of the course that changed is re-rendered
+    if not event or event.get("type") != "progress":
+        raise PreventUpdate
+    data = event["data"]
+    return [
+        f"Progress: {data['completion_percent']}%" if i["course_id"] == data["course_id"] else dash.no_update
+        for i in ids
+    ]
+
+
+@app.callback(
+    Output("my-courses-list", "children", allow_duplicate=True),
+    Input("live-event", "data"),
+    State({"type": "mc-progress", "course_id": ALL}, "id"),
+    State("my-courses-role", "data"),
+    prevent_initial_call=True,
+)
+def live_enrollment(event, ids, role):
+    # Enrolled in another tab: add the new card on top instead of reloading the list
+    # (instructors/admin see the courses they teach here instead)
+    if not event or event.get("type") != "enrollment" or event["channel"].startswith("course:"):
+        raise PreventUpdate
+    if role in ("instructor", "admin"):
+        raise PreventUpdate
+    course = event["data"]["course"]
+    if any(i["course_id"] == course["id"] for i in ids):
+        raise PreventUpdate
+    if not ids:
+        return [my_course_card(course, 0)]
+    cards = dash.Patch()
+    cards.prepend(my_course_card(course, 0))
+    return cards
+
 
 def instructor_page(user):
     return html.Div(
@@ -819,9 +1275,57 @@ def instructor_course_page(user, course_id: int):
             html.Hr(),
 
             html.H3("Lessons"),
+            # Reorder locally with the arrows, then save the whole order in one request
+            dcc.Store(id="ic-lessons-order"),
             html.Div(id="ic-lessons-list"),
+            html.Button("Save order", id="ic-order-save", n_clicks=0),
             html.Div(id="ic-lessons-msg", style={"marginTop": "10px"}),
 
+            html.Hr(),
+            html.H3("Live activity"),
+            html.Ul(id="ic-activity", children=[]),
+
+            html.Hr(),
+            html.H3("Prerequisites"),
+            html.Label("Lesson"),
+            dcc.Dropdown(id="ic-prereq-lesson", options=[], placeholder="Select a lesson"),
+            html.Br(),
+            html.Label("Requires completing"),
+            dcc.Dropdown(id="ic-prereq-ids", options=[], multi=True, placeholder="No prerequisites"),
+            html.Br(),
+            html.Button("Save prerequisites", id="ic-prereq-save", n_clicks=0),
+            html.Div(id="ic-prereq-msg", style={"marginTop": "10px"}),
+
+            html.Hr(),
+            html.H3("Media"),
+            html.Label("Lesson"),
+            dcc.Dropdown(id="ic-media-lesson", options=[], placeholder="Select a lesson"),
+            html.Br(),
+            dcc.Upload(
+                id="ic-media-upload",
+                children=html.Div(["Drop an audio/video/image file or ", html.A("select one")]),
+                style={"border": "1px dashed #999", "padding": "20px", "textAlign": "center"},
+            ),
+            html.Div(id="ic-media-msg", style={"marginTop": "10px"}),
+
+            html.Hr(),
+            html.H3("Roster"),
+            html.Button("Download CSV", id="ic-roster-csv-btn", n_clicks=0),
+            dcc.Download(id="ic-roster-download"),
+            html.Div(id="ic-roster-msg", style={"margin": "10px 0"}),
+            # Server-side pages; only the visible rows of a page are rendered
+            dash_table.DataTable(
+                id="ic-roster",
+                page_action="custom",
+                page_current=0,
+                page_size=ROSTER_PAGE_SIZE,
+                virtualization=True,
+                fixed_rows={"headers": True},
+                fixed_columns={"headers": True, "data": 2},
+                style_table={"height": "420px", "overflowY": "auto", "overflowX": "auto", "minWidth": "100%"},
+                style_cell={"minWidth": "40px", "fontFamily": "Arial", "fontSize": "13px"},
+            ),
+
             html.Hr(),
             html.H3("Add a Lesson"),
             html.Label("Lesson Title"),
@@ -843,7 +1347,7 @@ def instructor_course_page(user, course_id: int):
 
 @app.callback(
     Output("ic-course-info", "children"),
-    Output("ic-lessons-list", "children"),
+    Output("ic-lessons-order", "data"),
     Input("url", "pathname"),
     State("auth-store", "data"),
 )
@@ -881,24 +1385,146 @@ def load_instructor_course_data(pathname, auth_data):
         html.Small(f"Level: {course.get('level','')} | Instructor ID: {course.get('instructor_id')}"),
     ])
 
-    # Fetch lessons
+    return course_info, fetch_lesson_order(course_id)
+
+
+def fetch_lesson_order(course_id: int) -> dict:
+    # The list ETag goes back as If-Match when saving a new order
     rl = requests.get(f"{API_BASE}/courses/{course_id}/lessons", timeout=5)
     lessons = rl.json() if rl.status_code == 200 else []
+    return {
+        "course_id": course_id,
+        "ids": [l["id"] for l in lessons],
+        "titles": {str(l["id"]): l["title"] for l in lessons},
+        "etag": rl.headers.get("ETag"),
+        "dirty": False,
+    }
+
 
-    if not lessons:
-        lessons_view = html.Div("No lessons yet.")
+@app.callback(
+    Output("ic-lessons-order", "data", allow_duplicate=True),
+    Output("ic-lessons-msg", "children", allow_duplicate=True),
+    Input("live-event", "data"),
+    State("ic-lessons-order", "data"),
+    prevent_initial_call=True,
+)
+def live_lessons_changed(event, order):
+    # Lessons added, edited, deleted or reordered (here or by another editor)
+    if not event or not order or event.get("type") not in ("lessons_changed", "reset"):
+        raise PreventUpdate
+    if event.get("type") == "lessons_changed" and event["data"]["course_id"] != order["course_id"]:
+        raise PreventUpdate
+    if order.get("dirty"):
+        return dash.no_update, html.Div("Lessons changed elsewhere; save will fail until you refresh the page.",
+                                        style={"color": "crimson"})
+    return fetch_lesson_order(order["course_id"]), dash.no_update
+
+
+@app.callback(
+    Output("ic-activity", "children"),
+    Input("live-event", "data"),
+    State("manage-course-id", "data"),
+    prevent_initial_call=True,
+)
+def live_course_activity(event, course_id):
+    if not event or event.get("channel") != f"course:{course_id}":
+        raise PreventUpdate
+    data = event["data"]
+    if event["type"] == "enrollment":
+        line = f"{data['name']} enrolled ({data['enrollment_count']} students)"
+    elif event["type"] == "completion":
+        line = f"{data['name']} completed a lesson ({data['completion_percent']}% of the course)"
     else:
-        lessons_view = html.Ul([
-            html.Li([
-                html.Span(f"{l['order_index']}. {l['title']} "),
-                html.Small(" "),
-                dcc.Link("View", href=f"/lesson/{l['id']}"),
-                # Edit/Delete will come later once backend supports it
-            ])
-            for l in lessons
-        ])
+        raise PreventUpdate
+    items = dash.Patch()
+    items.prepend(html.Li(line))
+    return items
 
-    return course_info, lessons_view
+
+@app.callback(
+    Output("ic-lessons-list", "children"),
+    Input("ic-lessons-order", "data"),
+)
+def render_lesson_order(order):
+    if not order:
+        raise PreventUpdate
+    if not order["ids"]:
+        return html.Div("No lessons yet.")
+
+    arrow = {"padding": "0 6px", "marginRight": "4px"}
+    return html.Ol([
+        html.Li([
+            html.Button("↑", id={"type": "ic-move", "dir": "up", "index": lesson_id}, n_clicks=0,
+                        disabled=i == 0, style=arrow),
+            html.Button("↓", id={"type": "ic-move", "dir": "down", "index": lesson_id}, n_clicks=0,
+                        disabled=i == len(order["ids"]) - 1, style=arrow),
+            html.Span(f"{order['titles'][str(lesson_id)]} "),
+            dcc.Link("View", href=f"/lesson/{lesson_id}"),
+        ], style={"margin": "4px 0"})
+        for i, lesson_id in enumerate(order["ids"])
+    ])
+
+
+@app.callback(
+    Output("ic-lessons-order", "data", allow_duplicate=True),
+    Input({"type": "ic-move", "dir": ALL, "index": ALL}, "n_clicks"),
+    State("ic-lessons-order", "data"),
+    prevent_initial_call=True,
+)
+def move_lesson(_clicks, order):
+    # Re-rendered buttons fire with n_clicks=0; only real clicks move a lesson
+    trigger = dash.ctx.triggered_id
+    if not order or not trigger or not dash.ctx.triggered[0]["value"]:
+        raise PreventUpdate
+
+    ids = list(order["ids"])
+    i = ids.index(trigger["index"])
+    j = i - 1 if trigger["dir"] == "up" else i + 1
+    if not 0 <= j < len(ids):
+        raise PreventUpdate
+    ids[i], ids[j] = ids[j], ids[i]
+    return {**order, "ids": ids, "dirty": True}
+
+
+@app.callback(
+    Output("ic-lessons-msg", "children"),
+    Output("ic-lessons-order", "data", allow_duplicate=True),
+    Input("ic-order-save", "n_clicks"),
+    State("ic-lessons-order", "data"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def save_lesson_order(n, order, auth_data):
+    if not n or not order:
+        raise PreventUpdate
+
+    token = (auth_data or {}).get("access_token")
+    if not token:
+        return html.Div("Please login first.", style={"color": "crimson"}), dash.no_update
+    if not order.get("dirty"):
+        return html.Div("Order unchanged."), dash.no_update
+
+    # One request for the whole course, however many lessons moved
+    headers = auth_headers(token)
+    if order.get("etag"):
+        headers["If-Match"] = order["etag"]
+    r = requests.put(
+        f"{API_BASE}/courses/{order['course_id']}/lessons/order",
+        json={"lesson_ids": order["ids"]},
+        headers=headers,
+        timeout=5,
+    )
+    if r.status_code == 200:
+        return (
+            html.Div("Order saved ✅", style={"color": "green"}),
+            {**order, "etag": r.headers.get("ETag"), "dirty": False},
+        )
+    if r.status_code == 412:
+        return html.Div("Lessons were changed elsewhere; refresh the page and reorder again.",
+                        style={"color": "crimson"}), dash.no_update
+
+    msg = safe_json(r).get("error", r.text)
+    return html.Div(f"Saving order failed: {msg}", style={"color": "crimson"}), dash.no_update
 
 @app.callback(
     Output("ic-add-lesson-msg", "children"),
@@ -942,6 +1568,199 @@ def add_lesson_from_manage_page(n, course_id, title, content, order_index, auth_
     msg = safe_json(r).get("error", r.text)
     return html.Div(f"Add lesson failed: {msg}", style={"color": "crimson"})
 
+# -----------------------
+# Instructor course: prerequisites editor
+# -----------------------
+@app.callback(
+    Output("ic-prereq-lesson", "options"),
+    Output("ic-prereq-ids", "options"),
+    Output("ic-media-lesson", "options"),
+    Input("manage-course-id", "data"),
+)
+def load_prereq_options(course_id):
+    if not course_id:
+        raise PreventUpdate
+    try:
+        r = requests.get(f"{API_BASE}/courses/{course_id}/lessons", timeout=5)
+    except Exception:
+        raise PreventUpdate
+    lessons = r.json() if r.status_code == 200 else []
+    options = [{"label": f"{l['order_index']}. {l['title']}", "value": l["id"]} for l in lessons]
+    return options, options, options
+
+
+@app.callback(
+    Output("ic-prereq-ids", "value"),
+    Input("ic-prereq-lesson", "value"),
+)
+def load_prereqs(lesson_id):
+    if not lesson_id:
+        raise PreventUpdate
+    r = requests.get(f"{API_BASE}/lessons/{lesson_id}/prerequisites", timeout=5)
+    return r.json().get("prerequisite_ids", []) if r.status_code == 200 else []
+
+
+@app.callback(
+    Output("ic-prereq-msg", "children"),
+    Input("ic-prereq-save", "n_clicks"),
+    State("ic-prereq-lesson", "value"),
+    State("ic-prereq-ids", "value"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def save_prereqs(n, lesson_id, prereq_ids, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not n or not token:
+        raise PreventUpdate
+    if not lesson_id:
+        return html.Div("Select a lesson first.", style={"color": "crimson"})
+
+    r = requests.put(
+        f"{API_BASE}/lessons/{lesson_id}/prerequisites",
+        json={"prerequisite_ids": prereq_ids or []},
+        headers=auth_headers(token),
+        timeout=10,
+    )
+    if r.status_code == 200:
+        return html.Div("Prerequisites saved ✅", style={"color": "green"})
+    msg = safe_json(r).get("error", r.text)
+    return html.Div(f"Save failed: {msg}", style={"color": "crimson"})
+
+
+# -----------------------
+# Instructor course: media upload
+# -----------------------
+@app.callback(
+    Output("ic-media-msg", "children"),
+    Input("ic-media-upload", "contents"),
+    State("ic-media-upload", "filename"),
+    State("ic-media-lesson", "value"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def upload_media(contents, filename, lesson_id, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not contents or not token:
+        raise PreventUpdate
+    if not lesson_id:
+        return html.Div("Select a lesson first.", style={"color": "crimson"})
+
+    header, encoded = contents.split(",", 1)
+    content_type = header[len("data:"):].split(";")[0]
+    data = base64.b64decode(encoded)
+
+    r = requests.post(
+        f"{API_BASE}/lessons/{lesson_id}/media/uploads",
+        json={"filename": filename, "content_type": content_type, "size": len(data)},
+        headers=auth_headers(token),
+        timeout=10,
+    )
+    if r.status_code != 201:
+        msg = safe_json(r).get("error", r.text)
+        return html.Div(f"Upload failed: {msg}", style={"color": "crimson"})
+    upload = r.json()
+
+    # Send chunks from the server's offset; a retry resumes where the API left off
+    offset, attempts = upload["offset"], 0
+    while offset < len(data):
+        end = min(offset + upload["chunk_size"], len(data)) - 1
+        try:
+            r = requests.put(
+                f"{API_BASE}/media/uploads/{upload['upload_id']}",
+                data=data[offset:end + 1],
+                headers={**auth_headers(token), "Content-Range": f"bytes {offset}-{end}/{len(data)}"},
+                timeout=60,
+            )
+        except requests.RequestException:
+            r = None
+        if r is not None and r.status_code == 201:
+            break
+        if r is not None and r.status_code == 200:
+            offset, attempts = r.json()["offset"], 0
+            continue
+        attempts += 1
+        if attempts > 3:
+            return html.Div("Upload failed: too many retries", style={"color": "crimson"})
+        status = requests.get(f"{API_BASE}/media/uploads/{upload['upload_id']}", headers=auth_headers(token), timeout=10)
+        if status.status_code != 200:
+            return html.Div("Upload failed: session expired", style={"color": "crimson"})
+        offset = status.json()["offset"]
+
+    note = " (already stored, reused)" if safe_json(r).get("deduplicated") else ""
+    return html.Div(f"Uploaded {filename}{note} ✅", style={"color": "green"})
+
+
+# -----------------------
+# Instructor course: roster table
+# -----------------------
+@app.callback(
+    Output("ic-roster", "columns"),
+    Output("ic-roster", "data"),
+    Output("ic-roster", "page_count"),
+    Output("ic-roster-msg", "children"),
+    Input("ic-roster", "page_current"),
+    Input("ic-roster", "page_size"),
+    State("manage-course-id", "data"),
+    State("auth-store", "data"),
+)
+def load_roster_page(page_current, page_size, course_id, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not token or not course_id:
+        raise PreventUpdate
+
+    try:
+        r = requests.get(
+            f"{API_BASE}/courses/{course_id}/roster",
+            params={"page": (page_current or 0) + 1, "per_page": page_size},
+            headers=auth_headers(token),
+            timeout=10,
+        )
+    except Exception:
+        return [], [], 0, html.Div("Backend not reachable. Is Flask running on :5000?", style={"color": "crimson"})
+    if r.status_code != 200:
+        return [], [], 0, html.Div(safe_json(r).get("error", r.text), style={"color": "crimson"})
+
+    roster = r.json()
+    columns = [
+        {"name": "Student", "id": "name"},
+        {"name": "%", "id": "completion_percent"},
+        {"name": "Email", "id": "email"},
+    ] + [{"name": str(l["order_index"]), "id": f"l{l['id']}"} for l in roster["lessons"]]
+
+    data = []
+    for s in roster["students"]:
+        row = {"name": s["name"], "completion_percent": s["completion_percent"], "email": s["email"]}
+        for l, done in zip(roster["lessons"], s["lessons"]):
+            row[f"l{l['id']}"] = "✓" if done else ""
+        data.append(row)
+
+    pages = max(1, -(-roster["total"] // roster["per_page"]))
+    return columns, data, pages, html.Small(f"{roster['total']} students enrolled")
+
+
+@app.callback(
+    Output("ic-roster-download", "data"),
+    Input("ic-roster-csv-btn", "n_clicks"),
+    State("manage-course-id", "data"),
+    State("auth-store", "data"),
+    prevent_initial_call=True,
+)
+def download_roster(n, course_id, auth_data):
+    token = (auth_data or {}).get("access_token")
+    if not n or not token:
+        raise PreventUpdate
+
+    r = requests.get(
+        f"{API_BASE}/courses/{course_id}/roster",
+        params={"format": "csv"},
+        headers=auth_headers(token),
+        timeout=60,
+    )
+    if r.status_code != 200:
+        raise PreventUpdate
+    return dcc.send_bytes(r.content, f"course-{course_id}-roster.csv")
+
+
 if __name__ == "__main__":
     app.run(debug=True, port=8050)
 